@@ -1,15 +1,30 @@
 import multiprocessing
+import os
 import sys
-from functools import reduce
 from pathlib import Path
 from timeit import default_timer as timer
-from typing import Callable
+from typing import Callable, Optional
 
-from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import evaluate as evaluate_baseline
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import evaluate as evaluate_baseline, \
+    find_counterexample as find_counterexample_baseline, evaluate_each as evaluate_each_baseline, \
+    write_trace_corpus as write_trace_corpus_baseline
 from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
-    evaluate as evaluate_optimized1
+    evaluate as evaluate_optimized1, find_counterexample as find_counterexample_optimized1, \
+    evaluate_each as evaluate_each_optimized1, write_trace_corpus as write_trace_corpus_optimized1
 from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
-    evaluate as evaluate_optimized2
+    evaluate as evaluate_optimized2, find_counterexample as find_counterexample_optimized2, \
+    evaluate_each as evaluate_each_optimized2, write_trace_corpus as write_trace_corpus_optimized2
+from checkers.symbolic_version.evaluator_bdd.BDDSpatioTemporalEvaluator import evaluate as evaluate_bdd
+from checkers.symbolic_version.evaluator_sat.SATSpatioTemporalEvaluator import check_validity
+from checkers.Checkpoint import checkpoint_path, checkpoint_scenario
+from checkers.Decomposition import decomposed_check
+from checkers.Planner import PLANNED_CHECKERS, plan, choose_checker
+from checkers.Portfolio import race, FINISHED, FAILED
+from checkers.ScenarioFamilies import FAMILIES, sweep, SWEEP_TIME_BUDGET
+from checkers.ScenarioGenerator import random_scenarios, differential_check, read_scenarios, write_record, \
+    MAX_PROPS, MAX_NOMS, MAX_GRID, MAX_TRACE_LENGTH, MAX_DEPTH
+from checkers.statistical_version.evaluator_sampling.SamplingSpatioTemporalEvaluator import estimate, \
+    DEFAULT_SAMPLES, DEFAULT_SEED, DEFAULT_CONFIDENCE
 from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
 from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
 
@@ -17,7 +32,8 @@ import argparse
 
 
 def evaluate_handler(queue: multiprocessing.Queue, propositions: list[str], nominals: list[str], assumptions: list[str], conclusions: list[str],
-                     grid_size: tuple[int, int], trace_max_length: int, show_traces: bool, evaluate: Callable):
+                     grid_size: tuple[int, int], trace_max_length: int, show_traces: bool, evaluate: Callable,
+                     options: dict):
     """
     Runs the evaluation function of the model checker.
 
@@ -30,9 +46,10 @@ def evaluate_handler(queue: multiprocessing.Queue, propositions: list[str], nomi
    :param trace_max_length: the maximal length of traces to consider
    :param show_traces: whether the (trace, point) tuples should be displayed in the console
    :param evaluate: model checker evaluation function
+   :param options: additional keyword arguments of the evaluation function
    """
     start: float = timer()
-    counter_sat, counter_gen = evaluate(propositions, nominals, assumptions, conclusions, grid_size, trace_max_length, show_traces)
+    counter_sat, counter_gen = evaluate(propositions, nominals, assumptions, conclusions, grid_size, trace_max_length, show_traces, **options)
     end: float = timer()
     timeX = end - start
 
@@ -42,7 +59,7 @@ def evaluate_handler(queue: multiprocessing.Queue, propositions: list[str], nomi
 
 def run_evaluator(run_id: int, propositions: list[str], nominals: list[str], assumptions: list[str],
                   conclusions: list[str], grid_size: tuple[int, int], trace_max_length: int, show_traces: bool,
-                  evaluator_function: Callable):
+                  evaluator_function: Callable, **options):
     """
    Returns for a given formula all (trace, points) tuples where the formula holds.
 
@@ -55,13 +72,25 @@ def run_evaluator(run_id: int, propositions: list[str], nominals: list[str], ass
    :param trace_max_length: the maximal length of traces to consider
    :param show_traces: whether the (trace, point) tuples should be displayed in the console
    :param evaluator_function: model checker evaluation function
+   :param options: additional keyword arguments of the evaluation function (e.g. static_props)
    """
     TIMEOUT = 600
 
+    # the checkers of the test suites checkpoint their counts to the checkpoint directory, if one is given
+    if CHECKPOINT_DIR is not None and evaluator_function in EVALUATORS:
+        options = {**options, "checkpoint": checkpoint_path(CHECKPOINT_DIR, checkpoint_scenario(
+            evaluator_function.__module__, propositions, nominals, assumptions, conclusions, grid_size,
+            trace_max_length, options.get("static_props", ()))), "resume": RESUME}
+
+    # the statistics of the search trees of the test suites are written to one file per test case and checker
+    if STATS_DIR is not None and evaluator_function in EVALUATORS:
+        options = {**options, "stats": os.path.join(
+            STATS_DIR, f"{run_id}-{EVALUATOR_NAMES[EVALUATORS.index(evaluator_function)]}.json")}
+
     queue = multiprocessing.Queue()
     # evaluate formula and return traces and points where the formula holds
     p = multiprocessing.Process(target=evaluate_handler, args=(
-        queue, propositions, nominals, assumptions, conclusions, grid_size, trace_max_length, show_traces, evaluator_function))
+        queue, propositions, nominals, assumptions, conclusions, grid_size, trace_max_length, show_traces, evaluator_function, options))
     p.start()
     p.join(TIMEOUT)
     if p.is_alive():
@@ -73,6 +102,20 @@ def run_evaluator(run_id: int, propositions: list[str], nominals: list[str], ass
         return run_id, len(nominals), grid_size, trace_max_length, sat, gen, time
 
 
+def run_scenario(run_id: int, scenario: dict, evaluator_function: Callable, **options):
+    """
+    Runs the evaluation function of a model checker on a scenario (see checkers.ScenarioFamilies).
+
+    :param run_id: the id of the run
+    :param scenario: the scenario
+    :param evaluator_function: model checker evaluation function
+    :param options: additional keyword arguments of the evaluation function
+    """
+    return run_evaluator(run_id, scenario["props"], scenario["noms"], scenario["assumptions"],
+                         scenario["conclusions"], scenario["grid_size"], scenario["max_trace_length"], False,
+                         evaluator_function, **options)
+
+
 def left_right_test(test_index: int, evaluator_function: Callable):
     """
     Tests a spatial validity.
@@ -105,12 +148,8 @@ def one_lane_follow_test(test_index: int, duration: int, road_length: int, evalu
     :param road_length: length of the one-lane road
     :param evaluator_function: function of the checker for evaluating the formula
     """
-    return run_evaluator(test_index, [], ['z0', 'z1'],
-                  ["@z0 !(Back 1)",  # SV is initially at the start of the lane
-                   "G (@z1 ↓z2 ((! X 1) | X @z1  (z2 | Back z2)))",  # POV always moves forward or stays put
-                   "G (@z0 ↓z2 ((! X 1) | X (@z0 ((!z1 & Back z2 ) | (z2 & Front z1) ))))"],
-                  # SV Always moves forward if safe, stays put if POV immediately ahead
-                  ["G(@z0 ! z1)"], (road_length, 1), duration, False, evaluator_function)
+    return run_scenario(test_index, FAMILIES["follow"].scenario(duration=duration, road_length=road_length),
+                        evaluator_function)
 
 
 def hazard_test(test_index: int, duration: int, evaluator_function: Callable):
@@ -122,28 +161,7 @@ def hazard_test(test_index: int, duration: int, evaluator_function: Callable):
     :param duration: maximal length of traces
     :param evaluator_function: function of the checker for evaluating the formula
     """
-    width = 2
-    length = 2
-
-    def fronts(i: int, p: str):
-        if i == 0:
-            return "({})".format(p)
-        else:
-            return "(Front {})".format(fronts(i - 1, p))
-
-    def bfront(p: str):
-        each = ["(({})->({}))".format(fronts(i + 1, "1"), fronts(i + 1, p)) for i in range(0, length)]
-        return "({})".format(reduce((lambda x, acc: x + "&" + acc), each))
-
-    def dfront(p: str):
-        each = [fronts(i + 1, p) for i in range(0, length)]
-        return "({})".format(reduce((lambda x, acc: x + "|" + acc), each))
-
-    p1 = "(Right z1) & {}".format(dfront("G h"))
-    p2 = "(@z0 ↓z2 X @z0 ((Back z2) & (G ! h)))"
-    p3 = "(@z0 ↓z2 X @z0((Left z2) & {} & {}))".format(dfront("z1"), bfront("G ! h"))
-    full = "@z0 (({}) & (({}) U ({})))".format(p1, p2, p3)
-    return run_evaluator(test_index, ["h"], ["z0", "z1"], [], [full], (length, width), duration, False, evaluator_function)
+    return run_scenario(test_index, FAMILIES["hazard"].scenario(duration=duration), evaluator_function)
 
 
 def safe_intersection_priority(test_index: int, duration: int, grid_size: int, evaluator_function: Callable):
@@ -156,13 +174,8 @@ def safe_intersection_priority(test_index: int, duration: int, grid_size: int, e
     :param road_length: width and length of the road
     :param evaluator_function: function of the checker for evaluating the formula
     """
-    return run_evaluator(test_index, [], ['z0', 'z1'],
-                  ["@z1 !(Left 1)",  # z1 starts somewhere on the left border
-                   "@z0 !(Back 1)",  # z0 starts somewhere on the bottom border
-                   "G (@z1 ↓z2 ((! X 1)| X @z1 (Left z2)))",  # Moves left-to-right always
-                   "G (@z0 ↓z2 ((! X 1)| X @z0 ((!z1 & Back z2) | (z2 & Front z1) )))"],
-                  # Moves bottom-to-top except it stops to avoid other vehicle.
-                  ["G (@z0 !z1)"], (grid_size, grid_size), duration, False, evaluator_function)
+    return run_scenario(test_index, FAMILIES["intersection"].scenario(duration=duration, grid_size=grid_size),
+                        evaluator_function)
 
 
 def safe_passing(test_index: int, duration: int, road_length: int, evaluator_function: Callable):
@@ -175,24 +188,8 @@ def safe_passing(test_index: int, duration: int, road_length: int, evaluator_fun
     :param road_length: width and length of the road
     :param evaluator_function: function of the checker for evaluating the formula
     """
-    # z0 initially moves forward
-    first_forward = "(@z0 ↓z2 ((! X 1) | X @z0 (Back z2)))"
-    # then swerves left to avoid z1
-    dodge_left = "(@z0 ↓z2 ((Front z1) & ((! X 1)| X (@z0 (Back (Right z2))))))"
-    # then drives twice as fast
-    fast_forward = "(@z0 ↓z2 ((! X 1)| X @z0 (Back (Back z2))))"
-    # then dodges back when safe
-    dodge_right = "(@z0 ↓z2 ((! X 1)| X @z0 (Back (Left z2))))"
-    # then drives normally
-    last_forward = "(@z0 ↓z2 ((! X 1) | X @z0 (Back z2)))"
-    return run_evaluator(test_index, [], ['z0', 'z1'],
-                  ["G(@z1 !(Right 1))",  # POV starts anywhere in right lane, stays in right lane
-                   "@z0 !(Right 1)",  # SV starts in back of right lane
-                   "@z0 !(Back 1)",
-                   "G (@z1 ↓z2 ((! X 1) | X @z1  (z2 | Back z2)))",  # z1 moves forward or stays in place
-                   "({} U ({} & ((! X 1) | X ({} & ((! X 1) | X ({} U ({} & ((! X 1) | X G ({})))))))))".format(
-                       first_forward, dodge_left, fast_forward, fast_forward, dodge_right, last_forward)],
-                  ["G (@z0 !z1)"], (road_length, 2), duration, False, evaluator_function)
+    return run_scenario(test_index, FAMILIES["passing"].scenario(duration=duration, road_length=road_length),
+                        evaluator_function)
 
 
 def join_platoon(test_index: int, duration: int, platoon_size: int, road_length: int, evaluator_function: Callable):
@@ -205,19 +202,8 @@ def join_platoon(test_index: int, duration: int, platoon_size: int, road_length:
     :param road_length: width and length of the road
     :param evaluator_function: function of the checker for evaluating the formula
     """
-    pov_noms = ["z" + str(i + 1) for i in range(platoon_size)]
-    noms = ["z0"] + pov_noms  # and z is a temporary
-    no_collide = "!({})".format(reduce((lambda x, acc: x + "|" + acc), pov_noms))
-    each_front = ["Front " + n for n in pov_noms]
-    some_front = reduce((lambda x, acc: x + "|" + acc), each_front)
-    sv_mov_assump = "G(@z0 ↓z ((! X 1) | (X @z0((Back z)|(({0})&(Right z)&({1}))))))".format(some_front, no_collide)
-    sv_start_assump = "@z0 !(Right 1)"
-    pov_start_assumps = [format("G(@z{0} !(Left 1))".format(str(i + 1))) for i in range(platoon_size)]
-    pov_mov_assumps = [format("G(@z{0} ↓z ((! X 1) | X (@z{0} (Back z))))".format(str(i + 1))) for i in
-                       range(platoon_size)]
-    assumps = [sv_start_assump, sv_mov_assump] + pov_mov_assumps + pov_start_assumps
-    postcond = "G(@z0 ({}))".format(no_collide)
-    return run_evaluator(test_index, [], noms, assumps, [postcond], (road_length, 2), duration, False, evaluator_function)
+    return run_scenario(test_index, FAMILIES["platoon"].scenario(duration=duration, platoon_size=platoon_size,
+                                                                 road_length=road_length), evaluator_function)
 
 
 def global_soundness(test_index: int, duration: int, evaluator_function: Callable):
@@ -226,6 +212,18 @@ def global_soundness(test_index: int, duration: int, evaluator_function: Callabl
 
 #BAR_STR = "###########################################################"
 EVALUATORS = [evaluate_baseline, evaluate_optimized1, evaluate_optimized2]
+EVALUATOR_NAMES = ["baseline", "optimized", "motion"]
+
+# directory of the checkpoints of the test suites (None for no checkpoints), and whether to resume from them
+CHECKPOINT_DIR: Optional[str] = None
+RESUME: bool = False
+
+# directory of the search tree statistics of the test suites (None for no statistics)
+STATS_DIR: Optional[str] = None
+
+# checkers compared on random scenarios, which must agree on #Sat
+DIFFERENTIAL_EVALUATORS = {"baseline": evaluate_baseline, "optimized": evaluate_optimized1,
+                           "motion": evaluate_optimized2, "bdd": evaluate_bdd}
 #EVALUATOR_MSGS = ["Running BASELINE algorithm (columns TraceX=Trace1, TimeX=Time1)", "Running OPTIMIZED algorithm (columns TraceX=Trace2, TimeX=Time2)", "Running MOTION algorithm (columns TraceX=Trace3, TimeX=Time3)"]
 
 
@@ -358,6 +356,111 @@ def run_all_test_cases():
         print(f'{counter_gets[0]}; {counter_gets[1]}; {counter_gets[2]}; {timeXs[0]}; {timeXs[1]}; {timeXs[2]}')
 
 
+def run_differential_test_cases(scenarios: list[dict], corpus: Optional[str] = None) -> int:
+    """
+    Runs all checkers of DIFFERENTIAL_EVALUATORS on each scenario and compares their #Sat.
+
+    :param scenarios: the scenarios
+    :param corpus: the JSON-lines file the scenarios and results are appended to (None for no file)
+    :return: 0 if the checkers agree on every scenario and none failed, 1 otherwise
+    """
+    names = list(DIFFERENTIAL_EVALUATORS)
+    print('Scenario; Nominals; Grid; Len; ' + "; ".join(f'#Sat {n}' for n in names) + "; "
+          + "; ".join(f'Time {n}' for n in names) + '; Agree')
+    print('-------------------------------------------------------------------------------')
+
+    disagreements = 0
+    failures = 0
+    for i, scenario in enumerate(scenarios):
+        record = differential_check(scenario, DIFFERENTIAL_EVALUATORS)
+        results = record["results"]
+        print(f'{i}; {len(scenario["noms"])}; {tuple(scenario["grid_size"])}; {scenario["max_trace_length"]}; '
+              + "; ".join("-" if results[n]["sat"] is None else str(results[n]["sat"]) for n in names) + "; "
+              + "; ".join("-" if results[n]["seconds"] is None else str(results[n]["seconds"]) for n in names)
+              + f'; {"yes" if record["agree"] else "no"}')
+        for name, r in results.items():
+            if r["state"] == FAILED:
+                failures += 1
+                print(f'{name} failed: {r["error"]}')
+        if not record["agree"]:
+            disagreements += 1
+            print(f'The checkers disagree on #Sat: {scenario}')
+        if corpus is not None:
+            write_record(corpus, {"index": i, **record})
+
+    print(f'{len(scenarios) - disagreements} of {len(scenarios)} scenarios agree on #Sat, {failures} checker runs failed')
+    return 1 if disagreements or failures else 0
+
+
+def run_sweep(family: str, parameter: Optional[str], checkers: list[str], parameters: dict[str, int],
+              time_budget: float, memory_budget: Optional[int]):
+    """
+    Grows a parameter of a scenario family until each checker exceeds the time or memory budget, and prints the runs
+    and the fitted scaling curve of every checker.
+
+    :param family: the name of the scenario family
+    :param parameter: the parameter to grow (None for the first scaling parameter of the family)
+    :param checkers: the names of the checkers (of DIFFERENTIAL_EVALUATORS)
+    :param parameters: the parameters of the family differing from the defaults
+    :param time_budget: the seconds after which a run is cancelled
+    :param memory_budget: the megabytes of address space a run may use (None for no limit)
+    """
+    parameter = parameter or FAMILIES[family].scaling[0]
+    for name in checkers:
+        result = sweep(FAMILIES[family], parameter, DIFFERENTIAL_EVALUATORS[name], parameters, time_budget,
+                       memory_budget)
+        print(f'Checker: {name}; Family: {family}; Parameters: {result["parameters"]}')
+        print(f'{parameter}; State; #Sat; #Trace; Time; Memory')
+        print('-------------------------------------------------------------------------------')
+        for p in result["points"]:
+            print(f'{p["value"]}; {p["state"]}; ' + "; ".join("-" if p[k] is None else str(p[k])
+                                                              for k in ("sat", "traces", "seconds", "memory")))
+            if p["error"] is not None:
+                print(f'{name} failed: {p["error"]}')
+        fit = result["fit"]
+        if fit is None:
+            print('Fit: too few finished runs')
+        elif fit["model"] == "exponential":
+            print(f'Fit: Time = {fit["a"]:.3g} * {fit["b"]:.3g} ^ {parameter} (r2 {fit["r2"]:.3f})')
+        else:
+            print(f'Fit: Time = {fit["a"]:.3g} * {parameter} ^ {fit["b"]:.3g} (r2 {fit["r2"]:.3f})')
+        limit = "-" if result["limit"] is None else f'{result["limit"]:.1f}'
+        print(f'Largest {parameter} within budget: {"-" if result["largest"] is None else result["largest"]}; '
+              f'{parameter} at which the fit reaches {time_budget} seconds: {limit}')
+        print()
+
+
+def print_decomposition(checks: list[dict]):
+    """
+    Prints the checks run by decomposed_check, one per line.
+
+    :param checks: the checks (with their nominals, assumptions, conclusions and result)
+    """
+    for i, c in enumerate(checks):
+        verdict: str = "valid" if c["result"][0] is None else "counterexample"
+        print(f'\t |Check {i + 1}: nominals {" ".join(c["noms"]) or "-"}; {len(c["assumptions"])} assumptions; '
+              f'conclusions {" & ".join(c["conclusions"])}; {verdict}')
+
+
+def read_formula_file(path_string: str, kind: str) -> list[str]:
+    """
+    Reads a file with one formula per line.
+
+    :param path_string: the path of the file
+    :param kind: the kind of formulas (e.g. Assumptions), used in error messages
+    :return: the formulas
+    """
+    path = Path(path_string)
+    if not path.exists():
+        raise FileNotFoundError(f"{kind} file not found.")
+
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    except OSError:
+        raise RuntimeError(f"Error reading {kind.lower()} file.")
+
+
 def create_parser():
     parser = argparse.ArgumentParser(description="Checker experiment runner")
 
@@ -365,6 +468,12 @@ def create_parser():
     mode = parser.add_mutually_exclusive_group(required=False)
     mode.add_argument("--quick", action="store_true", help="Run the quick reproduction subset")
     mode.add_argument("--all", dest="run_all", action="store_true", help="Run the full experiment suite")
+    mode.add_argument("--differential", type=int, metavar="N",
+                      help="Compare the #Sat of all checkers on N random scenarios")
+    mode.add_argument("--replay", type=str,
+                      help="Compare the #Sat of all checkers on the scenarios of a file written by --scenarios")
+    mode.add_argument("--sweep", type=str, choices=list(FAMILIES),
+                      help="Grow a parameter of a scenario family until the checker exceeds the time or memory budget")
 
     # Custom parameters (used only when neither --quick nor --all is passed)
     parser.add_argument("--road_length", type=int, help="Road length for a custom test case")
@@ -375,19 +484,105 @@ def create_parser():
     parser.add_argument("--conclusions", type=str, help="Path to conclusions file")
     parser.add_argument("--max_trace_length", type=int, help="Maximum trace length")
     parser.add_argument("--show_traces", type=int, choices=[0, 1], help="Whether to print traces (0/1)")
-    parser.add_argument("--checker", type=str, choices=["optimized", "baseline", "motion"], help="Checker implementation")
+    parser.add_argument("--checker", type=str,
+                        choices=["optimized", "baseline", "motion", "bdd", "sat", "sampling", "auto", "race"],
+                        help="Checker implementation (auto: the one with the lowest estimated running time, "
+                             "race: the first of baseline, optimized and motion to finish)")
+    parser.add_argument("--cross_validate", action="store_true",
+                        help="With --checker race, let all checkers finish and compare their #Sat")
+    parser.add_argument("--dry_run", action="store_true",
+                        help="Print the estimated #Trace and running time of each checker without running one")
+    parser.add_argument("--static_prop", dest="static_props", action="append", default=[],
+                        help="Proposition whose placement does not change over time (repeatable, optimized/motion only).")
+    parser.add_argument("--mode", type=str, choices=["count", "counterexample", "each", "corpus"], default="count",
+                        help="Count satisfying traces, stop at the first counterexample of a custom test case, "
+                             "count the traces satisfying each conclusion separately, "
+                             "or write the traces of the checker to a corpus file")
+    parser.add_argument("--decompose", action="store_true",
+                        help="Split the conclusions into conjuncts and check each on the nominals it mentions "
+                             "(--mode counterexample or --checker sat)")
+    parser.add_argument("--corpus", type=str, help="Path of the binary trace corpus written by --mode corpus")
+    parser.add_argument("--index", type=str,
+                        help="Directory of the on-disk indexes of assumption-satisfying traces (--mode each only)")
+    parser.add_argument("--dimacs", type=str, help="Path to write the CNF of the sat checker to (DIMACS format)")
+    parser.add_argument("--sat_solver", type=str, help="SAT solver of the sat checker (executable or 'bundled')")
+    parser.add_argument("--checkpoint", type=str,
+                        help="Checkpoint file of a count (a directory of checkpoint files with --quick or --all), "
+                             "written periodically")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the count(s) from the checkpoint(s) given by --checkpoint")
+    parser.add_argument("--cone_of_influence", action="store_true",
+                        help="Only enumerate the propositions, nominals and trace steps the formulas depend on and "
+                             "scale the counts (baseline/optimized only)")
+    parser.add_argument("--stats", type=str,
+                        help="JSON file the statistics of the search tree are written to (a directory of such files "
+                             "with --quick or --all)")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                        help="Number of traces drawn by the sampling checker")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help="Seed of the sampling checker and of the random scenarios of --differential")
+    parser.add_argument("--scenarios", type=str,
+                        help="JSON-lines file the scenarios and results of --differential/--replay are appended to")
+    parser.add_argument("--max_props", type=int, default=MAX_PROPS,
+                        help="Maximal number of propositions of the random scenarios")
+    parser.add_argument("--max_noms", type=int, default=MAX_NOMS,
+                        help="Maximal number of nominals of the random scenarios")
+    parser.add_argument("--max_depth", type=int, default=MAX_DEPTH,
+                        help="Maximal nesting depth of the formulas of the random scenarios")
+    parser.add_argument("--parameter", type=str,
+                        help="Parameter grown by --sweep (default: the first scaling parameter of the family)")
+    parser.add_argument("--set", dest="family_parameters", action="append", default=[], metavar="NAME=VALUE",
+                        help="Parameter of the --sweep family differing from its default (repeatable)")
+    parser.add_argument("--time_budget", type=float, default=SWEEP_TIME_BUDGET,
+                        help="Seconds after which a run of --sweep is cancelled")
+    parser.add_argument("--memory_budget", type=int, help="Megabytes of address space a run of --sweep may use")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE,
+                        help="Confidence level of the intervals of the sampling checker")
 
     return parser
 
 def main():
+    global CHECKPOINT_DIR, RESUME, STATS_DIR
     parser = create_parser()
     args = parser.parse_args()
 
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint.")
+
     # Mode A/B
+    if args.quick or args.run_all:
+        CHECKPOINT_DIR = args.checkpoint
+        RESUME = args.resume
+        STATS_DIR = args.stats
     if args.quick:
         return run_quick_test_cases()
     if args.run_all:
         return run_all_test_cases()
+    if args.differential is not None:
+        # the road dimensions and the trace length bound those of the random scenarios
+        scenarios = list(random_scenarios(
+            args.differential, args.seed, max_props=args.max_props, max_noms=args.max_noms,
+            max_grid=(args.road_length or MAX_GRID[0], args.road_width or MAX_GRID[1]),
+            max_trace_length=args.max_trace_length or MAX_TRACE_LENGTH, max_depth=args.max_depth))
+        return run_differential_test_cases(scenarios, args.scenarios)
+    if args.replay:
+        return run_differential_test_cases(read_scenarios(args.replay), args.scenarios)
+    if args.sweep:
+        family = FAMILIES[args.sweep]
+        if args.parameter is not None and args.parameter not in family.scaling:
+            parser.error(f"--sweep {args.sweep} scales on: {' '.join(family.scaling)}")
+        if args.checker is not None and args.checker not in DIFFERENTIAL_EVALUATORS:
+            parser.error("--sweep is only supported by the " + ", ".join(DIFFERENTIAL_EVALUATORS) + " checkers.")
+        parameters = {}
+        for p in args.family_parameters:
+            name, _, value = p.partition("=")
+            if name not in family.parameters or not value.isdigit():
+                parser.error(f"--set expects NAME=VALUE with a parameter of {args.sweep}: "
+                             + " ".join(family.parameters))
+            parameters[name] = int(value)
+        # without --checker, all checkers are swept
+        checkers = [args.checker] if args.checker else list(DIFFERENTIAL_EVALUATORS)
+        return run_sweep(args.sweep, args.parameter, checkers, parameters, args.time_budget, args.memory_budget)
 
     # Mode C: custom run (validate required fields)
     required = [
@@ -399,6 +594,9 @@ def main():
         "show_traces",
         "checker",
     ]
+    if args.mode == "corpus":
+        # the traces of a corpus do not depend on the conclusions
+        required = [r for r in required if r != "conclusions"] + ["corpus"]
 
     missing = [r for r in required if getattr(args, r) is None]
     if missing:
@@ -416,40 +614,200 @@ def main():
     else:
         show_traces = False
 
+    assumptions = read_formula_file(getattr(args, 'assumptions'), "Assumptions")
+    conclusions = read_formula_file(getattr(args, 'conclusions'), "Conclusions") if args.conclusions else []
+    if not conclusions and args.mode != "corpus":
+        raise ValueError("No conclusions found in the file.")
+
+    # estimate the traces and running time of each checker before running one
+    if getattr(args, 'checker') == 'auto' or args.dry_run:
+        # the cone of influence is only projected by the baseline and optimized checkers
+        planned = ("baseline", "optimized") if args.cone_of_influence else PLANNED_CHECKERS
+        estimates = plan(args.props, args.noms, assumptions, conclusions, (road_length, road_width), max_trace_length,
+                         args.static_props, checkers=planned)
+        selected = choose_checker(estimates) if getattr(args, 'checker') == 'auto' else getattr(args, 'checker')
+        if args.dry_run:
+            print('Checker; #Trace (estimate); Exact; Time (estimate)')
+            print('-------------------------------------------------------------------------------')
+            for e in estimates:
+                print(f'{e["checker"]}; {e["traces"]}; {"yes" if e["exact"] else "no"}; {e["seconds"]}')
+            print(f'Selected checker: {selected}')
+            return
+        print(f'Selected checker: {selected}')
+        args.checker = selected
+
     if getattr(args, 'checker') == 'baseline':
         checker = evaluate_baseline
+        counterexample_finder = find_counterexample_baseline
+        each_evaluator = evaluate_each_baseline
+        corpus_writer = write_trace_corpus_baseline
     elif getattr(args, 'checker') == 'optimized':
         checker = evaluate_optimized1
+        counterexample_finder = find_counterexample_optimized1
+        each_evaluator = evaluate_each_optimized1
+        corpus_writer = write_trace_corpus_optimized1
+    elif getattr(args, 'checker') == 'bdd':
+        checker = evaluate_bdd
+        counterexample_finder = None
+        each_evaluator = None
+        corpus_writer = None
+    elif getattr(args, 'checker') in ('sampling', 'race'):
+        checker = None
+        counterexample_finder = None
+        each_evaluator = None
+        corpus_writer = None
     else:
         checker = evaluate_optimized2
-
-    path = Path(getattr(args, 'assumptions'))
-    assumptions = []
-
-    if not path.exists():
-        raise FileNotFoundError("Assumptions file not found.")
-
-    try:
-        with path.open("r", encoding="utf-8") as f:
-            assumptions = [line.strip() for line in f if line.strip()]
-    except OSError:
-        raise RuntimeError("Error reading assumptions file.")
-
-    path = Path(getattr(args, 'conclusions'))
-    conclusions = []
-    if not path.exists():
-        raise FileNotFoundError("Conclusions file not found.")
-
-    try:
-        with path.open("r", encoding="utf-8") as f:
-            conclusions = [line.strip() for line in f if line.strip()]
-    except OSError:
-        raise RuntimeError("Error reading assumptions file.")
-
-    if not conclusions:
-        raise ValueError("No conclusions found in the file.")
-
-    run_id, len_nom, grid_size, trace_max_length, counter_sat, counter_get, timeX = run_evaluator(1, args.props, args.noms, assumptions, conclusions, (road_length, road_width), max_trace_length, show_traces, checker)
+        counterexample_finder = find_counterexample_optimized2
+        each_evaluator = evaluate_each_optimized2
+        corpus_writer = write_trace_corpus_optimized2
+
+    unknown_static_props = [p for p in args.static_props if p not in args.props]
+    if unknown_static_props:
+        parser.error("Static propositions must also be given with --prop: " + " ".join(unknown_static_props))
+    if args.static_props and getattr(args, 'checker') not in ('optimized', 'motion', 'race'):
+        parser.error("--static_prop is only supported by the optimized and motion checkers.")
+    options = {"static_props": args.static_props} if args.static_props else {}
+
+    if args.mode == "counterexample" and getattr(args, 'checker') == 'bdd':
+        parser.error("The bdd checker only counts traces, use --checker sat for a symbolic counterexample search.")
+    if args.mode != "count" and getattr(args, 'checker') == 'sampling':
+        parser.error("The sampling checker only estimates counts (--mode count).")
+    if args.mode != "count" and getattr(args, 'checker') == 'race':
+        parser.error("The race checker only counts traces (--mode count).")
+    if args.cross_validate and getattr(args, 'checker') != 'race':
+        parser.error("--cross_validate is only supported by the race checker.")
+    if getattr(args, 'checker') == 'sampling' and (args.samples <= 0 or not 0 < args.confidence < 1):
+        parser.error("--samples must be positive and --confidence between 0 and 1.")
+    if args.mode == "each" and getattr(args, 'checker') in ('bdd', 'sat'):
+        parser.error("--mode each is only supported by the baseline, optimized and motion checkers.")
+    if args.mode == "corpus" and getattr(args, 'checker') in ('bdd', 'sat'):
+        parser.error("--mode corpus is only supported by the baseline, optimized and motion checkers.")
+    if args.decompose and args.mode != "counterexample" and getattr(args, 'checker') != 'sat':
+        parser.error("--decompose is only supported with --mode counterexample or --checker sat.")
+    if args.decompose and args.dimacs:
+        parser.error("--decompose cannot be combined with --dimacs.")
+    if args.index and args.mode != "each":
+        parser.error("--index is only supported with --mode each.")
+    if args.checkpoint and (args.mode != "count" or getattr(args, 'checker') not in ('baseline', 'optimized', 'motion')):
+        parser.error("--checkpoint is only supported with --mode count and the baseline, optimized and motion checkers.")
+    if args.checkpoint:
+        options = {**options, "checkpoint": args.checkpoint, "resume": args.resume}
+    if args.stats and (args.mode != "count" or getattr(args, 'checker') not in ('baseline', 'optimized', 'motion')):
+        parser.error("--stats is only supported with --mode count and the baseline, optimized and motion checkers.")
+    if args.stats:
+        options = {**options, "stats": args.stats}
+    if args.cone_of_influence and (args.mode != "count" or getattr(args, 'checker') not in ('baseline', 'optimized')):
+        parser.error("--cone_of_influence is only supported with --mode count and the baseline and optimized checkers.")
+    if args.cone_of_influence and args.checkpoint:
+        parser.error("--cone_of_influence cannot be combined with --checkpoint, whose positions are full-space ranks.")
+    if args.cone_of_influence:
+        options = {**options, "cone_of_influence": True}
+
+    if args.mode == "corpus":
+        start: float = timer()
+        count = corpus_writer(args.props, args.noms, assumptions, (road_length, road_width), max_trace_length,
+                              args.corpus, **options)
+        timeX = timer() - start
+        print(f'Wrote {count} traces to {args.corpus} (time {timeX})')
+        return
+
+    if getattr(args, 'checker') == 'sat':
+        start: float = timer()
+        if args.decompose:
+            (trace, points), checks = decomposed_check(lambda *check: check_validity(*check, None, args.sat_solver),
+                                                       args.props, args.noms, assumptions, conclusions,
+                                                       (road_length, road_width), max_trace_length)
+            print_decomposition(checks)
+        else:
+            trace, points = check_validity(args.props, args.noms, assumptions, conclusions, (road_length, road_width),
+                                           max_trace_length, args.dimacs, args.sat_solver)
+        timeX = timer() - start
+        if trace is None:
+            print(f'Valid: the conclusions hold on all traces up to length {max_trace_length} (time {timeX})')
+        else:
+            print(f'Not valid: counterexample of length {len(trace)} violating the conclusions at points {points} '
+                  f'(time {timeX})')
+            print("\t |", trace)
+        return
+
+    if getattr(args, 'checker') == 'sampling':
+        start: float = timer()
+        result = estimate(args.props, args.noms, assumptions, conclusions, (road_length, road_width),
+                          max_trace_length, show_traces, args.samples, args.seed, args.confidence)
+        timeX = timer() - start
+        sat_low, sat_high = result["sat_interval"]
+        fraction_low, fraction_high = result["fraction_interval"]
+        conditional_low, conditional_high = result["conditional_interval"]
+        print(f'Samples: {result["samples"]} (seed {args.seed}); #Trace: {result["traces"]}; Time: {timeX}')
+        print(f'#Sat: {result["sat"]} ({args.confidence:.0%} interval {sat_low} to {sat_high})')
+        print(f'Satisfying fraction: {result["fraction"]:.6f} ({fraction_low:.6f} to {fraction_high:.6f})')
+        print(f'Satisfying fraction among the {result["assumption_samples"]} samples satisfying the assumptions: '
+              f'{result["conditional_fraction"]:.6f} ({conditional_low:.6f} to {conditional_high:.6f})')
+        return
+
+    if getattr(args, 'checker') == 'race':
+        # the baseline checker cannot keep static propositions in place
+        evaluators = {"baseline": evaluate_baseline, "optimized": evaluate_optimized1, "motion": evaluate_optimized2}
+        if args.static_props:
+            del evaluators["baseline"]
+        result = race(evaluators, (args.props, args.noms, assumptions, conclusions, (road_length, road_width),
+                                   max_trace_length, show_traces),
+                      {name: options for name in evaluators}, args.cross_validate)
+        print('Checker; State; #Sat; #Trace; Time')
+        print('-------------------------------------------------------------------------------')
+        for name, r in result["results"].items():
+            print(f'{name}; {r["state"]}; ' + "; ".join("-" if r[k] is None else str(r[k])
+                                                       for k in ("sat", "traces", "seconds")))
+        for name, r in result["results"].items():
+            if r["error"] is not None:
+                print(f'{name} failed: {r["error"]}')
+        if result["winner"] is None:
+            print('No checker finished.')
+            return 1
+        print(f'Winner: {result["winner"]}; #Sat: {result["sat"]}')
+        if args.cross_validate:
+            finished = [name for name, r in result["results"].items() if r["state"] == FINISHED]
+            if not result["agree"]:
+                print('Cross-validation failed: the checkers disagree on #Sat')
+                return 1
+            print(f'Cross-validation: {", ".join(finished)} agree on #Sat')
+        return
+
+    if args.mode == "counterexample":
+        start: float = timer()
+        if args.decompose:
+            (trace, points, _), checks = decomposed_check(counterexample_finder, args.props, args.noms, assumptions,
+                                                          conclusions, (road_length, road_width), max_trace_length,
+                                                          **options)
+            print_decomposition(checks)
+            explored = sum(c["result"][2] for c in checks)
+        else:
+            trace, points, explored = counterexample_finder(args.props, args.noms, assumptions, conclusions,
+                                                            (road_length, road_width), max_trace_length, **options)
+        timeX = timer() - start
+        if trace is None:
+            print(f'No counterexample up to length {max_trace_length} ({explored} traces explored, time {timeX})')
+        else:
+            print(f'Counterexample of length {len(trace)} violating the conclusions at points {points} '
+                  f'({explored} traces explored, time {timeX})')
+            print("\t |", trace)
+        return
+
+    if args.mode == "each":
+        start: float = timer()
+        sat_counts, violation_counts, counter_gen = each_evaluator(args.props, args.noms, assumptions, conclusions,
+                                                                   (road_length, road_width), max_trace_length,
+                                                                   show_traces, index_dir=args.index, **options)
+        timeX = timer() - start
+        print(f'#Trace: {counter_gen}; Time: {timeX}')
+        print('Conclusion; #Sat; #Violated')
+        print('-------------------------------------------------------------------------------')
+        for conclusion, counter_sat, counter_violated in zip(conclusions, sat_counts, violation_counts):
+            print(f'{conclusion}; {counter_sat}; {counter_violated}')
+        return
+
+    run_id, len_nom, grid_size, trace_max_length, counter_sat, counter_get, timeX = run_evaluator(1, args.props, args.noms, assumptions, conclusions, (road_length, road_width), max_trace_length, show_traces, checker, **options)
 
     print('Test; Nominals; Grid; Len; #Sat; #Trace1; Time1')
     print('-------------------------------------------------------------------------------')
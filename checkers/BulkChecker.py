@@ -0,0 +1,331 @@
+import argparse
+import json
+import multiprocessing
+import sys
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from timeit import default_timer as timer
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+from checkers.ConclusionCounting import parse_formula, conclusion_verdicts
+from checkers.SpatioTemporalEvaluatorUtils import generate_trace_from_spec
+from checkers.TraceCorpus import TraceCorpus, CORPUS_SUFFIX
+from formula_types.FormulaSimplifier import is_verum
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+
+# number of traces sent to a worker at once
+BATCH_SIZE: int = 256
+
+# number of batches per worker that may be in flight, which bounds the memory use of the pipeline
+BATCHES_PER_WORKER: int = 4
+
+# state of a worker process: the parsed formulas, the default grid size and the opened corpus
+_worker: dict = {}
+
+
+def parse_grid(record: dict) -> dict:
+    """
+    Converts a grid read from JSON: nominals are given as [row, column] and propositions as lists of such points.
+
+    :param record: the grid as read from JSON
+    :return: the grid
+    """
+    grid: dict = {}
+    for name, value in record.items():
+        if len(value) == 2 and all(isinstance(x, int) for x in value):
+            grid[name] = (value[0], value[1])
+        else:
+            grid[name] = [(p[0], p[1]) for p in value]
+    return grid
+
+
+def parse_trace_record(line: str, grid_size: Optional[tuple[int, int]]) -> tuple[object, Trace, tuple[int, int]]:
+    """
+    Parses one line of a JSONL trace file. A line is either a list of grids, or an object with the trace under
+    "trace" (a list of grids) or "spec" (a trace specification as used by generate_trace_from_spec), and optionally
+    an "id" and a "grid_size".
+
+    :param line: the line
+    :param grid_size: the grid size of records that do not specify one
+    :return: the id of the trace (None if not given), the trace and its grid size
+    """
+    record = json.loads(line)
+    if isinstance(record, list):
+        record = {"trace": record}
+
+    size = record.get("grid_size", grid_size)
+    if size is None:
+        raise ValueError("No grid size given.")
+    size = (size[0], size[1])
+
+    if "spec" in record:
+        grids: list[dict] = generate_trace_from_spec(record["spec"], size)
+
+        # a proposition that holds nowhere at a time step does not occur in the specification of that step
+        props: set[str] = {name for grid in grids for name, value in grid.items() if isinstance(value, list)}
+        for grid in grids:
+            for name in props:
+                grid.setdefault(name, [])
+    else:
+        grids: list[dict] = [parse_grid(g) for g in record["trace"]]
+    if not grids:
+        raise ValueError("Empty trace.")
+    return record.get("id"), Trace.from_grids(grids), size
+
+
+def check_trace(assumption_formula: HybridSpatioTemporalFormula, formulas: list[HybridSpatioTemporalFormula],
+                trace: Trace, grid_size: tuple[int, int]) -> dict:
+    """
+    Checks one trace: for each formula, whether it holds at some and whether it fails at some of the points at which
+    the assumptions hold.
+
+    :param assumption_formula: the conjunction of the assumptions
+    :param formulas: the formulas
+    :param trace: the trace
+    :param grid_size: the size of the grid
+    :return: the verdict of the trace
+    """
+    points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+    if not is_verum(assumption_formula):
+        points = [p for p in points if assumption_formula.evaluate(trace, p, grid_size)]
+
+    verdicts: list[tuple[bool, bool]] = conclusion_verdicts(formulas, trace, points, grid_size)
+    return {"length": len(trace), "assumptions": bool(points), "satisfied": [s for s, _ in verdicts],
+            "violated": [v for _, v in verdicts]}
+
+
+def init_worker(formulas: list[str], assumptions: list[str], grid_size: Optional[tuple[int, int]],
+                corpus_path: Optional[str]):
+    """
+    Prepares a worker process: parses the formulas once and maps the corpus, if any.
+
+    :param formulas: the formulas to check
+    :param assumptions: the assumptions
+    :param grid_size: the grid size of records that do not specify one
+    :param corpus_path: the path of the binary corpus, None for JSONL input
+    """
+    _worker["formulas"] = [parse_formula([f]) for f in formulas]
+    _worker["assumptions"] = parse_formula(assumptions)
+    _worker["grid_size"] = grid_size
+    _worker["corpus"] = TraceCorpus(corpus_path) if corpus_path is not None else None
+
+
+def check_lines(batch: list[tuple[int, str]]) -> list[dict]:
+    """
+    Checks a batch of lines of a JSONL trace file in a worker.
+
+    :param batch: the (line number, line) pairs
+    :return: the verdicts, in the order of the lines
+    """
+    results: list[dict] = []
+    for number, line in batch:
+        try:
+            trace_id, trace, grid_size = parse_trace_record(line, _worker["grid_size"])
+            if trace_id is None:
+                trace_id = number
+            result: dict = check_trace(_worker["assumptions"], _worker["formulas"], trace, grid_size)
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            results.append({"id": number, "error": f"{type(e).__name__}: {e}"})
+            continue
+        results.append({"id": trace_id, **result})
+    return results
+
+
+def check_range(batch: tuple[int, int]) -> list[dict]:
+    """
+    Checks a range of the traces of a binary corpus in a worker.
+
+    :param batch: the index of the first trace and the index after the last trace
+    :return: the verdicts, in the order of the traces
+    """
+    corpus: TraceCorpus = _worker["corpus"]
+    start, stop = batch
+    return [{"id": index, **check_trace(_worker["assumptions"], _worker["formulas"], t, corpus.grid_size)}
+            for index, t in enumerate(corpus.traces(start, stop), start)]
+
+
+def ordered_results(function: Callable[[object], list[dict]], batches: Iterable, workers: int,
+                    initargs: tuple) -> Iterator[dict]:
+    """
+    Applies a function to batches, in parallel if more than one worker is used, and yields the results in order.
+    At most BATCHES_PER_WORKER batches per worker are in flight, so input is read as fast as it is processed.
+
+    :param function: the function checking a batch
+    :param batches: the batches
+    :param workers: the number of worker processes
+    :param initargs: the arguments of init_worker
+    :return: the results of all batches
+    """
+    if workers <= 1:
+        init_worker(*initargs)
+        try:
+            for batch in batches:
+                yield from function(batch)
+        finally:
+            if _worker["corpus"] is not None:
+                _worker["corpus"].close()
+        return
+
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=initargs) as pool:
+        pending: deque = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(function, (batch,)))
+            if len(pending) >= workers * BATCHES_PER_WORKER:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def line_batches(stream: TextIO, batch_size: int) -> Iterator[list[tuple[int, str]]]:
+    """
+    Splits a JSONL stream into batches of non-empty lines.
+
+    :param stream: the stream
+    :param batch_size: the number of lines per batch
+    :return: the batches of (line number, line) pairs
+    """
+    lines: Iterator[tuple[int, str]] = ((number, line) for number, line in enumerate(stream, 1) if line.strip())
+    while True:
+        batch: list[tuple[int, str]] = list(islice(lines, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def check_traces(formulas: list[str], assumptions: list[str], input_path: str,
+                 grid_size: Optional[tuple[int, int]] = None, workers: int = 1, batch_size: int = BATCH_SIZE) -> \
+        Iterator[dict]:
+    """
+    Checks the traces of a JSONL file (a path, or "-" for standard input) or of a binary corpus (suffix .trc).
+    Each verdict holds the id of the trace (its line number or its index in the corpus, unless the record gives one),
+    its length, whether the assumptions hold at some point, and per formula whether it holds at some and whether it
+    fails at some of these points. Records that cannot be read are reported with an "error" instead.
+
+    :param formulas: the formulas to check
+    :param assumptions: the assumptions restricting the points at which the formulas are checked
+    :param input_path: the path of the traces
+    :param grid_size: the grid size of JSONL records that do not specify one
+    :param workers: the number of worker processes
+    :param batch_size: the number of traces per batch
+    :return: the verdicts, in the order of the traces
+    """
+    # a formula that cannot be parsed would make every worker fail in init_worker, which the pool answers by starting
+    # new workers forever, so the formulas are parsed once here first
+    for f in formulas:
+        parse_formula([f])
+    parse_formula(assumptions)
+
+    if input_path.endswith(CORPUS_SUFFIX):
+        with TraceCorpus(input_path) as corpus:
+            count: int = len(corpus)
+        ranges = ((start, min(start + batch_size, count)) for start in range(0, count, batch_size))
+        yield from ordered_results(check_range, ranges, workers, (formulas, assumptions, None, input_path))
+        return
+
+    stream: TextIO = sys.stdin if input_path == "-" else open(input_path, "r", encoding="utf-8")
+    try:
+        yield from ordered_results(check_lines, line_batches(stream, batch_size), workers,
+                                   (formulas, assumptions, grid_size, None))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class BulkStatistics:
+    """
+    Aggregate statistics over the verdicts of check_traces.
+    """
+
+    def __init__(self, formulas: list[str]):
+        self.formulas = formulas
+        self.traces: int = 0
+        self.errors: int = 0
+        self.assumptions: int = 0
+        self.satisfied: list[int] = [0] * len(formulas)
+        self.violated: list[int] = [0] * len(formulas)
+        self.lengths: dict[int, int] = {}
+
+    def add(self, verdict: dict):
+        """
+        Adds a verdict to the statistics.
+
+        :param verdict: the verdict of a trace
+        """
+        if "error" in verdict:
+            self.errors = self.errors + 1
+            return
+        self.traces = self.traces + 1
+        self.lengths[verdict["length"]] = self.lengths.get(verdict["length"], 0) + 1
+        if verdict["assumptions"]:
+            self.assumptions = self.assumptions + 1
+        for index, (satisfied, violated) in enumerate(zip(verdict["satisfied"], verdict["violated"])):
+            self.satisfied[index] = self.satisfied[index] + satisfied
+            self.violated[index] = self.violated[index] + violated
+
+    def to_dict(self) -> dict:
+        """
+        Returns the statistics.
+
+        :return: dictionary of statistics
+        """
+        return {"traces": self.traces, "errors": self.errors, "assumptions_hold": self.assumptions,
+                "lengths": {str(k): v for k, v in sorted(self.lengths.items())},
+                "formulas": [{"formula": f, "satisfied": s, "violated": v}
+                             for f, s, v in zip(self.formulas, self.satisfied, self.violated)]}
+
+
+def read_formulas(path: str) -> list[str]:
+    """
+    Reads formulas from a file, one per line.
+
+    :param path: the path of the file
+    :return: the formulas
+    """
+    with Path(path).open("r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks formulas on recorded traces")
+    parser.add_argument("--input", type=str, required=True,
+                        help="JSONL file of traces ('-' for standard input) or binary corpus (.trc)")
+    parser.add_argument("--formulas", type=str, required=True, help="Path to the file of formulas to check")
+    parser.add_argument("--assumptions", type=str, help="Path to the file of assumptions")
+    parser.add_argument("--grid_size", type=int, nargs=2, metavar=("ROWS", "COLUMNS"),
+                        help="Grid size of JSONL records that do not specify one")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--batch_size", type=int, default=BATCH_SIZE, help="Number of traces per batch")
+    parser.add_argument("--verdicts", type=str, help="Path to write the per-trace verdicts to (JSONL, '-' for stdout)")
+    args = parser.parse_args()
+
+    formulas: list[str] = read_formulas(args.formulas)
+    assumptions: list[str] = read_formulas(args.assumptions) if args.assumptions else []
+    statistics: BulkStatistics = BulkStatistics(formulas)
+
+    output: Optional[TextIO] = None
+    if args.verdicts == "-":
+        output = sys.stdout
+    elif args.verdicts:
+        output = open(args.verdicts, "w", encoding="utf-8")
+
+    start: float = timer()
+    try:
+        for verdict in check_traces(formulas, assumptions, args.input,
+                                    tuple(args.grid_size) if args.grid_size else None, args.workers, args.batch_size):
+            statistics.add(verdict)
+            if output is not None:
+                output.write(json.dumps(verdict) + "\n")
+    finally:
+        if output is not None and output is not sys.stdout:
+            output.close()
+    elapsed: float = timer() - start
+
+    summary: dict = statistics.to_dict()
+    summary["time"] = elapsed
+    summary["traces_per_second"] = (summary["traces"] + summary["errors"]) / elapsed if elapsed > 0 else None
+    print(json.dumps(summary, indent=2), file=sys.stderr if output is sys.stdout else sys.stdout)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import json
+import os
+from time import monotonic
+from typing import Optional, Union
+from checkers.TraceIndex import canonical_scenario, scenario_key
+
+# seconds between two checkpoints of a running enumeration
+CHECKPOINT_INTERVAL: float = 60.0
+
+# file suffix of checkpoint files
+CHECKPOINT_SUFFIX: str = ".ckpt"
+
+
+def checkpoint_scenario(checker: str, props: list[str], noms: list[str], assumptions: list[str],
+                        conclusions: list[str], grid_size: tuple[int, int], max_trace_length: int,
+                        static_props: list[str] = ()) -> dict:
+    """
+    Returns the canonical description of a count, which a checkpoint must match to be resumed.
+
+    :param checker: the checker
+    :param props: the list of propositions
+    :param noms: the list of nominals
+    :param assumptions: the list of assumptions
+    :param conclusions: the list of conclusions
+    :param grid_size: the size of the grid
+    :param max_trace_length: the maximal trace length
+    :param static_props: the propositions whose placement does not change over time
+    :return: the scenario
+    """
+    scenario: dict = canonical_scenario(checker, props, noms, assumptions, grid_size, max_trace_length, static_props)
+    scenario["conclusions"] = sorted(c.strip() for c in conclusions)
+    return scenario
+
+
+def checkpoint_path(checkpoint_dir: str, scenario: dict) -> str:
+    """
+    Returns the path of the checkpoint file of a count in a directory of checkpoints.
+
+    :param checkpoint_dir: the directory of the checkpoint files
+    :param scenario: the scenario of the count
+    :return: the path of the checkpoint file
+    """
+    return os.path.join(checkpoint_dir, scenario_key(scenario) + CHECKPOINT_SUFFIX)
+
+
+class Checkpointer:
+    """
+    Periodically saves the position of an enumeration (the rank of the next trace, or the position of the last
+    trace of the motion checker) together with the running counters, and restores them to resume the enumeration.
+    Checkpoints are written to a temporary file and moved into place, so a preempted process leaves either the
+    previous or the new checkpoint.
+    """
+
+    def __init__(self, path: str, scenario: dict, resume: bool, interval: float = CHECKPOINT_INTERVAL):
+        self.path = path
+        self.scenario = scenario
+        self.interval = interval
+        self.position: Optional[Union[int, tuple]] = None
+        self.counter_sat: int = 0
+        self.counter_gen: int = 0
+        self.finished: bool = False
+
+        # without a checkpoint to resume from, the enumeration starts at the beginning
+        if resume and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state: dict = json.load(f)
+            if state["scenario"] != scenario:
+                raise ValueError(f"The checkpoint {path} belongs to a different count.")
+            position = state["position"]
+            self.position = tuple(position) if isinstance(position, list) else position
+            self.counter_sat = state["counter_sat"]
+            self.counter_gen = state["counter_gen"]
+            self.finished = state["finished"]
+
+        self._saved: float = monotonic()
+
+    def due(self) -> bool:
+        """
+        Returns whether the next checkpoint is due.
+
+        :return: true if the last checkpoint is older than the interval
+        """
+        return monotonic() - self._saved >= self.interval
+
+    def save(self, position: Optional[Union[int, tuple]], counter_sat: int, counter_gen: int,
+             finished: bool = False):
+        """
+        Writes a checkpoint.
+
+        :param position: the position of the enumeration
+        :param counter_sat: the number of satisfying traces so far
+        :param counter_gen: the number of traces so far
+        :param finished: whether the enumeration is complete
+        """
+        state: dict = {"scenario": self.scenario, "position": position, "counter_sat": counter_sat,
+                       "counter_gen": counter_gen, "finished": finished}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path: str = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._saved = monotonic()
@@ -0,0 +1,116 @@
+from typing import Iterable, Iterator
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+from formula_types.FormulaCost import order_by_cost, adapt_order, ADAPT_INTERVAL
+from formula_types.FormulaSimplifier import simplify, is_verum
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+
+def parse_formula(formulas: list[str]) -> HybridSpatioTemporalFormula:
+    """
+    Parses the conjunction of the given formulas, simplified and with cheap and selective conjuncts first.
+
+    :param formulas: list of formulas (the empty conjunction is true)
+    :return: the parsed formula
+    """
+    formula_string: str = "&".join(["(" + x + ")" for x in formulas]) if formulas else "1"
+    parsed_formula: HybridSpatioTemporalFormula = simplify(HybridSpatioTemporalParser(tokenize(formula_string)).parse())
+    order_by_cost(parsed_formula)
+    return parsed_formula
+
+
+def filter_by_assumptions(assumption_formula: HybridSpatioTemporalFormula, traces: Iterable[Trace],
+                          grid_size: tuple[int, int]) -> Iterator[tuple[Trace, list[tuple[int, int]]]]:
+    """
+    Pairs each trace with the points at which the assumptions hold on it.
+
+    :param assumption_formula: the conjunction of the assumptions
+    :param traces: the traces to evaluate the assumptions on
+    :param grid_size: the size of the grid
+    :return: the (trace, points) pairs, with an empty list of points if the assumptions hold nowhere
+    """
+    points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+    if is_verum(assumption_formula):
+        for t in traces:
+            yield t, points
+        return
+
+    counter_gen: int = 0
+    for t in traces:
+        yield t, [p for p in points if assumption_formula.evaluate(t, p, grid_size)]
+
+        # adapt the conjunct order to the observed failure rates
+        counter_gen = counter_gen + 1
+        if counter_gen % ADAPT_INTERVAL == 0:
+            adapt_order(assumption_formula)
+
+
+def conclusion_verdicts(conclusion_formulas: list[HybridSpatioTemporalFormula], trace: Trace,
+                        assumption_points: list[tuple[int, int]], grid_size: tuple[int, int]) -> \
+        list[tuple[bool, bool]]:
+    """
+    Decides for each conclusion whether it holds at some and whether it fails at some of the given points.
+
+    :param conclusion_formulas: the conclusions
+    :param trace: the trace
+    :param assumption_points: the points at which the assumptions hold
+    :param grid_size: the size of the grid
+    :return: the (satisfied, violated) pair of each conclusion
+    """
+    verdicts: list[tuple[bool, bool]] = []
+    for fml in conclusion_formulas:
+        satisfied: bool = False
+        violated: bool = False
+        for p in assumption_points:
+            if fml.evaluate(trace, p, grid_size):
+                satisfied = True
+            else:
+                violated = True
+            if satisfied and violated:
+                break
+        verdicts.append((satisfied, violated))
+    return verdicts
+
+
+def count_conclusions(conclusion_formulas: list[HybridSpatioTemporalFormula],
+                      candidates: Iterable[tuple[Trace, list[tuple[int, int]]]], grid_size: tuple[int, int],
+                      show_traces: bool = False) -> tuple[list[int], list[int], int]:
+    """
+    Counts, for each conclusion separately, the traces on which the assumptions and the conclusion hold at some point
+    (the #Sat of evaluate with this single conclusion), and the traces on which the assumptions hold but the
+    conclusion does not at some point (the counterexamples of the conclusion). The conclusions are only evaluated at
+    the points where the assumptions hold.
+
+    :param conclusion_formulas: the conclusions
+    :param candidates: the traces paired with the points at which the assumptions hold (see filter_by_assumptions)
+    :param grid_size: the size of the grid
+    :param show_traces: whether the traces satisfying the assumptions should be shown in the console
+    :return: the number of satisfying traces per conclusion, the number of violating traces per conclusion, and the
+             number of traces
+    """
+    sat_counts: list[int] = [0] * len(conclusion_formulas)
+    violation_counts: list[int] = [0] * len(conclusion_formulas)
+    counter_gen: int = 0
+
+    for t, assumption_points in candidates:
+        counter_gen = counter_gen + 1
+        if counter_gen % ADAPT_INTERVAL == 0:
+            # adapt the conjunct orders to the observed failure rates
+            for fml in conclusion_formulas:
+                adapt_order(fml)
+
+        if not assumption_points:
+            continue
+        verdicts: list[tuple[bool, bool]] = conclusion_verdicts(conclusion_formulas, t, assumption_points, grid_size)
+        for index, (satisfied, violated) in enumerate(verdicts):
+            sat_counts[index] = sat_counts[index] + satisfied
+            violation_counts[index] = violation_counts[index] + violated
+
+        if show_traces:
+            print("\t |Trace satisfying the assumptions at points: ", assumption_points)
+            print("\t |(satisfied, violated) per conclusion: ", verdicts)
+            print("\t |--------------------------------------------------------------------")
+            print("\t |", t, "\n")
+
+    return sat_counts, violation_counts, counter_gen
+
@@ -0,0 +1,86 @@
+from typing import Iterable, Optional
+from formula_types.ClassicalLogicFormula import Prop
+from formula_types.FormulaUtils import subformulas, temporal_horizon
+from formula_types.HybridFormula import Nom, At, Bind
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+
+
+def formula_symbols(fml: HybridSpatioTemporalFormula) -> set[str]:
+    """
+    Returns the names of the propositions and nominals a formula refers to (including the nominals of @ and ↓).
+
+    :param fml: logical formula
+    :return: the set of names
+    """
+    return {node.name for node in subformulas(fml) if isinstance(node, (Prop, Nom, At, Bind))}
+
+
+class ConeOfInfluence:
+    """
+    The part of a trace space the (simplified) formulas of a check depend on. Propositions and nominals no formula
+    refers to cannot change a verdict, so they are projected out of the enumeration: every grid of the projected
+    space stands for grid_factor grids of the full space (every placement of the projected symbols), and every trace
+    additionally for trace_factor placements of the projected static propositions. If the formulas only look a
+    bounded number of steps ahead (temporal_horizon), the verdict of a trace is decided by its first horizon + 1
+    grids, so only traces up to that length are enumerated and the traces of that length also stand for all their
+    extensions up to the maximal trace length.
+    """
+
+    def __init__(self, formulas: Iterable[HybridSpatioTemporalFormula], props: list[str], noms: list[str],
+                 grid_size: tuple[int, int], max_trace_length: int, static_props: list[str] = (),
+                 truncate: bool = True):
+        formulas = list(formulas)
+        symbols: set[str] = set().union(*(formula_symbols(fml) for fml in formulas))
+        cells: int = grid_size[0] * grid_size[1]
+
+        self.props: list[str] = [p for p in props if p in symbols]
+        self.noms: list[str] = [n for n in noms if n in symbols]
+        self.static_props: list[str] = [p for p in static_props if p in symbols]
+        self.projected: list[str] = [s for s in list(props) + list(noms) if s not in symbols]
+
+        projected_static: int = len([p for p in static_props if p not in symbols])
+        projected_props: int = len([p for p in props if p not in symbols]) - projected_static
+        self.grid_factor: int = 2 ** (cells * projected_props) * cells ** (len(noms) - len(self.noms))
+        self.trace_factor: int = 2 ** (cells * projected_static)
+
+        self.full_trace_length: int = max_trace_length
+        self.horizon: Optional[int] = None
+        if truncate and formulas:
+            horizons: list[Optional[int]] = [temporal_horizon(fml) for fml in formulas]
+            self.horizon = None if None in horizons else max(horizons)
+        self.max_trace_length: int = max_trace_length if self.horizon is None else min(max_trace_length,
+                                                                                        self.horizon + 1)
+
+        # weights of the enumerated trace lengths, computed on their first use
+        self._weights: dict[int, int] = {}
+
+    def reduces(self) -> bool:
+        """
+        Returns whether the projection removes a symbol or a trace length from the enumeration.
+
+        :return: whether the space is reduced
+        """
+        return bool(self.projected) or self.max_trace_length < self.full_trace_length
+
+    def weight(self, length: int, pool_size: int = 0) -> int:
+        """
+        Returns the number of traces of the full space an enumerated trace of the given length stands for.
+
+        :param length: the length of the enumerated trace
+        :param pool_size: the number of grids (of the projected space) a trace can be extended by, only needed for
+                          traces of the truncated length
+        :return: the weight
+        """
+        if length not in self._weights:
+            weight: int = self.trace_factor * self.grid_factor ** length
+            if length == self.max_trace_length < self.full_trace_length:
+                # every extension of the trace by grids of the full pool up to the maximal trace length
+                full_pool: int = pool_size * self.grid_factor
+                weight = weight * sum(full_pool ** k for k in range(self.full_trace_length - length + 1))
+            self._weights[length] = weight
+        return self._weights[length]
+
+    def __repr__(self) -> str:
+        horizon: str = "unbounded" if self.horizon is None else str(self.horizon)
+        return (f"projected out: {' '.join(self.projected) or '-'}, temporal horizon: {horizon}, "
+                f"enumerated trace length: {self.max_trace_length}")
@@ -0,0 +1,117 @@
+from typing import Callable, Iterable, Optional
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+from formula_types.TemporalFormula import Always
+from formula_types.FormulaCost import order_by_cost
+from formula_types.FormulaSimplifier import simplify
+from formula_types.FormulaUtils import temporal_horizon
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+
+def parse_counterexample_formula(assumptions: list[str], conclusions: list[str]) -> HybridSpatioTemporalFormula:
+    """
+    Parses the formula whose satisfying (trace, point) pairs are counterexamples, i.e. the conjunction of the
+    assumptions and the negated conjunction of the conclusions.
+
+    :param assumptions: list of assumptions
+    :param conclusions: list of conclusions
+    :return: the simplified counterexample formula
+    """
+    assumption_string: str = "&".join(["(" + x + ")" for x in assumptions]) if assumptions else "1"
+    conclusion_string: str = "&".join(["(" + x + ")" for x in conclusions]) if conclusions else "1"
+    parsed_formula: HybridSpatioTemporalFormula = simplify(HybridSpatioTemporalParser(
+        tokenize("({}) & !({})".format(assumption_string, conclusion_string))).parse())
+
+    # evaluate cheap and selective conjuncts first
+    order_by_cost(parsed_formula)
+    return parsed_formula
+
+
+def prefix_checks(assumptions: list[str]) -> list[tuple[HybridSpatioTemporalFormula, int, bool]]:
+    """
+    Collects the assumptions whose violation on a trace prefix carries over to all extensions of the prefix: formulas
+    whose only temporal operator is X, and formulas G ψ where ψ has this property.
+
+    :param assumptions: list of assumptions
+    :return: list of (formula, horizon, globally) triples, where formula is the assumption (or ψ if globally), and
+             horizon the number of future time steps its truth depends on
+    """
+    checks: list[tuple[HybridSpatioTemporalFormula, int, bool]] = []
+    for a in assumptions:
+        fml: HybridSpatioTemporalFormula = simplify(HybridSpatioTemporalParser(tokenize(a)).parse())
+        horizon: Optional[int] = temporal_horizon(fml)
+        if horizon is not None:
+            checks.append((fml, horizon, False))
+        elif isinstance(fml, Always) and temporal_horizon(fml.operand) is not None:
+            checks.append((fml.operand, temporal_horizon(fml.operand), True))
+    return checks
+
+
+def refuted_points(checks: list[tuple[HybridSpatioTemporalFormula, int, bool]], prefix: Trace,
+                   points: set[tuple[int, int]], grid_size: tuple[int, int]) -> set[tuple[int, int]]:
+    """
+    Returns the points at which some assumption is violated on every extension of the given prefix. Only the time
+    step that is determined by the last grid of the prefix is checked, since earlier time steps have been checked on
+    the shorter prefixes.
+
+    :param checks: the prefix checks of the assumptions
+    :param prefix: the trace prefix
+    :param points: the points to check
+    :param grid_size: the size of the grid
+    :return: the points at which an assumption is violated
+    """
+    refuted: set[tuple[int, int]] = set()
+    for fml, horizon, globally in checks:
+        time: int = len(prefix) - 1 - horizon
+        if time < 0 or (not globally and time > 0):
+            continue
+        for p in points - refuted:
+            if not fml.evaluate_memoized(prefix, time, p, grid_size, {}):
+                refuted.add(p)
+    return refuted
+
+
+def search(formula: HybridSpatioTemporalFormula, checks: list[tuple[HybridSpatioTemporalFormula, int, bool]],
+           roots: Iterable[dict], successors: Callable[[dict], Iterable[dict]], grid_size: tuple[int, int],
+           max_trace_length: int) -> tuple[Optional[Trace], list[tuple[int, int]], int]:
+    """
+    Searches depth-first through a space of traces for one on which the given formula holds at some point.
+    Every prefix of a trace in the space is itself a trace of the space, so each visited prefix is a candidate.
+    A prefix is not extended further once every point violates an assumption on all of its extensions.
+
+    :param formula: the counterexample formula
+    :param checks: the prefix checks of the assumptions
+    :param roots: the grids a trace can start with
+    :param successors: function returning the grids that can follow a given grid
+    :param grid_size: the size of the grid
+    :param max_trace_length: the maximal length of the traces
+    :return: the first trace found, the points at which the formula holds, and the number of traces explored
+    """
+    all_points: set[tuple[int, int]] = {(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])}
+    explored: int = 0
+
+    # stack of (prefix, points still admitted by the assumptions, remaining children)
+    stack: list[tuple[Trace, set[tuple[int, int]], iter]] = [(Trace(), all_points, iter(roots))]
+
+    while stack:
+        prefix, alive, remaining = stack[-1]
+        grid: Optional[dict] = next(remaining, None)
+        if grid is None:
+            stack.pop()
+            continue
+
+        trace: Trace = prefix.extend(grid)
+        explored = explored + 1
+
+        trace_alive: set[tuple[int, int]] = alive - refuted_points(checks, trace, alive, grid_size)
+        if not trace_alive:
+            continue
+
+        witness_points: list[tuple[int, int]] = [p for p in sorted(trace_alive) if formula.evaluate(trace, p, grid_size)]
+        if witness_points:
+            return trace, witness_points, explored
+
+        if len(trace) < max_trace_length:
+            stack.append((trace, trace_alive, iter(successors(grid))))
+
+    return None, [], explored
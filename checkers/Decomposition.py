@@ -0,0 +1,171 @@
+import copy
+from typing import Callable
+from checkers.ConeOfInfluence import formula_symbols
+from formula_types.ClassicalLogicFormula import Verum, Falsum, Not, And, If, Iff, Or, NaryOr
+from formula_types.FormulaSimplifier import flatten, negate, simplify
+from formula_types.FormulaUtils import children
+from formula_types.HybridFormula import Nom, At, Bind
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.NaryFormula import NaryFormula
+from formula_types.SpatialFormula import Front, Back, Left, Right
+from formula_types.TemporalFormula import Next, Always
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+# unary operators distributing over conjunctions (at the trace end or the grid border, both sides are false)
+DISTRIBUTIVE_OPERATORS: tuple[type, ...] = (Always, Next, At, Front, Back, Left, Right)
+
+
+def copy_node(fml: HybridSpatioTemporalFormula) -> HybridSpatioTemporalFormula:
+    """
+    Returns a shallow copy of a formula node whose children can be replaced. Copies of n-ary nodes get their own
+    evaluation statistics, so adapting the operand order of one copy does not use those of the others.
+
+    :param fml: logical formula
+    :return: the copy
+    """
+    node: HybridSpatioTemporalFormula = copy.copy(fml)
+    if isinstance(node, NaryFormula):
+        node.reset_statistics()
+    return node
+
+
+def conjuncts(fml: HybridSpatioTemporalFormula) -> list[HybridSpatioTemporalFormula]:
+    """
+    Splits a formula into conjuncts whose conjunction is equivalent to it, distributing G, X, @ and the spatial
+    operators over conjunctions and negations over disjunctions.
+
+    :param fml: logical formula
+    :return: the conjuncts
+    """
+    if isinstance(fml, Not) and isinstance(fml.operand, (Or, NaryOr)):
+        return [c for operand in flatten(fml.operand, Or) for c in conjuncts(negate(operand))]
+    if isinstance(fml, DISTRIBUTIVE_OPERATORS):
+        parts: list[HybridSpatioTemporalFormula] = conjuncts(fml.operand)
+        if len(parts) == 1:
+            return [fml]
+        result: list[HybridSpatioTemporalFormula] = []
+        for part in parts:
+            node: HybridSpatioTemporalFormula = copy_node(fml)
+            node.operand = part
+            result.append(node)
+        return result
+    operands: list[HybridSpatioTemporalFormula] = flatten(fml, And)
+    if len(operands) == 1:
+        return [fml]
+    return [c for operand in operands for c in conjuncts(operand)]
+
+
+def weaken(fml: HybridSpatioTemporalFormula, outside: set[str], positive: bool = True,
+           bound: frozenset = frozenset()) -> HybridSpatioTemporalFormula:
+    """
+    Returns a formula implied by the given one that does not mention the given nominals: every occurrence of such a
+    nominal (or @-formula of it) is replaced by ⊤ where it occurs positively and by ⊥ where it occurs negatively. All
+    operators except negation, implication and equivalence are monotone; equivalences mentioning such a nominal are
+    replaced as a whole.
+
+    :param fml: logical formula
+    :param outside: the nominals to remove
+    :param positive: whether the formula occurs positively
+    :param bound: the nominals bound by the enclosing ↓-operators, which refer to the bound point
+    :return: the weakened formula
+    """
+    def constant() -> HybridSpatioTemporalFormula:
+        return Verum() if positive else Falsum()
+
+    if isinstance(fml, (Nom, At)) and fml.name in outside and fml.name not in bound:
+        return constant()
+    if isinstance(fml, Iff):
+        names: set[str] = formula_symbols(fml) - bound
+        return constant() if names & outside else fml
+    if not children(fml):
+        return fml
+
+    node: HybridSpatioTemporalFormula = copy_node(fml)
+    if isinstance(fml, Bind):
+        bound = bound | {fml.name}
+    if isinstance(fml, Not):
+        node.operand = weaken(fml.operand, outside, not positive, bound)
+    elif isinstance(fml, If):
+        node.left = weaken(fml.left, outside, not positive, bound)
+        node.right = weaken(fml.right, outside, positive, bound)
+    elif hasattr(fml, "operand"):
+        node.operand = weaken(fml.operand, outside, positive, bound)
+    elif hasattr(fml, "operands"):
+        node.operands = [weaken(operand, outside, positive, bound) for operand in fml.operands]
+    else:
+        node.left = weaken(fml.left, outside, positive, bound)
+        node.right = weaken(fml.right, outside, positive, bound)
+    return node
+
+
+def decompose(noms: list[str], assumptions: list[str], conclusions: list[str]) -> list[tuple[list[str], list[str],
+                                                                                            list[str]]]:
+    """
+    Splits a validity question (do the conclusions hold at every point of every trace at which the assumptions hold)
+    into independent ones: the conclusions are split into conjuncts, which are grouped by the nominals they mention,
+    and every group is checked on its nominals only. The assumptions of a group are those that only mention its
+    nominals; the others are weakened to not mention the remaining nominals (see weaken). The conclusions are valid
+    if every group is valid, as a counterexample trace restricted to the nominals of a group would be one of the group.
+
+    :param noms: the nominals of the question
+    :param assumptions: the assumptions
+    :param conclusions: the conclusions
+    :return: the nominals, assumptions and conclusions of every group, in the order of the conclusions
+    """
+    groups: dict[frozenset, list[str]] = {}
+    for c in conclusions:
+        for part in conjuncts(simplify(HybridSpatioTemporalParser(tokenize(c)).parse())):
+            groups.setdefault(frozenset(formula_symbols(part) & set(noms)), []).append(repr(part))
+
+    checks: list[tuple[list[str], list[str], list[str]]] = []
+    for names, group in groups.items():
+        sliced: list[str] = []
+        for a in assumptions:
+            parsed: HybridSpatioTemporalFormula = HybridSpatioTemporalParser(tokenize(a)).parse()
+            if formula_symbols(parsed) & set(noms) <= names:
+                sliced.append(a)
+                continue
+            weakened: HybridSpatioTemporalFormula = simplify(weaken(parsed, set(noms) - names))
+            if not isinstance(weakened, Verum):
+                sliced.append(repr(weakened))
+        checks.append(([n for n in noms if n in names], sliced, group))
+    return checks
+
+
+def decomposed_check(check: Callable[..., tuple], props: list[str], noms: list[str], assumptions: list[str],
+                     conclusions: list[str], grid_size: tuple[int, int], max_trace_length: int,
+                     **options) -> tuple[tuple, list[dict]]:
+    """
+    Answers a validity question by checking the groups of decompose one after the other. Weakening the assumptions
+    can make a counterexample of a group spurious, so once a group has a counterexample, the whole question is
+    checked instead (giving the counterexample of an undecomposed check).
+
+    :param check: the check (e.g. find_counterexample of a checker), called like find_counterexample, returning a
+                  tuple whose first element is the counterexample (None if there is none)
+    :param props: the propositions
+    :param noms: the nominals
+    :param assumptions: the assumptions
+    :param conclusions: the conclusions
+    :param grid_size: the size of the grid
+    :param max_trace_length: the maximal trace length
+    :param options: additional keyword arguments of the check
+    :return: the result of the deciding check (the last group, or the whole question), and per check run a dictionary
+             with its nominals, assumptions, conclusions and result
+    """
+    checks: list[dict] = []
+    decomposition: list[tuple[list[str], list[str], list[str]]] = decompose(noms, assumptions, conclusions)
+    if len(decomposition) > 1 or (decomposition and len(decomposition[0][0]) < len(noms)):
+        for group_noms, group_assumptions, group_conclusions in decomposition:
+            result: tuple = check(props, group_noms, group_assumptions, group_conclusions, grid_size,
+                                  max_trace_length, **options)
+            checks.append({"noms": group_noms, "assumptions": group_assumptions, "conclusions": group_conclusions,
+                           "result": result})
+            if result[0] is not None:
+                break
+        else:
+            return checks[-1]["result"], checks
+
+    result = check(props, noms, assumptions, conclusions, grid_size, max_trace_length, **options)
+    checks.append({"noms": list(noms), "assumptions": list(assumptions), "conclusions": list(conclusions),
+                   "result": result})
+    return result, checks
@@ -0,0 +1,74 @@
+import struct
+from typing import Iterable
+
+
+class GridCodec:
+    """
+    Packs grids over fixed propositions, nominals and grid size into fixed-size byte strings: every nominal is stored
+    as the index of its cell (two bytes), and every proposition as a bitmask over the cells.
+    """
+
+    def __init__(self, props: list[str], noms: list[str], grid_size: tuple[int, int]):
+        self.props = list(props)
+        self.noms = list(noms)
+        self.grid_size = tuple(grid_size)
+        self.cells: int = grid_size[0] * grid_size[1]
+        if self.cells > 0xFFFF:
+            raise ValueError("Grids with more than 65535 cells cannot be encoded.")
+        self.mask_size: int = (self.cells + 7) // 8
+        self.grid_size_bytes: int = 2 * len(self.noms) + self.mask_size * len(self.props)
+        self._points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+
+    def encode_points(self, points: Iterable[tuple[int, int]]) -> bytes:
+        """
+        Encodes a set of points as a bitmask over the cells.
+
+        :param points: the points
+        :return: the bitmask
+        """
+        mask: int = 0
+        for i, j in points:
+            mask = mask | (1 << (i * self.grid_size[1] + j))
+        return mask.to_bytes(self.mask_size, "little")
+
+    def decode_points(self, data: bytes) -> tuple[tuple[int, int], ...]:
+        """
+        Decodes a bitmask over the cells.
+
+        :param data: the bitmask
+        :return: the points in the bitmask, in row-major order
+        """
+        mask: int = int.from_bytes(data, "little")
+        return tuple(p for k, p in enumerate(self._points) if mask >> k & 1)
+
+    def encode(self, grid: dict) -> bytes:
+        """
+        Encodes a grid.
+
+        :param grid: the grid
+        :return: the packed grid
+        """
+        parts: list[bytes] = []
+        for name in self.noms:
+            i, j = grid[name]
+            parts.append(struct.pack("<H", i * self.grid_size[1] + j))
+        for name in self.props:
+            parts.append(self.encode_points(grid[name]))
+        return b"".join(parts)
+
+    def decode(self, data: bytes) -> dict:
+        """
+        Decodes a packed grid.
+
+        :param data: the packed grid
+        :return: the grid
+        """
+        grid: dict = {}
+        offset: int = 0
+        for name in self.noms:
+            grid[name] = self._points[struct.unpack_from("<H", data, offset)[0]]
+            offset = offset + 2
+        for name in self.props:
+            grid[name] = self.decode_points(data[offset:offset + self.mask_size])
+            offset = offset + self.mask_size
+        return grid
@@ -0,0 +1,200 @@
+from array import array
+from math import comb
+from typing import Callable, Iterator, Optional, Sequence
+
+# type code of the arrays of grid ranks (unsigned 64-bit integers, as pools with more grids cannot be enumerated)
+RANK_TYPECODE: str = "Q"
+
+
+class GridPool:
+    """
+    The grids over given propositions, nominals and grid size, numbered in the order of the baseline checker's
+    generate_grids (the placements of the propositions in powerset order, then the cells of the nominals), without
+    storing them. The rank of a grid is a mixed-radix number with one digit per proposition (the rank of its subset
+    of cells among the 2^cells subsets) and one digit per nominal (the index of its cell), so grids are decoded from
+    their rank on demand and the pool can be iterated any number of times in constant memory.
+    """
+
+    def __init__(self, props: list[str], noms: list[str], grid_size: tuple[int, int],
+                 prop_type: Callable[[tuple], Sequence] = tuple):
+        self.props = list(props)
+        self.noms = list(noms)
+        self.grid_size = tuple(grid_size)
+        self.prop_type = prop_type
+        self.points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+        self.cells: int = len(self.points)
+        self.nominal_radix: int = self.cells ** len(self.noms)
+        self.size: int = 2 ** (self.cells * len(self.props)) * self.nominal_radix
+
+        # number of subsets of each size, in the order of powerset
+        self._subset_counts: list[int] = [comb(self.cells, r) for r in range(self.cells + 1)]
+
+        # subsets of the last decoded placement of the propositions, as consecutive grids mostly only move nominals
+        self._last_prop_rank: Optional[int] = None
+        self._last_subsets: tuple = ()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def subset(self, rank: int) -> tuple[tuple[int, int], ...]:
+        """
+        Returns the subset of cells of a rank in powerset order (by size, then in the lexicographic order of
+        itertools.combinations).
+
+        :param rank: the rank, below 2^cells
+        :return: the cells of the subset
+        """
+        size: int = 0
+        while rank >= self._subset_counts[size]:
+            rank = rank - self._subset_counts[size]
+            size = size + 1
+
+        # unrank the combination: skip the combinations starting with each smaller cell
+        cells: list[tuple[int, int]] = []
+        cell: int = 0
+        while size > 0:
+            starting: int = comb(self.cells - cell - 1, size - 1)
+            if rank < starting:
+                cells.append(self.points[cell])
+                size = size - 1
+            else:
+                rank = rank - starting
+            cell = cell + 1
+        return tuple(cells)
+
+    def __getitem__(self, rank: int) -> dict:
+        if not 0 <= rank < self.size:
+            raise IndexError(f"Grid rank {rank} is out of range.")
+        prop_rank, nominal_rank = divmod(rank, self.nominal_radix)
+
+        if prop_rank != self._last_prop_rank:
+            subsets: list[tuple] = []
+            for _ in self.props:
+                prop_rank, digit = divmod(prop_rank, 2 ** self.cells)
+                subsets.append(self.subset(digit))
+            self._last_prop_rank = rank // self.nominal_radix
+            self._last_subsets = tuple(reversed(subsets))
+
+        grid: dict = {}
+        for name, subset in zip(self.props, self._last_subsets):
+            grid[name] = subset if self.prop_type is tuple else self.prop_type(subset)
+        cells: list[tuple[int, int]] = []
+        for _ in self.noms:
+            nominal_rank, digit = divmod(nominal_rank, self.cells)
+            cells.append(self.points[digit])
+        for name, point in zip(self.noms, reversed(cells)):
+            grid[name] = point
+        return grid
+
+    def __iter__(self) -> Iterator[dict]:
+        for rank in range(self.size):
+            yield self[rank]
+
+
+class GridSelection:
+    """
+    The grids of a pool accepted by a predicate (e.g. the state assumptions), in pool order. The pool is filtered as
+    the grids are consumed, and only the ranks of the accepted grids are kept (8 bytes per grid), so the selection
+    can be iterated and indexed again without storing its grids. A selection can also be given by its ranks.
+    """
+
+    def __init__(self, pool: GridPool, accept: Optional[Callable[[dict], bool]] = None,
+                 stats: Optional[dict] = None, ranks: Optional[array] = None):
+        self.pool = pool
+        self.accept = accept
+        self.stats = stats
+        self.ranks: array = ranks if ranks is not None else array(RANK_TYPECODE)
+        # the rank of the next grid of the pool to filter (the whole pool is filtered for given ranks)
+        self._next: int = pool.size if ranks is not None else 0
+
+    def _advance(self) -> Optional[dict]:
+        # filters the next grid of the pool, returning it if it is accepted
+        grid: dict = self.pool[self._next]
+        accepted: bool = self.accept is None or self.accept(grid)
+        if self.stats is not None:
+            self.stats["candidates"] = self.stats["candidates"] + 1
+            self.stats["rejected"] = self.stats["rejected"] + (0 if accepted else 1)
+        if accepted:
+            self.ranks.append(self._next)
+        self._next = self._next + 1
+        return grid if accepted else None
+
+    def complete(self) -> 'GridSelection':
+        """
+        Filters the rest of the pool.
+
+        :return: the selection
+        """
+        while self._next < self.pool.size:
+            self._advance()
+        return self
+
+    def __len__(self) -> int:
+        return len(self.complete().ranks)
+
+    def __getitem__(self, index: int) -> dict:
+        while index >= len(self.ranks) and self._next < self.pool.size:
+            self._advance()
+        return self.pool[self.ranks[index]]
+
+    def __iter__(self) -> Iterator[dict]:
+        index: int = 0
+        while True:
+            if index < len(self.ranks):
+                yield self.pool[self.ranks[index]]
+                index = index + 1
+            elif self._next < self.pool.size:
+                grid: Optional[dict] = self._advance()
+                if grid is not None:
+                    index = index + 1
+                    yield grid
+            else:
+                return
+
+    def group_by(self, key: Callable[[dict], tuple]) -> list['GridSelection']:
+        """
+        Splits the selection into selections of grids with the same key, in the order of their first grids.
+
+        :param key: the key of a grid
+        :return: the selections
+        """
+        groups: dict[tuple, array] = {}
+        for rank in self.complete().ranks:
+            groups.setdefault(key(self.pool[rank]), array(RANK_TYPECODE)).append(rank)
+        return [GridSelection(self.pool, ranks=ranks) for ranks in groups.values()]
+
+
+def lazy_product(grids: Sequence[dict], length: int, digits: Optional[list[int]] = None) -> Iterator[tuple]:
+    """
+    Iterates over the tuples of itertools.product(grids, repeat=length) without materializing the grids: an odometer
+    over the indices of the grids, which only fetches the grid of a position when its index changes. Traces of length
+    one are streamed from the grids, so a selection is filtered as they are consumed.
+
+    :param grids: the grids (e.g. a pool or selection)
+    :param length: the length of the tuples
+    :param digits: the indices of the first tuple (the first tuple of the product if None)
+    :return: the tuples
+    """
+    if length == 1 and digits is None:
+        for grid in grids:
+            yield (grid,)
+        return
+
+    base: int = len(grids)
+    if base == 0:
+        return
+    digits = list(digits) if digits is not None else [0] * length
+    current: list[dict] = [grids[d] for d in digits]
+    while True:
+        yield tuple(current)
+        position: int = length - 1
+        while position >= 0:
+            digits[position] = digits[position] + 1
+            if digits[position] < base:
+                current[position] = grids[digits[position]]
+                break
+            digits[position] = 0
+            current[position] = grids[0]
+            position = position - 1
+        if position < 0:
+            return
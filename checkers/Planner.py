@@ -0,0 +1,287 @@
+import random
+from itertools import islice
+from timeit import default_timer as timer
+from typing import Callable, Iterable, Optional
+from checkers.ConclusionCounting import parse_formula
+from checkers.SpatioTemporalEvaluatorUtils import satisfying_points
+from checkers.TraceSpaceIndex import TraceSpaceIndex, grid_key
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    generate_all_satisfying_grids, group_by_static_props, is_state_formula_string
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import motion_space, \
+    test_state_assumptions
+from checkers.statistical_version.evaluator_sampling.SamplingSpatioTemporalEvaluator import count_grids, \
+    count_traces, sample_grid
+from formula_types.FormulaSimplifier import simplify
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
+
+# checkers the planner chooses from
+PLANNED_CHECKERS: tuple[str, ...] = ("baseline", "optimized", "motion")
+
+# maximal number of grids enumerated (or generated as successors) to count a trace space exactly
+EXACT_GRID_LIMIT: int = 50000
+
+# number of random grids drawn to estimate the size of a larger grid pool
+GRID_SAMPLES: int = 2000
+
+# number of random walks estimating the number of traces of the motion checker if it cannot be counted exactly
+MOTION_PROBES: int = 200
+
+# number of traces timed to estimate the evaluation time per trace
+TIMING_SAMPLES: int = 100
+
+
+class PlannerBudgetExceeded(Exception):
+    """
+    Raised when counting a trace space exactly would generate more grids than EXACT_GRID_LIMIT.
+    """
+    pass
+
+
+def seconds_per_trace(formula: HybridSpatioTemporalFormula, traces: list[Trace], grid_size: tuple[int, int]) -> float:
+    """
+    Measures the mean time of evaluating a formula at all points of a trace.
+
+    :param formula: the formula
+    :param traces: the traces to time
+    :param grid_size: the size of the grid
+    :return: the mean time in seconds (0 if there are no traces)
+    """
+    if not traces:
+        return 0.0
+    start: float = timer()
+    for t in traces:
+        satisfying_points(formula, t, grid_size)
+    return (timer() - start) / len(traces)
+
+
+def sample_pool(props: list[str], noms: list[str], grid_size: tuple[int, int],
+                accept: Callable[[dict], bool], rng: random.Random) -> tuple[list[dict], int]:
+    """
+    Estimates the number of grids of generate_grids accepted by a predicate from GRID_SAMPLES random grids (the
+    callers enumerate pools of at most EXACT_GRID_LIMIT grids exactly instead).
+
+    :param props: the propositions of the grids
+    :param noms: the nominals of the grids
+    :param grid_size: the size of the grid
+    :param accept: the predicate
+    :param rng: the random number generator
+    :return: the accepted random grids, and the estimated number of accepted grids
+    """
+    grid_count: int = count_grids(props, noms, grid_size)
+    points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+    samples: list[dict] = [sample_grid(props, noms, points, rng) for _ in range(GRID_SAMPLES)]
+    accepted: list[dict] = [g for g in samples if accept(g)]
+    return accepted, grid_count * len(accepted) // GRID_SAMPLES
+
+
+def estimate_baseline(props, noms, assumptions, conclusions, grid_size, max_trace_length,
+                      rng: random.Random) -> dict:
+    """
+    Estimates the number of traces and the running time of the baseline checker. The number of traces is exact.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param rng: the random number generator
+    :return: the estimate
+    """
+    points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+    traces: list[Trace] = [Trace.from_grids(tuple(sample_grid(props, noms, points, rng)
+                                                  for _ in range(max_trace_length)))
+                           for _ in range(TIMING_SAMPLES)]
+    trace_count: int = count_traces(props, noms, grid_size, max_trace_length)
+    return {"checker": "baseline", "traces": trace_count, "exact": True,
+            "seconds": trace_count * seconds_per_trace(parse_formula(conclusions + assumptions), traces, grid_size)}
+
+
+def estimate_optimized(props, noms, assumptions, conclusions, grid_size, max_trace_length,
+                       static_props: list[str], rng: random.Random) -> dict:
+    """
+    Estimates the number of traces and the running time of the optimized checker. The pool of grids satisfying the
+    state formulas is enumerated if there are few grids, and estimated from random grids otherwise.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param static_props: propositions whose placement does not change over time
+    :param rng: the random number generator
+    :return: the estimate
+    """
+    state_fmls: list[str] = [a for a in assumptions + conclusions if is_state_formula_string(a)]
+    parsed_state_fmls: list[HybridSpatioTemporalFormula] = [simplify(HybridSpatioTemporalParser(tokenize(a)).parse())
+                                                            for a in state_fmls]
+    formula: HybridSpatioTemporalFormula = parse_formula(
+        conclusions + [a for a in assumptions if a not in state_fmls])
+
+    if count_grids(props, noms, grid_size) <= EXACT_GRID_LIMIT:
+        grids: list[dict] = generate_all_satisfying_grids(props, noms, grid_size, parsed_state_fmls)
+        groups: list[list[dict]] = group_by_static_props(grids, static_props) if static_props else [grids]
+        trace_count: int = len(TraceSpaceIndex(groups, max_trace_length))
+        exact: bool = True
+    else:
+        grids, pool_size = sample_pool(props, noms, grid_size,
+                                       lambda g: test_state_assumptions(grid_size, [g], parsed_state_fmls), rng)
+        # the placements of the static propositions split the pool into groups of (assumed) equal size
+        group_count: int = 2 ** (grid_size[0] * grid_size[1] * len(static_props))
+        trace_count = sum(round(group_count * (pool_size / group_count) ** length)
+                          for length in range(1, max_trace_length + 1))
+        exact = False
+
+    traces: list[Trace] = [Trace.from_grids(tuple(rng.choice(grids) for _ in range(max_trace_length)))
+                           for _ in range(TIMING_SAMPLES)] if grids else []
+    return {"checker": "optimized", "traces": trace_count, "exact": exact,
+            "seconds": trace_count * seconds_per_trace(formula, traces, grid_size)}
+
+
+def count_tree(roots: Iterable[dict], successors: Callable[[dict], Iterable[dict]], max_trace_length: int) -> int:
+    """
+    Counts the traces up to the given length that start with one of the roots and continue with successors, sharing
+    the counts of equal grids at equal depths.
+
+    :param roots: the start grids
+    :param successors: the function returning the grids that can follow a grid
+    :param max_trace_length: the maximal trace length
+    :return: the number of traces
+    """
+    memo: dict[tuple, int] = {}
+    generated: int = 0
+
+    def count(grid: dict, remaining: int) -> int:
+        nonlocal generated
+        key: tuple = (grid_key(grid), remaining)
+        if key in memo:
+            return memo[key]
+        total: int = 1
+        if remaining > 1:
+            children: list[dict] = list(successors(grid))
+            generated = generated + len(children)
+            if generated > EXACT_GRID_LIMIT:
+                raise PlannerBudgetExceeded()
+            for child in children:
+                total = total + count(child, remaining - 1)
+        memo[key] = total
+        return total
+
+    return sum(count(root, max_trace_length) for root in roots)
+
+
+def estimate_motion(props, noms, assumptions, conclusions, grid_size, max_trace_length,
+                    static_props: list[str], rng: random.Random) -> dict:
+    """
+    Estimates the number of traces and the running time of the motion checker. The traces are counted exactly, by
+    counting the traces from every reachable grid once, if this generates at most EXACT_GRID_LIMIT grids, and
+    estimated from random walks otherwise (Knuth's estimator of the size of a search tree).
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param static_props: propositions whose placement does not change over time
+    :param rng: the random number generator
+    :return: the estimate
+    """
+    roots_iterator, successors, is_root, remaining_assumptions = motion_space(props, noms, assumptions, grid_size,
+                                                                              static_props)
+    formula: HybridSpatioTemporalFormula = parse_formula(conclusions + remaining_assumptions)
+
+    roots: list[dict] = list(islice(roots_iterator, EXACT_GRID_LIMIT + 1))
+    if len(roots) > EXACT_GRID_LIMIT:
+        start_grids, root_count = sample_pool(props, noms, grid_size, is_root, rng)
+        exact: bool = False
+    else:
+        start_grids = roots
+        root_count = len(roots)
+        exact = True
+
+    # random walks, each weighted by the product of the branching factors along it
+    walks: list[Trace] = []
+    walk_total: int = 0
+    generation_seconds: float = 0.0
+    generated: int = 0
+    for _ in range(MOTION_PROBES if start_grids else 0):
+        grid: dict = rng.choice(start_grids)
+        trace: Trace = Trace.from_grids((grid,))
+        weight: int = 1
+        estimate: int = 1
+        while len(trace) < max_trace_length:
+            start: float = timer()
+            children: list[dict] = list(successors(grid))
+            generation_seconds = generation_seconds + timer() - start
+            generated = generated + len(children)
+            if not children:
+                break
+            weight = weight * len(children)
+            estimate = estimate + weight
+            grid = rng.choice(children)
+            trace = trace.extend(grid)
+        walk_total = walk_total + estimate
+        walks.append(trace)
+
+    trace_count: int
+    if exact:
+        try:
+            trace_count = count_tree(roots, successors, max_trace_length)
+        except PlannerBudgetExceeded:
+            exact = False
+    if not exact:
+        trace_count = round(root_count * walk_total / MOTION_PROBES) if start_grids else 0
+
+    per_trace: float = seconds_per_trace(formula, walks[:TIMING_SAMPLES], grid_size)
+    if generated:
+        per_trace = per_trace + generation_seconds / generated
+    return {"checker": "motion", "traces": trace_count, "exact": exact, "seconds": trace_count * per_trace}
+
+
+def plan(props, noms, assumptions, conclusions, grid_size, max_trace_length, static_props: list[str] = (),
+         checkers: Iterable[str] = PLANNED_CHECKERS, seed: int = 0) -> list[dict]:
+    """
+    Estimates, without running them, the number of traces each checker enumerates (#Trace) and its running time.
+    Checkers that cannot handle the scenario (e.g. the baseline checker with static propositions) are left out.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param static_props: propositions whose placement does not change over time
+    :param checkers: the checkers to estimate
+    :param seed: the seed of the random number generator
+    :return: per checker, a dictionary with the checker, the estimated #Trace ("traces"), whether it is exact
+             ("exact"), and the estimated running time in seconds ("seconds")
+    """
+    estimates: list[dict] = []
+    for checker in checkers:
+        rng: random.Random = random.Random(seed)
+        if checker == "baseline" and not static_props:
+            estimates.append(estimate_baseline(props, noms, assumptions, conclusions, grid_size, max_trace_length,
+                                               rng))
+        elif checker == "optimized":
+            estimates.append(estimate_optimized(props, noms, assumptions, conclusions, grid_size, max_trace_length,
+                                                static_props, rng))
+        elif checker == "motion":
+            estimates.append(estimate_motion(props, noms, assumptions, conclusions, grid_size, max_trace_length,
+                                             static_props, rng))
+    return estimates
+
+
+def choose_checker(estimates: list[dict]) -> Optional[str]:
+    """
+    Returns the checker with the lowest estimated running time, preferring fewer traces on ties.
+
+    :param estimates: the estimates of plan
+    :return: the checker, None if there are no estimates
+    """
+    if not estimates:
+        return None
+    return min(estimates, key=lambda e: (e["seconds"], e["traces"]))["checker"]
@@ -0,0 +1,104 @@
+import multiprocessing
+from queue import Empty
+from timeit import default_timer as timer
+from typing import Callable, Optional
+
+# seconds after which the checkers still running are cancelled
+RACE_TIMEOUT: float = 600.0
+
+# seconds between two checks whether a checker exited without reporting a result
+POLL_INTERVAL: float = 0.1
+
+# states of a checker after a race
+FINISHED: str = "finished"
+FAILED: str = "failed"
+CANCELLED: str = "cancelled"
+TIMED_OUT: str = "timeout"
+
+
+def race_handler(queue: multiprocessing.Queue, name: str, evaluate: Callable, args: tuple, options: dict):
+    """
+    Runs one checker of a race and reports its counts, or the error it raised, to the queue.
+
+    :param queue: the queue shared by the checkers of the race
+    :param name: the name of the checker
+    :param evaluate: the evaluation function of the checker
+    :param args: the positional arguments of the evaluation function
+    :param options: the keyword arguments of the evaluation function
+    """
+    start: float = timer()
+    try:
+        counter_sat, counter_gen = evaluate(*args, **options)
+    except Exception as e:
+        queue.put((name, None, None, timer() - start, f"{type(e).__name__}: {e}"))
+        return
+    queue.put((name, counter_sat, counter_gen, timer() - start, None))
+
+
+def race(evaluators: dict[str, Callable], args: tuple, options: Optional[dict[str, dict]] = None,
+         cross_validate: bool = False, timeout: float = RACE_TIMEOUT) -> dict:
+    """
+    Runs checkers in parallel processes and returns the #Sat of the first one to finish. The other checkers are
+    cancelled, or, with cross_validate, run to completion so that their counts can be compared.
+
+    :param evaluators: the evaluation functions of the checkers by name
+    :param args: the positional arguments of the evaluation functions (propositions, nominals, assumptions,
+                 conclusions, grid size, maximal trace length, show_traces)
+    :param options: the keyword arguments of the evaluation functions by checker name (none if missing)
+    :param cross_validate: whether to let all checkers finish and compare their #Sat
+    :param timeout: the seconds after which the checkers still running are cancelled
+    :return: a dictionary with the first checker to finish without error ("winner", None if there is none), its
+             #Sat ("sat"), per checker the state, #Sat, #Trace, seconds and error ("results", in the order of
+             evaluators) and, with cross_validate, whether the finished checkers agree on #Sat ("agree", otherwise
+             None)
+    """
+    options = options or {}
+    queue: multiprocessing.Queue = multiprocessing.Queue()
+    processes: dict[str, multiprocessing.Process] = {
+        name: multiprocessing.Process(target=race_handler, args=(queue, name, f, args, options.get(name, {})))
+        for name, f in evaluators.items()}
+    for p in processes.values():
+        p.start()
+
+    results: dict[str, dict] = {name: {"state": TIMED_OUT, "sat": None, "traces": None, "seconds": None,
+                                       "error": None} for name in evaluators}
+    pending: set[str] = set(evaluators)
+    exited: set[str] = set()
+    winner: Optional[str] = None
+    deadline: float = timer() + timeout
+
+    while pending and timer() < deadline:
+        try:
+            name, counter_sat, counter_gen, seconds, error = queue.get(
+                timeout=max(0.0, min(POLL_INTERVAL, deadline - timer())))
+        except Empty:
+            # a checker that exited without a result (e.g. killed for lack of memory) is given one more poll
+            # interval, as its result may still be on its way through the queue
+            for name in [n for n in pending if processes[n].exitcode is not None]:
+                if name in exited:
+                    results[name].update(state=FAILED, error=f"exit code {processes[name].exitcode}")
+                    pending.discard(name)
+                exited.add(name)
+            continue
+
+        results[name] = {"state": FINISHED if error is None else FAILED, "sat": counter_sat, "traces": counter_gen,
+                         "seconds": seconds, "error": error}
+        pending.discard(name)
+        if error is None and winner is None:
+            winner = name
+            if not cross_validate:
+                break
+
+    # the checkers still running lost the race, or ran out of time
+    for name in pending:
+        processes[name].terminate()
+        if winner is not None and not cross_validate:
+            results[name]["state"] = CANCELLED
+    for p in processes.values():
+        p.join()
+
+    agree: Optional[bool] = None
+    if cross_validate:
+        agree = len({r["sat"] for r in results.values() if r["state"] == FINISHED}) <= 1
+    return {"winner": winner, "sat": results[winner]["sat"] if winner is not None else None, "results": results,
+            "agree": agree}
@@ -0,0 +1,258 @@
+from typing import Iterable, Optional, Union
+from formula_types.ClassicalLogicFormula import Verum, Falsum, Prop, Not, And, Or, If, Iff, NaryAnd, NaryOr
+from formula_types.HybridFormula import Nom, At, Bind
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.SpatialFormula import Front, Back, Left, Right
+from formula_types.TemporalFormula import Next, Eventually, Always, Until
+
+# verdicts of the monitor
+SATISFIED: str = "satisfied"
+VIOLATED: str = "violated"
+PENDING: str = "pending"
+
+# offsets of the spatial operators
+OFFSETS: dict[type, tuple[int, int]] = {Front: (-1, 0), Back: (1, 0), Left: (0, -1), Right: (0, 1)}
+
+# A residual is what remains to be checked of a formula on the rest of the trace: True, False, a conjunction
+# ("&", frozenset of residuals), a disjunction ("|", frozenset of residuals), or an obligation
+# ("X", strong, positive, formula, point, bindings): the formula (negated if not positive) must hold at the point at the
+# next time step. If the trace ends instead, a strong obligation fails and a weak one holds. The bindings are the
+# (nominal, point) pairs fixed by enclosing binders.
+Residual = Union[bool, tuple]
+
+
+def conjoin(residuals: Iterable[Residual]) -> Residual:
+    """
+    Builds the simplified conjunction of residuals.
+
+    :param residuals: the residuals
+    :return: the conjunction
+    """
+    operands: set = set()
+    for r in residuals:
+        if r is False:
+            return False
+        if r is True:
+            continue
+        if r[0] == "&":
+            operands.update(r[1])
+        else:
+            operands.add(r)
+    if not operands:
+        return True
+    if len(operands) == 1:
+        return next(iter(operands))
+    return "&", frozenset(operands)
+
+
+def disjoin(residuals: Iterable[Residual]) -> Residual:
+    """
+    Builds the simplified disjunction of residuals.
+
+    :param residuals: the residuals
+    :return: the disjunction
+    """
+    operands: set = set()
+    for r in residuals:
+        if r is True:
+            return True
+        if r is False:
+            continue
+        if r[0] == "|":
+            operands.update(r[1])
+        else:
+            operands.add(r)
+    if not operands:
+        return False
+    if len(operands) == 1:
+        return next(iter(operands))
+    return "|", frozenset(operands)
+
+
+def negate(residual: Residual) -> Residual:
+    """
+    Negates a residual. The negation of a strong obligation is the weak obligation of the negated formula, and vice
+    versa.
+
+    :param residual: the residual
+    :return: the negated residual
+    """
+    if residual is True or residual is False:
+        return not residual
+    if residual[0] == "&":
+        return disjoin(negate(r) for r in residual[1])
+    if residual[0] == "|":
+        return conjoin(negate(r) for r in residual[1])
+    _, strong, positive, fml, point, bindings = residual
+    return "X", not strong, not positive, fml, point, bindings
+
+
+def value_at_end(residual: Residual) -> bool:
+    """
+    Returns the value of a residual if the trace ends at the current time step.
+
+    :param residual: the residual
+    :return: the truth value
+    """
+    if residual is True or residual is False:
+        return residual
+    if residual[0] == "&":
+        return all(value_at_end(r) for r in residual[1])
+    if residual[0] == "|":
+        return any(value_at_end(r) for r in residual[1])
+    return not residual[1]
+
+
+class RuntimeMonitor:
+    """
+    Monitors a formula on a trace that is given one grid at a time, e.g. by a simulation loop, without keeping the
+    trace. Every step rewrites, for every point of the grid, what remains to be checked of the formula on the rest of
+    the trace (formula progression), so a step costs time proportional to the size of these residuals, which is
+    bounded by the size of the formula times the number of points (and bound points). The verdict follows the
+    semantics of the checkers: the formula holds on the trace if it holds at some point at time 0.
+    """
+
+    def __init__(self, formula: HybridSpatioTemporalFormula, grid_size: tuple[int, int]):
+        self.formula = formula
+        self.grid_size = grid_size
+        self.time: int = 0
+        self.verdict: str = PENDING
+        self.witnesses: list[tuple[int, int]] = []
+
+        # residual per point, points whose residual is false are dropped
+        self._residuals: dict[tuple[int, int], Residual] = {
+            (i, j): ("X", True, True, formula, (i, j), ()) for i in range(grid_size[0]) for j in range(grid_size[1])}
+
+    def step(self, grid: dict) -> str:
+        """
+        Processes the grid of the next time step.
+
+        :param grid: the grid
+        :return: the verdict after this step: SATISFIED or VIOLATED if every continuation of the trace satisfies
+                 or violates the formula, PENDING otherwise
+        """
+        self.time = self.time + 1
+        memo: dict = {}
+        residuals: dict[tuple[int, int], Residual] = {}
+        for p, r in self._residuals.items():
+            r = self._substitute(r, grid, memo)
+            if r is not False:
+                residuals[p] = r
+        self._residuals = residuals
+
+        # the residuals of the other points are still progressed, so that satisfying_points stays exact
+        if self.verdict == PENDING:
+            self.witnesses = [p for p, r in residuals.items() if r is True]
+            if self.witnesses:
+                self.verdict = SATISFIED
+            elif not residuals:
+                self.verdict = VIOLATED
+        return self.verdict
+
+    def satisfying_points(self) -> list[tuple[int, int]]:
+        """
+        Returns the points at which the formula holds if the trace ends after the current time step, i.e. the points
+        at which evaluate holds on the trace seen so far.
+
+        :return: the points
+        """
+        if self.time == 0:
+            return []
+        return sorted(p for p, r in self._residuals.items() if value_at_end(r))
+
+    def holds(self) -> bool:
+        """
+        Returns whether the formula holds at some point if the trace ends after the current time step.
+
+        :return: true if the formula holds on the trace seen so far
+        """
+        return self.time > 0 and any(value_at_end(r) for r in self._residuals.values())
+
+    def _substitute(self, residual: Residual, grid: dict, memo: dict) -> Residual:
+        # replaces the obligations of a residual by the progression of their formulas over the grid
+        if residual is True or residual is False:
+            return residual
+        if residual[0] == "&":
+            return conjoin(self._substitute(r, grid, memo) for r in residual[1])
+        if residual[0] == "|":
+            return disjoin(self._substitute(r, grid, memo) for r in residual[1])
+        _, strong, positive, fml, point, bindings = residual
+        result: Residual = self._progress(fml, point, bindings, grid, memo)
+        return result if positive else negate(result)
+
+    def _progress(self, fml: HybridSpatioTemporalFormula, point: tuple[int, int], bindings: tuple, grid: dict,
+                  memo: dict) -> Residual:
+        # rewrites a formula at a point into what remains to be checked after the current grid
+        key: tuple = (fml, point, bindings)
+        result: Optional[Residual] = memo.get(key)
+        if result is not None:
+            return result
+
+        if isinstance(fml, Verum):
+            result = True
+        elif isinstance(fml, Falsum):
+            result = False
+        elif isinstance(fml, Prop):
+            result = point in grid[fml.name]
+        elif isinstance(fml, Nom):
+            result = point == self._position(fml.name, bindings, grid)
+        elif isinstance(fml, Not):
+            result = negate(self._progress(fml.operand, point, bindings, grid, memo))
+        elif isinstance(fml, (And, NaryAnd)):
+            operands = [fml.left, fml.right] if isinstance(fml, And) else fml.operands
+            result = True
+            for x in operands:
+                result = conjoin((result, self._progress(x, point, bindings, grid, memo)))
+                if result is False:
+                    break
+        elif isinstance(fml, (Or, NaryOr)):
+            operands = [fml.left, fml.right] if isinstance(fml, Or) else fml.operands
+            result = False
+            for x in operands:
+                result = disjoin((result, self._progress(x, point, bindings, grid, memo)))
+                if result is True:
+                    break
+        elif isinstance(fml, If):
+            result = disjoin((negate(self._progress(fml.left, point, bindings, grid, memo)),
+                              self._progress(fml.right, point, bindings, grid, memo)))
+        elif isinstance(fml, Iff):
+            left: Residual = self._progress(fml.left, point, bindings, grid, memo)
+            right: Residual = self._progress(fml.right, point, bindings, grid, memo)
+            result = conjoin((disjoin((negate(left), right)), disjoin((negate(right), left))))
+        elif isinstance(fml, At):
+            result = self._progress(fml.operand, self._position(fml.name, bindings, grid), bindings, grid, memo)
+        elif isinstance(fml, Bind):
+            bound: tuple = tuple(sorted({**dict(bindings), fml.name: point}.items()))
+            result = self._progress(fml.operand, point, bound, grid, memo)
+        elif type(fml) in OFFSETS:
+            offset: tuple[int, int] = OFFSETS[type(fml)]
+            target: tuple[int, int] = (point[0] + offset[0], point[1] + offset[1])
+            if 0 <= target[0] < self.grid_size[0] and 0 <= target[1] < self.grid_size[1]:
+                result = self._progress(fml.operand, target, bindings, grid, memo)
+            else:
+                result = False
+        elif isinstance(fml, Next):
+            result = "X", True, True, fml.operand, point, bindings
+        elif isinstance(fml, Always):
+            result = conjoin((self._progress(fml.operand, point, bindings, grid, memo),
+                              ("X", False, True, fml, point, bindings)))
+        elif isinstance(fml, Eventually):
+            result = disjoin((self._progress(fml.operand, point, bindings, grid, memo),
+                              ("X", True, True, fml, point, bindings)))
+        elif isinstance(fml, Until):
+            result = disjoin((self._progress(fml.right, point, bindings, grid, memo),
+                              conjoin((self._progress(fml.left, point, bindings, grid, memo),
+                                       ("X", True, True, fml, point, bindings)))))
+        else:
+            raise ValueError(f"Formula {fml} cannot be monitored.")
+
+        memo[key] = result
+        return result
+
+    @staticmethod
+    def _position(name: str, bindings: tuple, grid: dict) -> tuple[int, int]:
+        # bound nominals stay at the point they were bound to
+        for bound_name, bound_point in bindings:
+            if bound_name == name:
+                return bound_point
+        return grid[name]
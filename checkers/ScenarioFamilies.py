@@ -0,0 +1,386 @@
+import math
+import multiprocessing
+import resource
+from functools import reduce
+from queue import Empty
+from timeit import default_timer as timer
+from typing import Callable, Optional
+from checkers.Portfolio import FINISHED, FAILED, TIMED_OUT, POLL_INTERVAL
+
+# seconds a run of a sweep may take before the sweep stops
+SWEEP_TIME_BUDGET: float = 60.0
+
+# largest number of values of a parameter tried by a sweep
+SWEEP_MAX_STEPS: int = 20
+
+
+def scenario(props: list[str], noms: list[str], assumptions: list[str], conclusions: list[str],
+             grid_size: tuple[int, int], max_trace_length: int) -> dict:
+    """
+    Returns a scenario in the format of checkers.ScenarioGenerator.
+
+    :param props: the list of propositions
+    :param noms: the list of nominals
+    :param assumptions: the list of assumptions
+    :param conclusions: the list of conclusions
+    :param grid_size: the size of the grid
+    :param max_trace_length: the maximal trace length
+    :return: the scenario
+    """
+    return {"props": props, "noms": noms, "assumptions": assumptions, "conclusions": conclusions,
+            "grid_size": grid_size, "max_trace_length": max_trace_length}
+
+
+def disjunction(formulas: list[str]) -> str:
+    """
+    Returns the disjunction of formulas.
+
+    :param formulas: the formulas
+    :return: the disjunction
+    """
+    return reduce((lambda x, acc: x + "|" + acc), formulas)
+
+
+def one_lane_follow(duration: int, road_length: int) -> dict:
+    """
+    Vehicle safely following another in the same lane (README.md/Experiments/One Lane Follow).
+
+    :param duration: maximal length of the traces
+    :param road_length: length of the one-lane road
+    :return: the scenario
+    """
+    return scenario([], ['z0', 'z1'],
+                    ["@z0 !(Back 1)",  # SV is initially at the start of the lane
+                     "G (@z1 ↓z2 ((! X 1) | X @z1  (z2 | Back z2)))",  # POV always moves forward or stays put
+                     "G (@z0 ↓z2 ((! X 1) | X (@z0 ((!z1 & Back z2 ) | (z2 & Front z1) ))))"],
+                    # SV Always moves forward if safe, stays put if POV immediately ahead
+                    ["G(@z0 ! z1)"], (road_length, 1), duration)
+
+
+def hazard(duration: int, length: int = 2, width: int = 2) -> dict:
+    """
+    Vehicle avoiding a static hazard in presence of another vehicle (Figure 3 in paper).
+
+    :param duration: maximal length of traces
+    :param length: length of the road, and the distance up to which the hazard is looked for ahead
+    :param width: width of the road
+    :return: the scenario
+    """
+    def fronts(i: int, p: str):
+        if i == 0:
+            return "({})".format(p)
+        else:
+            return "(Front {})".format(fronts(i - 1, p))
+
+    def bfront(p: str):
+        each = ["(({})->({}))".format(fronts(i + 1, "1"), fronts(i + 1, p)) for i in range(0, length)]
+        return "({})".format(reduce((lambda x, acc: x + "&" + acc), each))
+
+    def dfront(p: str):
+        each = [fronts(i + 1, p) for i in range(0, length)]
+        return "({})".format(reduce((lambda x, acc: x + "|" + acc), each))
+
+    p1 = "(Right z1) & {}".format(dfront("G h"))
+    p2 = "(@z0 ↓z2 X @z0 ((Back z2) & (G ! h)))"
+    p3 = "(@z0 ↓z2 X @z0((Left z2) & {} & {}))".format(dfront("z1"), bfront("G ! h"))
+    full = "@z0 (({}) & (({}) U ({})))".format(p1, p2, p3)
+    return scenario(["h"], ["z0", "z1"], [], [full], (length, width), duration)
+
+
+def safe_intersection_priority(duration: int, grid_size: int) -> dict:
+    """
+    Vehicle going through an intersection safely (README.md/Experiments/Safe Intersection with Priority).
+
+    :param duration: maximal length of the traces
+    :param grid_size: width and length of the road
+    :return: the scenario
+    """
+    return scenario([], ['z0', 'z1'],
+                    ["@z1 !(Left 1)",  # z1 starts somewhere on the left border
+                     "@z0 !(Back 1)",  # z0 starts somewhere on the bottom border
+                     "G (@z1 ↓z2 ((! X 1)| X @z1 (Left z2)))",  # Moves left-to-right always
+                     "G (@z0 ↓z2 ((! X 1)| X @z0 ((!z1 & Back z2) | (z2 & Front z1) )))"],
+                    # Moves bottom-to-top except it stops to avoid other vehicle.
+                    ["G (@z0 !z1)"], (grid_size, grid_size), duration)
+
+
+def safe_passing(duration: int, road_length: int) -> dict:
+    """
+    Maneuvers of vehicles: speed-up, swerving left and right (README.md/Experiments/Safe Passing).
+
+    :param duration: maximal length of the traces
+    :param road_length: length of the two-lane road
+    :return: the scenario
+    """
+    # z0 initially moves forward
+    first_forward = "(@z0 ↓z2 ((! X 1) | X @z0 (Back z2)))"
+    # then swerves left to avoid z1
+    dodge_left = "(@z0 ↓z2 ((Front z1) & ((! X 1)| X (@z0 (Back (Right z2))))))"
+    # then drives twice as fast
+    fast_forward = "(@z0 ↓z2 ((! X 1)| X @z0 (Back (Back z2))))"
+    # then dodges back when safe
+    dodge_right = "(@z0 ↓z2 ((! X 1)| X @z0 (Back (Left z2))))"
+    # then drives normally
+    last_forward = "(@z0 ↓z2 ((! X 1) | X @z0 (Back z2)))"
+    return scenario([], ['z0', 'z1'],
+                    ["G(@z1 !(Right 1))",  # POV starts anywhere in right lane, stays in right lane
+                     "@z0 !(Right 1)",  # SV starts in back of right lane
+                     "@z0 !(Back 1)",
+                     "G (@z1 ↓z2 ((! X 1) | X @z1  (z2 | Back z2)))",  # z1 moves forward or stays in place
+                     "({} U ({} & ((! X 1) | X ({} & ((! X 1) | X ({} U ({} & ((! X 1) | X G ({})))))))))".format(
+                         first_forward, dodge_left, fast_forward, fast_forward, dodge_right, last_forward)],
+                    ["G (@z0 !z1)"], (road_length, 2), duration)
+
+
+def join_platoon(duration: int, platoon_size: int, road_length: int) -> dict:
+    """
+    Vehicle safely joining a platoon of other vehicles (README.md/Experiments/Join Platoon).
+
+    :param duration: maximal length of the traces
+    :param platoon_size: size of vehicle platoon
+    :param road_length: length of the two-lane road
+    :return: the scenario
+    """
+    pov_noms = ["z" + str(i + 1) for i in range(platoon_size)]
+    noms = ["z0"] + pov_noms  # and z is a temporary
+    no_collide = "!({})".format(disjunction(pov_noms))
+    some_front = disjunction(["Front " + n for n in pov_noms])
+    sv_mov_assump = "G(@z0 ↓z ((! X 1) | (X @z0((Back z)|(({0})&(Right z)&({1}))))))".format(some_front, no_collide)
+    sv_start_assump = "@z0 !(Right 1)"
+    pov_start_assumps = [format("G(@z{0} !(Left 1))".format(str(i + 1))) for i in range(platoon_size)]
+    pov_mov_assumps = [format("G(@z{0} ↓z ((! X 1) | X (@z{0} (Back z))))".format(str(i + 1))) for i in
+                       range(platoon_size)]
+    assumps = [sv_start_assump, sv_mov_assump] + pov_mov_assumps + pov_start_assumps
+    postcond = "G(@z0 ({}))".format(no_collide)
+    return scenario([], noms, assumps, [postcond], (road_length, 2), duration)
+
+
+def multi_lane_highway(duration: int, lanes: int, road_length: int, vehicles: int) -> dict:
+    """
+    Vehicle changing lanes on a highway with other vehicles, which drive forward or stay put in their lane. The
+    vehicle starts at the start of the road, and moves forward or to a neighbouring lane if that cell is free.
+
+    :param duration: maximal length of the traces
+    :param lanes: number of lanes (width of the road)
+    :param road_length: length of the road
+    :param vehicles: number of other vehicles
+    :return: the scenario
+    """
+    pov_noms = ["z" + str(i + 1) for i in range(vehicles)]
+    free = "!({})".format(disjunction(pov_noms))
+    sv_mov_assump = "G(@z0 ↓z ((! X 1) | X @z0 (({0}) & (Back z | Left z | Right z))))".format(free)
+    pov_mov_assumps = ["G(@{0} ↓z ((! X 1) | X @{0} (z | Back z)))".format(n) for n in pov_noms]
+    return scenario([], ["z0"] + pov_noms, ["@z0 !(Back 1)", sv_mov_assump] + pov_mov_assumps,
+                    ["G(@z0 ({}))".format(free)], (road_length, lanes), duration)
+
+
+def chained_intersections(duration: int, intersections: int, width: int) -> dict:
+    """
+    Vehicle crossing a chain of intersections, one per row of the grid above its start. At each intersection a
+    vehicle starts at the left border and drives left-to-right; the vehicle drives bottom-to-top and stops to avoid
+    a vehicle immediately ahead (as in Safe Intersection with Priority).
+
+    :param duration: maximal length of the traces
+    :param intersections: number of intersections
+    :param width: width of the intersecting roads
+    :return: the scenario
+    """
+    def backs(i: int) -> str:
+        return "Back " * i + "1"
+
+    pov_noms = ["z" + str(i + 1) for i in range(intersections)]
+    # the vehicle of intersection i starts in row i at the left border, and always moves left-to-right
+    pov_assumps = ["@{0} (!(Left 1) & ({1}) & !({2}))".format(n, backs(i + 1), backs(i + 2))
+                   for i, n in enumerate(pov_noms)]
+    pov_assumps += ["G (@{0} ↓z ((! X 1)| X @{0} (Left z)))".format(n) for n in pov_noms]
+    ahead = disjunction(["Front " + n for n in pov_noms])
+    sv_mov_assump = "G (@z0 ↓z ((! X 1)| X @z0 ((!({0}) & Back z) | (z & ({0})))))".format(ahead)
+    return scenario([], ["z0"] + pov_noms, ["@z0 !(Back 1)", sv_mov_assump] + pov_assumps,
+                    ["G (@z0 !({}))".format(disjunction(pov_noms))], (intersections + 1, width), duration)
+
+
+class ScenarioFamily:
+    """
+    A parameterized scenario: a function building the scenario from keyword parameters, their default values, and
+    the parameters it can be scaled on (each growing the trace space).
+    """
+
+    def __init__(self, name: str, build: Callable[..., dict], parameters: dict[str, int], scaling: tuple[str, ...]):
+        self.name = name
+        self.build = build
+        self.parameters = parameters
+        self.scaling = scaling
+
+    def scenario(self, **parameters) -> dict:
+        """
+        Builds the scenario of the family.
+
+        :param parameters: the parameters differing from the defaults
+        :return: the scenario
+        """
+        unknown: list[str] = [p for p in parameters if p not in self.parameters]
+        if unknown:
+            raise ValueError(f"Unknown parameters of {self.name}: {', '.join(unknown)}")
+        return self.build(**{**self.parameters, **parameters})
+
+
+# the scenario families by name, with the smallest sizes of the test suites as defaults
+FAMILIES: dict[str, ScenarioFamily] = {f.name: f for f in [
+    ScenarioFamily("follow", one_lane_follow, {"duration": 3, "road_length": 3}, ("road_length", "duration")),
+    ScenarioFamily("hazard", hazard, {"duration": 2, "length": 2, "width": 2}, ("duration", "length", "width")),
+    ScenarioFamily("intersection", safe_intersection_priority, {"duration": 2, "grid_size": 2},
+                   ("grid_size", "duration")),
+    ScenarioFamily("passing", safe_passing, {"duration": 2, "road_length": 4}, ("duration", "road_length")),
+    ScenarioFamily("platoon", join_platoon, {"duration": 3, "platoon_size": 2, "road_length": 5},
+                   ("platoon_size", "road_length", "duration")),
+    ScenarioFamily("highway", multi_lane_highway, {"duration": 2, "lanes": 2, "road_length": 3, "vehicles": 1},
+                   ("vehicles", "lanes", "road_length", "duration")),
+    ScenarioFamily("chained_intersections", chained_intersections, {"duration": 2, "intersections": 1, "width": 2},
+                   ("intersections", "width", "duration")),
+]}
+
+
+def sweep_handler(queue: multiprocessing.Queue, evaluate: Callable, args: tuple, memory_budget: Optional[int]):
+    """
+    Runs one checker of a sweep with limited memory and reports its counts, time and peak memory, or the error it
+    raised, to the queue.
+
+    :param queue: the queue of the sweep
+    :param evaluate: the evaluation function of the checker
+    :param args: the positional arguments of the evaluation function
+    :param memory_budget: the megabytes of address space the checker may use (None for no limit)
+    """
+    if memory_budget is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_budget * 2 ** 20, resource.getrlimit(resource.RLIMIT_AS)[1]))
+    start: float = timer()
+    try:
+        counter_sat, counter_gen = evaluate(*args)
+        error: Optional[str] = None
+    except MemoryError:
+        counter_sat, counter_gen, error = None, None, "out of memory"
+    except Exception as e:
+        counter_sat, counter_gen, error = None, None, f"{type(e).__name__}: {e}"
+    seconds: float = timer() - start
+    # the peak resident set size is in kilobytes on Linux
+    memory: float = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((counter_sat, counter_gen, seconds, memory, error))
+
+
+def run_point(evaluate: Callable, scenario: dict, time_budget: float, memory_budget: Optional[int]) -> dict:
+    """
+    Runs a checker on a scenario in a separate process, which is killed when it exceeds the time budget.
+
+    :param evaluate: the evaluation function of the checker
+    :param scenario: the scenario
+    :param time_budget: the seconds after which the checker is killed
+    :param memory_budget: the megabytes of address space the checker may use (None for no limit)
+    :return: the state, #Sat, #Trace, seconds, peak memory (megabytes) and error of the run
+    """
+    args: tuple = (scenario["props"], scenario["noms"], scenario["assumptions"], scenario["conclusions"],
+                   tuple(scenario["grid_size"]), scenario["max_trace_length"], False)
+    queue: multiprocessing.Queue = multiprocessing.Queue()
+    p = multiprocessing.Process(target=sweep_handler, args=(queue, evaluate, args, memory_budget))
+    p.start()
+    deadline: float = timer() + time_budget
+    exited: bool = False
+    while timer() < deadline:
+        try:
+            counter_sat, counter_gen, seconds, memory, error = queue.get(
+                timeout=max(0.0, min(POLL_INTERVAL, deadline - timer())))
+        except Empty:
+            # a checker killed for lack of memory exits without a result, which is given one more poll interval
+            if p.exitcode is not None:
+                if exited:
+                    p.join()
+                    return {"state": FAILED, "sat": None, "traces": None, "seconds": None, "memory": None,
+                            "error": f"exit code {p.exitcode}"}
+                exited = True
+            continue
+        p.join()
+        return {"state": FINISHED if error is None else FAILED, "sat": counter_sat, "traces": counter_gen,
+                "seconds": seconds, "memory": memory, "error": error}
+
+    p.terminate()
+    p.join()
+    return {"state": TIMED_OUT, "sat": None, "traces": None, "seconds": None, "memory": None, "error": None}
+
+
+def fit_scaling(values: list[int], seconds: list[float]) -> Optional[dict]:
+    """
+    Fits the running times of a sweep with an exponential (seconds = a * b ** value) and a power law
+    (seconds = a * value ** b) by least squares on the logarithm of the times, and returns the better fit.
+
+    :param values: the values of the parameter
+    :param seconds: the running times
+    :return: the model ("exponential" or "power"), its coefficients a and b, and the coefficient of determination
+             of the logarithms ("r2"); None if fewer than two points have a positive value and time
+    """
+    points: list[tuple[int, float]] = [(v, s) for v, s in zip(values, seconds) if v > 0 and s > 0]
+    if len({v for v, _ in points}) < 2:
+        return None
+
+    ys: list[float] = [math.log(s) for _, s in points]
+    fits: list[dict] = []
+    for model, xs in (("exponential", [float(v) for v, _ in points]), ("power", [math.log(v) for v, _ in points])):
+        mean_x: float = sum(xs) / len(xs)
+        mean_y: float = sum(ys) / len(ys)
+        sxx: float = sum((x - mean_x) ** 2 for x in xs)
+        slope: float = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+        intercept: float = mean_y - slope * mean_x
+        ss_res: float = sum((y - intercept - slope * x) ** 2 for x, y in zip(xs, ys))
+        ss_tot: float = sum((y - mean_y) ** 2 for y in ys)
+        fits.append({"model": model, "a": math.exp(intercept), "b": math.exp(slope) if model == "exponential" else slope,
+                     "r2": 1 - ss_res / ss_tot if ss_tot > 0 else 1.0})
+    return max(fits, key=lambda f: f["r2"])
+
+
+def predict_limit(fit: dict, time_budget: float) -> Optional[float]:
+    """
+    Returns the value of the parameter at which a fitted running time reaches the time budget.
+
+    :param fit: the fit (as returned by fit_scaling)
+    :param time_budget: the seconds
+    :return: the value, or None if the running time does not grow
+    """
+    if fit["model"] == "exponential":
+        return math.log(time_budget / fit["a"]) / math.log(fit["b"]) if fit["b"] > 1 else None
+    return (time_budget / fit["a"]) ** (1 / fit["b"]) if fit["b"] > 0 else None
+
+
+def sweep(family: ScenarioFamily, parameter: str, evaluate: Callable, parameters: Optional[dict[str, int]] = None,
+          time_budget: float = SWEEP_TIME_BUDGET, memory_budget: Optional[int] = None,
+          max_steps: int = SWEEP_MAX_STEPS) -> dict:
+    """
+    Grows a parameter of a scenario family by one, starting from its given or default value, and runs a checker on
+    each scenario until a run exceeds the time budget (or fails, e.g. for lack of memory) or max_steps values have
+    been tried. The running times are then fitted with a scaling curve.
+
+    :param family: the scenario family
+    :param parameter: the parameter to grow, one of the scaling parameters of the family
+    :param evaluate: the evaluation function of the checker
+    :param parameters: the parameters of the family differing from the defaults
+    :param time_budget: the seconds after which a run is cancelled
+    :param memory_budget: the megabytes of address space a run may use (None for no limit)
+    :param max_steps: the largest number of values of the parameter to try
+    :return: a dictionary with the family, parameter, the runs ("points": value, state, #Sat, #Trace, seconds,
+             peak memory and error), the largest value finished within the budgets ("largest", None if there is
+             none), the fit of the running times ("fit", as returned by fit_scaling) and the value at which the fit
+             reaches the time budget ("limit")
+    """
+    if parameter not in family.scaling:
+        raise ValueError(f"{family.name} does not scale on {parameter}, but on: {', '.join(family.scaling)}")
+    parameters = {**family.parameters, **(parameters or {})}
+
+    points: list[dict] = []
+    for value in range(parameters[parameter], parameters[parameter] + max_steps):
+        result: dict = run_point(evaluate, family.scenario(**{**parameters, parameter: value}), time_budget,
+                                 memory_budget)
+        points.append({"value": value, **result})
+        if result["state"] != FINISHED:
+            break
+
+    finished: list[dict] = [p for p in points if p["state"] == FINISHED]
+    fit: Optional[dict] = fit_scaling([p["value"] for p in finished], [p["seconds"] for p in finished])
+    return {"family": family.name, "parameter": parameter, "parameters": parameters, "points": points,
+            "largest": finished[-1]["value"] if finished else None, "fit": fit,
+            "limit": predict_limit(fit, time_budget) if fit is not None else None}
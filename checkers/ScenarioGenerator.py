@@ -0,0 +1,214 @@
+import json
+import os
+import random
+from typing import Callable, Iterator
+from checkers.Portfolio import race, FINISHED
+from checkers.statistical_version.evaluator_sampling.SamplingSpatioTemporalEvaluator import count_traces
+
+# default limits of the size of random scenarios
+MAX_PROPS: int = 1
+MAX_NOMS: int = 2
+MAX_GRID: tuple[int, int] = (3, 2)
+MAX_TRACE_LENGTH: int = 3
+MAX_DEPTH: int = 3
+MAX_CONCLUSIONS: int = 2
+
+# the largest number of traces (of the baseline checker) of a random scenario
+MAX_TRACES: int = 20000
+
+# seconds after which a checker of a differential run is cancelled
+DIFFERENTIAL_TIMEOUT: float = 60.0
+
+# probability that a subformula of a random formula is an atom before the maximal depth is reached
+LEAF_PROBABILITY: float = 0.3
+
+# operators of random formulas, drawn with the given weights
+UNARY_OPERATORS: list[str] = ["!", "X", "F", "G", "Front", "Back", "Left", "Right"]
+BINARY_OPERATORS: list[str] = ["&", "|", "->", "<->", "U"]
+OPERATOR_KINDS: list[str] = ["unary", "binary", "at", "bind"]
+OPERATOR_WEIGHTS: list[int] = [4, 4, 1, 1]
+
+# spatial directions of the movement assumptions
+DIRECTIONS: list[str] = ["Front", "Back", "Left", "Right"]
+OPPOSITE: dict[str, str] = {"Front": "Back", "Back": "Front", "Left": "Right", "Right": "Left"}
+
+
+def random_formula(rng: random.Random, props: list[str], noms: list[str], depth: int,
+                   variables: tuple[str, ...] = ()) -> str:
+    """
+    Returns a random formula of the grammar of HybridSpatioTemporalParser. Every operand is parenthesized, so the
+    formula does not depend on the precedence of the operators. Binders bind fresh nominals (not in noms), which are
+    only used in the scope of their binder.
+
+    :param rng: the random number generator
+    :param props: the propositions of the formula
+    :param noms: the nominals of the formula
+    :param depth: the maximal nesting depth of operators
+    :param variables: the nominals bound by the enclosing binders
+    :return: the formula
+    """
+    if depth <= 0 or rng.random() < LEAF_PROBABILITY:
+        return rng.choice(["1", "0"] + props + noms + list(variables))
+
+    kind: str = rng.choices(OPERATOR_KINDS, OPERATOR_WEIGHTS)[0]
+    if kind == "binary":
+        left: str = random_formula(rng, props, noms, depth - 1, variables)
+        right: str = random_formula(rng, props, noms, depth - 1, variables)
+        return f"({left}) {rng.choice(BINARY_OPERATORS)} ({right})"
+    if kind == "at" and (noms or variables):
+        return f"@{rng.choice(noms + list(variables))} ({random_formula(rng, props, noms, depth - 1, variables)})"
+    if kind == "bind":
+        variable: str = fresh_nominal(noms, variables)
+        return f"↓{variable} ({random_formula(rng, props, noms, depth - 1, variables + (variable,))})"
+    return f"{rng.choice(UNARY_OPERATORS)} ({random_formula(rng, props, noms, depth - 1, variables)})"
+
+
+def fresh_nominal(noms: list[str], variables: tuple[str, ...] = ()) -> str:
+    """
+    Returns a nominal that is neither one of the nominals nor bound.
+
+    :param noms: the nominals
+    :param variables: the bound nominals
+    :return: the fresh nominal
+    """
+    index: int = len(noms) + len(variables)
+    while f"z{index}" in noms or f"z{index}" in variables:
+        index += 1
+    return f"z{index}"
+
+
+def random_movement(rng: random.Random, nom: str, noms: list[str]) -> str:
+    """
+    Returns a random assumption on the movement of a vehicle, in one of the forms the motion checker recognizes: a
+    start at a border of the grid, a static vehicle, a fixed offset to a vehicle before it in noms (so the offsets
+    cannot contradict each other), or a movement by a set of directions.
+
+    :param rng: the random number generator
+    :param nom: the nominal of the vehicle
+    :param noms: the nominals of all vehicles
+    :return: the assumption
+    """
+    tmp: str = fresh_nominal(noms)
+    others: list[str] = noms[:noms.index(nom)]
+    form: str = rng.choice(["border", "static", "offset", "movement"] if others else ["border", "static", "movement"])
+    if form == "border":
+        return f"@{nom} !({rng.choice(DIRECTIONS)} 1)"
+    if form == "static":
+        return f"@{nom} ↓{tmp} G @{nom} {tmp}"
+    if form == "offset":
+        # opposite directions are not a fixed offset, as the cells in between must exist
+        first: str = rng.choice(DIRECTIONS)
+        directions: list[str] = [first] + rng.sample([d for d in DIRECTIONS if d != OPPOSITE[first]],
+                                                     rng.randint(0, 1))
+        return f"G @{nom} {' '.join(directions)} {rng.choice(others)}"
+    moves: list[str] = rng.sample([f"{d} {tmp}" for d in DIRECTIONS] + [tmp], rng.randint(1, 3))
+    return f"G (@{nom} ↓{tmp} ((! X 1) | X @{nom} ({' | '.join(moves)})))"
+
+
+def random_scenario(rng: random.Random, max_props: int = MAX_PROPS, max_noms: int = MAX_NOMS,
+                    max_grid: tuple[int, int] = MAX_GRID, max_trace_length: int = MAX_TRACE_LENGTH,
+                    max_depth: int = MAX_DEPTH, max_conclusions: int = MAX_CONCLUSIONS,
+                    max_traces: int = MAX_TRACES) -> dict:
+    """
+    Returns a random scenario: propositions, nominals, movement assumptions of some vehicles (and possibly a random
+    assumption), random conclusions, a grid size and a maximal trace length. The trace length, then the grid, is
+    shrunk until the baseline checker enumerates at most max_traces traces.
+
+    :param rng: the random number generator
+    :param max_props: the maximal number of propositions
+    :param max_noms: the maximal number of nominals
+    :param max_grid: the maximal length and width of the grid
+    :param max_trace_length: the maximal trace length
+    :param max_depth: the maximal nesting depth of the random formulas
+    :param max_conclusions: the maximal number of conclusions
+    :param max_traces: the maximal number of traces
+    :return: the scenario, with the keys props, noms, assumptions, conclusions, grid_size and max_trace_length
+    """
+    props: list[str] = [f"p{i}" for i in range(rng.randint(0, max_props))]
+    noms: list[str] = [f"z{i}" for i in range(rng.randint(1, max_noms))]
+
+    assumptions: list[str] = [random_movement(rng, n, noms) for n in noms if rng.random() < 0.5]
+    if rng.random() < 0.5:
+        assumptions.append(random_formula(rng, props, noms, max_depth))
+    conclusions: list[str] = [random_formula(rng, props, noms, max_depth)
+                              for _ in range(rng.randint(1, max_conclusions))]
+
+    length: int = rng.randint(1, max_grid[0])
+    width: int = rng.randint(1, max_grid[1])
+    trace_length: int = rng.randint(1, max_trace_length)
+    while count_traces(props, noms, (length, width), trace_length) > max_traces:
+        if trace_length > 1:
+            trace_length -= 1
+        elif length >= width and length > 1:
+            length -= 1
+        elif width > 1:
+            width -= 1
+        else:
+            break
+
+    return {"props": props, "noms": noms, "assumptions": assumptions, "conclusions": conclusions,
+            "grid_size": (length, width), "max_trace_length": trace_length}
+
+
+def random_scenarios(count: int, seed: int, **limits) -> Iterator[dict]:
+    """
+    Returns a reproducible sequence of random scenarios.
+
+    :param count: the number of scenarios
+    :param seed: the seed of the random number generator
+    :param limits: the size limits of random_scenario
+    :return: the scenarios
+    """
+    rng: random.Random = random.Random(seed)
+    for _ in range(count):
+        yield random_scenario(rng, **limits)
+
+
+def differential_check(scenario: dict, evaluators: dict[str, Callable],
+                       timeout: float = DIFFERENTIAL_TIMEOUT) -> dict:
+    """
+    Runs every checker on a scenario, one after the other so that their running times can be compared, and checks
+    that the checkers that finished agree on #Sat.
+
+    :param scenario: the scenario (as returned by random_scenario)
+    :param evaluators: the evaluation functions of the checkers by name
+    :param timeout: the seconds after which a checker is cancelled
+    :return: a dictionary with the scenario ("scenario"), per checker the state, #Sat, #Trace, seconds and error
+             ("results", as returned by race) and whether the finished checkers agree on #Sat ("agree")
+    """
+    args: tuple = (scenario["props"], scenario["noms"], scenario["assumptions"], scenario["conclusions"],
+                   tuple(scenario["grid_size"]), scenario["max_trace_length"], False)
+    results: dict[str, dict] = {name: race({name: f}, args, timeout=timeout)["results"][name]
+                                for name, f in evaluators.items()}
+    agree: bool = len({r["sat"] for r in results.values() if r["state"] == FINISHED}) <= 1
+    return {"scenario": scenario, "results": results, "agree": agree}
+
+
+def read_scenarios(path: str) -> list[dict]:
+    """
+    Reads the scenarios of a corpus written by write_record (one JSON object per line, either a scenario or a
+    record of a differential check).
+
+    :param path: the path of the corpus
+    :return: the scenarios
+    """
+    scenarios: list[dict] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record: dict = json.loads(line)
+                scenario: dict = record.get("scenario", record)
+                scenarios.append({**scenario, "grid_size": tuple(scenario["grid_size"])})
+    return scenarios
+
+
+def write_record(path: str, record: dict):
+    """
+    Appends a record of a differential check to a corpus (one JSON object per line).
+
+    :param path: the path of the corpus
+    :param record: the record
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
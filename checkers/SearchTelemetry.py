@@ -0,0 +1,124 @@
+import json
+import os
+from timeit import default_timer as timer
+from typing import Iterable, Iterator, Optional
+
+# counters recorded for every depth of the search tree
+DEPTH_COUNTERS: tuple[str, ...] = ("parents", "candidates", "rejected", "grids", "traces")
+
+
+class SearchTelemetry:
+    """
+    Statistics of a trace enumeration, to compare the search trees of the checkers. For every depth d of the search
+    tree (the length of the traces), it records the traces of length d - 1 that were extended ("parents"), the
+    candidate grids generated for position d ("candidates"), those rejected by the state assumptions ("rejected") and
+    accepted ("grids"), the traces of length d enumerated ("traces"), and the time spent generating the grids
+    ("seconds"). The checkers drawing their grids from a pool record the pool once ("pool") and take every grid of
+    it at every depth. The time of each phase of the run is recorded in "phases".
+    """
+
+    def __init__(self):
+        self.depths: dict[int, dict] = {}
+        self.pool: dict = {}
+        self.phases: dict[str, float] = {}
+
+    def level(self, depth: int) -> dict:
+        """
+        Returns the counters of a depth, creating them on first use.
+
+        :param depth: the depth (trace length)
+        :return: the counters, which the generators increment
+        """
+        stats: Optional[dict] = self.depths.get(depth)
+        if stats is None:
+            stats = {name: 0 for name in DEPTH_COUNTERS}
+            stats["seconds"] = 0.0
+            self.depths[depth] = stats
+        return stats
+
+    def add_time(self, phase: str, seconds: float):
+        """
+        Adds time to a phase.
+
+        :param phase: the name of the phase
+        :param seconds: the time
+        """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @staticmethod
+    def timed(grids: Iterable[dict], stats: dict) -> Iterator[dict]:
+        """
+        Yields the grids of a generator, adding the time spent generating them to the seconds of a depth. The time
+        the consumer spends between two grids is not counted.
+
+        :param grids: the grids
+        :param stats: the counters of the depth
+        :return: the grids
+        """
+        iterator: Iterator[dict] = iter(grids)
+        while True:
+            start: float = timer()
+            grid: Optional[dict] = next(iterator, None)
+            stats["seconds"] = stats["seconds"] + timer() - start
+            if grid is None:
+                return
+            yield grid
+
+    def record_pool(self, stats: dict, groups: list[list[dict]], seconds: float):
+        """
+        Records the grid pool of a checker drawing the grids of its traces from a pool.
+
+        :param stats: the candidates and rejected grids counted while generating the pool
+        :param groups: the groups of grids of the pool (one group without static propositions)
+        :param seconds: the time spent generating the pool
+        """
+        self.pool = {"candidates": stats["candidates"], "rejected": stats["rejected"],
+                     "grids": sum(len(g) for g in groups), "groups": len(groups), "seconds": seconds}
+
+    def pool_level(self, depth: int, groups: list[list[dict]]) -> dict:
+        """
+        Records a depth of a checker drawing every grid of a trace from the same group of its pool: the start grids
+        are the (filtered) pool, and every trace is extended by every grid of its group.
+
+        :param depth: the depth (trace length)
+        :param groups: the groups of grids of the pool
+        :return: the counters of the depth, whose traces the generator counts
+        """
+        stats: dict = self.level(depth)
+        if depth == 1:
+            for name in ("candidates", "rejected", "grids", "seconds"):
+                stats[name] = self.pool.get(name, 0)
+        else:
+            stats["parents"] = sum(len(g) ** (depth - 1) for g in groups)
+            stats["candidates"] = stats["grids"] = sum(len(g) ** depth for g in groups)
+        return stats
+
+    def to_dict(self) -> dict:
+        """
+        Returns the statistics as a JSON object, with the branching factor (accepted grids per parent) of every
+        depth. If a total time has been recorded, the part of it not spent in other phases is reported as
+        "generation", as it is mostly spent generating the traces.
+
+        :return: the statistics
+        """
+        phases: dict[str, float] = dict(self.phases)
+        if "total" in phases:
+            phases["generation"] = phases["total"] - sum(t for p, t in phases.items() if p != "total")
+
+        depths: list[dict] = []
+        for depth in sorted(self.depths):
+            stats: dict = {"depth": depth, **self.depths[depth]}
+            stats["branching_factor"] = stats["grids"] / stats["parents"] if stats["parents"] else None
+            depths.append(stats)
+        return {"phases": phases, "pool": self.pool, "depths": depths}
+
+    def write(self, path: str, **results):
+        """
+        Writes the statistics, together with the results of the run, to a JSON file.
+
+        :param path: the path of the file
+        :param results: the results of the run (e.g. checker, scenario, #Sat and #Trace)
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**results, **self.to_dict()}, f, indent=2)
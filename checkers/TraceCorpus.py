@@ -0,0 +1,235 @@
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, Optional
+from checkers.GridCodec import GridCodec
+from formula_types.FormulaCost import adapt_order, ADAPT_INTERVAL
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+
+# magic bytes at the start of a corpus file
+CORPUS_MAGIC: bytes = b"STMCTRC1"
+
+# version of the corpus file layout
+CORPUS_VERSION: int = 1
+
+# file suffix of corpus files
+CORPUS_SUFFIX: str = ".trc"
+
+# header: magic, version, rows, columns, number of nominals, number of propositions, maximal trace length, and number
+# of traces, followed by the names of the nominals and propositions
+HEADER: struct.Struct = struct.Struct("<8sHHHHHHQ")
+
+# offset of the number of traces in the header
+COUNT_OFFSET: int = HEADER.size - 8
+
+
+def encode_names(names: list[str]) -> bytes:
+    """
+    Encodes a table of names, each as its length (one byte) followed by its UTF-8 encoding.
+
+    :param names: the names
+    :return: the encoded table
+    """
+    parts: list[bytes] = []
+    for name in names:
+        data: bytes = name.encode("utf-8")
+        if len(data) > 0xFF:
+            raise ValueError(f"Name {name} is too long.")
+        parts.append(bytes((len(data),)) + data)
+    return b"".join(parts)
+
+
+class TraceCorpusWriter:
+    """
+    Writes traces to a corpus file. All records have the same size: the length of the trace (one byte) followed by
+    max_trace_length packed grids, the ones after the end of the trace being zero. The records start at a multiple of
+    eight bytes after the header and name tables. The corpus is written to a temporary file and moved into place on
+    close, so readers never see a partial corpus.
+    """
+
+    def __init__(self, path: str, props: list[str], noms: list[str], grid_size: tuple[int, int],
+                 max_trace_length: int):
+        if not 0 < max_trace_length <= 0xFF:
+            raise ValueError("The maximal trace length of a corpus must be between 1 and 255.")
+        self.path = path
+        self.codec = GridCodec(props, noms, grid_size)
+        self.max_trace_length = max_trace_length
+        self.count: int = 0
+        self._padding: bytes = bytes(self.codec.grid_size_bytes)
+
+        header: bytes = HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION, grid_size[0], grid_size[1], len(noms), len(props),
+                                    max_trace_length, 0) + encode_names(list(noms)) + encode_names(list(props))
+        header = header + bytes(-len(header) % 8)
+
+        self._tmp_path: str = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(header)
+
+    def write(self, trace: Iterable[dict]):
+        """
+        Appends a trace to the corpus.
+
+        :param trace: the trace
+        """
+        grids: list[bytes] = [self.codec.encode(grid) for grid in trace]
+        if not 0 < len(grids) <= self.max_trace_length:
+            raise ValueError(f"Traces of the corpus must have between 1 and {self.max_trace_length} grids.")
+        self._file.write(bytes((len(grids),)) + b"".join(grids) +
+                         self._padding * (self.max_trace_length - len(grids)))
+        self.count = self.count + 1
+
+    def close(self):
+        """
+        Writes the number of traces and publishes the corpus.
+        """
+        self._file.seek(COUNT_OFFSET)
+        self._file.write(struct.pack("<Q", self.count))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """
+        Discards the corpus.
+        """
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> 'TraceCorpusWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_corpus(path: str, traces: Iterable[Iterable[dict]], props: list[str], noms: list[str],
+                 grid_size: tuple[int, int], max_trace_length: int) -> int:
+    """
+    Writes traces, e.g. the ones of a trace generator, to a corpus file.
+
+    :param path: the path of the corpus
+    :param traces: the traces
+    :param props: the propositions of the grids
+    :param noms: the nominals of the grids
+    :param grid_size: the size of the grids
+    :param max_trace_length: the maximal length of the traces
+    :return: the number of traces written
+    """
+    with TraceCorpusWriter(path, props, noms, grid_size, max_trace_length) as writer:
+        for t in traces:
+            writer.write(t)
+    return writer.count
+
+
+class TraceCorpus:
+    """
+    Read-only, memory-mapped corpus of traces. Records are decoded directly from the mapped file, and each distinct
+    packed grid is decoded only once, so several processes can read the same corpus without loading it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, rows, columns, nom_count, prop_count, max_trace_length, count = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != CORPUS_MAGIC or version != CORPUS_VERSION:
+            raise ValueError(f"{path} is not a trace corpus.")
+
+        offset: int = HEADER.size
+        names: list[str] = []
+        for _ in range(nom_count + prop_count):
+            size: int = self._map[offset]
+            names.append(self._map[offset + 1:offset + 1 + size].decode("utf-8"))
+            offset = offset + 1 + size
+
+        self.noms: list[str] = names[:nom_count]
+        self.props: list[str] = names[nom_count:]
+        self.grid_size: tuple[int, int] = (rows, columns)
+        self.max_trace_length: int = max_trace_length
+        self.codec = GridCodec(self.props, self.noms, self.grid_size)
+        self.record_size: int = 1 + max_trace_length * self.codec.grid_size_bytes
+        self._records_start: int = offset + (-offset % 8)
+        self._count: int = count
+        self._grids: dict[bytes, dict] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Trace:
+        if index < 0:
+            index = index + self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Trace index out of range.")
+        return self._decode(self._records_start + index * self.record_size)
+
+    def _decode(self, offset: int) -> Trace:
+        grid_size_bytes: int = self.codec.grid_size_bytes
+        grids: list[dict] = []
+        for k in range(self._map[offset]):
+            start: int = offset + 1 + k * grid_size_bytes
+            data: bytes = self._map[start:start + grid_size_bytes]
+            grid: Optional[dict] = self._grids.get(data)
+            if grid is None:
+                grid = self.codec.decode(data)
+                self._grids[data] = grid
+            grids.append(grid)
+        return Trace.from_grids(tuple(grids))
+
+    def traces(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Trace]:
+        """
+        Iterates over a range of traces of the corpus.
+
+        :param start: the index of the first trace
+        :param stop: the index after the last trace (the end of the corpus if None)
+        :return: the traces
+        """
+        stop = self._count if stop is None else min(stop, self._count)
+        for index in range(start, stop):
+            yield self._decode(self._records_start + index * self.record_size)
+
+    def __iter__(self) -> Iterator[Trace]:
+        return self.traces()
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> 'TraceCorpus':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def count_satisfying(formula: HybridSpatioTemporalFormula, corpus: TraceCorpus, start: int = 0,
+                     stop: Optional[int] = None) -> tuple[int, int]:
+    """
+    Counts the traces of a range of a corpus on which the formula holds at some point.
+
+    :param formula: the formula
+    :param corpus: the corpus
+    :param start: the index of the first trace
+    :param stop: the index after the last trace (the end of the corpus if None)
+    :return: the number of satisfying traces and the number of traces
+    """
+    grid_size: tuple[int, int] = corpus.grid_size
+    points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+    counter_sat: int = 0
+    counter_gen: int = 0
+
+    for t in corpus.traces(start, stop):
+        if any(formula.evaluate(t, p, grid_size) for p in points):
+            counter_sat = counter_sat + 1
+        counter_gen = counter_gen + 1
+
+        # adapt the conjunct order to the observed failure rates
+        if counter_gen % ADAPT_INTERVAL == 0:
+            adapt_order(formula)
+
+    return counter_sat, counter_gen
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, Optional
+from checkers.ConclusionCounting import count_conclusions
+from checkers.GridCodec import GridCodec
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+
+# version of the index file layout, part of the scenario key
+INDEX_FORMAT: int = 1
+
+# magic bytes at the end of an index file
+INDEX_MAGIC: bytes = b"STMCIDX1"
+
+# file suffix of index files
+INDEX_SUFFIX: str = ".idx"
+
+# footer: length of the metadata followed by the magic bytes
+FOOTER: struct.Struct = struct.Struct("<Q8s")
+
+
+def canonical_scenario(checker: str, props: list[str], noms: list[str], assumptions: list[str],
+                       grid_size: tuple[int, int], max_trace_length: int, static_props: list[str] = ()) -> dict:
+    """
+    Returns the canonical description of a scenario, which determines the traces satisfying the assumptions.
+    The order of propositions, nominals and assumptions does not matter.
+
+    :param checker: the checker whose trace space is indexed
+    :param props: the list of propositions
+    :param noms: the list of nominals
+    :param assumptions: the list of assumptions
+    :param grid_size: the size of the grid
+    :param max_trace_length: the maximal trace length
+    :param static_props: the propositions whose placement does not change over time
+    :return: the scenario
+    """
+    return {"format": INDEX_FORMAT, "checker": checker, "props": sorted(props), "noms": sorted(noms),
+            "assumptions": sorted(a.strip() for a in assumptions), "grid_size": list(grid_size),
+            "max_trace_length": max_trace_length, "static_props": sorted(static_props)}
+
+
+def scenario_key(scenario: dict) -> str:
+    """
+    Returns the hash identifying a scenario.
+
+    :param scenario: the canonical scenario
+    :return: the hexadecimal SHA-256 of the scenario
+    """
+    return hashlib.sha256(json.dumps(scenario, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def index_path(index_dir: str, scenario: dict) -> str:
+    """
+    Returns the path of the index file of a scenario.
+
+    :param index_dir: the directory of the index files
+    :param scenario: the canonical scenario
+    :return: the path of the index file
+    """
+    return os.path.join(index_dir, scenario_key(scenario) + INDEX_SUFFIX)
+
+
+class TraceIndexWriter:
+    """
+    Writes the traces satisfying the assumptions of a scenario to an index file. Each record consists of the length
+    of the trace (one byte), the bitmask of the points at which the assumptions hold and the packed grids. The file
+    ends with the metadata (JSON) and a footer. It is written to a temporary file and moved into place on finish, so
+    readers never see a partial index.
+    """
+
+    def __init__(self, path: str, scenario: dict):
+        self.path = path
+        self.scenario = scenario
+        self.codec = GridCodec(scenario["props"], scenario["noms"], tuple(scenario["grid_size"]))
+        self.records: int = 0
+        self._tmp_path: str = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(self._tmp_path, "wb")
+
+    def add(self, trace: Trace, points: list[tuple[int, int]]):
+        """
+        Adds a trace to the index.
+
+        :param trace: the trace
+        :param points: the points at which the assumptions hold
+        """
+        if len(trace) > 0xFF:
+            raise ValueError("Traces longer than 255 grids cannot be indexed.")
+        self._file.write(bytes((len(trace),)) + self.codec.encode_points(points) +
+                         b"".join(self.codec.encode(grid) for grid in trace))
+        self.records = self.records + 1
+
+    def record(self, candidates: Iterable[tuple[Trace, list[tuple[int, int]]]]) -> \
+            Iterator[tuple[Trace, list[tuple[int, int]]]]:
+        """
+        Passes the (trace, points) pairs through, adding the traces at which the assumptions hold to the index.
+
+        :param candidates: the traces paired with the points at which the assumptions hold
+        :return: the same pairs
+        """
+        for t, points in candidates:
+            if points:
+                self.add(t, points)
+            yield t, points
+
+    def finish(self, trace_count: int):
+        """
+        Writes the metadata and publishes the index.
+
+        :param trace_count: the number of traces of the scenario (#Trace)
+        """
+        metadata: bytes = json.dumps({"scenario": self.scenario, "records": self.records,
+                                      "traces": trace_count}).encode("utf-8")
+        self._file.write(metadata)
+        self._file.write(FOOTER.pack(len(metadata), INDEX_MAGIC))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """
+        Discards the index.
+        """
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class TraceIndex:
+    """
+    Read-only, memory-mapped index of the traces satisfying the assumptions of a scenario. Several processes can map
+    the same index file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        metadata_size, magic = FOOTER.unpack_from(self._map, len(self._map) - FOOTER.size)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a trace index.")
+        self._records_end: int = len(self._map) - FOOTER.size - metadata_size
+        metadata: dict = json.loads(self._map[self._records_end:len(self._map) - FOOTER.size].decode("utf-8"))
+
+        self.scenario: dict = metadata["scenario"]
+        self.trace_count: int = metadata["traces"]
+        self.records: int = metadata["records"]
+        self.codec = GridCodec(self.scenario["props"], self.scenario["noms"], tuple(self.scenario["grid_size"]))
+        self._grids: dict[bytes, dict] = {}
+
+    def __len__(self) -> int:
+        return self.records
+
+    def __iter__(self) -> Iterator[tuple[Trace, tuple[tuple[int, int], ...]]]:
+        codec: GridCodec = self.codec
+        grid_size_bytes: int = codec.grid_size_bytes
+        offset: int = 0
+        while offset < self._records_end:
+            length: int = self._map[offset]
+            offset = offset + 1
+            points = codec.decode_points(self._map[offset:offset + codec.mask_size])
+            offset = offset + codec.mask_size
+
+            grids: list[dict] = []
+            for _ in range(length):
+                data: bytes = self._map[offset:offset + grid_size_bytes]
+                grid: Optional[dict] = self._grids.get(data)
+                if grid is None:
+                    grid = codec.decode(data)
+                    self._grids[data] = grid
+                grids.append(grid)
+                offset = offset + grid_size_bytes
+            yield Trace.from_grids(tuple(grids)), points
+
+    def close(self):
+        self._map.close()
+
+
+def count_conclusions_indexed(conclusion_formulas: list[HybridSpatioTemporalFormula],
+                              candidates: Iterable[tuple[Trace, list[tuple[int, int]]]], grid_size: tuple[int, int],
+                              show_traces: bool, index_dir: Optional[str], scenario: dict) -> \
+        tuple[list[int], list[int], int]:
+    """
+    Counts the traces satisfying and violating each conclusion like count_conclusions, but only evaluates the
+    assumptions once per scenario: the first run writes the traces satisfying them to an index in index_dir, later
+    runs read them from the index instead of consuming the candidates.
+
+    :param conclusion_formulas: the conclusions
+    :param candidates: the traces of the scenario paired with the points at which the assumptions hold
+    :param grid_size: the size of the grid
+    :param show_traces: whether the traces satisfying the assumptions should be shown in the console
+    :param index_dir: the directory of the index files, or None to not use an index
+    :param scenario: the canonical scenario
+    :return: the number of satisfying traces per conclusion, the number of violating traces per conclusion, and the
+             number of traces
+    """
+    if index_dir is None:
+        return count_conclusions(conclusion_formulas, candidates, grid_size, show_traces)
+
+    path: str = index_path(index_dir, scenario)
+    if os.path.exists(path):
+        index: TraceIndex = TraceIndex(path)
+        try:
+            if index.scenario != scenario:
+                raise ValueError(f"The index {path} belongs to a different scenario.")
+            sat_counts, violation_counts, _ = count_conclusions(conclusion_formulas, index, grid_size, show_traces)
+            return sat_counts, violation_counts, index.trace_count
+        finally:
+            index.close()
+
+    writer: TraceIndexWriter = TraceIndexWriter(path, scenario)
+    try:
+        sat_counts, violation_counts, counter_gen = count_conclusions(conclusion_formulas, writer.record(candidates),
+                                                                      grid_size, show_traces)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.finish(counter_gen)
+    return sat_counts, violation_counts, counter_gen
@@ -0,0 +1,154 @@
+from itertools import islice
+from typing import Iterator, Optional, Sequence
+from checkers.GridPool import lazy_product
+from formula_types.Trace import Trace
+
+
+def grid_key(grid: dict) -> tuple:
+    """
+    Returns a hashable key of a grid that does not depend on the order of its names or of the points of its
+    propositions.
+
+    :param grid: the grid
+    :return: the key
+    """
+    key: list = []
+    for name in sorted(grid.keys()):
+        value = grid[name]
+        # nominals are placed at a single point, propositions at a collection of points
+        if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], int):
+            key.append((name, value))
+        else:
+            key.append((name, tuple(sorted(value))))
+    return tuple(key)
+
+
+class TraceSpaceIndex:
+    """
+    Numbers the traces of a trace space in the order in which the enumerating checkers generate them: for every
+    length from 1 to max_trace_length and every group of grids, all traces of that length over the group, in the order
+    of itertools.product (the first grid being the most significant digit). The baseline checker has a single group
+    of all grids, the optimized checker one group of assumption-satisfying grids per placement of the static
+    propositions. A trace is thus identified by its rank, an integer below the size of the space, so work can be
+    split into exact ranges, sampled uniformly or resumed from a position.
+    """
+
+    def __init__(self, groups: Sequence[Sequence[dict]], max_trace_length: int):
+        self.groups: list[Sequence[dict]] = [g for g in groups if len(g) > 0]
+        self.max_trace_length = max_trace_length
+
+        # blocks of traces of one length over one group, as (start rank, length, group index)
+        self._blocks: list[tuple[int, int, int]] = []
+        size: int = 0
+        for length in range(1, max_trace_length + 1):
+            for k, group in enumerate(self.groups):
+                self._blocks.append((size, length, k))
+                size = size + len(group) ** length
+        self.size: int = size
+
+        # index of each grid within its group, built on the first call of rank
+        self._positions: Optional[dict[tuple, tuple[int, int]]] = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _block(self, rank: int) -> tuple[int, int, int]:
+        # binary search for the block containing the rank
+        low: int = 0
+        high: int = len(self._blocks) - 1
+        while low < high:
+            middle: int = (low + high + 1) // 2
+            if self._blocks[middle][0] <= rank:
+                low = middle
+            else:
+                high = middle - 1
+        return self._blocks[low]
+
+    def _digits(self, rank: int) -> tuple[int, list[int]]:
+        # group index and grid indices of the trace of the given rank
+        if not 0 <= rank < self.size:
+            raise IndexError(f"Trace rank {rank} is out of range.")
+        start, length, k = self._block(rank)
+        base: int = len(self.groups[k])
+        offset: int = rank - start
+        digits: list[int] = [0] * length
+        for position in range(length - 1, -1, -1):
+            offset, digits[position] = divmod(offset, base)
+        return k, digits
+
+    def unrank(self, rank: int) -> Trace:
+        """
+        Returns the trace of the given rank.
+
+        :param rank: the rank, between 0 and the size of the space (exclusive)
+        :return: the trace
+        """
+        k, digits = self._digits(rank)
+        group: Sequence[dict] = self.groups[k]
+        return Trace.from_grids(tuple(group[d] for d in digits))
+
+    def rank(self, trace: Sequence[dict]) -> int:
+        """
+        Returns the rank of a trace of the space.
+
+        :param trace: the trace
+        :return: the rank
+        """
+        if self._positions is None:
+            self._positions = {}
+            for k, group in enumerate(self.groups):
+                for index, grid in enumerate(group):
+                    self._positions.setdefault(grid_key(grid), (k, index))
+
+        if not 0 < len(trace) <= self.max_trace_length:
+            raise ValueError(f"Trace of length {len(trace)} is not in the trace space.")
+        group_index: Optional[int] = None
+        offset: int = 0
+        for grid in trace:
+            position: Optional[tuple[int, int]] = self._positions.get(grid_key(grid))
+            if position is None or (group_index is not None and position[0] != group_index):
+                raise ValueError("Trace is not in the trace space.")
+            group_index = position[0]
+            offset = offset * len(self.groups[group_index]) + position[1]
+
+        for start, length, k in self._blocks:
+            if length == len(trace) and k == group_index:
+                return start + offset
+        raise ValueError("Trace is not in the trace space.")
+
+    def traces(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Trace]:
+        """
+        Iterates over the traces with ranks in [start, stop), in rank order.
+
+        :param start: the rank of the first trace
+        :param stop: the rank after the last trace (the size of the space if None)
+        :return: the traces
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        for block_start, length, k in self._blocks:
+            group: Sequence[dict] = self.groups[k]
+            block_stop: int = block_start + len(group) ** length
+            if block_stop <= start:
+                continue
+            if block_start >= stop:
+                return
+            first: int = max(start, block_start)
+            last: int = min(stop, block_stop)
+
+            # resume the odometer from the digits of the first rank (of the block for a prefix of it)
+            digits: Optional[list[int]] = None if first == block_start else self._digits(first)[1]
+            for tup in islice(lazy_product(group, length, digits), last - first):
+                yield Trace.from_grids(tup)
+
+    def __iter__(self) -> Iterator[Trace]:
+        return self.traces()
+
+    def split(self, parts: int) -> list[tuple[int, int]]:
+        """
+        Splits the space into consecutive rank ranges of (nearly) equal size.
+
+        :param parts: the number of ranges
+        :return: the (start, stop) pairs of the non-empty ranges
+        """
+        bounds: list[int] = [self.size * k // parts for k in range(parts + 1)]
+        return [(bounds[k], bounds[k + 1]) for k in range(parts) if bounds[k] < bounds[k + 1]]
@@ -1,11 +1,36 @@
-from itertools import product
-from checkers.SpatioTemporalEvaluatorUtils import powerset, satisfying_points
+from typing import Optional
+from timeit import default_timer as timer
+from checkers.SpatioTemporalEvaluatorUtils import satisfying_points
+from checkers.GridPool import GridPool, lazy_product
+from checkers.ConeOfInfluence import ConeOfInfluence
+from checkers.CounterexampleSearch import parse_counterexample_formula, prefix_checks, search
+from checkers.ConclusionCounting import parse_formula, filter_by_assumptions
+from checkers.TraceIndex import canonical_scenario, count_conclusions_indexed
+from checkers.TraceCorpus import write_corpus
+from checkers.TraceSpaceIndex import TraceSpaceIndex
+from checkers.Checkpoint import Checkpointer, checkpoint_scenario
+from checkers.SearchTelemetry import SearchTelemetry
 from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+from formula_types.FormulaCost import order_by_cost, adapt_order, ADAPT_INTERVAL
+from formula_types.FormulaSimplifier import simplify_with_report
 from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
 
 
-def generate_traces(props: list[str], noms: list[str], max_trace_length: int, grid_size: tuple[int, int]) -> list[
-    list[dict]]:
+def generate_grids(props: list[str], noms: list[str], grid_size: tuple[int, int]) -> list[dict]:
+    """
+    Generates all grids over the given propositions and nominals.
+
+    :param props: the set of propositions to be placed in the grids
+    :param noms: the set of nominals to be placed in the grids
+    :param grid_size: the dimensions of the grids
+    :return: the list of all grids
+    """
+    return list(GridPool(props, noms, grid_size))
+
+
+def generate_traces(props: list[str], noms: list[str], max_trace_length: int, grid_size: tuple[int, int],
+                    telemetry: Optional[SearchTelemetry] = None) -> list[Trace]:
     """
     Generates all traces up to a given length based on the given grid structure.
 
@@ -13,44 +38,29 @@ def generate_traces(props: list[str], noms: list[str], max_trace_length: int, gr
     :param noms: the set of nominals to be placed in the trace grids
     :param max_trace_length: the maximal length the traces should be
     :param grid_size: the dimensions of the grid the traces are build on
+    :param telemetry: the statistics of the search tree to record, None to not record any
     :return: a finite trace of spatial grids
     """
-
-    # generate all points found in the bounding box
-    points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
-
-    # generate all possible placements for each proposition
-    prop_placements: list[list] = [list(powerset(points)) for _ in props]
-
-    # generate all possible placements for each nominal
-    nominal_placements: list[list[tuple[int, int]]] = [points for _ in noms]
-
-    grids: list = []
-
-    # iterate over all possible placements of atomic components
-    for prop_choice in product(*prop_placements):
-        for nominal_choice in product(*nominal_placements):
-            placement: dict = {}
-
-            # Add propositions with their chosen subsets
-            for name, subset in zip(props, prop_choice):
-                placement[name] = subset
-
-            # Add nominals with their single chosen point
-            for name, pos in zip(noms, nominal_choice):
-                placement[name] = pos
-
-            grids.append(placement)
+    # the grids are decoded from their ranks while the traces are enumerated, so the pool is never stored
+    start: float = timer()
+    grids: GridPool = GridPool(props, noms, grid_size)
+    if telemetry is not None:
+        telemetry.record_pool({"candidates": len(grids), "rejected": 0}, [grids], timer() - start)
 
     #print("|Total amount of grids generated:", len(grids))
 
     # generate all traces with the available grids and up to the given length
     for length in range(1, max_trace_length + 1):
-        for tup in product(grids, repeat=length):
-            yield list(tup)
+        stats: Optional[dict] = telemetry.pool_level(length, [grids]) if telemetry is not None else None
+        for tup in lazy_product(grids, length):
+            if stats is not None:
+                stats["traces"] = stats["traces"] + 1
+            yield Trace.from_grids(tup)
 
 
-def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces) -> (int, int):
+def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces,
+             checkpoint: Optional[str] = None, resume: bool = False, stats: Optional[str] = None,
+             cone_of_influence: bool = False) -> (int, int):
     """
     Prints the number of traces and, if parameter show_traces, also the traces where spatial points have
     been found in which the given formula holds.
@@ -62,28 +72,171 @@ def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length,
     :param grid_size: the dimensions of the grid the traces are build on
     :param max_trace_length: the maximal length the traces should be
     :param show_traces: whether the satisfying traces should be shown in the console
+    :param checkpoint: path of the checkpoint file written periodically, None for no checkpoints
+    :param resume: whether to continue from the checkpoint file (if it exists)
+    :param stats: path of the JSON file the statistics of the search tree are written to, None to not record them
+    :param cone_of_influence: whether to enumerate only the symbols and trace steps the formula depends on and scale
+                              the counts (see ConeOfInfluence), not with checkpoints
     :return: 
     """
+    start: float = timer()
+    telemetry: Optional[SearchTelemetry] = SearchTelemetry() if stats is not None else None
+
     # conjunction of assumptions and conclusion
     input_formula_string: str = "&".join([*("(" + x + ")" for x in conclusions), *("(" + x + ")" for x in assumptions)])
 
     # parse the input formula
     parsed_formula: HybridSpatioTemporalFormula = HybridSpatioTemporalParser(tokenize(input_formula_string)).parse()
 
+    # simplify the input formula before evaluating it on the traces
+    size_before: int
+    size_after: int
+    parsed_formula, size_before, size_after = simplify_with_report(parsed_formula)
+
+    if show_traces:
+        print("\t |Simplified input formula from", size_before, "to", size_after, "nodes")
+
+    # evaluate cheap and selective conjuncts first
+    order_by_cost(parsed_formula)
+    if telemetry is not None:
+        telemetry.add_time("parse", timer() - start)
+
+    # the positions of checkpoints are ranks of the full trace space, so it is not projected with checkpoints
+    cone: Optional[ConeOfInfluence] = None
+    pool_size: int = 0
+    if cone_of_influence and checkpoint is None:
+        cone = ConeOfInfluence([parsed_formula], props, noms, grid_size, max_trace_length)
+        pool_size = len(GridPool(cone.props, cone.noms, grid_size))
+        if show_traces:
+            print("\t |Cone of influence:", cone)
+
     counter_sat: int = 0
     counter_gen: int = 0
+    if cone is not None:
+        traces = generate_traces(cone.props, cone.noms, cone.max_trace_length, grid_size, telemetry)
+    else:
+        traces = generate_traces(props, noms, max_trace_length, grid_size, telemetry)
+
+    # the position of the enumeration is the rank of the next trace, i.e. the number of traces so far
+    checkpointer: Optional[Checkpointer] = None
+    if checkpoint is not None:
+        checkpointer = Checkpointer(checkpoint, checkpoint_scenario("baseline", props, noms, assumptions, conclusions,
+                                                                    grid_size, max_trace_length), resume)
+        counter_sat, counter_gen = checkpointer.counter_sat, checkpointer.counter_gen
+        if counter_gen > 0:
+            traces = trace_space(props, noms, assumptions, grid_size, max_trace_length).traces(counter_gen)
+    enumerated: int = counter_gen
 
     # evaluate the input formula on all the generated traces over the given propositions
     # and nominals, and with maximal length max_trace_length
-    for t in generate_traces(props, noms, max_trace_length, grid_size):
+    for t in traces:
+        evaluation_start: float = timer() if telemetry is not None else 0.0
         sat_points: list[tuple[int, int]] = satisfying_points(parsed_formula, t, grid_size)
+        if telemetry is not None:
+            telemetry.add_time("evaluation", timer() - evaluation_start)
 
+        # a trace of the projected space stands for the traces of the full space differing only outside the cone
+        weight: int = cone.weight(len(t), pool_size) if cone is not None else 1
         if sat_points:
             if show_traces:
                 print("\t |Satisfying trace #", counter_sat, " with satisfying points: ", sat_points)
                 print("\t |--------------------------------------------------------------------")
                 print("\t |", t, "\n")
-            counter_sat = counter_sat + 1
-        counter_gen = counter_gen + 1
+            counter_sat = counter_sat + weight
+        counter_gen = counter_gen + weight
+        enumerated = enumerated + 1
+
+        # adapt the conjunct order to the observed failure rates
+        if enumerated % ADAPT_INTERVAL == 0:
+            adapt_order(parsed_formula)
+
+            # save the position and counters periodically
+            if checkpointer is not None and checkpointer.due():
+                checkpointer.save(counter_gen, counter_sat, counter_gen)
+
+    if checkpointer is not None:
+        checkpointer.save(counter_gen, counter_sat, counter_gen, finished=True)
+
+    if telemetry is not None:
+        telemetry.add_time("total", timer() - start)
+        telemetry.write(stats, scenario=checkpoint_scenario("baseline", props, noms, assumptions, conclusions,
+                                                            grid_size, max_trace_length),
+                        sat=counter_sat, traces=counter_gen)
 
     return counter_sat, counter_gen
+
+
+def evaluate_each(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces,
+                  index_dir: Optional[str] = None) -> (list[int], list[int], int):
+    """
+    Evaluates each conclusion separately against the traces satisfying the assumptions, enumerating the traces and
+    evaluating the assumptions only once.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check separately
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param show_traces: whether the traces satisfying the assumptions should be shown in the console
+    :param index_dir: directory of the on-disk indexes of the traces satisfying the assumptions, None for no index
+    :return: the #Sat of each conclusion, the number of traces violating each conclusion, and the number of traces
+    """
+    candidates = filter_by_assumptions(parse_formula(assumptions),
+                                       generate_traces(props, noms, max_trace_length, grid_size), grid_size)
+
+    return count_conclusions_indexed([parse_formula([c]) for c in conclusions], candidates, grid_size, show_traces,
+                                     index_dir, canonical_scenario("baseline", props, noms, assumptions, grid_size,
+                                                                   max_trace_length))
+
+
+def write_trace_corpus(props, noms, assumptions, grid_size, max_trace_length, path: str) -> int:
+    """
+    Writes the traces enumerated by evaluate to a corpus file. The baseline checker does not restrict the traces by
+    the assumptions.
+
+    :param props: the set of propositions to be placed in the trace grids
+    :param noms: the set of nominals to be placed in the trace grids
+    :param assumptions: list of assumptions that hold (unused)
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param path: the path of the corpus
+    :return: the number of traces written
+    """
+    return write_corpus(path, generate_traces(props, noms, max_trace_length, grid_size), props, noms, grid_size,
+                        max_trace_length)
+
+
+def trace_space(props, noms, assumptions, grid_size, max_trace_length) -> TraceSpaceIndex:
+    """
+    Returns the index of the traces enumerated by evaluate, numbered in the order of generate_traces. The baseline
+    checker does not restrict the traces by the assumptions.
+
+    :param props: the set of propositions to be placed in the trace grids
+    :param noms: the set of nominals to be placed in the trace grids
+    :param assumptions: list of assumptions that hold (unused)
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :return: the trace space index
+    """
+    return TraceSpaceIndex([GridPool(props, noms, grid_size)], max_trace_length)
+
+
+def find_counterexample(props, noms, assumptions, conclusions, grid_size, max_trace_length) -> (list[dict], list, int):
+    """
+    Searches depth-first for a trace on which the assumptions hold but the conclusions do not, at some point, and
+    stops at the first one found.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :return: the counterexample trace (None if there is none), the points at which it violates the conclusions,
+             and the number of traces explored
+    """
+    grids: list[dict] = generate_grids(props, noms, grid_size)
+
+    return search(parse_counterexample_formula(assumptions, conclusions), prefix_checks(assumptions), grids,
+                  lambda grid: grids, grid_size, max_trace_length)
@@ -1,7 +1,7 @@
 import re
 from typing import Optional, Union
 from formula_types.HybridFormula import Nom
-from formula_types.ClassicalLogicFormula import Verum, Not, Or
+from formula_types.ClassicalLogicFormula import Verum, Not, Or, NaryOr
 from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
 from formula_types.SpatialFormula import Front, Back, Left, Right
 
@@ -131,12 +131,29 @@ def parse_fixed_offset(formula: str) -> Union[tuple[str, str, tuple[int, int]],
         if d != "Left" and d != "Right" and d != "Back" and d != "Front":
             return None, None, None
 
+    # opposite directions cancel out in the offset, but still require the cells in between to exist
+    if ("Left" in directions and "Right" in directions) or ("Front" in directions and "Back" in directions):
+        return None, None, None
+
     reference_car: str = tokens[1][1:]
     dependent_car: str = tokens[-1]
-    offset: tuple[int, int] = dirs_to_offset(directions)
+    # DIRECTIONS holds the movement of a car whose previous position is in the given direction (see
+    # parse_fixed_movement), while the dependent car is in the given directions of the reference car
+    dx, dy = dirs_to_offset(directions)
+    offset: tuple[int, int] = (-dx, -dy)
     return reference_car, dependent_car, offset
 
 
+def operator_of(fml: HybridSpatioTemporalFormula) -> str:
+    """
+    Returns the operator of a formula.
+
+    :param fml: logical formula
+    :return: the operator, or an empty string for atoms (propositions, nominals, constants)
+    """
+    return getattr(fml, 'op', "")
+
+
 def branches_of(fml: HybridSpatioTemporalFormula) -> list[HybridSpatioTemporalFormula]:
     """
     Returns a list of disjuncts for a (nested) disjunction.
@@ -146,6 +163,8 @@ def branches_of(fml: HybridSpatioTemporalFormula) -> list[HybridSpatioTemporalFo
     """
     if isinstance(fml, Or):
         return branches_of(fml.left) + branches_of(fml.right)
+    elif isinstance(fml, NaryOr):
+        return [x for operand in fml.operands for x in branches_of(operand)]
     else:
         return [fml]
 
@@ -170,7 +189,7 @@ def is_end_check(fml: HybridSpatioTemporalFormula) -> bool:
     if not isinstance(fml, Not):
         return False
     next: HybridSpatioTemporalFormula = fml.operand
-    if next.op != "X":
+    if operator_of(next) != "X":
         return False
     return isinstance(next.operand, Verum)
 
@@ -182,7 +201,7 @@ def strip_end_check(fml: HybridSpatioTemporalFormula) -> Optional[HybridSpatioTe
     :param fml: logical formula
     :return: the first disjunct in the list of disjuncts
     """
-    if fml.op != "∨":
+    if operator_of(fml) != "∨":
         return fml
     branches: list[HybridSpatioTemporalFormula] = branches_of(fml)
     clean_branches: list[HybridSpatioTemporalFormula] = [x for x in branches if not is_end_check(x)]
@@ -200,21 +219,19 @@ def get_movement_pattern(fml: HybridSpatioTemporalFormula) -> Optional[
     :return:
     """
 
-    if fml.op != "G":
+    if operator_of(fml) != "G":
         return None
     at_outer: HybridSpatioTemporalFormula = fml.operand
-    if not hasattr(at_outer, 'op'):
-        return None
-    if at_outer.op[0] != "@":
+    if operator_of(at_outer)[:1] != "@":
         return None
     arrow: HybridSpatioTemporalFormula = at_outer.operand
-    if arrow.op[0] != "↓":
+    if operator_of(arrow)[:1] != "↓":
         return None
     next: HybridSpatioTemporalFormula = strip_end_check(arrow.operand)
-    if next is None or next.op != "X":
+    if next is None or operator_of(next) != "X":
         return None
     at_inner: HybridSpatioTemporalFormula = next.operand
-    if at_inner.op[0] != "@":
+    if operator_of(at_inner)[:1] != "@":
         return None
     if at_outer.op != at_inner.op:
         return None
@@ -1,67 +1,88 @@
-from checkers.SpatioTemporalEvaluatorUtils import satisfying_points, powerset
+from typing import Optional, Union
+from checkers.SpatioTemporalEvaluatorUtils import satisfying_points
+from checkers.GridPool import GridPool, GridSelection, lazy_product
+from checkers.ConeOfInfluence import ConeOfInfluence
+from checkers.CounterexampleSearch import parse_counterexample_formula, prefix_checks, search
+from checkers.ConclusionCounting import parse_formula, filter_by_assumptions
+from checkers.TraceIndex import canonical_scenario, count_conclusions_indexed
+from checkers.TraceCorpus import write_corpus
+from checkers.TraceSpaceIndex import TraceSpaceIndex
+from checkers.Checkpoint import Checkpointer, checkpoint_scenario
+from checkers.SearchTelemetry import SearchTelemetry
 from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
-from itertools import product
+from formula_types.Trace import Trace
+from formula_types.FormulaCost import order_by_cost, adapt_order, ADAPT_INTERVAL
+from formula_types.FormulaSimplifier import simplify, simplify_with_report
+from timeit import default_timer as timer
 from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
 
 
-def generate_all_satisfying_grids(props: list[str], noms: list[str], grid_size: tuple[int, int],
-                                  state_formulas: list[HybridSpatioTemporalFormula]) -> list[dict]:
+def satisfying_grids(props: list[str], noms: list[str], grid_size: tuple[int, int],
+                     state_formulas: list[HybridSpatioTemporalFormula],
+                     stats: Optional[dict] = None) -> GridSelection:
     """
-    This function generate all possible starting states in the grid. Since any position can be a starting point for any car, it generates all possible placements.
+    Returns the grids satisfying the state formulas, in the order of generate_all_satisfying_grids. The grids are
+    filtered as they are consumed, and only the ranks of the accepted grids are stored.
 
     :param props: propositions the formulas contain
     :param noms: nominals the formulas contain
     :param grid_size: size of the spatial grid
     :param state_formulas: set of state formulas
-    :return: list of grid that satisfy state formulas
+    :param stats: the counters (see SearchTelemetry) of the candidate and rejected grids, None to not count them
+    :return: the selection of grids that satisfy state formulas
     """
 
     # generate all points found in the bounding box
     points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in
                                      range(grid_size[1])]
 
-    # generate all possible placements for each proposition
-    prop_placements: list[list] = [list(powerset(points)) for _ in props]
+    def formulas_hold(placement: dict) -> bool:
+        # check whether in the generated state, the assumptions hold
+        for fml in state_formulas:
+            for p in points:
+                if not fml.evaluate([placement], p, grid_size):
+                    return False
+        return True
 
-    # generate all possible placements for each nominal
-    nominal_placements: list[list[tuple[int, int]]] = [points for _ in noms]
+    return GridSelection(GridPool(props, noms, grid_size, list), formulas_hold, stats)
 
-    allowed_grids: list[dict] = []
 
-    # iterate over all possible placements of atomic components
-    for prop_choice in product(*prop_placements):
-        for nominal_choice in product(*nominal_placements):
-            placement: dict = {}
-
-            # Add propositions with their chosen subsets
-            for name, subset in zip(props, prop_choice):
-                placement[name] = list(subset)
+def generate_all_satisfying_grids(props: list[str], noms: list[str], grid_size: tuple[int, int],
+                                  state_formulas: list[HybridSpatioTemporalFormula],
+                                  stats: Optional[dict] = None) -> list[dict]:
+    """
+    This function generate all possible starting states in the grid. Since any position can be a starting point for any car, it generates all possible placements.
 
-            # Add nominals with their single chosen point (wrapped in a list)
-            for name, pos in zip(noms, nominal_choice):
-                placement[name] = pos
+    :param props: propositions the formulas contain
+    :param noms: nominals the formulas contain
+    :param grid_size: size of the spatial grid
+    :param state_formulas: set of state formulas
+    :param stats: the counters (see SearchTelemetry) of the candidate and rejected grids, None to not count them
+    :return: list of grid that satisfy state formulas
+    """
+    return list(satisfying_grids(props, noms, grid_size, state_formulas, stats))
 
-            # check whether in the generated state, the assumptions hold
-            formulas_hold: bool = True
-            for fml in state_formulas:
-                for p in points:
-                    if not fml.evaluate([placement], p, grid_size):
-                        formulas_hold = False
-                        break
 
-                if not formulas_hold:
-                    break
+def group_by_static_props(grids: Union[list[dict], GridSelection], static_props: list[str]) -> list[list[dict]]:
+    """
+    Groups grids by the placement of the static propositions, which must be the same in all grids of a trace.
 
-            # consider these states, only if the assumption holds
-            if formulas_hold:
-                allowed_grids.append(placement)
-            else:
-                pass
-    return allowed_grids
+    :param grids: the list (or selection) of grids
+    :param static_props: the propositions whose placement does not change over time
+    :return: the list of groups of grids with the same placement of the static propositions (selections for a
+             selection)
+    """
+    if isinstance(grids, GridSelection):
+        return grids.group_by(lambda grid: tuple(tuple(grid[p]) for p in static_props))
+    groups: dict[tuple, list[dict]] = {}
+    for grid in grids:
+        groups.setdefault(tuple(tuple(grid[p]) for p in static_props), []).append(grid)
+    return list(groups.values())
 
 
 def generate_traces(props: list[str], noms: list[str], max_trace_length: int, grid_size: tuple[int, int],
-                    parsed_state_formulas: list[HybridSpatioTemporalFormula]) -> list[list[dict]]:
+                    parsed_state_formulas: list[HybridSpatioTemporalFormula],
+                    static_props: list[str] = (), telemetry: Optional[SearchTelemetry] = None) -> list[Trace]:
     """
     Generates all traces up to a given length based on the given grid structure.
 
@@ -70,17 +91,33 @@ def generate_traces(props: list[str], noms: list[str], max_trace_length: int, gr
     :param grid_size: size of the spatial grid
     :param max_trace_length: maximal length of traces
     :param parsed_state_formulas: set of state formula
+    :param static_props: propositions whose placement is chosen once per trace
+    :param telemetry: the statistics of the search tree to record, None to not record any
     :return:
     """
     # consider only grids that satisfy state assumptions
-    grids: list[dict] = generate_all_satisfying_grids(props, noms, grid_size, parsed_state_formulas)
+    start: float = timer()
+    pool_stats: dict = {"candidates": 0, "rejected": 0}
+    grids: GridSelection = satisfying_grids(props, noms, grid_size, parsed_state_formulas,
+                                            pool_stats if telemetry is not None else None)
 
     #print("|Total amount of grids generated:", len(grids))
 
+    # static propositions are placed once, so traces only combine grids agreeing on them
+    groups: list[list[dict]] = group_by_static_props(grids, static_props) if static_props else [grids]
+    if telemetry is not None:
+        # the pool is timed as a phase, so it is filtered before the traces are generated
+        grids.complete()
+        telemetry.record_pool(pool_stats, groups, timer() - start)
+
     # generate all traces with the available grids and up to the given length
     for length in range(1, max_trace_length + 1):
-        for tup in product(grids, repeat=length):
-            yield list(tup)
+        stats: Optional[dict] = telemetry.pool_level(length, groups) if telemetry is not None else None
+        for group in groups:
+            for tup in lazy_product(group, length):
+                if stats is not None:
+                    stats["traces"] = stats["traces"] + 1
+                yield Trace.from_grids(tup)
 
 
 # She who fixes soundness bugs the afternoon of the deadline be not bound by style guides
@@ -96,7 +133,9 @@ def is_state_formula_string(s: str):
     return False
 
 
-def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces) -> (int, int):
+def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces,
+             static_props: list[str] = (), checkpoint: Optional[str] = None, resume: bool = False,
+             stats: Optional[str] = None, cone_of_influence: bool = False) -> (int, int):
     """
     Prints the number of traces and, if parameter show_traces, also the traces where spatial points have
     been found in which the given formula holds.
@@ -108,7 +147,15 @@ def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length,
     :param grid_size: the dimensions of the grid the traces are build on
     :param max_trace_length: the maximal length the traces should be
     :param show_traces: whether the satisfying traces should be shown in the console
+    :param static_props: propositions whose placement does not change over time
+    :param checkpoint: path of the checkpoint file written periodically, None for no checkpoints
+    :param resume: whether to continue from the checkpoint file (if it exists)
+    :param stats: path of the JSON file the statistics of the search tree are written to, None to not record them
+    :param cone_of_influence: whether to enumerate only the symbols and trace steps the formulas depend on and scale
+                              the counts (see ConeOfInfluence), not with checkpoints
     """
+    start: float = timer()
+    telemetry: Optional[SearchTelemetry] = SearchTelemetry() if stats is not None else None
 
     # filter global formula with propositional/hybrid or other global arguments
     state_fmls = []
@@ -117,7 +164,7 @@ def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length,
         if is_state_formula_string(a):
             state_fmls.append(a)
 
-    parsed_state_fmls: list[HybridSpatioTemporalFormula] = [HybridSpatioTemporalParser(tokenize(assumption)).parse() for
+    parsed_state_fmls: list[HybridSpatioTemporalFormula] = [simplify(HybridSpatioTemporalParser(tokenize(assumption)).parse()) for
                                                             assumption in
                                                             state_fmls]
 
@@ -128,20 +175,193 @@ def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length,
     # parse the input formula
     parsed_formula: HybridSpatioTemporalFormula = HybridSpatioTemporalParser(tokenize(input_formula_string)).parse()
 
+    # simplify the input formula before evaluating it on the traces
+    size_before: int
+    size_after: int
+    parsed_formula, size_before, size_after = simplify_with_report(parsed_formula)
+
+    if show_traces:
+        print("\t |Simplified input formula from", size_before, "to", size_after, "nodes")
+
+    # evaluate cheap and selective conjuncts first
+    order_by_cost(parsed_formula)
+    if telemetry is not None:
+        telemetry.add_time("parse", timer() - start)
+
+    # the positions of checkpoints are ranks of the full trace space, so it is not projected with checkpoints;
+    # the traces of a group only extend by grids of the group, so they are only truncated with a single group
+    cone: Optional[ConeOfInfluence] = None
+    pool_size: int = 0
+    if cone_of_influence and checkpoint is None:
+        cone = ConeOfInfluence(parsed_state_fmls + [parsed_formula], props, noms, grid_size, max_trace_length,
+                               static_props, truncate=not static_props)
+        if cone.max_trace_length < max_trace_length:
+            pool_size = len(satisfying_grids(cone.props, cone.noms, grid_size, parsed_state_fmls))
+        if show_traces:
+            print("\t |Cone of influence:", cone)
+
     counter_sat: int = 0
     counter_gen: int = 0
+    if cone is not None:
+        traces = generate_traces(cone.props, cone.noms, cone.max_trace_length, grid_size, parsed_state_fmls,
+                                 cone.static_props, telemetry)
+    else:
+        traces = generate_traces(props, noms, max_trace_length, grid_size, parsed_state_fmls, static_props,
+                                 telemetry)
+
+    # the position of the enumeration is the rank of the next trace, i.e. the number of traces so far
+    checkpointer: Optional[Checkpointer] = None
+    if checkpoint is not None:
+        checkpointer = Checkpointer(checkpoint, checkpoint_scenario("optimized", props, noms, assumptions, conclusions,
+                                                                    grid_size, max_trace_length, static_props), resume)
+        counter_sat, counter_gen = checkpointer.counter_sat, checkpointer.counter_gen
+        if counter_gen > 0:
+            grids: GridSelection = satisfying_grids(props, noms, grid_size, parsed_state_fmls)
+            groups: list[GridSelection] = group_by_static_props(grids, static_props) if static_props else [grids]
+            traces = TraceSpaceIndex(groups, max_trace_length).traces(counter_gen)
+    enumerated: int = counter_gen
 
     # evaluate the input formula on all the generated traces over the given propositions
     # and nominals, and with maximal length max_trace_length
-    for t in generate_traces(props, noms, max_trace_length, grid_size, parsed_state_fmls):
+    for t in traces:
+        evaluation_start: float = timer() if telemetry is not None else 0.0
         sat_points = satisfying_points(parsed_formula, t, grid_size)
+        if telemetry is not None:
+            telemetry.add_time("evaluation", timer() - evaluation_start)
 
+        # a trace of the projected space stands for the traces of the full space differing only outside the cone
+        weight: int = cone.weight(len(t), pool_size) if cone is not None else 1
         if sat_points:
             if show_traces:
                 print("\t |Satisfying trace #", counter_sat, " with satisfying points: ", sat_points)
                 print("\t |--------------------------------------------------------------------")
                 print("\t |", t, "\n")
-            counter_sat = counter_sat + 1
-        counter_gen = counter_gen + 1
+            counter_sat = counter_sat + weight
+        counter_gen = counter_gen + weight
+        enumerated = enumerated + 1
+
+        # adapt the conjunct order to the observed failure rates
+        if enumerated % ADAPT_INTERVAL == 0:
+            adapt_order(parsed_formula)
+
+            # save the position and counters periodically
+            if checkpointer is not None and checkpointer.due():
+                checkpointer.save(counter_gen, counter_sat, counter_gen)
+
+    if checkpointer is not None:
+        checkpointer.save(counter_gen, counter_sat, counter_gen, finished=True)
+
+    if telemetry is not None:
+        telemetry.add_time("total", timer() - start)
+        telemetry.write(stats, scenario=checkpoint_scenario("optimized", props, noms, assumptions, conclusions,
+                                                            grid_size, max_trace_length, static_props),
+                        sat=counter_sat, traces=counter_gen)
 
     return counter_sat, counter_gen
+
+
+def evaluate_each(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces,
+                  static_props: list[str] = (), index_dir: Optional[str] = None) -> (list[int], list[int], int):
+    """
+    Evaluates each conclusion separately against the traces satisfying the assumptions, enumerating the traces and
+    evaluating the assumptions only once. Only state assumptions restrict the grid pool, so the traces are shared by
+    all conclusions.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check separately
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param show_traces: whether the traces satisfying the assumptions should be shown in the console
+    :param static_props: propositions whose placement does not change over time
+    :param index_dir: directory of the on-disk indexes of the traces satisfying the assumptions, None for no index
+    :return: the #Sat of each conclusion, the number of traces violating each conclusion, and the number of traces
+    """
+    state_fmls: list[str] = [a for a in assumptions if is_state_formula_string(a)]
+    parsed_state_fmls: list[HybridSpatioTemporalFormula] = [simplify(HybridSpatioTemporalParser(tokenize(a)).parse())
+                                                            for a in state_fmls]
+
+    candidates = filter_by_assumptions(parse_formula([a for a in assumptions if a not in state_fmls]),
+                                       generate_traces(props, noms, max_trace_length, grid_size, parsed_state_fmls,
+                                                       static_props), grid_size)
+
+    return count_conclusions_indexed([parse_formula([c]) for c in conclusions], candidates, grid_size, show_traces,
+                                     index_dir, canonical_scenario("optimized", props, noms, assumptions, grid_size,
+                                                                   max_trace_length, static_props))
+
+
+def write_trace_corpus(props, noms, assumptions, grid_size, max_trace_length, path: str,
+                       static_props: list[str] = ()) -> int:
+    """
+    Writes the traces over the grids satisfying the state assumptions to a corpus file.
+
+    :param props: propositions the formulas contain
+    :param noms: nominals the formulas contain
+    :param assumptions: list of assumptions that hold
+    :param grid_size: size of the spatial grid
+    :param max_trace_length: maximal length of traces
+    :param path: the path of the corpus
+    :param static_props: propositions whose placement does not change over time
+    :return: the number of traces written
+    """
+    parsed_state_fmls: list[HybridSpatioTemporalFormula] = [simplify(HybridSpatioTemporalParser(tokenize(a)).parse())
+                                                            for a in assumptions if is_state_formula_string(a)]
+
+    return write_corpus(path, generate_traces(props, noms, max_trace_length, grid_size, parsed_state_fmls,
+                                              static_props), props, noms, grid_size, max_trace_length)
+
+
+def trace_space(props, noms, assumptions, grid_size, max_trace_length,
+                static_props: list[str] = ()) -> TraceSpaceIndex:
+    """
+    Returns the index of the traces over the grids satisfying the state assumptions, numbered in the order of
+    generate_traces.
+
+    :param props: propositions the formulas contain
+    :param noms: nominals the formulas contain
+    :param assumptions: list of assumptions that hold
+    :param grid_size: size of the spatial grid
+    :param max_trace_length: maximal length of traces
+    :param static_props: propositions whose placement does not change over time
+    :return: the trace space index
+    """
+    parsed_state_fmls: list[HybridSpatioTemporalFormula] = [simplify(HybridSpatioTemporalParser(tokenize(a)).parse())
+                                                            for a in assumptions if is_state_formula_string(a)]
+    grids: GridSelection = satisfying_grids(props, noms, grid_size, parsed_state_fmls)
+
+    return TraceSpaceIndex(group_by_static_props(grids, static_props) if static_props else [grids], max_trace_length)
+
+
+def find_counterexample(props, noms, assumptions, conclusions, grid_size, max_trace_length,
+                        static_props: list[str] = ()) -> (list[dict], list, int):
+    """
+    Searches depth-first for a trace on which the assumptions hold but the conclusions do not, at some point, and
+    stops at the first one found. Only grids satisfying the state assumptions are considered.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param static_props: propositions whose placement does not change over time
+    :return: the counterexample trace (None if there is none), the points at which it violates the conclusions,
+             and the number of traces explored
+    """
+    # only assumptions restrict the grids, the conclusions are negated
+    state_fmls: list[str] = [a for a in assumptions if is_state_formula_string(a)]
+    remaining_assumptions: list[str] = [a for a in assumptions if a not in state_fmls]
+
+    parsed_state_fmls: list[HybridSpatioTemporalFormula] = [simplify(HybridSpatioTemporalParser(tokenize(a)).parse())
+                                                            for a in state_fmls]
+    grids: list[dict] = generate_all_satisfying_grids(props, noms, grid_size, parsed_state_fmls)
+
+    # a trace can only continue with grids placing the static propositions like its first grid
+    groups: dict[int, list[dict]] = {}
+    for group in group_by_static_props(grids, static_props):
+        for grid in group:
+            groups[id(grid)] = group
+
+    return search(parse_counterexample_formula(remaining_assumptions, conclusions), prefix_checks(remaining_assumptions),
+                  grids, lambda grid: groups[id(grid)], grid_size, max_trace_length)
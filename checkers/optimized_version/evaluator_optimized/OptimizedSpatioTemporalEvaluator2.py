@@ -1,8 +1,19 @@
-from itertools import product
+from typing import Callable, Iterable, Iterator, Optional
+from itertools import product, islice, repeat
+from timeit import default_timer as timer
 from checkers.SpatioTemporalEvaluatorUtils import satisfying_points, powerset
+from checkers.CounterexampleSearch import parse_counterexample_formula, prefix_checks, search
+from checkers.ConclusionCounting import parse_formula, filter_by_assumptions
+from checkers.TraceIndex import canonical_scenario, count_conclusions_indexed
+from checkers.TraceCorpus import write_corpus
+from checkers.Checkpoint import Checkpointer, checkpoint_scenario
+from checkers.SearchTelemetry import SearchTelemetry
 from checkers.optimized_version.OptimizedEvaluatorUtils import parse_static_car, parse_fixed_offset, \
     parse_fixed_movement, strip_parentheses
 from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+from formula_types.FormulaCost import order_by_cost, adapt_order, ADAPT_INTERVAL
+from formula_types.FormulaSimplifier import simplify, simplify_with_report
 from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
 
 
@@ -213,7 +224,7 @@ def test_state_assumptions(grid_size: tuple[int, int], trace: list[dict],
 
 
 def generate_grids(grid_size: tuple[int, int], propositions: list[str], nominals: list[str], components: list[dict],
-                   state_assumptions: list[HybridSpatioTemporalFormula]) -> dict:
+                   state_assumptions: list[HybridSpatioTemporalFormula], stats: Optional[dict] = None) -> dict:
     """
     Generates all possible start grids of the given grid size, propositions and nominals, and with respect to the given state assumptions.
 
@@ -222,6 +233,7 @@ def generate_grids(grid_size: tuple[int, int], propositions: list[str], nominals
     :param nominals: the list of nominals
     :param components: the list of dependent car components
     :param state_assumptions: the list of state assumptions
+    :param stats: the counters (see SearchTelemetry) of the candidate, rejected and accepted grids, None to not count
     :return: all possible placement of the propositions and nominals in the grid w.r.t. the given assumptions
     """
     constrained_cars = set()
@@ -286,13 +298,55 @@ def generate_grids(grid_size: tuple[int, int], propositions: list[str], nominals
                         grid[c] = pos
 
                     # check if the generated grid satisfies the state assumptions
-                    if test_state_assumptions(grid_size, [grid], state_assumptions):
+                    accepted: bool = test_state_assumptions(grid_size, [grid], state_assumptions)
+                    if stats is not None:
+                        stats["candidates"] = stats["candidates"] + 1
+                        stats["grids" if accepted else "rejected"] = stats["grids" if accepted else "rejected"] + 1
+                    if accepted:
                         yield grid
 
 
+def movements_consistent(static_cars: list[str], components: list[dict], fixed_movement_cars: dict) -> bool:
+    """
+    Checks whether the movement constraints of the cars can be satisfied together.
+
+    :param static_cars: the list of static car
+    :param components: the list of dependent components
+    :param fixed_movement_cars: the dictionary of fixed movement cars
+    :return: true if the cars can move beyond the first grid, false otherwise
+    """
+    # a static car cannot have a movement
+    for s in static_cars:
+        if s in fixed_movement_cars.keys():
+            return False
+
+    # if a component has a static car, no dependent car can have a fixed movement
+    for c in components:
+        if len(set(static_cars) & set(c.keys())) != 0 and len(
+                set(c.keys()) & set(fixed_movement_cars.keys())) != 0:
+            return False
+
+    # if cars in dependent components also are fixed movement cars, they must have at least a common relative movement
+    for c in components:
+        fixed_movement_cars_in_c = list(set(c.keys()).intersection(set(fixed_movement_cars.keys())))
+
+        # if entries exist but no common relative movements - discard movement
+        if len(fixed_movement_cars_in_c) > 0:
+            allowed_moves = fixed_movement_cars[fixed_movement_cars_in_c[0]]
+
+            for i in range(1, len(fixed_movement_cars_in_c)):
+                allowed_moves = set(allowed_moves).intersection(set(fixed_movement_cars_in_c[i]))
+
+            if len(allowed_moves) == 0:
+                return False
+
+    return True
+
+
 def generate_traces(grid_size: tuple[int, int], propositions: list[str], nominals: list[str], static_cars: list[str],
                     dependent_cars: dict, fixed_movement_cars: dict,
-                    state_assumptions: list[HybridSpatioTemporalFormula], trace_length: int) -> list[dict]:
+                    state_assumptions: list[HybridSpatioTemporalFormula], trace_length: int,
+                    static_props: list[str] = (), telemetry: Optional[SearchTelemetry] = None) -> list[Trace]:
     """
     Generates all possible traces.
 
@@ -304,6 +358,8 @@ def generate_traces(grid_size: tuple[int, int], propositions: list[str], nominal
     :param fixed_movement_cars: the dictionary of fixed movement cars
     :param state_assumptions: the list of parsed assumption formulas
     :param trace_length: the maximal length of the traces to be generated
+    :param static_props: the propositions whose placement does not change over time
+    :param telemetry: the statistics of the search tree to record, None to not record any
     :return:
     """
 
@@ -318,43 +374,27 @@ def generate_traces(grid_size: tuple[int, int], propositions: list[str], nominal
 
     dep_cars = [x for xs in components for x in xs.keys()]
 
-    independent_cars = set(nominals) - set(static_cars) - set(dep_cars) - set(fixed_movement_cars)
+    # sorted, so that the enumeration order does not depend on the hash seed of the process
+    independent_cars = sorted(set(nominals) - set(static_cars) - set(dep_cars) - set(fixed_movement_cars))
 
-    for grid in generate_grids(grid_size, propositions, nominals, components, state_assumptions):
+    grids = generate_grids(grid_size, propositions, nominals, components, state_assumptions,
+                           telemetry.level(1) if telemetry is not None else None)
+    if telemetry is not None:
+        grids = telemetry.timed(grids, telemetry.level(1))
+
+    for grid in grids:
         if trace_length == 1:
-            yield [grid]
+            if telemetry is not None:
+                telemetry.level(1)["traces"] = telemetry.level(1)["traces"] + 1
+            yield Trace.from_grids((grid,))
         else:
-            # a static car cannot have a movement
-            for s in static_cars:
-                if s in fixed_movement_cars.keys():
-                    yield []
-                    return
-
-            # if a component has a static car, no dependent car can have a fixed movement
-            for c in components:
-                if len(set(static_cars) & set(c.keys())) != 0 and len(
-                        set(c.keys()) & set(fixed_movement_cars.keys())) != 0:
-                    yield []
-                    return
-
-            # if cars in dependent components also are fixed movement cars, they must have at least a common relative movement
-            for c in components:
-                fixed_movement_cars_in_c = list(set(c.keys()).intersection(set(fixed_movement_cars.keys())))
-
-                # if entries exist but no common relative movements - discard movement
-                if len(fixed_movement_cars_in_c) > 0:
-                    allowed_moves = fixed_movement_cars[fixed_movement_cars_in_c[0]]
-
-                    for i in range(1, len(fixed_movement_cars_in_c)):
-                        allowed_moves = set(allowed_moves).intersection(set(fixed_movement_cars_in_c[i]))
-
-                    if len(allowed_moves) == 0:
-                        yield []
-                        return
+            if not movements_consistent(static_cars, components, fixed_movement_cars):
+                yield Trace()
+                return
 
             yield from extend_trace(grid_size, propositions, static_cars, dependent_cars, components,
                                     fixed_movement_cars, independent_cars, state_assumptions, 1, trace_length, grid,
-                                    [grid])
+                                    Trace.from_grids((grid,)), static_props, telemetry)
 
 
 def check_in_bound(grid_size: tuple[int, int], point: tuple[int, int]) -> bool:
@@ -382,7 +422,8 @@ def add(p: tuple[int, int], d: tuple[int, int]) -> tuple[int, int]:
 def combine_placements(grid_size: tuple[int, int], curr_grid: dict, static_car_names: list[str], components: list[dict],
                        fixed_movement_car_names: list[str],
                        independent_car_names: list[str], moves: dict, propositions: list[str],
-                       state_assumptions: list[HybridSpatioTemporalFormula]) -> dict:
+                       state_assumptions: list[HybridSpatioTemporalFormula], static_props: list[str] = (),
+                       stats: Optional[dict] = None) -> dict:
     """
     Combines all possible placements of nominals and propositions. The placements of nominals are made with respect to the type of cars they represent, i.e.
     static car, dependent car or fixed movement car.
@@ -396,6 +437,8 @@ def combine_placements(grid_size: tuple[int, int], curr_grid: dict, static_car_n
     :param moves: the available moves for each car
     :param propositions: the list of propositions
     :param state_assumptions: the list of state assumptions
+    :param static_props: the propositions that keep their placement from the current grid
+    :param stats: the counters (see SearchTelemetry) of the candidate placements, None to not count them
     :return: a filled grid with the given nominals and propositions
     """
 
@@ -409,7 +452,7 @@ def combine_placements(grid_size: tuple[int, int], curr_grid: dict, static_car_n
     # placement of dependent cars
     dep_cars: list[str] = [x for xs in components for x in xs.keys()]
     fixed_car_moves: list[list[tuple[int, int]]] = []
-    for c in (set(fixed_movement_car_names) - set(dep_cars)):
+    for c in sorted(set(fixed_movement_car_names) - set(dep_cars)):
         allowed_moves: list[tuple[int, int]] = [add(curr_grid[c], m) for m in moves[c] if
                                                 check_in_bound(grid_size, add(curr_grid[c], m))]
         fixed_car_moves.append(allowed_moves)
@@ -422,7 +465,9 @@ def combine_placements(grid_size: tuple[int, int], curr_grid: dict, static_car_n
 
     points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in
                                      range(grid_size[1])]
-    prop_placements: list[list] = [list(powerset(points)) for _ in propositions]
+    # static propositions keep their placement, all others are placed anew
+    prop_placements: list[list] = [[curr_grid[p]] if p in static_props else list(powerset(points))
+                                   for p in propositions]
 
     dependent_components_placements = [[] for _ in components]
     for j in range(0, len(components)):
@@ -461,7 +506,8 @@ def combine_placements(grid_size: tuple[int, int], curr_grid: dict, static_car_n
                         for name, pl_choice in zip(static_car_names, static_car_choice):
                             placement[name] = pl_choice
 
-                        for name, pl_choice in zip(set(fixed_movement_car_names) - set(dep_cars), fixed_car_choice):
+                        for name, pl_choice in zip(sorted(set(fixed_movement_car_names) - set(dep_cars)),
+                                                   fixed_car_choice):
                             placement[name] = pl_choice
 
                         for name, pl_choice in zip(independent_car_names, independent_car_choice):
@@ -479,37 +525,23 @@ def combine_placements(grid_size: tuple[int, int], curr_grid: dict, static_car_n
                                     break
                             else:
                                 continue
+                        if stats is not None:
+                            stats["candidates"] = stats["candidates"] + 1
                         yield placement
 
 
-def extend_trace(grid_size: tuple[int, int], propositions: list[str], static_cars: list[str], dependent_cars: dict,
-                 components: list[dict], fixed_movement_cars: dict,
-                 independent_cars: list[str], state_assumptions: list[HybridSpatioTemporalFormula],
-                 curr_trace_length: int, max_trace_length: int, prev_grid: dict, trace: list[dict]) -> list[dict]:
+def compute_moves(grid_size: tuple[int, int], static_cars: list[str], components: list[dict],
+                  fixed_movement_cars: dict, independent_cars: list[str]) -> dict:
     """
-    Extends the trace by an additional grid.
+    Computes the moves available to each car between two consecutive grids.
 
     :param grid_size: the size of the grid
-    :param propositions: the list of propositions
     :param static_cars: the list of static cars
-    :param dependent_cars: the dictionary of dependent cars
     :param components: the list od dependent components
     :param fixed_movement_cars: the dictionary of fixed movement cars
     :param independent_cars: the list of independent cars
-    :param state_assumptions: the list of state assumptions
-    :param curr_trace_length: the current length of the trace
-    :param max_trace_length: the maximal length of the trace
-    :param prev_grid: the previous state in the trace
-    :param trace: the trace to extend
-    :return: the extended trace
+    :return: the available moves (offsets) for each car
     """
-    if curr_trace_length <= max_trace_length:
-        yield trace
-        if curr_trace_length == max_trace_length:
-            return
-    else:
-        raise Exception("Current trace length exceeded maximum trace length")
-
     moves: dict = {}
 
     # static cars are placed in the same position in the next time instance
@@ -533,7 +565,7 @@ def extend_trace(grid_size: tuple[int, int], propositions: list[str], static_car
 
         else:
             # get common fixed movements for cars in component
-            fixed_movement_cars_in_c: list[tuple[int, int]] = list(
+            fixed_movement_cars_in_c: list[tuple[int, int]] = sorted(
                 set(c.keys()).intersection(set(fixed_movement_cars.keys())))
 
             # if entries exist but no common relative movements - discard movement
@@ -553,29 +585,209 @@ def extend_trace(grid_size: tuple[int, int], propositions: list[str], static_car
 
     # place fixed movement cars
     dep_cars: list[str] = [x for xs in components for x in xs.keys()]
-    for c in set(fixed_movement_cars) - set(dep_cars):
+    for c in sorted(set(fixed_movement_cars) - set(dep_cars)):
         moves[c] = fixed_movement_cars[c]
 
     # place independent cars
     for c in independent_cars:
         moves[c] = all_deltas
 
+    return moves
+
+
+def next_grids(grid_size: tuple[int, int], propositions: list[str], static_cars: list[str], components: list[dict],
+               fixed_movement_cars: dict, independent_cars: list[str],
+               state_assumptions: list[HybridSpatioTemporalFormula], prev_grid: dict,
+               static_props: list[str] = (), stats: Optional[dict] = None) -> list[dict]:
+    """
+    Generates all grids that can follow the given grid.
+
+    :param grid_size: the size of the grid
+    :param propositions: the list of propositions
+    :param static_cars: the list of static cars
+    :param components: the list od dependent components
+    :param fixed_movement_cars: the dictionary of fixed movement cars
+    :param independent_cars: the list of independent cars
+    :param state_assumptions: the list of state assumptions
+    :param prev_grid: the previous state in the trace
+    :param static_props: the propositions whose placement does not change over time
+    :param stats: the counters (see SearchTelemetry) of the candidate, rejected and accepted grids, None to not count
+    :return: the grids following the previous grid
+    """
+    moves: dict = compute_moves(grid_size, static_cars, components, fixed_movement_cars, independent_cars)
+
     # combine placements
     for placement in combine_placements(grid_size, prev_grid, static_cars, components, list(fixed_movement_cars.keys()),
-                                        independent_cars, moves, propositions, state_assumptions):
-        # new_trace: list[dict] = trace + [placement]
+                                        independent_cars, moves, propositions, state_assumptions, static_props, stats):
         # check if the generated placement satisfies the state assumptions
-        if test_state_assumptions(grid_size, [placement], state_assumptions):
-            yield from extend_trace(grid_size, propositions, static_cars, dependent_cars, components,
-                                    fixed_movement_cars,
-                                    independent_cars, state_assumptions, curr_trace_length + 1, max_trace_length,
-                                    placement,
-                                    trace + [placement])
+        accepted: bool = test_state_assumptions(grid_size, [placement], state_assumptions)
+        if stats is not None:
+            stats["grids" if accepted else "rejected"] = stats["grids" if accepted else "rejected"] + 1
+        if accepted:
+            yield placement
+
+
+def extend_trace(grid_size: tuple[int, int], propositions: list[str], static_cars: list[str], dependent_cars: dict,
+                 components: list[dict], fixed_movement_cars: dict,
+                 independent_cars: list[str], state_assumptions: list[HybridSpatioTemporalFormula],
+                 curr_trace_length: int, max_trace_length: int, prev_grid: dict, trace: Trace,
+                 static_props: list[str] = (), telemetry: Optional[SearchTelemetry] = None) -> list[Trace]:
+    """
+    Extends the trace by an additional grid.
+
+    :param grid_size: the size of the grid
+    :param propositions: the list of propositions
+    :param static_cars: the list of static cars
+    :param dependent_cars: the dictionary of dependent cars
+    :param components: the list od dependent components
+    :param fixed_movement_cars: the dictionary of fixed movement cars
+    :param independent_cars: the list of independent cars
+    :param state_assumptions: the list of state assumptions
+    :param curr_trace_length: the current length of the trace
+    :param max_trace_length: the maximal length of the trace
+    :param prev_grid: the previous state in the trace
+    :param trace: the trace to extend
+    :param static_props: the propositions whose placement does not change over time
+    :param telemetry: the statistics of the search tree to record, None to not record any
+    :return: the extended trace
+    """
+    if curr_trace_length <= max_trace_length:
+        if telemetry is not None:
+            telemetry.level(curr_trace_length)["traces"] = telemetry.level(curr_trace_length)["traces"] + 1
+        yield trace
+        if curr_trace_length == max_trace_length:
+            return
+    else:
+        raise Exception("Current trace length exceeded maximum trace length")
+
+    stats: Optional[dict] = None
+    if telemetry is not None:
+        stats = telemetry.level(curr_trace_length + 1)
+        stats["parents"] = stats["parents"] + 1
+    placements = next_grids(grid_size, propositions, static_cars, components, fixed_movement_cars, independent_cars,
+                            state_assumptions, prev_grid, static_props, stats)
+    if telemetry is not None:
+        placements = telemetry.timed(placements, stats)
+
+    for placement in placements:
+        yield from extend_trace(grid_size, propositions, static_cars, dependent_cars, components,
+                                fixed_movement_cars,
+                                independent_cars, state_assumptions, curr_trace_length + 1, max_trace_length,
+                                placement,
+                                trace.extend(placement), static_props, telemetry)
+
+
+def generate_positioned_traces(grid_size: tuple[int, int], propositions: list[str], nominals: list[str],
+                               static_cars: list[str], dependent_cars: dict, fixed_movement_cars: dict,
+                               state_assumptions: list[HybridSpatioTemporalFormula], trace_length: int,
+                               static_props: list[str] = (), resume: Optional[tuple[int, ...]] = None,
+                               telemetry: Optional[SearchTelemetry] = None) -> \
+        Iterator[tuple[tuple[int, ...], Trace]]:
+    """
+    Generates the traces of generate_traces in the same order, each paired with its position in the enumeration: the
+    index of its first grid among the start grids followed by the index of every further grid among the successors of
+    the previous one. Given the position of a trace, the enumeration continues after that trace without generating
+    the traces before it.
+
+    :param grid_size: the size of the grid
+    :param propositions: the list of propositions
+    :param nominals: the list of nominals
+    :param static_cars: the list of static car
+    :param dependent_cars: the dictionary of dependent cars
+    :param fixed_movement_cars: the dictionary of fixed movement cars
+    :param state_assumptions: the list of parsed assumption formulas
+    :param trace_length: the maximal length of the traces to be generated
+    :param static_props: the propositions whose placement does not change over time
+    :param resume: the position of the trace after which to continue, None to start at the beginning
+    :param telemetry: the statistics of the search tree to record, None to not record any
+    :return: the (position, trace) pairs
+    """
+    adj = build_adjacency(dependent_cars)
+    components = compute_components(adj)
+    dep_cars = [x for xs in components for x in xs.keys()]
+    independent_cars = sorted(set(nominals) - set(static_cars) - set(dep_cars) - set(fixed_movement_cars))
+
+    grids = generate_grids(grid_size, propositions, nominals, components, state_assumptions,
+                           telemetry.level(1) if telemetry is not None else None)
+    if telemetry is not None:
+        grids = telemetry.timed(grids, telemetry.level(1))
+    first: int = 0
+    if resume:
+        first = resume[0]
+        grids = islice(grids, first, None)
+
+    for index, grid in enumerate(grids, first):
+        if trace_length > 1 and not movements_consistent(static_cars, components, fixed_movement_cars):
+            # generate_traces yields a single empty trace, whose position is empty
+            if resume is None:
+                yield (), Trace()
+            return
+
+        yield from extend_positioned_trace(grid_size, propositions, static_cars, components, fixed_movement_cars,
+                                           independent_cars, state_assumptions, trace_length, grid,
+                                           Trace.from_grids((grid,)), (index,), static_props,
+                                           resume[1:] if resume and index == first else None, telemetry)
+
+
+def extend_positioned_trace(grid_size: tuple[int, int], propositions: list[str], static_cars: list[str],
+                            components: list[dict], fixed_movement_cars: dict, independent_cars: list[str],
+                            state_assumptions: list[HybridSpatioTemporalFormula], max_trace_length: int,
+                            prev_grid: dict, trace: Trace, position: tuple[int, ...], static_props: list[str] = (),
+                            resume: Optional[tuple[int, ...]] = None,
+                            telemetry: Optional[SearchTelemetry] = None) -> Iterator[tuple[tuple[int, ...], Trace]]:
+    """
+    Yields the trace and its extensions like extend_trace, paired with their positions (see
+    generate_positioned_traces).
+
+    :param grid_size: the size of the grid
+    :param propositions: the list of propositions
+    :param static_cars: the list of static cars
+    :param components: the list od dependent components
+    :param fixed_movement_cars: the dictionary of fixed movement cars
+    :param independent_cars: the list of independent cars
+    :param state_assumptions: the list of state assumptions
+    :param max_trace_length: the maximal length of the trace
+    :param prev_grid: the previous state in the trace
+    :param trace: the trace to extend
+    :param position: the position of the trace
+    :param static_props: the propositions whose placement does not change over time
+    :param resume: the position of the trace after which to continue, relative to this trace (empty for this trace
+                   itself), None to yield this trace and all its extensions
+    :param telemetry: the statistics of the search tree to record, None to not record any
+    :return: the (position, trace) pairs
+    """
+    # the trace itself and the traces on the way to the resume position have been enumerated before
+    if resume is None:
+        if telemetry is not None:
+            telemetry.level(len(trace))["traces"] = telemetry.level(len(trace))["traces"] + 1
+        yield position, trace
+    if len(trace) == max_trace_length:
+        return
+
+    stats: Optional[dict] = None
+    if telemetry is not None:
+        stats = telemetry.level(len(trace) + 1)
+        stats["parents"] = stats["parents"] + 1
+    placements = next_grids(grid_size, propositions, static_cars, components, fixed_movement_cars, independent_cars,
+                            state_assumptions, prev_grid, static_props, stats)
+    if telemetry is not None:
+        placements = telemetry.timed(placements, stats)
+    first: int = 0
+    if resume:
+        first = resume[0]
+        placements = islice(placements, first, None)
+
+    for index, placement in enumerate(placements, first):
+        yield from extend_positioned_trace(grid_size, propositions, static_cars, components, fixed_movement_cars,
+                                           independent_cars, state_assumptions, max_trace_length, placement,
+                                           trace.extend(placement), position + (index,), static_props,
+                                           resume[1:] if resume and index == first else None, telemetry)
 
 
 def evaluate(propositions: list[str], nominals: list[str], assumptions, conclusions, grid_size: tuple[int, int],
              max_trace_length: int,
-             show_traces: bool) -> (int, int):
+             show_traces: bool, static_props: list[str] = (), checkpoint: Optional[str] = None,
+             resume: bool = False, stats: Optional[str] = None) -> (int, int):
     """
     Evaluates the given formulas against all generated traces.
 
@@ -586,11 +798,17 @@ def evaluate(propositions: list[str], nominals: list[str], assumptions, conclusi
     :param grid_size: the size of the grid
     :param max_trace_length: the maximal trace length
     :param show_traces: whether satisfying traces should be shown in the console or not
+    :param static_props: the propositions whose placement does not change over time
+    :param checkpoint: path of the checkpoint file written periodically, None for no checkpoints
+    :param resume: whether to continue from the checkpoint file (if it exists)
+    :param stats: path of the JSON file the statistics of the search tree are written to, None to not record them
     """
+    start: float = timer()
+    telemetry: Optional[SearchTelemetry] = SearchTelemetry() if stats is not None else None
 
     static_cars, dependent_cars, fixed_movement_cars, remaining_assumptions = divide_cars_in_types(assumptions)
     state_assumptions, remaining_assumptions = filter_state_assumptions(remaining_assumptions)
-    parsed_state_assumptions = [HybridSpatioTemporalParser(tokenize(fml)).parse() for fml in state_assumptions]
+    parsed_state_assumptions = [simplify(HybridSpatioTemporalParser(tokenize(fml)).parse()) for fml in state_assumptions]
 
     # conjunction of assumptions and conclusion
     input_formula_string: str = "&".join([*("(" + x + ")" for x in conclusions),
@@ -599,11 +817,44 @@ def evaluate(propositions: list[str], nominals: list[str], assumptions, conclusi
     # parse the input formula
     parsed_formula: HybridSpatioTemporalFormula = HybridSpatioTemporalParser(tokenize(input_formula_string)).parse()
 
+    # simplify the input formula before evaluating it on the traces
+    size_before: int
+    size_after: int
+    parsed_formula, size_before, size_after = simplify_with_report(parsed_formula)
+
+    if show_traces:
+        print("\t |Simplified input formula from", size_before, "to", size_after, "nodes")
+
+    # evaluate cheap and selective conjuncts first
+    order_by_cost(parsed_formula)
+    if telemetry is not None:
+        telemetry.add_time("parse", timer() - start)
+
     counter_sat = 0
     counter_gen = 0
-    for t in generate_traces(grid_size, propositions, nominals, static_cars, dependent_cars, fixed_movement_cars,
-                             parsed_state_assumptions, max_trace_length):
+    traces = zip(repeat(None), generate_traces(grid_size, propositions, nominals, static_cars, dependent_cars,
+                                               fixed_movement_cars, parsed_state_assumptions, max_trace_length,
+                                               static_props, telemetry))
+
+    # the position of the enumeration is the position of the last trace (see generate_positioned_traces)
+    checkpointer: Optional[Checkpointer] = None
+    position: Optional[tuple[int, ...]] = None
+    if checkpoint is not None:
+        checkpointer = Checkpointer(checkpoint, checkpoint_scenario("motion", propositions, nominals, assumptions,
+                                                                    conclusions, grid_size, max_trace_length,
+                                                                    static_props), resume)
+        counter_sat, counter_gen, position = checkpointer.counter_sat, checkpointer.counter_gen, checkpointer.position
+        traces = generate_positioned_traces(grid_size, propositions, nominals, static_cars, dependent_cars,
+                                            fixed_movement_cars, parsed_state_assumptions, max_trace_length,
+                                            static_props, position, telemetry)
+        if checkpointer.finished:
+            traces = iter(())
+
+    for position, t in traces:
+        evaluation_start: float = timer() if telemetry is not None else 0.0
         sat_points = satisfying_points(parsed_formula, t, grid_size)
+        if telemetry is not None:
+            telemetry.add_time("evaluation", timer() - evaluation_start)
 
         if sat_points:
             if show_traces:
@@ -613,4 +864,145 @@ def evaluate(propositions: list[str], nominals: list[str], assumptions, conclusi
             counter_sat = counter_sat + 1
         counter_gen = counter_gen + 1
 
+        # adapt the conjunct order to the observed failure rates
+        if counter_gen % ADAPT_INTERVAL == 0:
+            adapt_order(parsed_formula)
+
+            # save the position and counters periodically
+            if checkpointer is not None and checkpointer.due():
+                checkpointer.save(position, counter_sat, counter_gen)
+
+    if checkpointer is not None:
+        checkpointer.save(position, counter_sat, counter_gen, finished=True)
+
+    if telemetry is not None:
+        telemetry.add_time("total", timer() - start)
+        telemetry.write(stats, scenario=checkpoint_scenario("motion", propositions, nominals, assumptions, conclusions,
+                                                            grid_size, max_trace_length, static_props),
+                        sat=counter_sat, traces=counter_gen)
+
     return counter_sat, counter_gen
+
+
+def evaluate_each(propositions: list[str], nominals: list[str], assumptions, conclusions, grid_size: tuple[int, int],
+                  max_trace_length: int, show_traces: bool, static_props: list[str] = (),
+                  index_dir: Optional[str] = None) -> (list[int], list[int], int):
+    """
+    Evaluates each conclusion separately against the traces satisfying the assumptions, enumerating the traces and
+    evaluating the assumptions only once.
+
+    :param propositions: the list of propositions
+    :param nominals: the list of nominals
+    :param assumptions: the list of assumptions
+    :param conclusions: the list of conclusions to check separately
+    :param grid_size: the size of the grid
+    :param max_trace_length: the maximal trace length
+    :param show_traces: whether the traces satisfying the assumptions should be shown in the console
+    :param static_props: the propositions whose placement does not change over time
+    :param index_dir: directory of the on-disk indexes of the traces satisfying the assumptions, None for no index
+    :return: the #Sat of each conclusion, the number of traces violating each conclusion, and the number of traces
+    """
+    static_cars, dependent_cars, fixed_movement_cars, remaining_assumptions = divide_cars_in_types(assumptions)
+    state_assumptions, remaining_assumptions = filter_state_assumptions(remaining_assumptions)
+    parsed_state_assumptions = [simplify(HybridSpatioTemporalParser(tokenize(fml)).parse()) for fml in state_assumptions]
+
+    candidates = filter_by_assumptions(parse_formula(remaining_assumptions),
+                                       generate_traces(grid_size, propositions, nominals, static_cars, dependent_cars,
+                                                       fixed_movement_cars, parsed_state_assumptions, max_trace_length,
+                                                       static_props), grid_size)
+
+    return count_conclusions_indexed([parse_formula([c]) for c in conclusions], candidates, grid_size, show_traces,
+                                     index_dir, canonical_scenario("motion", propositions, nominals, assumptions,
+                                                                   grid_size, max_trace_length, static_props))
+
+
+def write_trace_corpus(propositions: list[str], nominals: list[str], assumptions, grid_size: tuple[int, int],
+                       max_trace_length: int, path: str, static_props: list[str] = ()) -> int:
+    """
+    Writes the traces that the movement and state assumptions admit to a corpus file.
+
+    :param propositions: the list of propositions
+    :param nominals: the list of nominals
+    :param assumptions: the list of assumptions
+    :param grid_size: the size of the grid
+    :param max_trace_length: the maximal trace length
+    :param path: the path of the corpus
+    :param static_props: the propositions whose placement does not change over time
+    :return: the number of traces written
+    """
+    static_cars, dependent_cars, fixed_movement_cars, remaining_assumptions = divide_cars_in_types(assumptions)
+    state_assumptions, remaining_assumptions = filter_state_assumptions(remaining_assumptions)
+    parsed_state_assumptions = [simplify(HybridSpatioTemporalParser(tokenize(fml)).parse()) for fml in state_assumptions]
+
+    return write_corpus(path, generate_traces(grid_size, propositions, nominals, static_cars, dependent_cars,
+                                              fixed_movement_cars, parsed_state_assumptions, max_trace_length,
+                                              static_props), propositions, nominals, grid_size, max_trace_length)
+
+
+def motion_space(propositions: list[str], nominals: list[str], assumptions, grid_size: tuple[int, int],
+                 static_props: list[str] = ()) -> tuple[Iterator[dict], Callable[[dict], Iterable[dict]], Callable[[dict], bool], list[str]]:
+    """
+    Returns the start grids and the successor function of the traces that the movement and state assumptions admit.
+
+    :param propositions: the list of propositions
+    :param nominals: the list of nominals
+    :param assumptions: the list of assumptions
+    :param grid_size: the size of the grid
+    :param static_props: the propositions whose placement does not change over time
+    :return: the start grids, the function returning the grids that can follow a grid (none if the movement
+             constraints contradict each other), the function deciding whether a grid is a start grid, and the
+             assumptions that are neither movement nor state assumptions
+    """
+    static_cars, dependent_cars, fixed_movement_cars, remaining_assumptions = divide_cars_in_types(assumptions)
+    state_assumptions, remaining_assumptions = filter_state_assumptions(remaining_assumptions)
+    parsed_state_assumptions = [simplify(HybridSpatioTemporalParser(tokenize(fml)).parse()) for fml in state_assumptions]
+
+    # dependent components in the dependency graph with relative positions
+    components = compute_components(build_adjacency(dependent_cars))
+    dep_cars = [x for xs in components for x in xs.keys()]
+    # sorted, so that the enumeration order does not depend on the hash seed of the process
+    independent_cars = sorted(set(nominals) - set(static_cars) - set(dep_cars) - set(fixed_movement_cars))
+
+    roots = generate_grids(grid_size, propositions, nominals, components, parsed_state_assumptions)
+
+    def successors(grid: dict) -> Iterable[dict]:
+        # contradicting movement constraints admit no trace longer than one grid
+        if not movements_consistent(static_cars, components, fixed_movement_cars):
+            return []
+        return next_grids(grid_size, propositions, static_cars, components, fixed_movement_cars, independent_cars,
+                          parsed_state_assumptions, grid, static_props)
+
+    def is_root(grid: dict) -> bool:
+        # the cars of a dependent component keep their relative positions
+        for component in components:
+            first, (first_x, first_y) = next(iter(component.items()))
+            for car, (x, y) in component.items():
+                if add(grid[first], (x - first_x, y - first_y)) != grid[car]:
+                    return False
+        return test_state_assumptions(grid_size, [grid], parsed_state_assumptions)
+
+    return roots, successors, is_root, remaining_assumptions
+
+
+def find_counterexample(propositions: list[str], nominals: list[str], assumptions, conclusions,
+                        grid_size: tuple[int, int], max_trace_length: int,
+                        static_props: list[str] = ()) -> (list[dict], list, int):
+    """
+    Searches depth-first for a trace on which the assumptions hold but the conclusions do not, at some point, and
+    stops at the first one found. Traces are extended by the movements the assumptions allow, as in evaluate.
+
+    :param propositions: the list of propositions
+    :param nominals: the list of nominals
+    :param assumptions: the list of assumptions
+    :param conclusions: the list of conclusions
+    :param grid_size: the size of the grid
+    :param max_trace_length: the maximal trace length
+    :param static_props: the propositions whose placement does not change over time
+    :return: the counterexample trace (None if there is none), the points at which it violates the conclusions,
+             and the number of traces explored
+    """
+    roots, successors, _, remaining_assumptions = motion_space(propositions, nominals, assumptions, grid_size,
+                                                               static_props)
+
+    return search(parse_counterexample_formula(remaining_assumptions, conclusions), prefix_checks(remaining_assumptions),
+                  roots, successors, grid_size, max_trace_length)
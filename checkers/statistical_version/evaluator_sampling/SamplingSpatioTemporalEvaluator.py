@@ -0,0 +1,193 @@
+import random
+from fractions import Fraction
+from statistics import NormalDist
+from typing import Iterator
+from checkers.SpatioTemporalEvaluatorUtils import satisfying_points
+from checkers.ConclusionCounting import parse_formula
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+
+# default number of sampled traces
+DEFAULT_SAMPLES: int = 10000
+
+# default seed of the random number generator
+DEFAULT_SEED: int = 0
+
+# default confidence level of the intervals
+DEFAULT_CONFIDENCE: float = 0.95
+
+
+def count_grids(props: list[str], noms: list[str], grid_size: tuple[int, int]) -> int:
+    """
+    Returns the number of grids over the given propositions and nominals (the length of generate_grids).
+
+    :param props: the set of propositions to be placed in the grids
+    :param noms: the set of nominals to be placed in the grids
+    :param grid_size: the dimensions of the grids
+    :return: the number of grids
+    """
+    size: int = grid_size[0] * grid_size[1]
+    return 2 ** (size * len(props)) * size ** len(noms)
+
+
+def count_traces(props: list[str], noms: list[str], grid_size: tuple[int, int], max_trace_length: int) -> int:
+    """
+    Returns the number of traces up to the given length (the number of traces of generate_traces).
+
+    :param props: the set of propositions to be placed in the trace grids
+    :param noms: the set of nominals to be placed in the trace grids
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :return: the number of traces
+    """
+    grid_count: int = count_grids(props, noms, grid_size)
+    return sum(grid_count ** length for length in range(1, max_trace_length + 1))
+
+
+def sample_grid(props: list[str], noms: list[str], points: list[tuple[int, int]], rng: random.Random) -> dict:
+    """
+    Draws a grid uniformly from the grids of generate_grids.
+
+    :param props: the set of propositions to be placed in the grid
+    :param noms: the set of nominals to be placed in the grid
+    :param points: the points of the grid
+    :param rng: the random number generator
+    :return: the grid
+    """
+    grid: dict = {}
+    for name in props:
+        mask: int = rng.getrandbits(len(points))
+        grid[name] = tuple(p for k, p in enumerate(points) if mask >> k & 1)
+    for name in noms:
+        grid[name] = points[rng.randrange(len(points))]
+    return grid
+
+
+def sample_traces(props: list[str], noms: list[str], grid_size: tuple[int, int], max_trace_length: int,
+                  rng: random.Random) -> Iterator[Trace]:
+    """
+    Draws traces uniformly from the traces of generate_traces: the length is drawn with probability proportional to
+    the number of traces of that length, then every proposition holds at every point with probability 1/2 and every
+    nominal is placed at a uniformly drawn point, independently for every grid.
+
+    :param props: the set of propositions to be placed in the trace grids
+    :param noms: the set of nominals to be placed in the trace grids
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param rng: the random number generator
+    :return: an endless stream of traces
+    """
+    points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+    grid_count: int = count_grids(props, noms, grid_size)
+    length_counts: list[int] = [grid_count ** length for length in range(1, max_trace_length + 1)]
+    total: int = sum(length_counts)
+
+    while True:
+        # draw the length by the number of traces of each length
+        r: int = rng.randrange(total)
+        length: int = 1
+        for count in length_counts:
+            if r < count:
+                break
+            r = r - count
+            length = length + 1
+
+        yield Trace.from_grids(tuple(sample_grid(props, noms, points, rng) for _ in range(length)))
+
+
+def wilson_interval(successes: int, samples: int, confidence: float) -> tuple[float, float]:
+    """
+    Returns the Wilson score interval of a binomial proportion.
+
+    :param successes: the number of successes
+    :param samples: the number of samples
+    :param confidence: the confidence level (e.g. 0.95)
+    :return: the lower and upper bound of the proportion
+    """
+    if samples == 0:
+        return 0.0, 1.0
+    z: float = NormalDist().inv_cdf((1 + confidence) / 2)
+    p: float = successes / samples
+    denominator: float = 1 + z * z / samples
+    center: float = (p + z * z / (2 * samples)) / denominator
+    margin: float = z * (p * (1 - p) / samples + z * z / (4 * samples * samples)) ** 0.5 / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def estimate(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces,
+             samples: int = DEFAULT_SAMPLES, seed: int = DEFAULT_SEED,
+             confidence: float = DEFAULT_CONFIDENCE) -> dict:
+    """
+    Estimates the fraction of traces on which the assumptions and conclusions hold at some point, and thereby #Sat,
+    from uniformly sampled traces. Among the sampled traces on which the assumptions hold at some point (i.e. traces
+    drawn from the distribution constrained by the assumptions), it also estimates the fraction on which the
+    conclusions hold at one of these points. The estimate only depends on the seed and the number of samples.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param show_traces: whether the satisfying traces should be shown in the console
+    :param samples: the number of traces to sample
+    :param seed: the seed of the random number generator
+    :param confidence: the confidence level of the intervals
+    :return: the number of traces ("traces"), of samples ("samples"), of samples satisfying the assumptions
+             ("assumption_samples") and of samples satisfying the assumptions and conclusions ("sat_samples"), and
+             the estimates with their intervals ("fraction", "fraction_interval", "sat", "sat_interval",
+             "conditional_fraction", "conditional_interval")
+    """
+    assumption_formula: HybridSpatioTemporalFormula = parse_formula(assumptions)
+    conclusion_formula: HybridSpatioTemporalFormula = parse_formula(conclusions)
+    trace_count: int = count_traces(props, noms, grid_size, max_trace_length)
+
+    counter_assumed: int = 0
+    counter_sat: int = 0
+    traces: Iterator[Trace] = sample_traces(props, noms, grid_size, max_trace_length, random.Random(seed))
+    for _ in range(samples):
+        t: Trace = next(traces)
+        assumption_points: list[tuple[int, int]] = satisfying_points(assumption_formula, t, grid_size)
+        if not assumption_points:
+            continue
+        counter_assumed = counter_assumed + 1
+
+        sat_points: list[tuple[int, int]] = [p for p in assumption_points
+                                             if conclusion_formula.evaluate(t, p, grid_size)]
+        if sat_points:
+            if show_traces:
+                print("\t |Satisfying sample #", counter_sat, " with satisfying points: ", sat_points)
+                print("\t |--------------------------------------------------------------------")
+                print("\t |", t, "\n")
+            counter_sat = counter_sat + 1
+
+    fraction_interval: tuple[float, float] = wilson_interval(counter_sat, samples, confidence)
+    return {"traces": trace_count, "samples": samples, "assumption_samples": counter_assumed,
+            "sat_samples": counter_sat,
+            "fraction": counter_sat / samples if samples else 0.0,
+            "fraction_interval": fraction_interval,
+            "sat": round(trace_count * Fraction(counter_sat, samples)) if samples else 0,
+            "sat_interval": tuple(round(trace_count * Fraction(bound)) for bound in fraction_interval),
+            "conditional_fraction": counter_sat / counter_assumed if counter_assumed else 0.0,
+            "conditional_interval": wilson_interval(counter_sat, counter_assumed, confidence)}
+
+
+def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces,
+             samples: int = DEFAULT_SAMPLES, seed: int = DEFAULT_SEED) -> (int, int):
+    """
+    Returns the estimated #Sat and the number of traces, like the exact checkers return #Sat and #Trace.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param show_traces: whether the satisfying traces should be shown in the console
+    :param samples: the number of traces to sample
+    :param seed: the seed of the random number generator
+    :return: the estimated number of satisfying traces and the number of traces
+    """
+    result: dict = estimate(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces,
+                            samples, seed)
+    return result["sat"], result["traces"]
@@ -0,0 +1,191 @@
+from typing import Iterator
+
+
+class BDD:
+    """
+    Minimal pure-Python manager for reduced ordered binary decision diagrams.
+
+    Nodes are represented by integers indexing the node table. The nodes 0 and 1 are the terminals "false" and
+    "true". Variables are identified by their position in the (fixed) variable order, 0 being the topmost variable.
+    """
+
+    FALSE: int = 0
+    TRUE: int = 1
+
+    # level of the terminals, below all variables
+    TERMINAL_LEVEL: int = 2 ** 62
+
+    def __init__(self):
+        # node table: node -> (variable, low successor, high successor)
+        self.nodes: list[tuple[int, int, int]] = [(BDD.TERMINAL_LEVEL, 0, 0), (BDD.TERMINAL_LEVEL, 1, 1)]
+        self.unique: dict[tuple[int, int, int], int] = {}
+        self.ite_cache: dict[tuple[int, int, int], int] = {}
+
+    def level(self, node: int) -> int:
+        """
+        Returns the variable a node branches on.
+
+        :param node: the BDD node
+        :return: the position of its variable in the variable order
+        """
+        return self.nodes[node][0]
+
+    def mk(self, var: int, low: int, high: int) -> int:
+        """
+        Returns the unique node branching on the given variable to the given successors.
+
+        :param var: the variable
+        :param low: the successor if the variable is false
+        :param high: the successor if the variable is true
+        :return: the (reduced, shared) node
+        """
+        if low == high:
+            return low
+        key: tuple[int, int, int] = (var, low, high)
+        node: int = self.unique.get(key, -1)
+        if node < 0:
+            node = len(self.nodes)
+            self.nodes.append(key)
+            self.unique[key] = node
+        return node
+
+    def var(self, var: int) -> int:
+        """
+        Returns the BDD of a single positive variable.
+
+        :param var: the variable
+        :return: the BDD node
+        """
+        return self.mk(var, BDD.FALSE, BDD.TRUE)
+
+    def nvar(self, var: int) -> int:
+        """
+        Returns the BDD of a single negated variable.
+
+        :param var: the variable
+        :return: the BDD node
+        """
+        return self.mk(var, BDD.TRUE, BDD.FALSE)
+
+    def cofactors(self, node: int, var: int) -> tuple[int, int]:
+        """
+        Returns the negative and positive cofactor of a node w.r.t. a variable at or above its level.
+
+        :param node: the BDD node
+        :param var: the variable
+        :return: the low and high cofactor
+        """
+        v, low, high = self.nodes[node]
+        if v == var:
+            return low, high
+        return node, node
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """
+        Computes the BDD of "if f then g else h".
+
+        :param f: the condition
+        :param g: the then-branch
+        :param h: the else-branch
+        :return: the resulting BDD node
+        """
+        if f == BDD.TRUE:
+            return g
+        if f == BDD.FALSE:
+            return h
+        if g == h:
+            return g
+        if g == BDD.TRUE and h == BDD.FALSE:
+            return f
+
+        key: tuple[int, int, int] = (f, g, h)
+        result: int = self.ite_cache.get(key, -1)
+        if result >= 0:
+            return result
+
+        var: int = min(self.nodes[f][0], self.nodes[g][0], self.nodes[h][0])
+        f0, f1 = self.cofactors(f, var)
+        g0, g1 = self.cofactors(g, var)
+        h0, h1 = self.cofactors(h, var)
+        result = self.mk(var, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self.ite_cache[key] = result
+        return result
+
+    def neg(self, f: int) -> int:
+        """
+        Computes the negation of a BDD.
+        """
+        return self.ite(f, BDD.FALSE, BDD.TRUE)
+
+    def conj(self, f: int, g: int) -> int:
+        """
+        Computes the conjunction of two BDDs.
+        """
+        return self.ite(f, g, BDD.FALSE)
+
+    def disj(self, f: int, g: int) -> int:
+        """
+        Computes the disjunction of two BDDs.
+        """
+        return self.ite(f, BDD.TRUE, g)
+
+    def iff(self, f: int, g: int) -> int:
+        """
+        Computes the bi-implication of two BDDs.
+        """
+        return self.ite(f, g, self.neg(g))
+
+    def count(self, f: int, num_vars: int) -> int:
+        """
+        Counts the satisfying assignments of a BDD over the first num_vars variables of the order.
+
+        :param f: the BDD node
+        :param num_vars: number of variables to count over; f must not depend on any later variable
+        :return: the number of satisfying assignments
+        """
+        cache: dict[int, int] = {}
+
+        def level(node: int) -> int:
+            return num_vars if node <= BDD.TRUE else self.nodes[node][0]
+
+        def paths(node: int) -> int:
+            # number of satisfying assignments of the variables from level(node) to num_vars
+            if node == BDD.FALSE:
+                return 0
+            if node == BDD.TRUE:
+                return 1
+            if node in cache:
+                return cache[node]
+            var, low, high = self.nodes[node]
+            result: int = (paths(low) << (level(low) - var - 1)) + (paths(high) << (level(high) - var - 1))
+            cache[node] = result
+            return result
+
+        return paths(f) << level(f)
+
+    def assignments(self, f: int, num_vars: int) -> Iterator[list[bool]]:
+        """
+        Enumerates all satisfying assignments of a BDD over the first num_vars variables of the order.
+
+        :param f: the BDD node
+        :param num_vars: number of variables to enumerate; f must not depend on any later variable
+        :return: generator of full assignments, as lists of booleans indexed by variable
+        """
+        assignment: list[bool] = [False] * num_vars
+
+        def expand(node: int, var: int) -> Iterator[list[bool]]:
+            if node == BDD.FALSE:
+                return
+            if var == num_vars:
+                yield list(assignment)
+                return
+            if node != BDD.TRUE and self.nodes[node][0] == var:
+                _, low, high = self.nodes[node]
+            else:
+                low, high = node, node
+            assignment[var] = False
+            yield from expand(low, var + 1)
+            assignment[var] = True
+            yield from expand(high, var + 1)
+
+        yield from expand(f, 0)
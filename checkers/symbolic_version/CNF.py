@@ -0,0 +1,131 @@
+from typing import Iterable
+
+
+class CNFBuilder:
+    """
+    Builds a formula in conjunctive normal form from boolean operations by Tseitin encoding.
+
+    The builder offers the same operations as the BDD manager, so that it can be used with the symbolic encoding.
+    Boolean functions are represented by DIMACS literals: variable i of the symbolic encoding is DIMACS variable
+    i + 1, and every gate introduces a fresh variable above the encoding variables. Gates are shared by hash-consing.
+    """
+
+    def __init__(self, num_vars: int):
+        self.num_inputs = num_vars
+
+        # a dedicated variable that is constrained to be true represents the constants
+        self.TRUE: int = num_vars + 1
+        self.FALSE: int = -self.TRUE
+        self.num_vars: int = num_vars + 1
+        self.clauses: list[list[int]] = [[self.TRUE]]
+        self.gates: dict[tuple[str, int, int], int] = {}
+
+    def fresh(self) -> int:
+        """
+        Allocates a fresh gate variable.
+
+        :return: the new DIMACS variable
+        """
+        self.num_vars += 1
+        return self.num_vars
+
+    def var(self, var: int) -> int:
+        """
+        Returns the literal of an encoding variable.
+
+        :param var: the encoding variable
+        :return: the positive DIMACS literal
+        """
+        return var + 1
+
+    def nvar(self, var: int) -> int:
+        """
+        Returns the negated literal of an encoding variable.
+
+        :param var: the encoding variable
+        :return: the negative DIMACS literal
+        """
+        return -(var + 1)
+
+    def neg(self, f: int) -> int:
+        """
+        Computes the negation of a literal.
+        """
+        return -f
+
+    def conj(self, f: int, g: int) -> int:
+        """
+        Computes a literal equivalent to the conjunction of two literals.
+        """
+        if f == self.FALSE or g == self.FALSE or f == -g:
+            return self.FALSE
+        if f == self.TRUE or f == g:
+            return g
+        if g == self.TRUE:
+            return f
+
+        key: tuple[str, int, int] = ("and", min(f, g), max(f, g))
+        if key in self.gates:
+            return self.gates[key]
+        out: int = self.fresh()
+        self.clauses.append([-out, f])
+        self.clauses.append([-out, g])
+        self.clauses.append([out, -f, -g])
+        self.gates[key] = out
+        return out
+
+    def disj(self, f: int, g: int) -> int:
+        """
+        Computes a literal equivalent to the disjunction of two literals.
+        """
+        return -self.conj(-f, -g)
+
+    def iff(self, f: int, g: int) -> int:
+        """
+        Computes a literal equivalent to the bi-implication of two literals.
+        """
+        if f == g:
+            return self.TRUE
+        if f == -g:
+            return self.FALSE
+        if f == self.TRUE or f == self.FALSE:
+            return g if f == self.TRUE else -g
+        if g == self.TRUE or g == self.FALSE:
+            return f if g == self.TRUE else -f
+
+        key: tuple[str, int, int] = ("iff", min(f, g), max(f, g))
+        if key in self.gates:
+            return self.gates[key]
+        out: int = self.fresh()
+        self.clauses.append([-out, -f, g])
+        self.clauses.append([-out, f, -g])
+        self.clauses.append([out, f, g])
+        self.clauses.append([out, -f, -g])
+        self.gates[key] = out
+        return out
+
+    def problem(self, roots: Iterable[int]) -> list[list[int]]:
+        """
+        Returns the clauses asserting that all given literals are true.
+
+        :param roots: the literals to assert
+        :return: the list of clauses
+        """
+        return self.clauses + [[r] for r in roots]
+
+
+def write_dimacs(path: str, num_vars: int, clauses: list[list[int]], comments: list[str] = ()):
+    """
+    Writes a CNF formula in DIMACS format.
+
+    :param path: the output file
+    :param num_vars: the number of variables
+    :param clauses: the list of clauses
+    :param comments: comment lines written into the header
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for c in comments:
+            f.write(f"c {c}\n")
+        f.write(f"p cnf {num_vars} {len(clauses)}\n")
+        for clause in clauses:
+            f.write(" ".join(str(lit) for lit in clause) + " 0\n")
@@ -0,0 +1,206 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Optional
+
+from checkers.symbolic_version.CNF import write_dimacs
+
+# SAT solvers that are used if installed, in order of preference
+KNOWN_SOLVERS: list[str] = ["kissat", "cadical", "glucose", "cryptominisat5", "lingeling", "picosat", "minisat"]
+
+
+def find_solver() -> Optional[str]:
+    """
+    Returns the path of the first known SAT solver that is installed.
+
+    :return: the path of the solver executable, or None if no solver is installed
+    """
+    for name in KNOWN_SOLVERS:
+        path: Optional[str] = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def solve_bundled(num_vars: int, clauses: list[list[int]]) -> Optional[list[bool]]:
+    """
+    Decides satisfiability with the bundled solver, a DPLL procedure with two watched literals per clause,
+    unit propagation, and decisions on the most frequently occurring unassigned variable.
+
+    :param num_vars: the number of variables
+    :param clauses: the list of clauses over the variables 1..num_vars
+    :return: a satisfying assignment indexed by variable (index 0 is unused), or None if unsatisfiable
+    """
+    # assignment per variable: None (unassigned), True or False
+    value: list[Optional[bool]] = [None] * (num_vars + 1)
+
+    def lit_value(lit: int) -> Optional[bool]:
+        v: Optional[bool] = value[abs(lit)]
+        if v is None:
+            return None
+        return v if lit > 0 else not v
+
+    # remove duplicate literals and tautologies, collect unit clauses
+    normalized: list[list[int]] = []
+    units: list[int] = []
+    for clause in clauses:
+        lits: list[int] = list(dict.fromkeys(clause))
+        if any(-lit in lits for lit in lits):
+            continue
+        if not lits:
+            return None
+        if len(lits) == 1:
+            units.append(lits[0])
+        else:
+            normalized.append(lits)
+
+    watches: dict[int, list[int]] = {}
+    for index, clause in enumerate(normalized):
+        watches.setdefault(clause[0], []).append(index)
+        watches.setdefault(clause[1], []).append(index)
+
+    occurrences: list[int] = [0] * (num_vars + 1)
+    for clause in normalized:
+        for lit in clause:
+            occurrences[abs(lit)] += 1
+    order: list[int] = sorted(range(1, num_vars + 1), key=lambda v: -occurrences[v])
+
+    trail: list[int] = []
+
+    def assign(lit: int) -> bool:
+        current: Optional[bool] = lit_value(lit)
+        if current is not None:
+            return current
+        value[abs(lit)] = lit > 0
+        trail.append(lit)
+        return True
+
+    def propagate(start: int) -> bool:
+        head: int = start
+        while head < len(trail):
+            false_lit: int = -trail[head]
+            head += 1
+            watching: list[int] = watches.get(false_lit, [])
+            i: int = 0
+            while i < len(watching):
+                clause: list[int] = normalized[watching[i]]
+                # keep the falsified watch in the second position
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if lit_value(clause[0]) is True:
+                    i += 1
+                    continue
+                # look for a new literal to watch
+                for k in range(2, len(clause)):
+                    if lit_value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches.setdefault(clause[1], []).append(watching[i])
+                        watching[i] = watching[-1]
+                        watching.pop()
+                        break
+                else:
+                    # clause is unit or conflicting
+                    if not assign(clause[0]):
+                        return False
+                    i += 1
+        return True
+
+    for lit in units:
+        if not assign(lit):
+            return None
+    if not propagate(0):
+        return None
+
+    # decision stack: (trail position before the decision, decided literal, whether the other branch was tried)
+    decisions: list[tuple[int, int, bool]] = []
+    next_var: int = 0
+
+    while True:
+        while next_var < len(order) and value[order[next_var]] is not None:
+            next_var += 1
+        if next_var == len(order):
+            return [False] + [bool(v) for v in value[1:]]
+
+        var: int = order[next_var]
+        decisions.append((len(trail), var, False))
+        assign(var)
+        ok: bool = propagate(len(trail) - 1)
+
+        while not ok:
+            # backtrack to the last decision whose other branch has not been tried
+            while decisions and decisions[-1][2]:
+                decisions.pop()
+            if not decisions:
+                return None
+            position, decided, _ = decisions.pop()
+            for lit in trail[position:]:
+                value[abs(lit)] = None
+            del trail[position:]
+            next_var = 0
+            decisions.append((position, decided, True))
+            assign(-decided)
+            ok = propagate(len(trail) - 1)
+
+
+def solve_external(solver: str, num_vars: int, clauses: list[list[int]]) -> Optional[list[bool]]:
+    """
+    Decides satisfiability with an installed SAT solver, via a temporary DIMACS file.
+
+    :param solver: the path or name of the solver executable
+    :param num_vars: the number of variables
+    :param clauses: the list of clauses over the variables 1..num_vars
+    :return: a satisfying assignment indexed by variable (index 0 is unused), or None if unsatisfiable
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        cnf_path: str = os.path.join(tmp, "problem.cnf")
+        out_path: str = os.path.join(tmp, "result.txt")
+        write_dimacs(cnf_path, num_vars, clauses)
+
+        if os.path.basename(solver).startswith("minisat"):
+            # minisat writes the result into a file instead of the standard output
+            subprocess.run([solver, cnf_path, out_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            with open(out_path, "r", encoding="utf-8") as f:
+                lines: list[str] = f.read().split("\n")
+            if not lines or lines[0].strip() != "SAT":
+                return None
+            literals: list[str] = " ".join(lines[1:]).split()
+        else:
+            # competition output format: "s SATISFIABLE" followed by "v" lines with the model
+            output: str = subprocess.run([solver, cnf_path], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                         text=True).stdout
+            status: list[str] = [line for line in output.split("\n") if line.startswith("s ")]
+            if not status or status[0].split()[1] != "SATISFIABLE":
+                if status and status[0].split()[1] == "UNSATISFIABLE":
+                    return None
+                raise RuntimeError(f"Unexpected output of SAT solver {solver}")
+            literals: list[str] = [x for line in output.split("\n") if line.startswith("v ") for x in line.split()[1:]]
+
+    model: list[bool] = [False] * (num_vars + 1)
+    for x in literals:
+        lit: int = int(x)
+        if lit != 0 and abs(lit) <= num_vars:
+            model[abs(lit)] = lit > 0
+    return model
+
+
+def solve(num_vars: int, clauses: list[list[int]], solver: Optional[str] = None) -> Optional[list[bool]]:
+    """
+    Decides satisfiability with the given or an installed SAT solver, falling back to the bundled solver.
+
+    :param num_vars: the number of variables
+    :param clauses: the list of clauses over the variables 1..num_vars
+    :param solver: name or path of the solver to use, "bundled" for the bundled solver, or None to pick an
+                   installed solver automatically
+    :return: a satisfying assignment indexed by variable (index 0 is unused), or None if unsatisfiable
+    """
+    if solver is None:
+        solver = find_solver()
+    elif solver != "bundled":
+        solver = shutil.which(solver)
+        if solver is None:
+            raise FileNotFoundError("SAT solver not found.")
+
+    if solver is None or solver == "bundled":
+        return solve_bundled(num_vars, clauses)
+    return solve_external(solver, num_vars, clauses)
@@ -0,0 +1,279 @@
+from math import ceil, log2
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.ClassicalLogicFormula import Verum, Falsum, Prop, Not, And, Or, If, Iff, NaryAnd, NaryOr
+from formula_types.HybridFormula import Nom, At, Bind
+from formula_types.SpatialFormula import Front, Back, Left, Right
+from formula_types.TemporalFormula import Next, Eventually, Always, Until
+
+# point offsets of the spatial operators (same conventions as formula_types.SpatialFormula)
+SPATIAL_OFFSETS: dict[type, tuple[int, int]] = {
+    Front: (-1, 0),
+    Back: (1, 0),
+    Left: (0, -1),
+    Right: (0, 1),
+}
+
+
+class SymbolicEncoding:
+    """
+    Encodes grid states as boolean variables and unrolls hybrid spatio-temporal formulas over a bounded number of
+    time steps into boolean functions over these variables.
+
+    The encoding is generic in the boolean manager, which must provide the constants TRUE and FALSE and the
+    operations var, nvar, neg, conj, disj and iff (e.g. a BDD manager or a circuit builder for CNF).
+
+    Variables are allocated time-major: all variables of time step t precede those of time step t + 1, so the
+    variables of traces of length l are exactly the first l * vars_per_step variables.
+    """
+
+    def __init__(self, manager, props: list[str], noms: list[str], grid_size: tuple[int, int], max_trace_length: int,
+                 nominal_encoding: str = "binary"):
+        if nominal_encoding not in ("binary", "onehot"):
+            raise ValueError(f"Unknown nominal encoding {nominal_encoding}")
+
+        self.manager = manager
+        self.props = props
+        self.noms = noms
+        self.grid_size = grid_size
+        self.max_trace_length = max_trace_length
+        self.nominal_encoding = nominal_encoding
+
+        self.points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+        self.num_cells: int = len(self.points)
+
+        # number of variables per nominal and time step
+        if nominal_encoding == "binary":
+            self.nominal_bits: int = max(1, ceil(log2(self.num_cells)))
+        else:
+            self.nominal_bits: int = self.num_cells
+
+        self.vars_per_step: int = len(noms) * self.nominal_bits + len(props) * self.num_cells
+        self.num_vars: int = self.vars_per_step * max_trace_length
+
+        self.nominal_cache: dict[tuple[str, int, tuple[int, int]], int] = {}
+        self.memo: dict[tuple, int] = {}
+
+    def cell_index(self, point: tuple[int, int]) -> int:
+        """
+        Returns the index of a grid cell.
+
+        :param point: the grid cell
+        :return: the row-major index of the cell
+        """
+        return point[0] * self.grid_size[1] + point[1]
+
+    def nominal_var(self, name: str, time: int, bit: int) -> int:
+        """
+        Returns the variable of one bit (binary encoding) or one cell (one-hot encoding) of a nominal.
+
+        :param name: the nominal
+        :param time: the time step
+        :param bit: the bit or cell index
+        :return: the variable index
+        """
+        return time * self.vars_per_step + self.noms.index(name) * self.nominal_bits + bit
+
+    def prop_var(self, name: str, time: int, point: tuple[int, int]) -> int:
+        """
+        Returns the variable stating that a proposition holds at a cell.
+
+        :param name: the proposition
+        :param time: the time step
+        :param point: the grid cell
+        :return: the variable index
+        """
+        return (time * self.vars_per_step + len(self.noms) * self.nominal_bits + self.props.index(name) *
+                self.num_cells + self.cell_index(point))
+
+    def nominal_at(self, name: str, time: int, point: tuple[int, int]) -> int:
+        """
+        Returns the boolean function stating that a nominal is placed at a cell.
+
+        :param name: the nominal
+        :param time: the time step
+        :param point: the grid cell
+        :return: the boolean function
+        """
+        key: tuple[str, int, tuple[int, int]] = (name, time, point)
+        if key in self.nominal_cache:
+            return self.nominal_cache[key]
+
+        m = self.manager
+        index: int = self.cell_index(point)
+        if self.nominal_encoding == "onehot":
+            # exactly-one is enforced by the validity constraint
+            result: int = m.var(self.nominal_var(name, time, index))
+        else:
+            result: int = m.TRUE
+            for bit in reversed(range(self.nominal_bits)):
+                value: bool = (index >> (self.nominal_bits - 1 - bit)) & 1 == 1
+                var: int = self.nominal_var(name, time, bit)
+                result = m.conj(m.var(var) if value else m.nvar(var), result)
+
+        self.nominal_cache[key] = result
+        return result
+
+    def valid(self, length: int) -> int:
+        """
+        Returns the boolean function stating that every nominal is placed at exactly one cell in the first
+        length time steps.
+
+        :param length: the trace length
+        :return: the boolean function
+        """
+        m = self.manager
+        result: int = m.TRUE
+        for time in reversed(range(length)):
+            for name in reversed(self.noms):
+                if self.nominal_encoding == "binary" and 2 ** self.nominal_bits == self.num_cells:
+                    continue
+                somewhere: int = m.FALSE
+                for point in reversed(self.points):
+                    cell: int = self.nominal_at(name, time, point)
+                    if self.nominal_encoding == "onehot":
+                        for other in self.points:
+                            if other != point:
+                                cell = m.conj(cell, m.nvar(self.nominal_var(name, time, self.cell_index(other))))
+                    somewhere = m.disj(cell, somewhere)
+                result = m.conj(somewhere, result)
+        return result
+
+    def trace_count(self, length: int) -> int:
+        """
+        Returns the number of traces of exactly the given length.
+
+        :param length: the trace length
+        :return: the number of traces
+        """
+        return (self.num_cells ** len(self.noms) * 2 ** (self.num_cells * len(self.props))) ** length
+
+    def encode(self, fml: HybridSpatioTemporalFormula, time: int, point: tuple[int, int], length: int,
+               env: tuple = ()) -> int:
+        """
+        Encodes the truth of a formula at a time step and cell on traces of the given length.
+
+        :param fml: the formula
+        :param time: the time step
+        :param point: the grid cell
+        :param length: the trace length
+        :param env: the cells of the nominals bound by enclosing binders, as a sorted tuple of (name, cell) pairs
+        :return: the boolean function
+        """
+        key: tuple = (id(fml), time, point, length, env)
+        if key in self.memo:
+            return self.memo[key]
+
+        m = self.manager
+        bound: dict = dict(env)
+
+        if isinstance(fml, Verum):
+            result: int = m.TRUE
+        elif isinstance(fml, Falsum):
+            result: int = m.FALSE
+        elif isinstance(fml, Prop):
+            result: int = m.var(self.prop_var(fml.name, time, point))
+        elif isinstance(fml, Nom):
+            if fml.name in bound:
+                result: int = m.TRUE if bound[fml.name] == point else m.FALSE
+            else:
+                result: int = self.nominal_at(fml.name, time, point)
+        elif isinstance(fml, Not):
+            result: int = m.neg(self.encode(fml.operand, time, point, length, env))
+        elif isinstance(fml, (And, NaryAnd)):
+            result: int = m.TRUE
+            for x in ([fml.left, fml.right] if isinstance(fml, And) else fml.operands):
+                result = m.conj(result, self.encode(x, time, point, length, env))
+                if result == m.FALSE:
+                    break
+        elif isinstance(fml, (Or, NaryOr)):
+            result: int = m.FALSE
+            for x in ([fml.left, fml.right] if isinstance(fml, Or) else fml.operands):
+                result = m.disj(result, self.encode(x, time, point, length, env))
+                if result == m.TRUE:
+                    break
+        elif isinstance(fml, If):
+            result: int = m.disj(m.neg(self.encode(fml.left, time, point, length, env)),
+                                 self.encode(fml.right, time, point, length, env))
+        elif isinstance(fml, Iff):
+            result: int = m.iff(self.encode(fml.left, time, point, length, env),
+                                self.encode(fml.right, time, point, length, env))
+        elif isinstance(fml, tuple(SPATIAL_OFFSETS.keys())):
+            dx, dy = SPATIAL_OFFSETS[type(fml)]
+            neighbor: tuple[int, int] = (point[0] + dx, point[1] + dy)
+            if 0 <= neighbor[0] < self.grid_size[0] and 0 <= neighbor[1] < self.grid_size[1]:
+                result: int = self.encode(fml.operand, time, neighbor, length, env)
+            else:
+                result: int = m.FALSE
+        elif isinstance(fml, At):
+            if fml.name in bound:
+                result: int = self.encode(fml.operand, time, bound[fml.name], length, env)
+            else:
+                result: int = m.FALSE
+                for cell in self.points:
+                    result = m.disj(result, m.conj(self.nominal_at(fml.name, time, cell),
+                                                   self.encode(fml.operand, time, cell, length, env)))
+        elif isinstance(fml, Bind):
+            bound[fml.name] = point
+            result: int = self.encode(fml.operand, time, point, length, tuple(sorted(bound.items())))
+        elif isinstance(fml, Next):
+            if time + 1 >= length:
+                result: int = m.FALSE
+            else:
+                result: int = self.encode(fml.operand, time + 1, point, length, env)
+        elif isinstance(fml, Always):
+            result: int = self.encode(fml.operand, time, point, length, env)
+            if time < length - 1:
+                result = m.conj(result, self.encode(fml, time + 1, point, length, env))
+        elif isinstance(fml, Eventually):
+            result: int = self.encode(fml.operand, time, point, length, env)
+            if time < length - 1:
+                result = m.disj(result, self.encode(fml, time + 1, point, length, env))
+        elif isinstance(fml, Until):
+            result: int = self.encode(fml.right, time, point, length, env)
+            if time < length - 1:
+                result = m.disj(result, m.conj(self.encode(fml.left, time, point, length, env),
+                                               self.encode(fml, time + 1, point, length, env)))
+        else:
+            raise ValueError(f"Unsupported formula {fml}")
+
+        self.memo[key] = result
+        return result
+
+    def encode_somewhere(self, fml: HybridSpatioTemporalFormula, length: int) -> int:
+        """
+        Encodes that a formula holds at time 0 at some cell of the grid, on traces of the given length.
+
+        :param fml: the formula
+        :param length: the trace length
+        :return: the boolean function
+        """
+        m = self.manager
+        result: int = m.FALSE
+        for point in self.points:
+            result = m.disj(result, self.encode(fml, 0, point, length))
+        return result
+
+    def decode(self, assignment: list[bool], length: int) -> list[dict]:
+        """
+        Decodes a variable assignment into a trace.
+
+        :param assignment: the assignment, indexed by variable
+        :param length: the trace length
+        :return: the trace, in the format of the enumerating checkers
+        """
+        trace: list[dict] = []
+        for time in range(length):
+            grid: dict = {}
+            for name in self.props:
+                grid[name] = [p for p in self.points if assignment[self.prop_var(name, time, p)]]
+            for name in self.noms:
+                bits: list[bool] = [assignment[self.nominal_var(name, time, b)] for b in range(self.nominal_bits)]
+                if self.nominal_encoding == "binary":
+                    index: int = 0
+                    for b in bits:
+                        index = 2 * index + int(b)
+                else:
+                    index: int = bits.index(True)
+                grid[name] = self.points[index]
+            trace.append(grid)
+        return trace
@@ -0,0 +1,70 @@
+import sys
+from checkers.SpatioTemporalEvaluatorUtils import satisfying_points
+from checkers.symbolic_version.BDD import BDD
+from checkers.symbolic_version.SymbolicEncoding import SymbolicEncoding
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.FormulaSimplifier import simplify_with_report
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+# the BDD operations recurse once per variable, and the unrolling once per time step
+RECURSION_LIMIT: int = 100000
+
+
+def evaluate(props, noms, assumptions, conclusions, grid_size, max_trace_length, show_traces,
+             nominal_encoding: str = "binary") -> (int, int):
+    """
+    Counts the traces on which the conjunction of assumptions and conclusions holds at some point, without
+    enumerating them: the formula is unrolled for every trace length into a binary decision diagram over the
+    boolean grid state variables, and the satisfying traces are counted by BDD model counting.
+    The trace space is the same as the one of the baseline checker.
+
+    :param props: the set of propositions used in the formula
+    :param noms: the set of nominals used in the formula
+    :param assumptions: list of assumptions that hold
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length the traces should be
+    :param show_traces: whether the satisfying traces should be shown in the console
+    :param nominal_encoding: encoding of nominal positions, either "binary" or "onehot"
+    :return: the number of satisfying traces and the number of traces
+    """
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), RECURSION_LIMIT))
+
+    # conjunction of assumptions and conclusion
+    input_formula_string: str = "&".join([*("(" + x + ")" for x in conclusions), *("(" + x + ")" for x in assumptions)])
+
+    # parse the input formula
+    parsed_formula: HybridSpatioTemporalFormula = HybridSpatioTemporalParser(tokenize(input_formula_string)).parse()
+
+    # simplify the input formula before encoding it
+    size_before: int
+    size_after: int
+    parsed_formula, size_before, size_after = simplify_with_report(parsed_formula)
+
+    if show_traces:
+        print("\t |Simplified input formula from", size_before, "to", size_after, "nodes")
+
+    manager: BDD = BDD()
+    encoding: SymbolicEncoding = SymbolicEncoding(manager, props, noms, grid_size, max_trace_length, nominal_encoding)
+
+    counter_sat: int = 0
+    counter_gen: int = 0
+
+    for length in range(1, max_trace_length + 1):
+        num_vars: int = length * encoding.vars_per_step
+        sat: int = manager.conj(encoding.valid(length), encoding.encode_somewhere(parsed_formula, length))
+
+        if show_traces:
+            for assignment in manager.assignments(sat, num_vars):
+                t: list[dict] = encoding.decode(assignment, length)
+                print("\t |Satisfying trace #", counter_sat, " with satisfying points: ",
+                      satisfying_points(parsed_formula, t, grid_size))
+                print("\t |--------------------------------------------------------------------")
+                print("\t |", t, "\n")
+                counter_sat = counter_sat + 1
+        else:
+            counter_sat = counter_sat + manager.count(sat, num_vars)
+
+        counter_gen = counter_gen + encoding.trace_count(length)
+
+    return counter_sat, counter_gen
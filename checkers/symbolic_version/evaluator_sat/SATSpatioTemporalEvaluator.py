@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+from typing import Optional
+from checkers.SpatioTemporalEvaluatorUtils import satisfying_points
+from checkers.symbolic_version.CNF import CNFBuilder, write_dimacs
+from checkers.symbolic_version.SATSolver import solve
+from checkers.symbolic_version.SymbolicEncoding import SymbolicEncoding
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.FormulaSimplifier import simplify
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+# the unrolling recurses once per time step and subformula
+RECURSION_LIMIT: int = 100000
+
+
+def dimacs_path_for_length(dimacs_path: str, length: int, max_trace_length: int) -> str:
+    """
+    Returns the DIMACS output file for one trace length.
+
+    :param dimacs_path: the requested output file
+    :param length: the trace length
+    :param max_trace_length: the maximal trace length
+    :return: the output file, with the length inserted before the suffix if several lengths are checked
+    """
+    if max_trace_length == 1:
+        return dimacs_path
+    path: Path = Path(dimacs_path)
+    return str(path.with_name(f"{path.stem}_len{length}{path.suffix}"))
+
+
+def check_validity(props: list[str], noms: list[str], assumptions: list[str], conclusions: list[str],
+                   grid_size: tuple[int, int], max_trace_length: int, dimacs_path: Optional[str] = None,
+                   solver: Optional[str] = None) -> tuple[Optional[list[dict]], list[tuple[int, int]]]:
+    """
+    Checks whether the conclusions follow from the assumptions on all traces up to the given length, i.e. whether
+    every point of every trace that satisfies all assumptions also satisfies all conclusions.
+
+    For every trace length, the assumptions, the negated conclusions and the grid semantics are encoded into CNF.
+    A satisfying assignment is a counterexample, which is decoded back into a trace.
+
+    :param props: the set of propositions used in the formulas
+    :param noms: the set of nominals used in the formulas
+    :param assumptions: list of assumptions
+    :param conclusions: list of conclusions to check
+    :param grid_size: the dimensions of the grid the traces are build on
+    :param max_trace_length: the maximal length of the traces
+    :param dimacs_path: if given, the CNF of every trace length is written to this file in DIMACS format
+    :param solver: name or path of the SAT solver, "bundled" for the bundled solver, or None to pick an installed
+                   solver automatically
+    :return: a counterexample trace and the points at which it violates the conclusions, or (None, []) if the
+             conclusions follow from the assumptions
+    """
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), RECURSION_LIMIT))
+
+    # assumptions ∧ ¬conclusions
+    assumption_string: str = "&".join(["(" + x + ")" for x in assumptions]) if assumptions else "1"
+    conclusion_string: str = "&".join(["(" + x + ")" for x in conclusions]) if conclusions else "1"
+    counterexample_formula: HybridSpatioTemporalFormula = simplify(HybridSpatioTemporalParser(
+        tokenize("({}) & !({})".format(assumption_string, conclusion_string))).parse())
+
+    for length in range(1, max_trace_length + 1):
+        encoding: SymbolicEncoding = SymbolicEncoding(None, props, noms, grid_size, length)
+        num_vars: int = encoding.num_vars
+        builder: CNFBuilder = CNFBuilder(num_vars)
+        encoding.manager = builder
+
+        roots: list[int] = [encoding.valid(length), encoding.encode_somewhere(counterexample_formula, length)]
+        clauses: list[list[int]] = builder.problem(roots)
+
+        if dimacs_path:
+            write_dimacs(dimacs_path_for_length(dimacs_path, length, max_trace_length), builder.num_vars, clauses,
+                         [f"bounded counterexample search, trace length {length}, grid {grid_size}",
+                          f"variables 1..{num_vars} encode the grid states, "
+                          f"{encoding.vars_per_step} variables per time step"])
+
+        model: Optional[list[bool]] = solve(builder.num_vars, clauses, solver)
+        if model is not None:
+            trace: list[dict] = encoding.decode(model[1:num_vars + 1], length)
+            return trace, satisfying_points(counterexample_formula, trace, grid_size)
+
+    return None, []
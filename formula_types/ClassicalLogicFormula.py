@@ -2,6 +2,7 @@ from formula_types.HybridFormula import Nom
 from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula, memoize
 from formula_types.UnaryFormula import UnaryFormula
 from formula_types.BinaryFormula import BinaryFormula
+from formula_types.NaryFormula import NaryFormula
 
 
 class Verum(HybridSpatioTemporalFormula):
@@ -141,3 +142,58 @@ class Or(BinaryFormula):
                                                                                                                 point,
                                                                                                                 grid_size,
                                                                                                                 memo)
+
+
+# --------------------------------------------------------------------------
+# n-ary operators
+# --------------------------------------------------------------------------
+
+
+class NaryAnd(NaryFormula):
+    """
+       Class for logical conjunction of an arbitrary number of operands.
+    """
+    def __init__(self, op, operands):
+        super().__init__(op, operands)
+        self.operator_string = "∧"
+
+    @memoize
+    def evaluate_memoized(self, trace, time, point, grid_size,
+                          memo: dict[tuple[HybridSpatioTemporalFormula, int], bool]) -> bool:
+        if not self.counting:
+            for operand in self.operands:
+                if not operand.evaluate_memoized(trace, time, point, grid_size, memo):
+                    return False
+            return True
+
+        for i, operand in enumerate(self.operands):
+            self.evaluations[i] += 1
+            if not operand.evaluate_memoized(trace, time, point, grid_size, memo):
+                self.decisions[i] += 1
+                return False
+        return True
+
+
+class NaryOr(NaryFormula):
+    """
+       Class for logical disjunction of an arbitrary number of operands.
+    """
+    def __init__(self, op, operands):
+        super().__init__(op, operands)
+        self.operator_string = "|"
+
+    @memoize
+    def evaluate_memoized(self, trace, time, point, grid_size,
+                          memo: dict[tuple[HybridSpatioTemporalFormula, int], bool]) -> bool:
+        if not self.counting:
+            for operand in self.operands:
+                if operand.evaluate_memoized(trace, time, point, grid_size, memo):
+                    return True
+            return False
+
+        for i, operand in enumerate(self.operands):
+            self.evaluations[i] += 1
+            if operand.evaluate_memoized(trace, time, point, grid_size, memo):
+                self.decisions[i] += 1
+                return True
+        return False
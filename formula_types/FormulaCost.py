@@ -0,0 +1,160 @@
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.ClassicalLogicFormula import Verum, Falsum, Prop, Not, And, Or, If, Iff, NaryAnd, NaryOr
+from formula_types.HybridFormula import Nom, At, Bind
+from formula_types.SpatialFormula import Front, Back, Left, Right
+from formula_types.TemporalFormula import Next, Eventually, Always, Until
+from formula_types.NaryFormula import NaryFormula
+from formula_types.FormulaUtils import subformulas
+
+# number of time steps a temporal operator is assumed to inspect
+TEMPORAL_HORIZON: int = 3
+
+# extra cost of a binder, which copies the trace
+BIND_COST: float = 4
+
+# probability that a spatial or next operator does not leave the grid/trace
+STEP_PROBABILITY: float = 0.8
+
+# probability that a nominal holds at the evaluated point
+NOMINAL_PROBABILITY: float = 0.25
+
+# number of evaluated traces after which the checkers adapt the operand order
+ADAPT_INTERVAL: int = 1000
+
+# the decision rates are only counted in every ADAPT_SAMPLE_PERIOD-th interval (starting with the one after the first
+# call of adapt_order)
+ADAPT_SAMPLE_PERIOD: int = 10
+
+# weight (in number of evaluations) of the static estimate when adapting to observed decision rates
+PRIOR_WEIGHT: int = 10
+
+
+def estimate_cost(fml: HybridSpatioTemporalFormula) -> float:
+    """
+    Estimates the number of node evaluations needed to evaluate a formula at one time instance and point.
+
+    :param fml: logical formula
+    :return: the estimated evaluation cost
+    """
+    if isinstance(fml, (Verum, Falsum, Prop, Nom)):
+        return 1
+    elif isinstance(fml, (Not, Next, At, Front, Back, Left, Right)):
+        return 1 + estimate_cost(fml.operand)
+    elif isinstance(fml, Bind):
+        return 1 + BIND_COST + estimate_cost(fml.operand)
+    elif isinstance(fml, (Always, Eventually)):
+        return 1 + TEMPORAL_HORIZON * estimate_cost(fml.operand)
+    elif isinstance(fml, Until):
+        return 1 + TEMPORAL_HORIZON * (estimate_cost(fml.left) + estimate_cost(fml.right))
+    elif isinstance(fml, Iff):
+        return 1 + 2 * (estimate_cost(fml.left) + estimate_cost(fml.right))
+    elif isinstance(fml, (And, Or, If)):
+        return 1 + estimate_cost(fml.left) + estimate_cost(fml.right)
+    elif isinstance(fml, NaryFormula):
+        return 1 + sum(estimate_cost(x) for x in fml.operands)
+    else:
+        return 1
+
+
+def estimate_probability(fml: HybridSpatioTemporalFormula) -> float:
+    """
+    Estimates the probability that a formula holds on a random trace at a random point, assuming
+    independent atomic formulas.
+
+    :param fml: logical formula
+    :return: the estimated probability
+    """
+    if isinstance(fml, Verum):
+        return 1
+    elif isinstance(fml, Falsum):
+        return 0
+    elif isinstance(fml, Prop):
+        return 0.5
+    elif isinstance(fml, Nom):
+        return NOMINAL_PROBABILITY
+    elif isinstance(fml, Not):
+        return 1 - estimate_probability(fml.operand)
+    elif isinstance(fml, (Next, Front, Back, Left, Right)):
+        return STEP_PROBABILITY * estimate_probability(fml.operand)
+    elif isinstance(fml, (At, Bind)):
+        return estimate_probability(fml.operand)
+    elif isinstance(fml, Always):
+        return estimate_probability(fml.operand) ** TEMPORAL_HORIZON
+    elif isinstance(fml, Eventually):
+        return 1 - (1 - estimate_probability(fml.operand)) ** TEMPORAL_HORIZON
+    elif isinstance(fml, Until):
+        p_left: float = estimate_probability(fml.left)
+        p_right: float = estimate_probability(fml.right)
+        return 1 - (1 - p_right) * (1 - p_left * p_right)
+    elif isinstance(fml, If):
+        return 1 - estimate_probability(fml.left) * (1 - estimate_probability(fml.right))
+    elif isinstance(fml, Iff):
+        p_left: float = estimate_probability(fml.left)
+        p_right: float = estimate_probability(fml.right)
+        return p_left * p_right + (1 - p_left) * (1 - p_right)
+    elif isinstance(fml, (And, NaryAnd)):
+        p: float = 1
+        for x in ([fml.left, fml.right] if isinstance(fml, And) else fml.operands):
+            p = p * estimate_probability(x)
+        return p
+    elif isinstance(fml, (Or, NaryOr)):
+        q: float = 1
+        for x in ([fml.left, fml.right] if isinstance(fml, Or) else fml.operands):
+            q = q * (1 - estimate_probability(x))
+        return 1 - q
+    else:
+        return 0.5
+
+
+def decision_probability(fml: NaryFormula, operand: HybridSpatioTemporalFormula) -> float:
+    """
+    Estimates the probability that an operand decides the value of an n-ary formula, i.e. that it is false
+    for a conjunction or true for a disjunction.
+
+    :param fml: the n-ary formula
+    :param operand: one of its operands
+    :return: the estimated probability
+    """
+    p: float = estimate_probability(operand)
+    return 1 - p if isinstance(fml, NaryAnd) else p
+
+
+def order_by_cost(fml: HybridSpatioTemporalFormula) -> HybridSpatioTemporalFormula:
+    """
+    Reorders the operands of every n-ary conjunction and disjunction of a formula (in place), so that cheap
+    operands that are likely to decide the result are evaluated first. Operands are sorted by their estimated
+    cost per decision, i.e. cost divided by the probability of short-circuiting the evaluation.
+
+    :param fml: logical formula
+    :return: the same formula with reordered operands
+    """
+    for node in subformulas(fml):
+        if isinstance(node, NaryFormula):
+            ranks: list[float] = [estimate_cost(x) / max(decision_probability(node, x), 1e-6) for x in node.operands]
+            node.reorder(sorted(range(len(node.operands)), key=lambda i: ranks[i]))
+    return fml
+
+
+def adapt_order(fml: HybridSpatioTemporalFormula) -> HybridSpatioTemporalFormula:
+    """
+    Reorders the operands of every n-ary conjunction and disjunction of a formula (in place) using the
+    decision rates observed during evaluation, with the static estimate acting as prior. The checkers call it every
+    ADAPT_INTERVAL traces; the decision rates are only counted in every ADAPT_SAMPLE_PERIOD-th interval, starting with
+    the one after the first call, so the order is only changed after such an interval. Formulas that are never adapted
+    are never counted.
+
+    :param fml: logical formula
+    :return: the same formula with reordered operands
+    """
+    for node in subformulas(fml):
+        if isinstance(node, NaryFormula):
+            if node.counting:
+                ranks: list[float] = []
+                for i, x in enumerate(node.operands):
+                    rate: float = (node.decisions[i] + PRIOR_WEIGHT * decision_probability(node, x)) / (
+                            node.evaluations[i] + PRIOR_WEIGHT)
+                    ranks.append(estimate_cost(x) / max(rate, 1e-6))
+                node.reorder(sorted(range(len(node.operands)), key=lambda i: ranks[i]))
+            node.windows = node.windows + 1
+            node.counting = (node.windows - 1) % ADAPT_SAMPLE_PERIOD == 0
+    return fml
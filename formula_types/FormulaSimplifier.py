@@ -0,0 +1,272 @@
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.ClassicalLogicFormula import Verum, Falsum, Not, And, Or, If, Iff, NaryAnd, NaryOr
+from formula_types.HybridFormula import Nom, At, Bind
+from formula_types.SpatialFormula import Front, Back, Left, Right
+from formula_types.TemporalFormula import Next, Eventually, Always, Until
+from formula_types.FormulaUtils import node_count, structural_key, subformulas
+
+
+def is_verum(fml: HybridSpatioTemporalFormula) -> bool:
+    """
+    Checks whether a formula is the constant "true".
+
+    :param fml: logical formula
+    :return: true if the formula is ⊤, false otherwise
+    """
+    return isinstance(fml, Verum)
+
+
+def is_falsum(fml: HybridSpatioTemporalFormula) -> bool:
+    """
+    Checks whether a formula is the constant "false".
+
+    :param fml: logical formula
+    :return: true if the formula is ⊥, false otherwise
+    """
+    return isinstance(fml, Falsum)
+
+
+def is_constant(fml: HybridSpatioTemporalFormula) -> bool:
+    """
+    Checks whether a formula is one of the logical constants.
+
+    :param fml: logical formula
+    :return: true if the formula is ⊤ or ⊥, false otherwise
+    """
+    return is_verum(fml) or is_falsum(fml)
+
+
+def negate(fml: HybridSpatioTemporalFormula) -> HybridSpatioTemporalFormula:
+    """
+    Negates a formula, folding constants and double negations.
+
+    :param fml: logical formula
+    :return: the (simplified) negation of the formula
+    """
+    if is_verum(fml):
+        return Falsum()
+    if is_falsum(fml):
+        return Verum()
+    if isinstance(fml, Not):
+        return fml.operand
+    return Not("¬", fml)
+
+
+def mentions_nominal(fml: HybridSpatioTemporalFormula, name: str) -> bool:
+    """
+    Checks whether a nominal occurs in a formula, either as a nominal or as the name of an at-/bind-operator.
+
+    :param fml: logical formula
+    :param name: name of the nominal
+    :return: true if the nominal occurs in the formula, false otherwise
+    """
+    for node in subformulas(fml):
+        if isinstance(node, (Nom, At, Bind)) and node.name == name:
+            return True
+    return False
+
+
+def flatten(fml: HybridSpatioTemporalFormula, kind: type) -> list[HybridSpatioTemporalFormula]:
+    """
+    Returns the operands of a (nested, binary or n-ary) conjunction or disjunction.
+
+    :param fml: logical formula
+    :param kind: either And or Or
+    :return: list of operands
+    """
+    if isinstance(fml, kind):
+        return flatten(fml.left, kind) + flatten(fml.right, kind)
+    if isinstance(fml, NaryAnd if kind is And else NaryOr):
+        return [x for operand in fml.operands for x in flatten(operand, kind)]
+    return [fml]
+
+
+def join(operands: list[HybridSpatioTemporalFormula], kind: type) -> HybridSpatioTemporalFormula:
+    """
+    Joins a non-empty list of operands into a conjunction or disjunction, which is n-ary for more than two operands.
+
+    :param operands: list of operands
+    :param kind: either And or Or
+    :return: the joined formula
+    """
+    op: str = "∧" if kind is And else "∨"
+    if len(operands) == 1:
+        return operands[0]
+    elif len(operands) == 2:
+        return kind(op, operands[0], operands[1])
+    else:
+        return (NaryAnd if kind is And else NaryOr)(op, operands)
+
+
+def simplify_junction(operands: list[HybridSpatioTemporalFormula], kind: type) -> HybridSpatioTemporalFormula:
+    """
+    Simplifies the (already simplified) operands of a conjunction or disjunction: removes neutral constants,
+    folds absorbing constants, removes repeated operands (idempotence), detects complementary operands and
+    applies absorption.
+
+    :param operands: list of simplified operands
+    :param kind: either And or Or
+    :return: the simplified conjunction or disjunction
+    """
+    neutral, absorbing = (is_verum, is_falsum) if kind is And else (is_falsum, is_verum)
+    dual: type = Or if kind is And else And
+    nary_dual: type = NaryOr if kind is And else NaryAnd
+
+    # flatten nested operands of the same kind, drop neutral elements and fold absorbing ones
+    flat: list[HybridSpatioTemporalFormula] = []
+    for operand in operands:
+        for x in flatten(operand, kind):
+            if absorbing(x):
+                return x
+            if not neutral(x):
+                flat.append(x)
+
+    # idempotence: keep only the first occurrence of syntactically equal operands
+    keys: list[str] = []
+    unique: list[HybridSpatioTemporalFormula] = []
+    for x in flat:
+        key: str = structural_key(x)
+        if key not in keys:
+            keys.append(key)
+            unique.append(x)
+
+    # complementary operands: φ ∧ ¬φ is ⊥ and φ | ¬φ is ⊤
+    for x in unique:
+        if isinstance(x, Not) and structural_key(x.operand) in keys:
+            return Falsum() if kind is And else Verum()
+
+    # absorption: φ ∧ (φ | ψ) is φ and φ | (φ ∧ ψ) is φ
+    absorbed: list[HybridSpatioTemporalFormula] = []
+    for x, key in zip(unique, keys):
+        if isinstance(x, (dual, nary_dual)):
+            inner_keys: list[str] = [structural_key(y) for y in flatten(x, dual)]
+            if any(k in inner_keys for k in keys if k != key):
+                continue
+        absorbed.append(x)
+
+    if not absorbed:
+        return Verum() if kind is And else Falsum()
+    return join(absorbed, kind)
+
+
+def simplify_node(fml: HybridSpatioTemporalFormula) -> HybridSpatioTemporalFormula:
+    """
+    Simplifies a formula in one bottom-up pass.
+
+    :param fml: logical formula
+    :return: an equivalent formula with at most as many nodes
+    """
+    if isinstance(fml, Not):
+        return negate(simplify_node(fml.operand))
+
+    if isinstance(fml, (And, Or)):
+        return simplify_junction([simplify_node(fml.left), simplify_node(fml.right)], type(fml))
+
+    if isinstance(fml, (NaryAnd, NaryOr)):
+        return simplify_junction([simplify_node(x) for x in fml.operands], And if isinstance(fml, NaryAnd) else Or)
+
+    if isinstance(fml, If):
+        left: HybridSpatioTemporalFormula = simplify_node(fml.left)
+        right: HybridSpatioTemporalFormula = simplify_node(fml.right)
+        if is_falsum(left) or is_verum(right) or structural_key(left) == structural_key(right):
+            return Verum()
+        if is_verum(left):
+            return right
+        if is_falsum(right):
+            return negate(left)
+        return If(fml.op, left, right)
+
+    if isinstance(fml, Iff):
+        left: HybridSpatioTemporalFormula = simplify_node(fml.left)
+        right: HybridSpatioTemporalFormula = simplify_node(fml.right)
+        if structural_key(left) == structural_key(right):
+            return Verum()
+        if is_verum(left):
+            return right
+        if is_verum(right):
+            return left
+        if is_falsum(left):
+            return negate(right)
+        if is_falsum(right):
+            return negate(left)
+        return Iff(fml.op, left, right)
+
+    if isinstance(fml, (Always, Eventually)):
+        operand: HybridSpatioTemporalFormula = simplify_node(fml.operand)
+        # G ⊤ = ⊤ and G ⊥ = ⊥ hold since traces are non-empty; G G φ = G φ and F F φ = F φ
+        if is_constant(operand) or type(operand) == type(fml):
+            return operand
+        return type(fml)(fml.op, operand)
+
+    if isinstance(fml, Next):
+        operand: HybridSpatioTemporalFormula = simplify_node(fml.operand)
+        # X ⊤ is not folded, since it is false at the end of the trace
+        if is_falsum(operand):
+            return operand
+        return Next(fml.op, operand)
+
+    if isinstance(fml, (Front, Back, Left, Right)):
+        operand: HybridSpatioTemporalFormula = simplify_node(fml.operand)
+        # spatial ⊤ is not folded, since it is false at the border of the grid
+        if is_falsum(operand):
+            return operand
+        return type(fml)(fml.op, operand)
+
+    if isinstance(fml, Until):
+        left: HybridSpatioTemporalFormula = simplify_node(fml.left)
+        right: HybridSpatioTemporalFormula = simplify_node(fml.right)
+        if is_constant(right) or is_falsum(left) or structural_key(left) == structural_key(right):
+            return right
+        return Until(fml.op, left, right)
+
+    if isinstance(fml, At):
+        operand: HybridSpatioTemporalFormula = simplify_node(fml.operand)
+        # @z @w φ = @w φ, since the inner at-operator ignores the current point
+        if is_constant(operand) or isinstance(operand, At):
+            return operand
+        # @z z always holds
+        if isinstance(operand, Nom) and operand.name == fml.name:
+            return Verum()
+        return At(fml.name, fml.op, operand)
+
+    if isinstance(fml, Bind):
+        operand: HybridSpatioTemporalFormula = simplify_node(fml.operand)
+        # a binder whose nominal does not occur in its scope has no effect
+        if not mentions_nominal(operand, fml.name):
+            return operand
+        return Bind(fml.name, fml.op, operand)
+
+    return fml
+
+
+def simplify(fml: HybridSpatioTemporalFormula) -> HybridSpatioTemporalFormula:
+    """
+    Rewrites a formula into a smaller equivalent formula by constant folding, removal of double negations,
+    idempotence (G G φ, F F φ, φ ∧ φ, φ | φ), absorption, collapsing nested at-operators and dropping
+    tautological conjuncts. The rewriting is repeated until the number of nodes does not decrease anymore.
+
+    The result never shares a node between two positions of the syntax tree, since the memoized evaluation
+    caches results per node.
+
+    :param fml: logical formula
+    :return: the simplified formula
+    """
+    size: int = node_count(fml)
+    while True:
+        fml = simplify_node(fml)
+        new_size: int = node_count(fml)
+        if new_size >= size:
+            return fml
+        size = new_size
+
+
+def simplify_with_report(fml: HybridSpatioTemporalFormula) -> tuple[HybridSpatioTemporalFormula, int, int]:
+    """
+    Simplifies a formula and reports the node count before and after the simplification.
+
+    :param fml: logical formula
+    :return: the simplified formula, the node count of the input and the node count of the result
+    """
+    before: int = node_count(fml)
+    simplified: HybridSpatioTemporalFormula = simplify(fml)
+    return simplified, before, node_count(simplified)
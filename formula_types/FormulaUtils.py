@@ -0,0 +1,81 @@
+from typing import Optional
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.UnaryFormula import UnaryFormula
+from formula_types.BinaryFormula import BinaryFormula
+from formula_types.NaryFormula import NaryFormula
+from formula_types.TemporalFormula import Next, Eventually, Always, Until
+
+
+def children(fml: HybridSpatioTemporalFormula) -> list[HybridSpatioTemporalFormula]:
+    """
+    Returns the direct subformulas of a formula.
+
+    :param fml: logical formula
+    :return: list of direct subformulas (empty for atomic formulas)
+    """
+    if isinstance(fml, UnaryFormula):
+        return [fml.operand]
+    elif isinstance(fml, BinaryFormula):
+        return [fml.left, fml.right]
+    elif isinstance(fml, NaryFormula):
+        return list(fml.operands)
+    else:
+        return []
+
+
+def subformulas(fml: HybridSpatioTemporalFormula) -> list[HybridSpatioTemporalFormula]:
+    """
+    Returns all subformulas of a formula in pre-order, including the formula itself.
+
+    :param fml: logical formula
+    :return: list of all subformulas
+    """
+    result: list[HybridSpatioTemporalFormula] = []
+    stack: list[HybridSpatioTemporalFormula] = [fml]
+    while stack:
+        node: HybridSpatioTemporalFormula = stack.pop()
+        result.append(node)
+        stack.extend(reversed(children(node)))
+    return result
+
+
+def node_count(fml: HybridSpatioTemporalFormula) -> int:
+    """
+    Returns the number of nodes in the syntax tree of a formula.
+
+    :param fml: logical formula
+    :return: number of syntax tree nodes
+    """
+    return len(subformulas(fml))
+
+
+def structural_key(fml: HybridSpatioTemporalFormula) -> str:
+    """
+    Returns a key identifying a formula up to syntactic equality. Formula objects compare by identity
+    (which the memoized evaluation relies on), so structurally equal formulas are compared through this key.
+
+    :param fml: logical formula
+    :return: string identifying the syntax tree of the formula
+    """
+    return repr(fml)
+
+
+def temporal_horizon(fml: HybridSpatioTemporalFormula) -> Optional[int]:
+    """
+    Returns the number of future time steps the truth of a formula depends on, i.e. its nesting depth of next
+    operators. Formulas with G, F or U depend on the whole remaining trace and have no horizon.
+
+    :param fml: logical formula
+    :return: the nesting depth of next operators, or None if the formula contains G, F or U
+    """
+    if isinstance(fml, (Eventually, Always, Until)):
+        return None
+
+    horizon: int = 0
+    for child in children(fml):
+        child_horizon: Optional[int] = temporal_horizon(child)
+        if child_horizon is None:
+            return None
+        horizon = max(horizon, child_horizon)
+
+    return horizon + 1 if isinstance(fml, Next) else horizon
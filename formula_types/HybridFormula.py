@@ -1,5 +1,5 @@
-import copy
 from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula, memoize
+from formula_types.Trace import BoundTrace
 from formula_types.UnaryFormula import UnaryFormula
 
 
@@ -49,9 +49,7 @@ class Bind(UnaryFormula):
     @memoize
     def evaluate_memoized(self, trace: list[dict], time: int, point: tuple[int, int], grid_size: tuple[int, int],
                           memo: dict[tuple[HybridSpatioTemporalFormula, int], bool]) -> bool:
-        new_trace: list[dict] = copy.deepcopy(trace)
-
-        for i in range(0, len(new_trace)):
-            new_trace[i][self.name] = point
+        # view of the trace with the nominal placed at the point at all times
+        new_trace: BoundTrace = BoundTrace(trace, self.name, point)
 
         return self.operand.evaluate_memoized(new_trace, time, point, grid_size, memo)
@@ -0,0 +1,47 @@
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+
+
+class NaryFormula(HybridSpatioTemporalFormula):
+    """
+    Class for associative operators with an arbitrary number of operands.
+    """
+
+    def __init__(self, op: str, operands: list[HybridSpatioTemporalFormula]):
+        self.op = op
+        self.operands = operands
+        self.operator_string = ""
+
+        self.reset_statistics()
+
+    def reset_statistics(self):
+        """
+        Clears the evaluation statistics per operand, which are used to adapt the evaluation order at run time. They
+        are only counted while counting is set (see adapt_order), to keep the bookkeeping out of most evaluations.
+        """
+        self.evaluations: list[int] = [0 for _ in self.operands]
+        self.decisions: list[int] = [0 for _ in self.operands]
+        self.counting: bool = False
+        self.windows: int = 0
+
+    def reorder(self, order: list[int]):
+        """
+        Permutes the operands (and their evaluation statistics) according to the given list of indices.
+
+        :param order: the new order as a list of operand indices
+        """
+        self.operands = [self.operands[i] for i in order]
+        self.evaluations = [self.evaluations[i] for i in order]
+        self.decisions = [self.decisions[i] for i in order]
+
+    def __repr__(self) -> str:
+        from formula_types.ClassicalLogicFormula import Prop, Falsum, Verum
+        from formula_types.HybridFormula import Nom
+
+        parts: list[str] = []
+        for operand in self.operands:
+            if type(operand) == Prop or type(operand) == Nom or type(operand) == Verum or type(operand) == Falsum:
+                parts.append(f"{operand}")
+            else:
+                parts.append(f"({operand})")
+
+        return f" {self.operator_string} ".join(parts)
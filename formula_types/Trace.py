@@ -0,0 +1,171 @@
+from typing import Iterator, Optional, Sequence
+
+
+class _Path:
+    """
+    Grid buffer shared by a trace and the traces extending it. A trace of length l owns the first l slots as long as
+    it is the owner of slot l - 1; extending a trace past a shorter one truncates the buffer first, so the slots of
+    a trace are never overwritten while it owns its last slot.
+    """
+    __slots__ = ("grids", "owners")
+
+    def __init__(self, grids: list[dict], owners: list[Optional['Trace']]):
+        self.grids = grids
+        self.owners = owners
+
+
+class Trace:
+    """
+    Immutable finite trace of grids, shared between all checkers.
+
+    Extending a trace by a grid takes constant time and leaves the original trace unchanged: as long as traces are
+    extended depth-first, as in the trace generators, all traces along the current path share one grid buffer and
+    support constant-time random access without copying. A trace whose slots have been reused by a sibling falls back
+    to materializing its grids from its parent links once.
+    """
+    __slots__ = ("_parent", "_grid", "_length", "_path", "_grids")
+
+    def __init__(self, grids: Sequence[dict] = ()):
+        self._parent: Optional[Trace] = None
+        self._grid: Optional[dict] = None
+        self._length: int = len(grids)
+        self._path: Optional[_Path] = None
+        self._grids: Optional[tuple] = grids if isinstance(grids, tuple) else tuple(grids)
+
+    @classmethod
+    def from_grids(cls, grids: Sequence[dict]) -> 'Trace':
+        """
+        Creates a trace from a sequence of grids. Tuples (such as the ones of itertools.product) are not copied.
+
+        :param grids: the grids of the trace
+        :return: the trace
+        """
+        return cls(grids)
+
+    def _owns_path(self) -> bool:
+        """
+        Returns whether the first slots of the shared buffer still hold the grids of this trace.
+        """
+        return (self._path is not None and 0 < self._length <= len(self._path.owners) and
+                self._path.owners[self._length - 1] is self)
+
+    def extend(self, grid: dict) -> 'Trace':
+        """
+        Returns the trace extended by one grid.
+
+        :param grid: the grid appended to the trace
+        :return: the extended trace
+        """
+        child: Trace = Trace.__new__(Trace)
+        child._parent = self
+        child._grid = grid
+        child._length = self._length + 1
+        child._grids = None
+
+        if self._owns_path() or (self._length == 0 and self._path is not None):
+            path: _Path = self._path
+            del path.grids[self._length:]
+            del path.owners[self._length:]
+        else:
+            # start a new buffer, e.g. for a trace built from a tuple or whose buffer has been reused
+            path: _Path = _Path(list(self), [None] * self._length)
+            self._path = path
+            if self._length > 0:
+                path.owners[self._length - 1] = self
+
+        path.grids.append(grid)
+        path.owners.append(child)
+        child._path = path
+        return child
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if self._grids is not None:
+            return self._grids[index]
+        if self._owns_path():
+            if isinstance(index, slice):
+                return self._path.grids[:self._length][index]
+            if index < 0:
+                index = index + self._length
+            if not 0 <= index < self._length:
+                raise IndexError("trace index out of range")
+            return self._path.grids[index]
+
+        # the buffer has been reused by another trace, collect the grids from the parent links
+        grids: list[dict] = []
+        node: Trace = self
+        while node._grids is None:
+            grids.append(node._grid)
+            node = node._parent
+        self._grids = node._grids + tuple(reversed(grids))
+        return self._grids[index]
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(self._length):
+            yield self[i]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Trace, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class BoundGrid:
+    """
+    Read-only view of a grid in which one nominal is placed at a given point.
+    """
+    __slots__ = ("grid", "name", "point")
+
+    def __init__(self, grid, name: str, point: tuple[int, int]):
+        self.grid = grid
+        self.name = name
+        self.point = point
+
+    def __getitem__(self, key: str):
+        if key == self.name:
+            return self.point
+        return self.grid[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key == self.name or key in self.grid
+
+    def keys(self) -> list[str]:
+        return [*(k for k in self.grid.keys() if k != self.name), self.name]
+
+    def __repr__(self) -> str:
+        return repr({k: self[k] for k in self.keys()})
+
+
+class BoundTrace:
+    """
+    Read-only view of a trace in which one nominal is placed at a given point at all times, as done by the binder.
+    Replaces copying the trace: grids are wrapped on access.
+    """
+    __slots__ = ("trace", "name", "point", "_grids")
+
+    def __init__(self, trace, name: str, point: tuple[int, int]):
+        self.trace = trace
+        self.name = name
+        self.point = point
+        self._grids: list[Optional[BoundGrid]] = [None] * len(trace)
+
+    def __len__(self) -> int:
+        return len(self._grids)
+
+    def __getitem__(self, index: int) -> BoundGrid:
+        grid: Optional[BoundGrid] = self._grids[index]
+        if grid is None:
+            grid = BoundGrid(self.trace[index], self.name, self.point)
+            self._grids[index] = grid
+        return grid
+
+    def __iter__(self) -> Iterator[BoundGrid]:
+        for i in range(len(self)):
+            yield self[i]
@@ -2,7 +2,7 @@ import re
 from typing import Union
 from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
 from formula_types.HybridFormula import Nom, At, Bind
-from formula_types.ClassicalLogicFormula import Verum, Falsum, Prop, Not, And, Iff, If, Or
+from formula_types.ClassicalLogicFormula import Verum, Falsum, Prop, Not, And, Iff, If, Or, NaryAnd, NaryOr
 from formula_types.SpatialFormula import Front, Back, Left, Right
 from formula_types.TemporalFormula import Next, Eventually, Always, Until
 
@@ -80,6 +80,23 @@ def tokenize(formula: str) -> list[tuple[str, str]]:
     return tokens
 
 
+def flatten_operands(fml: HybridSpatioTemporalFormula, binary: type, nary: type) -> list[HybridSpatioTemporalFormula]:
+    """
+    Returns the operands of a (nested) binary or n-ary conjunction/disjunction.
+
+    :param fml: the parsed formula
+    :param binary: the binary operator class (And or Or)
+    :param nary: the n-ary operator class (NaryAnd or NaryOr)
+    :return: the list of operands
+    """
+    if isinstance(fml, binary):
+        return flatten_operands(fml.left, binary, nary) + flatten_operands(fml.right, binary, nary)
+    elif isinstance(fml, nary):
+        return [x for operand in fml.operands for x in flatten_operands(operand, binary, nary)]
+    else:
+        return [fml]
+
+
 class HybridSpatioTemporalParser:
     """
     Class for the hybrid spatio-temporal formula parser
@@ -149,29 +166,41 @@ class HybridSpatioTemporalParser:
 
     def parse_or(self) -> HybridSpatioTemporalFormula:
         """
-        Parses a hybrid spatio-temporal formula with the uppermost operator a disjunction.
+        Parses a hybrid spatio-temporal formula with the uppermost operator a disjunction. Chains of more than
+        two disjuncts (including parenthesized ones) are flattened into a single n-ary disjunction.
 
         :return: the parsed hybrid spatio-temporal formula
         """
-        node: HybridSpatioTemporalFormula = self.parse_and()
+        operands: list[HybridSpatioTemporalFormula] = flatten_operands(self.parse_and(), Or, NaryOr)
         while self.peek()[0] == OR:
             self.consume()
-            right: HybridSpatioTemporalFormula = self.parse_and()
-            node = Or("∨", node, right)
-        return node
+            operands.extend(flatten_operands(self.parse_and(), Or, NaryOr))
+
+        if len(operands) == 1:
+            return operands[0]
+        elif len(operands) == 2:
+            return Or("∨", operands[0], operands[1])
+        else:
+            return NaryOr("∨", operands)
 
     def parse_and(self) -> HybridSpatioTemporalFormula:
         """
-        Parses a hybrid spatio-temporal formula with the uppermost operator a conjunction.
+        Parses a hybrid spatio-temporal formula with the uppermost operator a conjunction. Chains of more than
+        two conjuncts (including parenthesized ones) are flattened into a single n-ary conjunction.
 
         :return: the parsed hybrid spatio-temporal formula
         """
-        node: HybridSpatioTemporalFormula = self.parse_until()
+        operands: list[HybridSpatioTemporalFormula] = flatten_operands(self.parse_until(), And, NaryAnd)
         while self.peek()[0] == AND:
             self.consume()
-            right: HybridSpatioTemporalFormula = self.parse_until()
-            node = And("∧", node, right)
-        return node
+            operands.extend(flatten_operands(self.parse_until(), And, NaryAnd))
+
+        if len(operands) == 1:
+            return operands[0]
+        elif len(operands) == 2:
+            return And("∧", operands[0], operands[1])
+        else:
+            return NaryAnd("∧", operands)
 
     def parse_until(self) -> HybridSpatioTemporalFormula:
         """
@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import Iterator, Optional, Union
+
+from service.ModelCheckerSession import ModelCheckerSession, Job
+
+# keys of a query message that are passed on to the session
+QUERY_KEYS: list[str] = ["checker", "props", "noms", "assumptions", "conclusions", "grid_size", "max_trace_length",
+                         "static_props"]
+
+
+def query_arguments(message: dict) -> dict:
+    """
+    Extracts the keyword arguments of a session query from a request message.
+
+    :param message: the request message
+    :return: the keyword arguments
+    """
+    query: dict = {key: message[key] for key in QUERY_KEYS if key in message}
+    query.setdefault("props", [])
+    query.setdefault("noms", [])
+    query.setdefault("assumptions", [])
+    if "grid_size" in query:
+        query["grid_size"] = tuple(query["grid_size"])
+    return query
+
+
+class CheckerRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Serves one client connection. Requests and events are JSON objects, one per line.
+
+    Requests carry an "op" and a client-chosen "id":
+      - {"op": "count" | "counterexample", "id": ..., "checker": ..., "props": [...], "noms": [...],
+         "assumptions": [...], "conclusions": [...], "grid_size": [rows, columns], "max_trace_length": ...}
+        starts a query, whose events ("accepted", "progress", "result", "cancelled", "error") are streamed back
+        with the same id;
+      - {"op": "cancel", "id": ...} cancels the query with this id;
+      - {"op": "stats", "id": ...} returns the cache statistics of the session;
+      - {"op": "shutdown", "id": ...} stops the daemon.
+    Queries of one connection run concurrently; the connection stays open until the client closes it.
+    """
+
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+        self.jobs: dict = {}
+
+    def send(self, message: dict):
+        """
+        Sends one event to the client.
+
+        :param message: the event
+        """
+        with self.write_lock:
+            self._write(message)
+
+    def _write(self, message: dict):
+        try:
+            self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ValueError):
+            pass
+
+    def handle(self):
+        session: ModelCheckerSession = self.server.session
+
+        try:
+            for raw in self.rfile:
+                if not raw.strip():
+                    continue
+                try:
+                    message: dict = json.loads(raw.decode("utf-8"))
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    self.send({"event": "error", "message": "Malformed request."})
+                    continue
+
+                request_id = message.get("id")
+                op: Optional[str] = message.get("op")
+
+                if op in ("count", "counterexample"):
+                    # the job cannot report events before it has been accepted
+                    with self.write_lock:
+                        job: Job = session.submit(op,
+                                                  on_event=lambda event, i=request_id: self.send({"id": i, **event}),
+                                                  **query_arguments(message))
+                        self.jobs[request_id] = job
+                        self._write({"id": request_id, "event": "accepted"})
+                elif op == "cancel":
+                    job: Optional[Job] = self.jobs.get(request_id)
+                    if job is not None:
+                        job.cancel()
+                elif op == "stats":
+                    self.send({"id": request_id, "event": "stats", **session.stats()})
+                elif op == "shutdown":
+                    self.send({"id": request_id, "event": "shutdown"})
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    break
+                else:
+                    self.send({"id": request_id, "event": "error", "message": f"Unknown operation {op}"})
+        finally:
+            # the client is gone, its queries are no longer needed
+            for job in self.jobs.values():
+                job.cancel()
+
+
+class TCPCheckerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], session: ModelCheckerSession):
+        super().__init__(address, CheckerRequestHandler)
+        self.session = session
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class UnixCheckerServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path: str, session: ModelCheckerSession):
+            super().__init__(path, CheckerRequestHandler)
+            self.session = session
+
+
+def create_server(session: ModelCheckerSession, socket_path: Optional[str] = None, host: str = "127.0.0.1",
+                  port: int = 0) -> socketserver.BaseServer:
+    """
+    Creates a daemon server listening on a Unix socket or on a TCP port.
+
+    :param session: the session answering the queries
+    :param socket_path: path of the Unix socket, or None to listen on TCP
+    :param host: the TCP host (localhost by default)
+    :param port: the TCP port, 0 to pick a free port
+    :return: the server
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return UnixCheckerServer(socket_path, session)
+    return TCPCheckerServer((host, port), session)
+
+
+def send_request(address: Union[str, tuple[str, int]], request: dict) -> Iterator[dict]:
+    """
+    Sends one request to a daemon and yields its events until the final one.
+
+    :param address: path of the Unix socket or (host, port) of the daemon
+    :param request: the request message
+    :return: the events of the request
+    """
+    family: int = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        stream = sock.makefile("rwb")
+        stream.write((json.dumps(request) + "\n").encode("utf-8"))
+        stream.flush()
+        for line in stream:
+            event: dict = json.loads(line.decode("utf-8"))
+            yield event
+            if event.get("event") in ("result", "cancelled", "error", "stats", "shutdown"):
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model checker daemon")
+    parser.add_argument("--socket", type=str, help="Path of the Unix socket to listen on")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to listen on (without --socket)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (without --socket)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of queries processed concurrently")
+    args = parser.parse_args()
+
+    session: ModelCheckerSession = ModelCheckerSession(max_workers=args.workers)
+    server: socketserver.BaseServer = create_server(session, args.socket, args.host, args.port)
+    print("Listening on", args.socket if args.socket else "{}:{}".format(*server.server_address), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        session.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
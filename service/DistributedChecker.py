@@ -0,0 +1,389 @@
+import argparse
+import json
+import multiprocessing
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from timeit import default_timer as timer
+from typing import Optional
+
+from formula_types.Trace import Trace
+from service.CheckerDaemon import query_arguments
+from service.ModelCheckerSession import ModelCheckerSession
+
+# number of shards a job is split into (at most one per start grid)
+SHARDS: int = 256
+
+# number of times a shard is handed out again after its worker failed or disconnected
+MAX_ATTEMPTS: int = 3
+
+# number of satisfying traces reported per shard and job
+WITNESS_LIMIT: int = 1
+
+# seconds a worker waits before asking again when all remaining shards are being worked on
+POLL_SECONDS: float = 0.2
+
+# keys a worker message must carry besides "op", per operation
+REQUIRED_KEYS: dict[str, tuple[str, ...]] = {"result": ("shard", "sat", "traces"), "failed": ("shard",)}
+
+
+def grid_record(grid: dict) -> dict:
+    """
+    Converts a grid to JSON, in the format read by checkers.BulkChecker: nominals as [row, column] and propositions
+    as sorted lists of such points.
+
+    :param grid: the grid
+    :return: the JSON object of the grid
+    """
+    record: dict = {}
+    for name, value in grid.items():
+        if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], int):
+            record[name] = [value[0], value[1]]
+        else:
+            record[name] = sorted([p[0], p[1]] for p in value)
+    return record
+
+
+class Coordinator:
+    """
+    Splits the traces of a job into shards by their start grid (ranges of the canonical start grids of
+    ModelCheckerSession) and hands them to the workers that connect over TCP. Workers pull one shard at a time, so
+    faster workers take more shards. When no shard is left, idle workers are given a copy of the longest running
+    shard (speculative execution), and the first result of a shard counts. Shards whose worker fails or disconnects
+    are handed out again, up to MAX_ATTEMPTS times. The totals are those of a single-process count.
+
+    Messages are JSON objects, one per line. A worker sends {"op": "job"} once and receives {"event": "job",
+    "job": ..., "witness_limit": ...}; it then sends {"op": "pull"} and receives {"event": "shard", "shard": ...,
+    "start": ..., "stop": ...}, {"event": "wait"} or {"event": "done"}, and reports a shard with {"op": "result",
+    "shard": ..., "sat": ..., "traces": ..., "witnesses": [...]} or {"op": "failed", "shard": ..., "error": ...}.
+    """
+
+    def __init__(self, job: dict, shards: int = SHARDS, host: str = "127.0.0.1", port: int = 0,
+                 max_attempts: int = MAX_ATTEMPTS, witness_limit: int = WITNESS_LIMIT, speculate: bool = True):
+        self.job = job
+        self.max_attempts = max_attempts
+        self.witness_limit = witness_limit
+        self.speculate = speculate
+
+        session: ModelCheckerSession = ModelCheckerSession(max_workers=1)
+        try:
+            root_count: int = len(session.start_grids(job["checker"], job["props"], job["noms"], job["assumptions"],
+                                                      job["conclusions"], job["grid_size"],
+                                                      job.get("static_props", ())))
+        finally:
+            session.close()
+        parts: int = max(1, min(shards, root_count))
+        bounds: list[int] = [root_count * k // parts for k in range(parts + 1)]
+        self.shards: list[tuple[int, int]] = [(bounds[k], bounds[k + 1]) for k in range(parts)
+                                              if bounds[k] < bounds[k + 1]]
+
+        self._condition = threading.Condition()
+        self._pending: deque = deque(range(len(self.shards)))
+        self._running: dict[int, list[float]] = {}
+        self._results: dict[int, dict] = {}
+        self._failures: list[int] = [0] * len(self.shards)
+        self.speculative: int = 0
+        self.error: Optional[str] = None
+
+        self.server = CoordinatorServer((host, port), self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.server.server_address[:2]
+
+    def finished(self) -> bool:
+        """
+        Returns whether every shard has a result or the job failed.
+
+        :return: true if the job is over
+        """
+        return self.error is not None or len(self._results) == len(self.shards)
+
+    def start(self):
+        """
+        Starts serving the workers in a background thread.
+        """
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def assign(self) -> Optional[int]:
+        """
+        Hands out the next shard: a pending one, or else a copy of the longest running shard that has no copy yet.
+
+        :return: the shard, None if there is nothing to do at the moment
+        """
+        with self._condition:
+            if self.finished():
+                return None
+            if self._pending:
+                shard: int = self._pending.popleft()
+            else:
+                single: list[int] = [s for s, starts in self._running.items()
+                                     if len(starts) == 1 and s not in self._results]
+                if not self.speculate or not single:
+                    return None
+                shard = min(single, key=lambda s: self._running[s][0])
+                self.speculative = self.speculative + 1
+            self._running.setdefault(shard, []).append(timer())
+            return shard
+
+    def _stop_running(self, shard: int):
+        starts: list[float] = self._running.get(shard, [])
+        if starts:
+            starts.pop()
+        if not starts:
+            self._running.pop(shard, None)
+
+    def complete(self, shard: int, counter_sat: int, counter_gen: int, witnesses: list):
+        """
+        Records the result of a shard; later results of speculative copies are ignored.
+
+        :param shard: the shard
+        :param counter_sat: the number of satisfying traces of the shard
+        :param counter_gen: the number of traces of the shard
+        :param witnesses: satisfying traces of the shard
+        """
+        with self._condition:
+            self._stop_running(shard)
+            self._results.setdefault(shard, {"sat": counter_sat, "traces": counter_gen, "witnesses": witnesses})
+            self._condition.notify_all()
+
+    def fail(self, shard: int, error: str):
+        """
+        Records that a worker could not finish a shard, which is handed out again unless a copy is still running.
+
+        :param shard: the shard
+        :param error: the reason
+        """
+        with self._condition:
+            self._stop_running(shard)
+            if shard in self._results:
+                return
+            self._failures[shard] = self._failures[shard] + 1
+            if self._failures[shard] >= self.max_attempts:
+                self.error = f"Shard {shard} failed {self._failures[shard]} times: {error}"
+            elif shard not in self._running:
+                self._pending.appendleft(shard)
+            self._condition.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> dict:
+        """
+        Waits until every shard has a result.
+
+        :param timeout: maximal number of seconds to wait
+        :return: the number of satisfying traces ("sat") and of traces ("traces"), up to witness_limit satisfying
+                 traces ("witnesses"), the number of shards ("shards"), of shards handed out again after a failure
+                 ("retries") and of speculative copies ("speculative")
+        """
+        with self._condition:
+            if not self._condition.wait_for(self.finished, timeout):
+                raise TimeoutError("The job did not finish in time.")
+            if self.error is not None:
+                raise RuntimeError(self.error)
+            results: list[dict] = [self._results[s] for s in range(len(self.shards))]
+            return {"sat": sum(r["sat"] for r in results), "traces": sum(r["traces"] for r in results),
+                    "witnesses": [w for r in results for w in r["witnesses"]][:self.witness_limit],
+                    "shards": len(self.shards), "retries": sum(self._failures), "speculative": self.speculative}
+
+    def close(self):
+        """
+        Stops serving; connected workers see the connection close and stop.
+        """
+        if self._thread is not None:
+            self.server.shutdown()
+        self.server.server_close()
+
+
+def message_error(message: object, shard_count: int) -> Optional[str]:
+    """
+    Checks a message of a worker: it must be a JSON object with the keys its operation requires, and the shard it
+    reports on must be one of the job.
+
+    :param message: the decoded message
+    :param shard_count: the number of shards of the job
+    :return: the reason the message is rejected, None if it is well-formed
+    """
+    if not isinstance(message, dict):
+        return "Malformed request."
+    required: tuple[str, ...] = REQUIRED_KEYS.get(message.get("op"), ())
+    missing: list[str] = [key for key in required if key not in message]
+    if missing:
+        return f"Missing {', '.join(missing)} in {message['op']} message."
+    shard = message.get("shard")
+    if "shard" in required and (type(shard) is not int or not 0 <= shard < shard_count):
+        return f"Unknown shard {shard}."
+    return None
+
+
+class CoordinatorRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Serves one worker connection of a coordinator.
+    """
+
+    def handle(self):
+        coordinator: Coordinator = self.server.coordinator
+        assigned: set[int] = set()
+
+        try:
+            for raw in self.rfile:
+                if not raw.strip():
+                    continue
+                try:
+                    message: dict = json.loads(raw.decode("utf-8"))
+                except ValueError:
+                    message = None
+                error: Optional[str] = message_error(message, len(coordinator.shards))
+                if error is not None:
+                    self.send({"event": "error", "message": error})
+                    continue
+                op: Optional[str] = message.get("op")
+
+                if op == "job":
+                    self.send({"event": "job", "job": coordinator.job, "witness_limit": coordinator.witness_limit})
+                elif op == "pull":
+                    shard: Optional[int] = coordinator.assign()
+                    if shard is not None:
+                        assigned.add(shard)
+                        start, stop = coordinator.shards[shard]
+                        self.send({"event": "shard", "shard": shard, "start": start, "stop": stop})
+                    elif coordinator.finished():
+                        self.send({"event": "done"})
+                    else:
+                        self.send({"event": "wait"})
+                elif op == "result":
+                    assigned.discard(message["shard"])
+                    coordinator.complete(message["shard"], message["sat"], message["traces"],
+                                         message.get("witnesses", []))
+                elif op == "failed":
+                    assigned.discard(message["shard"])
+                    coordinator.fail(message["shard"], message.get("error", "unknown error"))
+                else:
+                    self.send({"event": "error", "message": f"Unknown operation {op}"})
+        except (ConnectionResetError, ValueError):
+            pass
+        finally:
+            # the shards of a worker that is gone are handed out again
+            for shard in assigned:
+                coordinator.fail(shard, "worker disconnected")
+
+    def send(self, message: dict):
+        self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+class CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], coordinator: Coordinator):
+        super().__init__(address, CoordinatorRequestHandler)
+        self.coordinator = coordinator
+
+
+def run_worker(address: tuple[str, int]) -> int:
+    """
+    Connects to a coordinator and counts shards until the job is done or the coordinator goes away.
+
+    :param address: (host, port) of the coordinator
+    :return: the number of shards counted
+    """
+    counted: int = 0
+    session: ModelCheckerSession = ModelCheckerSession(max_workers=1)
+    try:
+        with socket.create_connection(address) as sock:
+            stream = sock.makefile("rwb")
+
+            def send(message: dict):
+                stream.write((json.dumps(message) + "\n").encode("utf-8"))
+                stream.flush()
+
+            def receive() -> Optional[dict]:
+                line: bytes = stream.readline()
+                return json.loads(line.decode("utf-8")) if line else None
+
+            send({"op": "job"})
+            event: Optional[dict] = receive()
+            if event is None:
+                return counted
+            query: dict = query_arguments(event["job"])
+            witness_limit: int = event["witness_limit"]
+
+            while True:
+                send({"op": "pull"})
+                event = receive()
+                if event is None or event["event"] == "done":
+                    return counted
+                if event["event"] == "wait":
+                    time.sleep(POLL_SECONDS)
+                    continue
+
+                witnesses: list[list[dict]] = []
+
+                def witness(t: Trace):
+                    if len(witnesses) < witness_limit:
+                        witnesses.append([grid_record(g) for g in t])
+
+                try:
+                    counter_sat, counter_gen = session.count(root_range=(event["start"], event["stop"]),
+                                                             witness=witness, **query)
+                except Exception as e:
+                    send({"op": "failed", "shard": event["shard"], "error": f"{type(e).__name__}: {e}"})
+                    continue
+                send({"op": "result", "shard": event["shard"], "sat": counter_sat, "traces": counter_gen,
+                      "witnesses": witnesses})
+                counted = counted + 1
+    except (ConnectionError, OSError):
+        return counted
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed model checking over TCP")
+    roles = parser.add_subparsers(dest="role", required=True)
+
+    coordinator_parser = roles.add_parser("coordinator", help="Split a job into shards and serve them to workers")
+    coordinator_parser.add_argument("--job", type=str, required=True,
+                                    help="JSON file of the job, with the keys of a daemon count query")
+    coordinator_parser.add_argument("--host", type=str, default="0.0.0.0", help="Host to listen on")
+    coordinator_parser.add_argument("--port", type=int, default=8766, help="Port to listen on")
+    coordinator_parser.add_argument("--shards", type=int, default=SHARDS, help="Number of shards")
+    coordinator_parser.add_argument("--witnesses", type=int, default=WITNESS_LIMIT,
+                                    help="Number of satisfying traces to report")
+
+    worker_parser = roles.add_parser("worker", help="Count the shards of a coordinator")
+    worker_parser.add_argument("--host", type=str, default="127.0.0.1", help="Host of the coordinator")
+    worker_parser.add_argument("--port", type=int, default=8766, help="Port of the coordinator")
+    worker_parser.add_argument("--processes", type=int, default=1, help="Number of worker processes")
+    args = parser.parse_args()
+
+    if args.role == "worker":
+        with multiprocessing.Pool(args.processes) as pool:
+            counted: list[int] = pool.map(run_worker, [(args.host, args.port)] * args.processes)
+        print(f'Counted {sum(counted)} shards')
+        return
+
+    with open(args.job, "r", encoding="utf-8") as f:
+        job: dict = query_arguments(json.load(f))
+    coordinator: Coordinator = Coordinator(job, args.shards, args.host, args.port, witness_limit=args.witnesses)
+    print("Listening on {}:{}".format(*coordinator.address), flush=True)
+    start: float = timer()
+    coordinator.start()
+    try:
+        result: dict = coordinator.wait()
+    except KeyboardInterrupt:
+        return 1
+    finally:
+        coordinator.close()
+    print(f'#Sat: {result["sat"]}; #Trace: {result["traces"]}; Shards: {result["shards"]}; '
+          f'Retries: {result["retries"]}; Speculative: {result["speculative"]}; Time: {timer() - start}')
+    for w in result["witnesses"]:
+        print(json.dumps({"trace": w, "grid_size": list(job["grid_size"])}))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,445 @@
+import copy
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+from checkers.CounterexampleSearch import parse_counterexample_formula, prefix_checks, search
+from checkers.TraceSpaceIndex import grid_key
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import generate_grids as \
+    generate_baseline_grids
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    generate_all_satisfying_grids, group_by_static_props, is_state_formula_string
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import divide_cars_in_types, \
+    filter_state_assumptions, build_adjacency, compute_components, generate_grids as generate_motion_grids, \
+    movements_consistent, next_grids
+from formula_types.FormulaCost import order_by_cost, adapt_order, ADAPT_INTERVAL
+from formula_types.FormulaSimplifier import simplify
+from formula_types.HybridSpatioTemporalFormula import HybridSpatioTemporalFormula
+from formula_types.Trace import Trace
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+# checkers whose trace spaces the session can build
+CHECKERS: list[str] = ["baseline", "optimized", "motion"]
+
+# number of traces between two progress events
+PROGRESS_INTERVAL: int = 10000
+
+# number of scenarios whose grid pools and transitions are kept
+MAX_SCENARIOS: int = 16
+
+# number of parsed formulas that are kept
+MAX_FORMULAS: int = 1024
+
+
+class Cancelled(Exception):
+    """
+    Raised inside a job when it has been cancelled.
+    """
+    pass
+
+
+class TraceSpace:
+    """
+    The traces of a checker for one scenario, given by the grids a trace can start with and a successor function.
+    If transitions are cached, grids reached repeatedly are only expanded once.
+    """
+
+    def __init__(self, roots: list[dict], successors: Callable[[dict], Iterable[dict]], formula_assumptions: list[str],
+                 cache_transitions: bool = False):
+        self.roots = roots
+        self.formula_assumptions = formula_assumptions
+        self.cache_transitions = cache_transitions
+        self._successors = successors
+        self._transitions: dict[tuple, list[dict]] = {}
+        self._canonical_roots: Optional[list[dict]] = None
+        self._lock = threading.Lock()
+
+    def successors(self, grid: dict) -> list[dict]:
+        """
+        Returns the grids that can follow the given grid.
+
+        :param grid: the grid
+        :return: the list of successor grids
+        """
+        if not self.cache_transitions:
+            return self._successors(grid)
+
+        key: tuple = grid_key(grid)
+        result: Optional[list[dict]] = self._transitions.get(key)
+        if result is None:
+            result = list(self._successors(grid))
+            with self._lock:
+                self._transitions[key] = result
+        return result
+
+    def canonical_roots(self) -> list[dict]:
+        """
+        Returns the start grids in an order that does not depend on the process (e.g. on its hash seed), so that a
+        range of them denotes the same traces in every process.
+
+        :return: the sorted start grids
+        """
+        if self._canonical_roots is None:
+            self._canonical_roots = sorted(self.roots, key=grid_key)
+        return self._canonical_roots
+
+    def transition_count(self) -> int:
+        """
+        Returns the number of cached transitions.
+
+        :return: the number of grids whose successors are cached
+        """
+        return len(self._transitions)
+
+
+def enumerate_traces(space: TraceSpace, max_trace_length: int, cancel_event: Optional[threading.Event] = None,
+                     roots: Optional[Iterable[dict]] = None) -> Iterable[Trace]:
+    """
+    Enumerates the traces of a trace space depth-first.
+
+    :param space: the trace space
+    :param max_trace_length: the maximal length of the traces
+    :param cancel_event: if set, the enumeration stops with Cancelled
+    :param roots: the start grids of the enumerated traces (all start grids of the space if None)
+    :return: the traces of the space up to the given length
+    """
+    stack: list[tuple[Trace, iter]] = [(Trace(), iter(space.roots if roots is None else roots))]
+    while stack:
+        prefix, remaining = stack[-1]
+        grid: Optional[dict] = next(remaining, None)
+        if grid is None:
+            stack.pop()
+            continue
+        if cancel_event is not None and cancel_event.is_set():
+            raise Cancelled()
+
+        trace: Trace = prefix.extend(grid)
+        yield trace
+        if len(trace) < max_trace_length:
+            stack.append((trace, iter(space.successors(grid))))
+
+
+class Job:
+    """
+    A query running in a session.
+    """
+
+    def __init__(self, job_id: int, kind: str):
+        self.id = job_id
+        self.kind = kind
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+
+    def cancel(self):
+        """
+        Requests the job to stop at the next trace.
+        """
+        self.cancel_event.set()
+
+    def result(self, timeout: Optional[float] = None):
+        """
+        Waits for the result of the job.
+
+        :param timeout: maximal number of seconds to wait
+        :return: the result of the query
+        """
+        return self.future.result(timeout)
+
+
+class ModelCheckerSession:
+    """
+    Answers model checking queries while keeping parsed formulas, grid pools and transitions of recently used
+    scenarios in memory, so that repeated queries against the same scenario only pay for the evaluation.
+    Queries can be run directly or submitted as cancellable jobs that are processed concurrently.
+    """
+
+    def __init__(self, max_workers: int = 4, max_scenarios: int = MAX_SCENARIOS, max_formulas: int = MAX_FORMULAS):
+        self.max_scenarios = max_scenarios
+        self.max_formulas = max_formulas
+        self._formulas: OrderedDict = OrderedDict()
+        self._spaces: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._jobs: dict[int, Job] = {}
+        self._job_ids = itertools.count(1)
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def parse(self, formula_string: str) -> HybridSpatioTemporalFormula:
+        """
+        Parses and simplifies a formula, reusing earlier parses of the same string (of the max_formulas most
+        recently used ones).
+
+        :param formula_string: the formula
+        :return: a fresh copy of the simplified formula (evaluation statistics are per query)
+        """
+        with self._lock:
+            fml: Optional[HybridSpatioTemporalFormula] = self._formulas.get(formula_string)
+            if fml is not None:
+                self._formulas.move_to_end(formula_string)
+        if fml is None:
+            fml = simplify(HybridSpatioTemporalParser(tokenize(formula_string)).parse())
+            with self._lock:
+                self._formulas[formula_string] = fml
+                self._formulas.move_to_end(formula_string)
+                while len(self._formulas) > self.max_formulas:
+                    self._formulas.popitem(last=False)
+        return copy.deepcopy(fml)
+
+    def trace_space(self, checker: str, props: list[str], noms: list[str], assumptions: list[str],
+                    conclusions: list[str], grid_size: tuple[int, int], static_props: list[str] = ()) -> TraceSpace:
+        """
+        Returns the trace space of a checker for a scenario, building it on first use.
+
+        :param checker: the checker, one of CHECKERS
+        :param props: the list of propositions
+        :param noms: the list of nominals
+        :param assumptions: the list of assumptions
+        :param conclusions: the list of state conclusions that may restrict the grid pool (optimized checker only)
+        :param grid_size: the size of the grid
+        :param static_props: the propositions whose placement does not change over time
+        :return: the trace space
+        """
+        if checker not in CHECKERS:
+            raise ValueError(f"Unknown checker {checker}")
+        if static_props and checker == "baseline":
+            raise ValueError("Static propositions are only supported by the optimized and motion checkers.")
+
+        key: tuple = (checker, tuple(props), tuple(noms), tuple(assumptions), tuple(conclusions), tuple(grid_size),
+                      tuple(static_props))
+        with self._lock:
+            space: Optional[TraceSpace] = self._spaces.get(key)
+            if space is not None:
+                self._spaces.move_to_end(key)
+                self.hits = self.hits + 1
+                return space
+            self.misses = self.misses + 1
+
+        space = self._build_trace_space(checker, props, noms, assumptions, conclusions, grid_size, static_props)
+        with self._lock:
+            self._spaces[key] = space
+            while len(self._spaces) > self.max_scenarios:
+                self._spaces.popitem(last=False)
+        return space
+
+    def _build_trace_space(self, checker: str, props: list[str], noms: list[str], assumptions: list[str],
+                           conclusions: list[str], grid_size: tuple[int, int], static_props: list[str]) -> TraceSpace:
+        if checker == "baseline":
+            grids: list[dict] = generate_baseline_grids(props, noms, grid_size)
+            return TraceSpace(grids, lambda grid: grids, list(assumptions))
+
+        if checker == "optimized":
+            state_fmls: list[str] = [a for a in assumptions + conclusions if is_state_formula_string(a)]
+            grids: list[dict] = generate_all_satisfying_grids(props, noms, grid_size,
+                                                              [self.parse(a) for a in state_fmls])
+            groups: dict[int, list[dict]] = {}
+            for group in group_by_static_props(grids, static_props):
+                for grid in group:
+                    groups[id(grid)] = group
+            return TraceSpace(grids, lambda grid: groups[id(grid)], [a for a in assumptions if a not in state_fmls])
+
+        static_cars, dependent_cars, fixed_movement_cars, remaining_assumptions = divide_cars_in_types(assumptions)
+        state_assumptions, remaining_assumptions = filter_state_assumptions(remaining_assumptions)
+        parsed_state_assumptions: list[HybridSpatioTemporalFormula] = [self.parse(a) for a in state_assumptions]
+        components: list[dict] = compute_components(build_adjacency(dependent_cars))
+        dep_cars: list[str] = [x for xs in components for x in xs.keys()]
+        independent_cars: set[str] = set(noms) - set(static_cars) - set(dep_cars) - set(fixed_movement_cars)
+        roots: list[dict] = list(generate_motion_grids(grid_size, props, noms, components, parsed_state_assumptions))
+
+        def successors(grid: dict) -> Iterable[dict]:
+            # contradicting movement constraints admit no trace longer than one grid
+            if not movements_consistent(static_cars, components, fixed_movement_cars):
+                return []
+            return next_grids(grid_size, props, static_cars, components, fixed_movement_cars, independent_cars,
+                              parsed_state_assumptions, grid, static_props)
+
+        # the successors of a grid only depend on its contents
+        return TraceSpace(roots, successors, remaining_assumptions, cache_transitions=True)
+
+    @staticmethod
+    def _state_conclusions(checker: str, conclusions: list[str]) -> list[str]:
+        # only the optimized checker restricts its grid pool by the state conclusions
+        return [c for c in conclusions if checker == "optimized" and is_state_formula_string(c)]
+
+    def start_grids(self, checker: str, props: list[str], noms: list[str], assumptions: list[str],
+                    conclusions: list[str], grid_size: tuple[int, int], static_props: list[str] = ()) -> list[dict]:
+        """
+        Returns the start grids of the traces that count enumerates, in the canonical order used by its root_range.
+
+        :param checker: the checker, one of CHECKERS
+        :param props: the list of propositions
+        :param noms: the list of nominals
+        :param assumptions: the list of assumptions
+        :param conclusions: the list of conclusions
+        :param grid_size: the size of the grid
+        :param static_props: the propositions whose placement does not change over time
+        :return: the start grids
+        """
+        return self.trace_space(checker, props, noms, assumptions, self._state_conclusions(checker, conclusions),
+                                grid_size, static_props).canonical_roots()
+
+    def count(self, checker: str, props: list[str], noms: list[str], assumptions: list[str], conclusions: list[str],
+              grid_size: tuple[int, int], max_trace_length: int, static_props: list[str] = (),
+              cancel_event: Optional[threading.Event] = None,
+              progress: Optional[Callable[[int, int], None]] = None,
+              root_range: Optional[tuple[int, int]] = None,
+              witness: Optional[Callable[[Trace], None]] = None) -> tuple[int, int]:
+        """
+        Counts the traces of a checker on which the assumptions and conclusions hold at some point, like the
+        evaluate function of the checker.
+
+        :param checker: the checker, one of CHECKERS
+        :param props: the list of propositions
+        :param noms: the list of nominals
+        :param assumptions: the list of assumptions
+        :param conclusions: the list of conclusions
+        :param grid_size: the size of the grid
+        :param max_trace_length: the maximal trace length
+        :param static_props: the propositions whose placement does not change over time
+        :param cancel_event: if set, the query stops with Cancelled
+        :param progress: called with the number of satisfying and enumerated traces every PROGRESS_INTERVAL traces
+        :param root_range: only count the traces starting with the start grids in this range of the canonical
+                           order (see start_grids), all traces if None
+        :param witness: called with every satisfying trace
+        :return: the number of satisfying traces and the number of traces
+        """
+        space: TraceSpace = self.trace_space(checker, props, noms, assumptions,
+                                             self._state_conclusions(checker, conclusions), grid_size, static_props)
+        roots: Optional[list[dict]] = None
+        if root_range is not None:
+            roots = space.canonical_roots()[root_range[0]:root_range[1]]
+
+        # conjunction of assumptions and conclusion
+        formula: HybridSpatioTemporalFormula = self.parse("&".join(
+            [*("(" + x + ")" for x in conclusions), *("(" + x + ")" for x in space.formula_assumptions)]))
+        order_by_cost(formula)
+
+        points: list[tuple[int, int]] = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+        counter_sat: int = 0
+        counter_gen: int = 0
+
+        for t in enumerate_traces(space, max_trace_length, cancel_event, roots):
+            if any(formula.evaluate(t, p, grid_size) for p in points):
+                counter_sat = counter_sat + 1
+                if witness is not None:
+                    witness(t)
+            counter_gen = counter_gen + 1
+
+            # adapt the conjunct order to the observed failure rates
+            if counter_gen % ADAPT_INTERVAL == 0:
+                adapt_order(formula)
+            if progress is not None and counter_gen % PROGRESS_INTERVAL == 0:
+                progress(counter_sat, counter_gen)
+
+        return counter_sat, counter_gen
+
+    def find_counterexample(self, checker: str, props: list[str], noms: list[str], assumptions: list[str],
+                            conclusions: list[str], grid_size: tuple[int, int], max_trace_length: int,
+                            static_props: list[str] = (), cancel_event: Optional[threading.Event] = None) -> \
+            tuple[Optional[Trace], list[tuple[int, int]], int]:
+        """
+        Searches the traces of a checker for one on which the assumptions hold but the conclusions do not, like
+        the find_counterexample function of the checker.
+
+        :param checker: the checker, one of CHECKERS
+        :param props: the list of propositions
+        :param noms: the list of nominals
+        :param assumptions: the list of assumptions
+        :param conclusions: the list of conclusions
+        :param grid_size: the size of the grid
+        :param max_trace_length: the maximal trace length
+        :param static_props: the propositions whose placement does not change over time
+        :param cancel_event: if set, the query stops with Cancelled
+        :return: the counterexample trace (None if there is none), the points at which it violates the conclusions,
+                 and the number of traces explored
+        """
+        space: TraceSpace = self.trace_space(checker, props, noms, assumptions, [], grid_size, static_props)
+
+        def successors(grid: dict) -> list[dict]:
+            if cancel_event is not None and cancel_event.is_set():
+                raise Cancelled()
+            return space.successors(grid)
+
+        return search(parse_counterexample_formula(space.formula_assumptions, conclusions),
+                      prefix_checks(space.formula_assumptions), space.roots, successors, grid_size, max_trace_length)
+
+    def submit(self, kind: str, on_event: Optional[Callable[[dict], None]] = None, **query) -> Job:
+        """
+        Runs a query ("count" or "counterexample") in the background. Events are reported as dictionaries with an
+        "event" entry: "progress" (count queries only), "result", "cancelled" or "error".
+
+        :param kind: the kind of query
+        :param on_event: called with every event of the job
+        :param query: the keyword arguments of count or find_counterexample
+        :return: the job
+        """
+        if kind not in ("count", "counterexample"):
+            raise ValueError(f"Unknown query {kind}")
+
+        job: Job = Job(next(self._job_ids), kind)
+        emit: Callable[[dict], None] = on_event if on_event is not None else (lambda event: None)
+
+        def run():
+            try:
+                if kind == "count":
+                    sat, gen = self.count(cancel_event=job.cancel_event,
+                                          progress=lambda s, g: emit({"event": "progress", "sat": s, "traces": g}),
+                                          **query)
+                    result: dict = {"event": "result", "sat": sat, "traces": gen}
+                else:
+                    trace, points, explored = self.find_counterexample(cancel_event=job.cancel_event, **query)
+                    result: dict = {"event": "result", "trace": None if trace is None else list(trace),
+                                    "points": points, "explored": explored}
+                emit(result)
+                return result
+            except Cancelled:
+                emit({"event": "cancelled"})
+                raise
+            except Exception as e:
+                emit({"event": "error", "message": str(e)})
+                raise
+            finally:
+                with self._lock:
+                    self._jobs.pop(job.id, None)
+
+        with self._lock:
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(run)
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancels a running job.
+
+        :param job_id: the id of the job
+        :return: true if the job was still running, false otherwise
+        """
+        with self._lock:
+            job: Optional[Job] = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def stats(self) -> dict:
+        """
+        Returns statistics about the caches and jobs of the session.
+
+        :return: dictionary of statistics
+        """
+        with self._lock:
+            return {"formulas": len(self._formulas), "scenarios": len(self._spaces),
+                    "transitions": sum(space.transition_count() for space in self._spaces.values()),
+                    "hits": self.hits, "misses": self.misses, "jobs": len(self._jobs)}
+
+    def close(self):
+        """
+        Cancels all running jobs and stops the worker threads.
+        """
+        with self._lock:
+            jobs: list[Job] = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,22 @@
+"""
+The one-lane-follow scenario of checkers.ScenarioFamilies (README.md/Experiments/One Lane Follow) shared by the
+tests, with the variants of its assumptions they check.
+"""
+from checkers.ScenarioFamilies import one_lane_follow
+
+# SV starts at the beginning of the lane, POV moves forward or stays put, SV follows POV
+FOLLOW_ASSUMPTIONS: list[str] = one_lane_follow(3, 4)["assumptions"]
+START, POV_MOVES, SV_FOLLOWS = FOLLOW_ASSUMPTIONS
+
+# the vehicles additionally start at different cells
+APART_ASSUMPTIONS: list[str] = [START, "@z0 !z1", POV_MOVES, SV_FOLLOWS]
+
+# the vehicles are never at the same cell
+ALWAYS_APART_ASSUMPTIONS: list[str] = [START, "G (@z0 !z1)", POV_MOVES, SV_FOLLOWS]
+
+# the vehicles start at different cells, SV moves freely
+FREE_SV_ASSUMPTIONS: list[str] = [START, "@z0 !z1", POV_MOVES]
+
+# SV is never right behind POV, checked on a 4x1 road up to length 3
+FOLLOW_SCENARIO: dict = {"props": [], "noms": ["z0", "z1"], "assumptions": APART_ASSUMPTIONS,
+                         "conclusions": ["G(@z0 ! Front z1)"], "grid_size": (4, 1), "max_trace_length": 3}
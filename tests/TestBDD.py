@@ -0,0 +1,43 @@
+import unittest
+
+from checkers.symbolic_version.BDD import BDD
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import evaluate as evaluate_baseline
+from checkers.symbolic_version.evaluator_bdd.BDDSpatioTemporalEvaluator import evaluate as evaluate_bdd
+
+
+class TestBDD(unittest.TestCase):
+    def setUp(self):
+        self.bdd = BDD()
+        self.x0 = self.bdd.var(0)
+        self.x1 = self.bdd.var(1)
+        self.x2 = self.bdd.var(2)
+
+    def test_reduction(self):
+        self.assertEqual(self.x1, self.bdd.conj(self.x1, self.bdd.disj(self.x1, self.x2)))
+        self.assertEqual(BDD.FALSE, self.bdd.conj(self.x0, self.bdd.neg(self.x0)))
+        self.assertEqual(BDD.TRUE, self.bdd.iff(self.x2, self.x2))
+
+    def test_count(self):
+        self.assertEqual(4, self.bdd.count(self.x1, 3))
+        self.assertEqual(6, self.bdd.count(self.bdd.disj(self.x0, self.x2), 3))
+        self.assertEqual(8, self.bdd.count(BDD.TRUE, 3))
+        self.assertEqual(0, self.bdd.count(BDD.FALSE, 3))
+
+    def test_assignments(self):
+        assignments = list(self.bdd.assignments(self.bdd.conj(self.x0, self.bdd.neg(self.x2)), 3))
+        self.assertEqual([[True, False, False], [True, True, False]], assignments)
+
+    def test_evaluate_agrees_with_baseline(self):
+        cases = [
+            (["a"], ["z"], ["@z !(Back 1)"], ["F(a & X z)"], (2, 2), 2),
+            ([], ["z0", "z1"], ["G (@z1 ↓z2 ((! X 1) | X @z1  (z2 | Back z2)))"], ["G(@z0 ! z1)"], (3, 1), 3),
+        ]
+        for props, noms, assumptions, conclusions, grid_size, length in cases:
+            expected = evaluate_baseline(props, noms, assumptions, conclusions, grid_size, length, False)
+            for encoding in ["binary", "onehot"]:
+                self.assertEqual(expected, evaluate_bdd(props, noms, assumptions, conclusions, grid_size, length,
+                                                        False, encoding))
+
+
+if __name__ == '__main__':
+    unittest.main()
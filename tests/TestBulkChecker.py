@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+
+from checkers.BulkChecker import BulkStatistics, check_traces, parse_grid
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import \
+    evaluate_each as evaluate_each_baseline, write_trace_corpus as write_trace_corpus_baseline
+from tests.FollowScenario import APART_ASSUMPTIONS
+
+CONCLUSIONS = ["G(@z0 ! Front z1)", "F(@z0 Front z1)"]
+
+
+def statistics(verdicts, formulas):
+    result = BulkStatistics(formulas)
+    for verdict in verdicts:
+        result.add(verdict)
+    return result.to_dict()
+
+
+class TestBulkChecker(unittest.TestCase):
+    def test_parse_grid(self):
+        self.assertEqual({"z0": (1, 2), "a": [(0, 0), (1, 1)], "b": []},
+                         parse_grid({"z0": [1, 2], "a": [[0, 0], [1, 1]], "b": []}))
+
+    def test_jsonl(self):
+        lines = [{"id": "grids", "trace": [{"z0": [0, 0], "a": []}, {"z0": [0, 0], "a": [[0, 0]]}]},
+                 {"spec": [["z0;z0,a"], [";"]], "grid_size": [2, 1]},
+                 [{"z0": [0, 0], "a": [[1, 0]]}]]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(json.dumps(line) + "\n")
+                f.write("{not json}\n")
+            verdicts = list(check_traces(["F a", "a"], [], path, (2, 1)))
+
+        self.assertEqual(["grids", 2, 3, 4], [v["id"] for v in verdicts])
+        self.assertEqual([[True, False], [True, False], [True, True]], [v["satisfied"] for v in verdicts[:3]])
+        self.assertEqual([[True, True], [True, True], [True, True]], [v["violated"] for v in verdicts[:3]])
+        self.assertIn("error", verdicts[3])
+        self.assertEqual(1, statistics(verdicts, ["F a", "a"])["errors"])
+
+    def test_corpus_matches_evaluate_each(self):
+        sat_counts, violation_counts, counter_gen = evaluate_each_baseline([], ["z0", "z1"], APART_ASSUMPTIONS,
+                                                                           CONCLUSIONS, (3, 1), 3, False)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.trc")
+            write_trace_corpus_baseline([], ["z0", "z1"], APART_ASSUMPTIONS, (3, 1), 3, path)
+            for workers in (1, 2):
+                result = statistics(check_traces(CONCLUSIONS, APART_ASSUMPTIONS, path, workers=workers,
+                                                 batch_size=100), CONCLUSIONS)
+                self.assertEqual(counter_gen, result["traces"])
+                self.assertEqual(sat_counts, [f["satisfied"] for f in result["formulas"]])
+                self.assertEqual(violation_counts, [f["violated"] for f in result["formulas"]])
+
+    def test_invalid_formula_fails_before_the_workers_start(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps([{"z0": [0, 0], "a": []}]) + "\n")
+            for formulas, assumptions in ((["F a", "G (a &"], []), (["F a"], ["G (a &"])):
+                with self.assertRaises(SyntaxError):
+                    list(check_traces(formulas, assumptions, path, (1, 1), workers=2))
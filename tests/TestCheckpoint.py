@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from checkers.Checkpoint import Checkpointer, checkpoint_scenario
+from checkers.baseline_version.evaluator_baseline import BaselineSpatioTemporalEvaluator
+from checkers.optimized_version.evaluator_optimized import OptimizedSpatioTemporalEvaluator1, \
+    OptimizedSpatioTemporalEvaluator2
+
+CONCLUSIONS = ["F (@z0 Back z1)"]
+
+
+class Preempted(Exception):
+    pass
+
+
+def preempt_after(calls):
+    # adapt_order replacement that fails on the given call, after the checkpoints of the previous calls
+    state = {"calls": 0}
+
+    def adapt_order(fml):
+        state["calls"] = state["calls"] + 1
+        if state["calls"] == calls:
+            raise Preempted()
+
+    return adapt_order
+
+
+class TestCheckpoint(unittest.TestCase):
+    def check_resume(self, module, options):
+        args = ([], ["z0", "z1"], [], CONCLUSIONS, (3, 1), 4, False)
+        expected = module.evaluate(*args, **options)
+        self.assertGreater(expected[1], 3000)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "count.ckpt")
+            with mock.patch.object(Checkpointer, "due", return_value=True), \
+                    mock.patch.object(module, "adapt_order", preempt_after(3)):
+                with self.assertRaises(Preempted):
+                    module.evaluate(*args, checkpoint=path, **options)
+
+            with open(path, encoding="utf-8") as f:
+                self.assertIn('"counter_gen": 2000', f.read())
+            self.assertEqual(expected, module.evaluate(*args, checkpoint=path, resume=True, **options))
+
+            # a finished count is not repeated
+            with mock.patch.object(module, "satisfying_points", side_effect=AssertionError):
+                self.assertEqual(expected, module.evaluate(*args, checkpoint=path, resume=True, **options))
+
+    def test_resume_baseline(self):
+        self.check_resume(BaselineSpatioTemporalEvaluator, {})
+
+    def test_resume_optimized(self):
+        self.check_resume(OptimizedSpatioTemporalEvaluator1, {})
+
+    def test_resume_motion(self):
+        self.check_resume(OptimizedSpatioTemporalEvaluator2, {})
+
+    def test_checkpoint_of_other_count(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "count.ckpt")
+            scenario = checkpoint_scenario("baseline", [], ["z0"], [], ["z0"], (2, 1), 2)
+            Checkpointer(path, scenario, False).save(3, 1, 3)
+            self.assertEqual((3, 1, 3), (lambda c: (c.position, c.counter_sat, c.counter_gen))(
+                Checkpointer(path, scenario, True)))
+            with self.assertRaises(ValueError):
+                Checkpointer(path, checkpoint_scenario("baseline", [], ["z0"], [], ["!z0"], (2, 1), 2), True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from formula_types.ClassicalLogicFormula import Prop, Verum, Falsum, Not, And, Or, If, Iff
+from formula_types.ClassicalLogicFormula import Prop, Verum, Falsum, Not, And, Or, If, Iff, NaryAnd, NaryOr
 
 
 class TestClassicalLogicFormula(unittest.TestCase):
@@ -57,6 +57,22 @@ class TestClassicalLogicFormula(unittest.TestCase):
         for pt in [self.point1, self.point2, self.point3, self.point4]:
             self.assertTrue(a_or_b.evaluate(self.grid, pt, self.grid_size))
 
+    def test_nary_and_evaluate(self):
+        a_and_b_and_top = NaryAnd("AND", [self.a, self.b, Verum()])
+        a_and_b_and_top.counting = True
+        self.assertTrue(a_and_b_and_top.evaluate(self.grid, self.point1, self.grid_size))
+        self.assertFalse(a_and_b_and_top.evaluate(self.grid, self.point2, self.grid_size))
+        self.assertEqual([2, 2, 1], a_and_b_and_top.evaluations)
+        self.assertEqual([0, 1, 0], a_and_b_and_top.decisions)
+
+    def test_nary_or_evaluate(self):
+        bot_or_a_or_b = NaryOr("OR", [Falsum(), self.a, self.b])
+        bot_or_a_or_b.counting = True
+        self.assertTrue(bot_or_a_or_b.evaluate(self.grid, self.point3, self.grid_size))
+        self.assertTrue(bot_or_a_or_b.evaluate(self.grid, self.point2, self.grid_size))
+        self.assertEqual([2, 2, 1], bot_or_a_or_b.evaluations)
+        self.assertEqual([0, 1, 1], bot_or_a_or_b.decisions)
+
     def test_if_evaluate(self):
         a_implies_b = If("IMPLIES", self.a, self.b)
 
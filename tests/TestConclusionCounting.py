@@ -0,0 +1,32 @@
+import unittest
+
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import \
+    evaluate as evaluate_baseline, evaluate_each as evaluate_each_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    evaluate as evaluate_optimized1, evaluate_each as evaluate_each_optimized1
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2, evaluate_each as evaluate_each_optimized2
+from tests.FollowScenario import APART_ASSUMPTIONS
+
+CONCLUSIONS = ["G(@z0 ! Front z1)", "G(@z0 ! Back z1)", "F(@z0 Front z1)"]
+
+CHECKERS = [(evaluate_baseline, evaluate_each_baseline), (evaluate_optimized1, evaluate_each_optimized1),
+            (evaluate_optimized2, evaluate_each_optimized2)]
+
+
+class TestConclusionCounting(unittest.TestCase):
+    def test_counts_match_separate_evaluations(self):
+        for evaluate, evaluate_each in CHECKERS:
+            sat_counts, violation_counts, counter_gen = evaluate_each([], ["z0", "z1"], APART_ASSUMPTIONS,
+                                                                      CONCLUSIONS, (4, 1), 3, False)
+            # the optimized checker also restricts its grid pool by state conclusions, which only changes #Trace
+            for c, sat, violated in zip(CONCLUSIONS, sat_counts, violation_counts):
+                self.assertEqual(sat, evaluate([], ["z0", "z1"], APART_ASSUMPTIONS, [c], (4, 1), 3, False)[0])
+                self.assertEqual((violated, counter_gen),
+                                 evaluate([], ["z0", "z1"], APART_ASSUMPTIONS, ["!(" + c + ")"], (4, 1), 3, False))
+
+    def test_without_assumptions(self):
+        sat_counts, violation_counts, counter_gen = evaluate_each_baseline(["a"], [], [], ["a", "!a"], (1, 1), 2, False)
+        self.assertEqual(6, counter_gen)
+        self.assertEqual([3, 3], sat_counts)
+        self.assertEqual([3, 3], violation_counts)
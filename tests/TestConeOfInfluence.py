@@ -0,0 +1,42 @@
+import unittest
+
+from checkers.ConeOfInfluence import ConeOfInfluence, formula_symbols
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import evaluate as evaluate_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    evaluate as evaluate_optimized1
+from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
+
+
+def parse(s):
+    return HybridSpatioTemporalParser(tokenize(s)).parse()
+
+
+class TestConeOfInfluence(unittest.TestCase):
+    def test_symbols_and_factors(self):
+        self.assertEqual({"p", "z0", "z1", "z2"}, formula_symbols(parse("@z0 ↓z2 F (p & Front z1)")))
+
+        cone = ConeOfInfluence([parse("X (p & z0)")], ["p", "q"], ["z0", "z1"], (2, 1), 3)
+        self.assertEqual((["p"], ["z0"], ["q", "z1"]), (cone.props, cone.noms, cone.projected))
+        self.assertEqual(2 ** 2 * 2, cone.grid_factor)
+        self.assertEqual((1, 2), (cone.horizon, cone.max_trace_length))
+        self.assertTrue(cone.reduces())
+        # a trace of length 2 stands for its extensions by any of the 8 * 8 grids of the full space
+        self.assertEqual(8 ** 2 * (1 + 64), cone.weight(2, 8))
+
+        cone = ConeOfInfluence([parse("G p")], ["p", "h"], [], (2, 2), 3, static_props=["h"])
+        self.assertEqual((1, 2 ** 4, 3), (cone.grid_factor, cone.trace_factor, cone.max_trace_length))
+        self.assertFalse(ConeOfInfluence([parse("F (p & z0)")], ["p"], ["z0"], (2, 2), 3).reduces())
+
+    def test_counts_equal_full_enumeration(self):
+        scenarios = [(["p", "q"], ["z0", "z1"], ["@z0 p"], ["X (p & z1)"], (2, 1), 3),
+                     (["p", "q"], ["z0"], ["G (@z0 !(Front 1))"], ["F p"], (2, 1), 3),
+                     (["p"], ["z0", "z1"], ["p | 1"], ["@z0 Front 1"], (3, 1), 3)]
+        for scenario in scenarios:
+            for evaluate in (evaluate_baseline, evaluate_optimized1):
+                self.assertEqual(evaluate(*scenario, False), evaluate(*scenario, False, cone_of_influence=True))
+
+    def test_static_props(self):
+        scenario = (["p", "h"], ["z0"], ["@z0 !(Back 1)"], ["X p"], (2, 1), 3)
+        for static_props in (["h"], ["p"]):
+            self.assertEqual(evaluate_optimized1(*scenario, False, static_props=static_props),
+                             evaluate_optimized1(*scenario, False, static_props=static_props, cone_of_influence=True))
@@ -0,0 +1,43 @@
+import unittest
+
+from checkers.CounterexampleSearch import parse_counterexample_formula, prefix_checks
+from checkers.SpatioTemporalEvaluatorUtils import satisfying_points
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import \
+    find_counterexample as find_counterexample_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    find_counterexample as find_counterexample_optimized1
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    find_counterexample as find_counterexample_optimized2
+from formula_types.FormulaUtils import temporal_horizon
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+from tests.FollowScenario import APART_ASSUMPTIONS
+
+FINDERS = [find_counterexample_baseline, find_counterexample_optimized1, find_counterexample_optimized2]
+
+
+class TestCounterexampleSearch(unittest.TestCase):
+    def test_temporal_horizon(self):
+        self.assertEqual(0, temporal_horizon(HybridSpatioTemporalParser(tokenize("@z0 !(Back 1)")).parse()))
+        self.assertEqual(2, temporal_horizon(HybridSpatioTemporalParser(tokenize("X (a & X z)")).parse()))
+        self.assertIsNone(temporal_horizon(HybridSpatioTemporalParser(tokenize("X F a")).parse()))
+
+    def test_prefix_checks(self):
+        checks = prefix_checks(APART_ASSUMPTIONS + ["F a"])
+        self.assertEqual([(0, False), (0, False), (1, True), (1, True)], [(h, g) for _, h, g in checks])
+
+    def test_counterexample_found(self):
+        conclusions = ["G(@z0 ! Front z1)"]
+        counterexample_formula = parse_counterexample_formula(APART_ASSUMPTIONS, conclusions)
+        for finder in FINDERS:
+            trace, points, explored = finder([], ["z0", "z1"], APART_ASSUMPTIONS, conclusions, (4, 1), 3)
+            self.assertIsNotNone(trace)
+            self.assertTrue(points)
+            self.assertEqual(points, satisfying_points(counterexample_formula, trace, (4, 1)))
+
+    def test_no_counterexample(self):
+        for finder in FINDERS:
+            trace, points, explored = finder([], ["z0", "z1"], APART_ASSUMPTIONS, ["G(@z0 ! z1)"], (4, 1), 3)
+            self.assertIsNone(trace)
+            self.assertEqual([], points)
+            # the pruned search explores far fewer than the 16 + 16^2 + 16^3 traces
+            self.assertLess(explored, 16 + 16 ** 2)
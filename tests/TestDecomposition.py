@@ -0,0 +1,54 @@
+import unittest
+
+from checkers.Decomposition import conjuncts, weaken, decompose, decomposed_check
+from checkers.ScenarioFamilies import FAMILIES
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import \
+    find_counterexample as find_counterexample_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    find_counterexample as find_counterexample_optimized2
+from formula_types.FormulaSimplifier import simplify
+from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
+
+
+def parse(s):
+    return HybridSpatioTemporalParser(tokenize(s)).parse()
+
+
+class TestDecomposition(unittest.TestCase):
+    def test_conjuncts_and_weakening(self):
+        self.assertEqual(["G(@z0(¬ z1))", "G(@z0(¬ z2))", "X p"],
+                         [repr(c) for c in conjuncts(parse("(G(@z0 !(z1|z2))) & X p"))])
+        self.assertEqual(1, len(conjuncts(parse("F (p & q)"))))
+
+        # z2 is replaced so that the formula gets weaker, bound nominals are kept
+        self.assertEqual("¬ z1", repr(simplify(weaken(parse("!(z1|z2)"), {"z2"}))))
+        self.assertEqual("Front z1", repr(simplify(weaken(parse("Front z1 & (p | !z2)"), {"z2"}))))
+        self.assertEqual("⊤", repr(simplify(weaken(parse("@z2 p -> p"), {"z2"}))))
+        self.assertEqual("↓z2(Front z2)", repr(weaken(parse("↓z2 (Front z2)"), {"z2"})))
+
+        # weakened n-ary nodes do not share the evaluation statistics of the original
+        original = parse("p & q & !z2")
+        weakened = weaken(original, {"z2"})
+        weakened.evaluations[0] += 1
+        self.assertEqual([0, 0, 0], original.evaluations)
+
+    def test_decompose(self):
+        s = FAMILIES["platoon"].scenario(platoon_size=3)
+        checks = decompose(s["noms"], s["assumptions"], s["conclusions"])
+        self.assertEqual([["z0", "z1"], ["z0", "z2"], ["z0", "z3"]], [c[0] for c in checks])
+        for names, assumptions, _ in checks:
+            others = set(s["noms"]) - set(names)
+            self.assertFalse(any(n in a for a in assumptions for n in others))
+
+    def test_decomposed_check(self):
+        s = FAMILIES["platoon"].scenario(platoon_size=2)
+        args = (s["props"], s["noms"], s["assumptions"], s["conclusions"], s["grid_size"], s["max_trace_length"])
+        result, checks = decomposed_check(find_counterexample_optimized2, *args)
+        self.assertIsNone(result[0])
+        self.assertEqual(2, len(checks))
+
+        # a counterexample of a group is confirmed by the undecomposed check
+        args = ([], ["z0", "z1"], ["G @z1 Front z0"], ["G !(z0 | z1)"], (2, 1), 2)
+        result, checks = decomposed_check(find_counterexample_baseline, *args)
+        self.assertEqual(find_counterexample_baseline(*args), result)
+        self.assertEqual(list(args[1]), checks[-1]["noms"])
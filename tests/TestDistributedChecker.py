@@ -0,0 +1,127 @@
+import json
+import socket
+import threading
+import unittest
+
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import \
+    evaluate as evaluate_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    evaluate as evaluate_optimized1
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2
+from service.DistributedChecker import Coordinator, run_worker
+from tests.FollowScenario import FOLLOW_SCENARIO
+
+
+class FakeWorker:
+    """
+    A worker connection driven by the test.
+    """
+
+    def __init__(self, address):
+        self.sock = socket.create_connection(address)
+        self.stream = self.sock.makefile("rwb")
+
+    def request(self, message: dict) -> dict:
+        self.send(message)
+        return json.loads(self.stream.readline().decode("utf-8"))
+
+    def send(self, message: dict):
+        self.stream.write((json.dumps(message) + "\n").encode("utf-8"))
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+
+class TestDistributedChecker(unittest.TestCase):
+    def run_job(self, coordinator: Coordinator, workers: int) -> dict:
+        coordinator.start()
+        threads = [threading.Thread(target=run_worker, args=(coordinator.address,)) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        try:
+            return coordinator.wait(60)
+        finally:
+            for t in threads:
+                t.join()
+            coordinator.close()
+
+    def test_totals_match_single_process(self):
+        evaluators = {"baseline": evaluate_baseline, "optimized": evaluate_optimized1, "motion": evaluate_optimized2}
+        for checker, evaluate in evaluators.items():
+            expected = evaluate(FOLLOW_SCENARIO["props"], FOLLOW_SCENARIO["noms"], FOLLOW_SCENARIO["assumptions"],
+                                FOLLOW_SCENARIO["conclusions"], FOLLOW_SCENARIO["grid_size"],
+                                FOLLOW_SCENARIO["max_trace_length"], False)
+            result = self.run_job(Coordinator({"checker": checker, **FOLLOW_SCENARIO}, shards=5), 3)
+            self.assertEqual(expected, (result["sat"], result["traces"]), checker)
+            self.assertEqual(5, result["shards"])
+            self.assertEqual(1, len(result["witnesses"]))
+
+    def test_failed_shards_are_retried(self):
+        job = {"checker": "motion", **FOLLOW_SCENARIO}
+        expected = self.run_job(Coordinator(job, shards=4), 1)
+
+        coordinator = Coordinator(job, shards=4)
+        coordinator.start()
+        crashing = FakeWorker(coordinator.address)
+        self.assertEqual("job", crashing.request({"op": "job"})["event"])
+        self.assertEqual(0, crashing.request({"op": "pull"})["shard"])
+        crashing.close()
+        failing = FakeWorker(coordinator.address)
+        shard = failing.request({"op": "pull"})
+        failing.send({"op": "failed", "shard": shard["shard"], "error": "out of memory"})
+        failing.close()
+
+        result = self.run_job(coordinator, 2)
+        self.assertEqual((expected["sat"], expected["traces"]), (result["sat"], result["traces"]))
+        self.assertEqual(2, result["retries"])
+
+        coordinator = Coordinator(job, shards=4, max_attempts=2)
+        coordinator.start()
+        worker = FakeWorker(coordinator.address)
+        for _ in range(2):
+            shard = worker.request({"op": "pull"})
+            self.assertEqual(0, shard["shard"])
+            worker.send({"op": "failed", "shard": 0, "error": "broken"})
+        with self.assertRaises(RuntimeError):
+            coordinator.wait(10)
+        worker.close()
+        coordinator.close()
+
+    def test_idle_workers_copy_running_shards(self):
+        coordinator = Coordinator({"checker": "motion", **FOLLOW_SCENARIO}, shards=1)
+        coordinator.start()
+        slow, fast = FakeWorker(coordinator.address), FakeWorker(coordinator.address)
+        self.assertEqual(0, slow.request({"op": "pull"})["shard"])
+        self.assertEqual(0, fast.request({"op": "pull"})["shard"])
+        idle = FakeWorker(coordinator.address)
+        self.assertEqual("wait", idle.request({"op": "pull"})["event"])
+        idle.close()
+        fast.send({"op": "result", "shard": 0, "sat": 1, "traces": 2, "witnesses": []})
+        self.assertEqual("done", fast.request({"op": "pull"})["event"])
+        slow.send({"op": "result", "shard": 0, "sat": 3, "traces": 4, "witnesses": []})
+        result = coordinator.wait(10)
+        self.assertEqual((1, 2, 1), (result["sat"], result["traces"], result["speculative"]))
+        slow.close()
+        fast.close()
+        coordinator.close()
+
+    def test_malformed_messages_are_rejected(self):
+        coordinator = Coordinator({"checker": "motion", **FOLLOW_SCENARIO}, shards=2)
+        coordinator.start()
+        worker = FakeWorker(coordinator.address)
+        self.assertEqual(0, worker.request({"op": "pull"})["shard"])
+        for message in ([1, 2], {"op": "result", "sat": 0, "traces": 0}, {"op": "failed", "shard": 7},
+                        {"op": "failed", "shard": "0"}):
+            self.assertEqual("error", worker.request(message)["event"])
+        self.assertEqual(1, worker.request({"op": "pull"})["shard"])
+
+        result = self.run_job(coordinator, 1)
+        worker.close()
+        self.assertEqual(0, result["retries"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from formula_types.FormulaCost import order_by_cost, adapt_order, estimate_cost, ADAPT_SAMPLE_PERIOD
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+
+def parse(formula: str):
+    return HybridSpatioTemporalParser(tokenize(formula)).parse()
+
+
+class TestFormulaCost(unittest.TestCase):
+    def setUp(self):
+        self.grid_size = (3, 1)
+        self.movement = "G (@z1 ↓z2 ((! X 1) | X @z1  (z2 | Back z2)))"
+        self.start = "@z0 !(Back 1)"
+        self.conclusion = "G(@z0 ! z1)"
+
+    def test_estimate_cost(self):
+        self.assertEqual(1, estimate_cost(parse("a")))
+        self.assertEqual(4, estimate_cost(parse(self.start)))
+        self.assertTrue(estimate_cost(parse(self.movement)) > estimate_cost(parse(self.conclusion)))
+
+    def test_order_by_cost(self):
+        formula = order_by_cost(parse("({}) & ({}) & ({})".format(self.conclusion, self.movement, self.start)))
+        self.assertEqual("@z0(¬(Back ⊤))", str(formula.operands[0]))
+        self.assertEqual(str(parse(self.movement)), str(formula.operands[2]))
+
+    def test_order_preserves_evaluation(self):
+        trace = [{'z0': (1, 0), 'z1': (2, 0)}, {'z0': (1, 0), 'z1': (1, 0)}]
+        formula = parse("({}) & ({}) & ({})".format(self.conclusion, self.movement, self.start))
+        expected = [formula.evaluate(trace, (i, 0), self.grid_size) for i in range(3)]
+        order_by_cost(formula)
+        self.assertEqual(expected, [formula.evaluate(trace, (i, 0), self.grid_size) for i in range(3)])
+
+    def test_adapt_order(self):
+        formula = parse("a & b & c")
+        trace = [{'a': [(0, 0)], 'b': [(0, 0)], 'c': []}]
+        # the first call starts counting the decision rates
+        adapt_order(formula)
+        for _ in range(50):
+            formula.evaluate(trace, (0, 0), self.grid_size)
+        adapt_order(formula)
+        self.assertEqual("c", str(formula.operands[0]))
+        self.assertTrue(formula.evaluate([{'a': [], 'b': [], 'c': [(0, 0)]}], (0, 0), self.grid_size) is False)
+
+    def test_statistics_are_sampled(self):
+        formula = parse("a & b & c")
+        trace = [{'a': [(0, 0)], 'b': [(0, 0)], 'c': []}]
+        formula.evaluate(trace, (0, 0), self.grid_size)
+        self.assertEqual([0, 0, 0], formula.evaluations)
+        for _ in range(2 * ADAPT_SAMPLE_PERIOD + 2):
+            formula.evaluate(trace, (0, 0), self.grid_size)
+            adapt_order(formula)
+        # only the interval after the first call and every ADAPT_SAMPLE_PERIOD-th interval after it are counted
+        self.assertEqual([3, 1, 1], formula.evaluations)
+        self.assertEqual([3, 0, 0], formula.decisions)
+        self.assertEqual("c", str(formula.operands[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from formula_types.FormulaSimplifier import simplify, simplify_with_report
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+
+def parse(formula: str):
+    return HybridSpatioTemporalParser(tokenize(formula)).parse()
+
+
+class TestFormulaSimplifier(unittest.TestCase):
+    def setUp(self):
+        self.grid_size = (2, 2)
+        self.points = [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+        self.trace = [
+            {'a': [(0, 0)], 'b': [(1, 1)], 'z1': (0, 0), 'z2': (1, 0)},
+            {'a': [(0, 0), (0, 1)], 'b': [], 'z1': (0, 1), 'z2': (1, 0)},
+            {'a': [], 'b': [(0, 0)], 'z1': (1, 1), 'z2': (0, 0)}
+        ]
+
+    def assertEquivalent(self, original: str, simplified: str):
+        formula = simplify(parse(original))
+        self.assertEqual(simplified, str(formula))
+        for pt in self.points:
+            self.assertEqual(parse(original).evaluate(self.trace, pt, self.grid_size),
+                             formula.evaluate(self.trace, pt, self.grid_size))
+
+    def test_simplify_double_negation(self):
+        self.assertEquivalent("!!a", "a")
+        self.assertEquivalent("!!!a", "¬ a")
+
+    def test_simplify_temporal_idempotence(self):
+        self.assertEquivalent("G G a", "G a")
+        self.assertEquivalent("F F F b", "F b")
+        self.assertEquivalent("X X a", "X(X a)")
+
+    def test_simplify_constants(self):
+        self.assertEquivalent("a & 1", "a")
+        self.assertEquivalent("a & (b | 0)", "a ∧ b")
+        self.assertEquivalent("(0 -> a) & G 1", "⊤")
+        self.assertEquivalent("a | !0", "⊤")
+        self.assertEquivalent("X 0 | Front 0", "⊥")
+        self.assertEquivalent("X 1", "X ⊤")
+        self.assertEquivalent("Front 1", "Front ⊤")
+        self.assertEquivalent("a U 0", "⊥")
+
+    def test_simplify_junctions(self):
+        self.assertEquivalent("a & b & a", "a ∧ b")
+        self.assertEquivalent("a & (a | b)", "a")
+        self.assertEquivalent("a | (b & a)", "a")
+        self.assertEquivalent("a & !a", "⊥")
+        self.assertEquivalent("(a -> a) & b & (b | !b)", "b")
+
+    def test_simplify_hybrid_operators(self):
+        self.assertEquivalent("@z1 @z2 a", "@z2 a")
+        self.assertEquivalent("@z1 @z1 Front a", "@z1(Front a)")
+        self.assertEquivalent("@z1 z1", "⊤")
+        self.assertEquivalent(":z3 X a", "X a")
+        self.assertEquivalent(":z3 X @z1 z3", "↓z3(X(@z1 z3))")
+
+    def test_simplify_reports_node_counts(self):
+        formula, before, after = simplify_with_report(parse("(G G (!!a)) & (G a) & 1"))
+        self.assertEqual("G a", str(formula))
+        self.assertEqual(9, before)
+        self.assertEqual(2, after)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from itertools import product
+
+from checkers.GridPool import GridPool, GridSelection, lazy_product
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import generate_grids
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    generate_all_satisfying_grids
+from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
+
+
+class TestGridPool(unittest.TestCase):
+    def test_pool_order(self):
+        for props, noms, grid_size in [([], ["z0"], (2, 2)), (["p"], ["z0", "z1"], (2, 1)),
+                                       (["p", "q"], ["z0"], (1, 2)), (["p"], [], (3, 1))]:
+            pool = GridPool(props, noms, grid_size)
+            grids = list(pool)
+            self.assertEqual(len(pool), len(grids))
+            self.assertEqual(grids, generate_grids(props, noms, grid_size))
+            self.assertEqual(grids[-1], pool[len(pool) - 1])
+        with self.assertRaises(IndexError):
+            GridPool(["p"], [], (1, 1))[2]
+
+        # large pools are not materialized
+        pool = GridPool(["p"], ["z0", "z1"], (6, 6))
+        self.assertEqual(2 ** 36 * 36 ** 2, len(pool))
+        self.assertEqual({"p": tuple((i, j) for i in range(6) for j in range(6)), "z0": (5, 5), "z1": (5, 5)},
+                         pool[len(pool) - 1])
+
+    def test_selection(self):
+        fml = HybridSpatioTemporalParser(tokenize("@z0 !(Front z1)")).parse()
+        stats = {"candidates": 0, "rejected": 0}
+        selection = GridSelection(GridPool(["p"], ["z0", "z1"], (2, 2), list),
+                                  lambda grid: all(fml.evaluate([grid], (i, j), (2, 2))
+                                                   for i in range(2) for j in range(2)), stats)
+
+        # interleaved iterators and indexing see the grids in the same order while the pool is filtered
+        first, second = iter(selection), iter(selection)
+        self.assertEqual(next(first), next(second))
+        self.assertEqual(next(second), selection[1])
+        self.assertEqual(next(first), selection[1])
+        self.assertEqual(2, stats["candidates"] - stats["rejected"])
+        self.assertLess(stats["candidates"], 16 * 16)
+
+        expected = generate_all_satisfying_grids(["p"], ["z0", "z1"], (2, 2), [fml])
+        self.assertEqual(expected, list(selection))
+        self.assertEqual(len(expected), len(selection))
+        self.assertEqual({"candidates": 16 * 16, "rejected": 16 * 16 - len(expected)}, stats)
+
+        groups = selection.group_by(lambda grid: tuple(grid["p"]))
+        self.assertEqual(16, len(groups))
+        self.assertEqual(expected, sorted((g for group in groups for g in group), key=expected.index))
+
+    def test_lazy_product(self):
+        pool = GridPool([], ["z0"], (3, 1))
+        grids = list(pool)
+        for length in range(1, 4):
+            self.assertEqual(list(product(grids, repeat=length)), list(lazy_product(pool, length)))
+        self.assertEqual(list(product(grids, repeat=2))[4:], list(lazy_product(pool, 2, [1, 1])))
+        self.assertEqual([], list(lazy_product(GridSelection(pool, lambda grid: False), 2)))
@@ -16,6 +16,12 @@ class TestHybridSpatioTemporalFormulaParser(unittest.TestCase):
         self.assertTrue(
             "(a ∧ b) ↔ ((c | d) ↔ (¬ d))" == str(HybridSpatioTemporalParser(tokenize("(a & b) <-> ((c | d) <-> !d)")).parse()))
 
+    def test_parse_flattened_classical_operators(self):
+        self.assertTrue("a ∧ b ∧ c" == str(HybridSpatioTemporalParser(tokenize("a & b & c")).parse()))
+        self.assertTrue("a ∧ b ∧ c ∧ d" == str(HybridSpatioTemporalParser(tokenize("(a & b) & (c & d)")).parse()))
+        self.assertTrue("a | b | (c ∧ d)" == str(HybridSpatioTemporalParser(tokenize("a | (b | c & d)")).parse()))
+        self.assertTrue("(a | b) ∧ c" == str(HybridSpatioTemporalParser(tokenize("(a | b) & c")).parse()))
+
     def test_parse_simple_hybrid_operators(self):
         self.assertTrue("@z1 z2" == str(HybridSpatioTemporalParser(tokenize("@z1 z2")).parse()))
         self.assertTrue("↓z1 z2" == str(HybridSpatioTemporalParser(tokenize(":z1 z2")).parse()))
@@ -0,0 +1,109 @@
+import json
+import socket
+import threading
+import unittest
+from concurrent.futures import CancelledError
+
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import \
+    evaluate as evaluate_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    evaluate as evaluate_optimized1
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2
+from service.CheckerDaemon import create_server, send_request
+from service.ModelCheckerSession import ModelCheckerSession, Cancelled, TraceSpace
+from tests.FollowScenario import FOLLOW_SCENARIO
+
+
+class TestModelCheckerSession(unittest.TestCase):
+    def setUp(self):
+        self.session = ModelCheckerSession(max_workers=2)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_count_matches_evaluate(self):
+        evaluators = {"baseline": evaluate_baseline, "optimized": evaluate_optimized1, "motion": evaluate_optimized2}
+        for checker, evaluate in evaluators.items():
+            expected = evaluate(FOLLOW_SCENARIO["props"], FOLLOW_SCENARIO["noms"], FOLLOW_SCENARIO["assumptions"],
+                                FOLLOW_SCENARIO["conclusions"], FOLLOW_SCENARIO["grid_size"],
+                                FOLLOW_SCENARIO["max_trace_length"], False)
+            self.assertEqual(expected, self.session.count(checker, **FOLLOW_SCENARIO))
+
+    def test_trace_spaces_are_reused(self):
+        self.session.count("motion", **FOLLOW_SCENARIO)
+        self.session.count("motion", **{**FOLLOW_SCENARIO, "conclusions": ["G(@z0 ! Back z1)"]})
+        stats = self.session.stats()
+        self.assertEqual(1, stats["misses"])
+        self.assertEqual(1, stats["hits"])
+        self.assertTrue(stats["transitions"] > 0)
+
+    def test_transitions_ignore_point_order(self):
+        expanded = []
+        space = TraceSpace([], lambda grid: expanded.append(grid) or [grid], [], cache_transitions=True)
+        space.successors({"z0": (0, 0), "a": [(0, 0), (1, 0)]})
+        space.successors({"a": [(1, 0), (0, 0)], "z0": (0, 0)})
+        self.assertEqual(1, len(expanded))
+        self.assertEqual(1, space.transition_count())
+
+    def test_formula_cache_is_bounded(self):
+        session = ModelCheckerSession(max_workers=1, max_formulas=2)
+        try:
+            session.parse("G p")
+            session.parse("F p")
+            session.parse("G p")
+            session.parse("X p")
+            # the least recently used formula is evicted
+            self.assertEqual(2, session.stats()["formulas"])
+            self.assertEqual(["G p", "X p"], list(session._formulas))
+        finally:
+            session.close()
+
+    def test_cancel(self):
+        event = threading.Event()
+        event.set()
+        with self.assertRaises(Cancelled):
+            self.session.count("baseline", **FOLLOW_SCENARIO, cancel_event=event)
+
+        events = []
+        job = self.session.submit("count", on_event=events.append, checker="baseline",
+                                  **{**FOLLOW_SCENARIO, "max_trace_length": 6})
+        job.cancel()
+        with self.assertRaises((Cancelled, CancelledError)):
+            job.result()
+        self.assertEqual({"event": "cancelled"}, events[-1])
+
+    def test_daemon(self):
+        server = create_server(self.session)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            request = {"op": "counterexample", "id": 1, "checker": "optimized", **FOLLOW_SCENARIO}
+            events = list(send_request(server.server_address, request))
+            self.assertEqual("accepted", events[0]["event"])
+            self.assertEqual("result", events[-1]["event"])
+            self.assertEqual(1, events[-1]["id"])
+            self.assertIsNotNone(events[-1]["trace"])
+
+            stats = list(send_request(server.server_address, {"op": "stats", "id": 2}))
+            self.assertEqual(1, stats[-1]["misses"])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_daemon_rejects_malformed_requests(self):
+        server = create_server(self.session)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with socket.create_connection(server.server_address) as sock:
+                stream = sock.makefile("rwb")
+                for request in (b"[1, 2]", b"{not json}", json.dumps({"op": "stats", "id": 1}).encode("utf-8")):
+                    stream.write(request + b"\n")
+                stream.flush()
+                events = [json.loads(stream.readline().decode("utf-8")) for _ in range(3)]
+            self.assertEqual(["error", "error", "stats"], [e["event"] for e in events])
+            self.assertEqual("Malformed request.", events[0]["message"])
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,46 @@
+import unittest
+from unittest import mock
+
+from checkers import Planner
+from checkers.Planner import plan, choose_checker
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import evaluate as evaluate_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    evaluate as evaluate_optimized1
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2
+from tests.FollowScenario import FOLLOW_ASSUMPTIONS
+
+INTERSECTION_ASSUMPTIONS = ["G (@z0 !z1)"]
+
+
+class TestPlanner(unittest.TestCase):
+    def test_exact_counts(self):
+        for props, noms, assumptions, conclusions, grid_size, length in [
+                ([], ["z0", "z1"], FOLLOW_ASSUMPTIONS, ["G(@z0 ! z1)"], (4, 1), 3),
+                (["a"], ["z0", "z1"], INTERSECTION_ASSUMPTIONS, ["F (@z0 a)"], (2, 1), 2)]:
+            estimates = plan(props, noms, assumptions, conclusions, grid_size, length)
+            self.assertEqual(["baseline", "optimized", "motion"], [e["checker"] for e in estimates])
+            self.assertTrue(all(e["exact"] for e in estimates))
+            expected = [f(props, noms, assumptions, conclusions, grid_size, length, False)[1]
+                        for f in (evaluate_baseline, evaluate_optimized1, evaluate_optimized2)]
+            self.assertEqual(expected, [e["traces"] for e in estimates])
+
+    def test_estimated_counts(self):
+        args = ([], ["z0", "z1"], FOLLOW_ASSUMPTIONS, ["G(@z0 ! z1)"], (6, 1), 3)
+        exact = {e["checker"]: e["traces"] for e in plan(*args)}
+        with mock.patch.object(Planner, "EXACT_GRID_LIMIT", 10):
+            estimates = plan(*args)
+        self.assertTrue(all(not e["exact"] for e in estimates if e["checker"] != "baseline"))
+        for e in estimates:
+            self.assertLess(abs(e["traces"] - exact[e["checker"]]), 0.3 * exact[e["checker"]], e["checker"])
+
+    def test_choice(self):
+        estimates = plan([], ["z0", "z1"], FOLLOW_ASSUMPTIONS, ["G(@z0 ! z1)"], (6, 1), 3)
+        self.assertEqual("motion", choose_checker(estimates))
+        self.assertEqual(["optimized", "motion"],
+                         [e["checker"] for e in plan(["h"], ["z0"], [], ["F h"], (2, 1), 2, ["h"])])
+        self.assertIsNone(choose_checker([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from checkers.Portfolio import race, FINISHED, FAILED, CANCELLED, TIMED_OUT
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import evaluate as evaluate_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    evaluate as evaluate_optimized1
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2
+
+
+def fast(*args, **options):
+    return 1, 10
+
+
+def slow(*args, **options):
+    time.sleep(30)
+    return 1, 20
+
+
+def failing(*args, **options):
+    raise ValueError("broken")
+
+
+def disagreeing(*args, **options):
+    return 2, 10
+
+
+class TestPortfolio(unittest.TestCase):
+    def test_first_finisher_wins(self):
+        start = time.monotonic()
+        result = race({"slow": slow, "failing": failing, "fast": fast}, ())
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual("fast", result["winner"])
+        self.assertEqual(1, result["sat"])
+        self.assertIsNone(result["agree"])
+        self.assertEqual(["slow", "failing", "fast"], list(result["results"]))
+        self.assertEqual(CANCELLED, result["results"]["slow"]["state"])
+        self.assertEqual(FINISHED, result["results"]["fast"]["state"])
+        self.assertEqual(10, result["results"]["fast"]["traces"])
+
+    def test_cross_validation(self):
+        props, noms, assumptions, conclusions = ["a"], ["z0", "z1"], ["G (@z0 !z1)"], ["F (@z0 a)"]
+        result = race({"baseline": evaluate_baseline, "optimized": evaluate_optimized1, "motion": evaluate_optimized2},
+                      (props, noms, assumptions, conclusions, (2, 1), 2, False), cross_validate=True)
+        self.assertTrue(result["agree"])
+        self.assertTrue(all(r["state"] == FINISHED for r in result["results"].values()))
+        expected = evaluate_baseline(props, noms, assumptions, conclusions, (2, 1), 2, False)
+        self.assertEqual(expected, (result["sat"], result["results"]["baseline"]["traces"]))
+
+        result = race({"fast": fast, "failing": failing, "disagreeing": disagreeing}, (), cross_validate=True)
+        self.assertFalse(result["agree"])
+        self.assertEqual(FAILED, result["results"]["failing"]["state"])
+        self.assertIn("broken", result["results"]["failing"]["error"])
+
+    def test_timeout(self):
+        result = race({"slow": slow, "failing": failing}, (), timeout=1)
+        self.assertIsNone(result["winner"])
+        self.assertIsNone(result["sat"])
+        self.assertEqual(TIMED_OUT, result["results"]["slow"]["state"])
+        self.assertEqual(FAILED, result["results"]["failing"]["state"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from checkers.ConclusionCounting import parse_formula
+from checkers.RuntimeMonitor import RuntimeMonitor, SATISFIED, VIOLATED, PENDING
+
+FORMULAS = ["G (a -> F z0)",
+            "a U (z0 & !a)",
+            "X X a",
+            "F (Front a | Right z0)",
+            "@z0 ↓z2 G ((! X 1) | X (z2 | Back z2))",
+            "G (@z1 ↓z2 ((! X 1) | X @z1 (z2 | Back z2)))",
+            "↓z1 F (z0 & !z1)",
+            "!(G F a) <-> (Left a U X z1)"]
+
+
+def random_trace(rng, grid_size, length):
+    points = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+    return [{"z0": rng.choice(points), "z1": rng.choice(points),
+             "a": [p for p in points if rng.random() < 0.4]} for _ in range(length)]
+
+
+class TestRuntimeMonitor(unittest.TestCase):
+    def test_prefixes_agree_with_evaluation(self):
+        rng = random.Random(7)
+        grid_size = (2, 3)
+        points = [(i, j) for i in range(grid_size[0]) for j in range(grid_size[1])]
+        for formula_string in FORMULAS:
+            formula = parse_formula([formula_string])
+            for _ in range(20):
+                trace = random_trace(rng, grid_size, 5)
+                monitor = RuntimeMonitor(formula, grid_size)
+                verdicts = [monitor.step(grid) for grid in trace]
+                for length in range(1, len(trace) + 1):
+                    monitor = RuntimeMonitor(formula, grid_size)
+                    for grid in trace[:length]:
+                        monitor.step(grid)
+                    expected = [p for p in points if formula.evaluate(trace[:length], p, grid_size)]
+                    self.assertEqual(expected, monitor.satisfying_points(), formula_string)
+                    self.assertEqual(bool(expected), monitor.holds(), formula_string)
+
+                    # a verdict must hold for every continuation of the prefix
+                    if verdicts[length - 1] != PENDING:
+                        self.assertEqual(verdicts[length - 1] == SATISFIED,
+                                         any(formula.evaluate(trace, p, grid_size) for p in points), formula_string)
+
+    def test_early_verdicts(self):
+        grid_size = (1, 2)
+        monitor = RuntimeMonitor(parse_formula(["F a"]), grid_size)
+        self.assertEqual(PENDING, monitor.step({"a": []}))
+        self.assertEqual(SATISFIED, monitor.step({"a": [(0, 1)]}))
+        self.assertEqual([(0, 1)], monitor.witnesses)
+        self.assertEqual(SATISFIED, monitor.step({"a": []}))
+
+        monitor = RuntimeMonitor(parse_formula(["G a"]), grid_size)
+        self.assertEqual(PENDING, monitor.step({"a": [(0, 0), (0, 1)]}))
+        self.assertEqual(PENDING, monitor.step({"a": [(0, 0)]}))
+        self.assertEqual(VIOLATED, monitor.step({"a": [(0, 1)]}))
+        self.assertEqual(3, monitor.time)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+
+from checkers.SpatioTemporalEvaluatorUtils import satisfying_points
+from checkers.symbolic_version.SATSolver import solve_bundled
+from checkers.symbolic_version.evaluator_sat.SATSpatioTemporalEvaluator import check_validity
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+
+class TestSATSolver(unittest.TestCase):
+    def test_solve_satisfiable(self):
+        clauses = [[1, 2], [-1, 3], [-2, -3], [-3, 1]]
+        model = solve_bundled(3, clauses)
+        self.assertIsNotNone(model)
+        for clause in clauses:
+            self.assertTrue(any(model[abs(lit)] == (lit > 0) for lit in clause))
+
+    def test_solve_unsatisfiable(self):
+        self.assertIsNone(solve_bundled(2, [[1, 2], [-1, 2], [1, -2], [-1, -2]]))
+        self.assertIsNone(solve_bundled(1, [[1], [-1]]))
+
+    def test_counterexample(self):
+        trace, points = check_validity([], ["z0", "z1"], [], ["G(@z0 ! z1)"], (3, 1), 2, solver="bundled")
+        self.assertIsNotNone(trace)
+        self.assertTrue(any(grid["z0"] == grid["z1"] for grid in trace))
+        violated = HybridSpatioTemporalParser(tokenize("!G(@z0 ! z1)")).parse()
+        self.assertEqual(satisfying_points(violated, trace, (3, 1)), points)
+
+    def test_valid(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.cnf")
+            trace, points = check_validity([], ["z0", "z1"], ["G(@z0 ! z1)"], ["G ! (z0 & z1)"], (2, 2), 2,
+                                           dimacs_path=path, solver="bundled")
+            self.assertIsNone(trace)
+            self.assertEqual([], points)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "out_len2.cnf")))
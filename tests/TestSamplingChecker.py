@@ -0,0 +1,48 @@
+import random
+import unittest
+from collections import Counter
+
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import generate_traces, \
+    evaluate as evaluate_baseline
+from checkers.statistical_version.evaluator_sampling.SamplingSpatioTemporalEvaluator import count_traces, \
+    sample_traces, wilson_interval, estimate
+from tests.FollowScenario import FREE_SV_ASSUMPTIONS
+
+
+class TestSamplingChecker(unittest.TestCase):
+    def test_trace_count(self):
+        for props, noms, grid_size, length in [([], ["z0"], (2, 2), 3), (["a"], ["z0"], (1, 2), 2)]:
+            self.assertEqual(len(list(generate_traces(props, noms, length, grid_size))),
+                             count_traces(props, noms, grid_size, length))
+
+    def test_samples_are_uniform_and_reproducible(self):
+        def draw(seed):
+            traces = sample_traces(["a"], ["z0"], (1, 2), 2, random.Random(seed))
+            return [tuple((tuple(grid["a"]), grid["z0"]) for grid in next(traces)) for _ in range(6000)]
+
+        samples = draw(3)
+        self.assertEqual(samples, draw(3))
+
+        # 8 traces of length 1 and 64 of length 2, each drawn about 6000 / 72 times
+        counts = Counter(samples)
+        self.assertEqual(72, len(counts))
+        self.assertTrue(all(40 < c < 130 for c in counts.values()))
+
+    def test_wilson_interval(self):
+        low, high = wilson_interval(30, 100, 0.95)
+        self.assertTrue(low < 0.3 < high)
+        self.assertAlmostEqual(0.2189, low, places=3)
+        self.assertAlmostEqual(0.0, wilson_interval(0, 10, 0.95)[0])
+        self.assertEqual((0.0, 1.0), wilson_interval(0, 0, 0.95))
+
+    def test_estimate_covers_exact_count(self):
+        args = ([], ["z0", "z1"], FREE_SV_ASSUMPTIONS, ["G (@z0 !z1)"], (4, 1), 3, False)
+        exact_sat, exact_traces = evaluate_baseline(*args)
+        result = estimate(*args, samples=3000, seed=1)
+        self.assertEqual(exact_traces, result["traces"])
+        self.assertTrue(result["sat_interval"][0] <= exact_sat <= result["sat_interval"][1])
+        self.assertEqual(result, estimate(*args, samples=3000, seed=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import math
+import unittest
+
+from checkers.Portfolio import FINISHED, TIMED_OUT
+from checkers.ScenarioFamilies import FAMILIES, sweep, fit_scaling, predict_limit
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import evaluate as evaluate_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2
+from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
+
+
+def evaluate(scenario, evaluator):
+    return evaluator(scenario["props"], scenario["noms"], scenario["assumptions"], scenario["conclusions"],
+                     scenario["grid_size"], scenario["max_trace_length"], False)
+
+
+class TestScenarioFamilies(unittest.TestCase):
+    def test_families(self):
+        for family in FAMILIES.values():
+            self.assertTrue(set(family.scaling) <= set(family.parameters))
+            for parameter in family.scaling:
+                s = family.scenario(**{parameter: family.parameters[parameter] + 1})
+                for f in s["assumptions"] + s["conclusions"]:
+                    HybridSpatioTemporalParser(tokenize(f)).parse()
+        with self.assertRaises(ValueError):
+            FAMILIES["follow"].scenario(lanes=2)
+
+        # the families reproduce the test suites (test cases 3 and 12)
+        self.assertEqual((9, 270), evaluate(FAMILIES["follow"].scenario(), evaluate_optimized2))
+        self.assertEqual((6, 272), evaluate(FAMILIES["intersection"].scenario(), evaluate_baseline))
+
+    def test_new_families(self):
+        highway = FAMILIES["highway"].scenario(lanes=2, road_length=2)
+        self.assertEqual(evaluate(highway, evaluate_baseline)[0], evaluate(highway, evaluate_optimized2)[0])
+        chained = FAMILIES["chained_intersections"].scenario()
+        self.assertEqual(evaluate(chained, evaluate_baseline)[0], evaluate(chained, evaluate_optimized2)[0])
+
+    def test_fit_scaling(self):
+        values = [1, 2, 3, 4]
+        fit = fit_scaling(values, [0.01 * 3 ** v for v in values])
+        self.assertEqual("exponential", fit["model"])
+        self.assertAlmostEqual(3, fit["b"])
+        self.assertAlmostEqual(0.01, fit["a"])
+        self.assertAlmostEqual(math.log(100 / 0.01, 3), predict_limit(fit, 100))
+
+        fit = fit_scaling(values, [0.5 * v ** 2 for v in values])
+        self.assertEqual("power", fit["model"])
+        self.assertAlmostEqual(2, fit["b"])
+        self.assertIsNone(fit_scaling([1], [1.0]))
+
+    def test_sweep(self):
+        result = sweep(FAMILIES["follow"], "road_length", evaluate_optimized2, {"duration": 2}, time_budget=30,
+                       max_steps=3)
+        self.assertEqual([3, 4, 5], [p["value"] for p in result["points"]])
+        self.assertTrue(all(p["state"] == FINISHED for p in result["points"]))
+        self.assertEqual(5, result["largest"])
+        self.assertIsNotNone(result["fit"])
+
+        result = sweep(FAMILIES["follow"], "road_length", evaluate_baseline, {"road_length": 60}, time_budget=0.5)
+        self.assertEqual([60], [p["value"] for p in result["points"]])
+        self.assertEqual(TIMED_OUT, result["points"][0]["state"])
+        self.assertIsNone(result["largest"])
+        with self.assertRaises(ValueError):
+            sweep(FAMILIES["follow"], "lanes", evaluate_baseline)
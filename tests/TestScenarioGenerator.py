@@ -0,0 +1,65 @@
+import os
+import random
+import tempfile
+import unittest
+
+from checkers.Portfolio import FINISHED
+from checkers.ScenarioGenerator import random_scenario, random_scenarios, random_movement, differential_check, \
+    read_scenarios, write_record
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import evaluate as evaluate_baseline
+from checkers.optimized_version.OptimizedEvaluatorUtils import parse_static_car, parse_fixed_offset, \
+    parse_fixed_movement
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    evaluate as evaluate_optimized1
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2
+from checkers.statistical_version.evaluator_sampling.SamplingSpatioTemporalEvaluator import count_traces
+from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
+
+EVALUATORS = {"baseline": evaluate_baseline, "optimized": evaluate_optimized1, "motion": evaluate_optimized2}
+
+
+class TestScenarioGenerator(unittest.TestCase):
+    def test_scenarios_are_well_formed_and_reproducible(self):
+        scenarios = list(random_scenarios(50, 7, max_props=2, max_noms=3, max_traces=5000))
+        self.assertEqual(scenarios, list(random_scenarios(50, 7, max_props=2, max_noms=3, max_traces=5000)))
+        self.assertNotEqual(scenarios, list(random_scenarios(50, 8, max_props=2, max_noms=3, max_traces=5000)))
+        for s in scenarios:
+            self.assertLessEqual(len(s["props"]), 2)
+            self.assertTrue(1 <= len(s["noms"]) <= 3)
+            self.assertTrue(s["conclusions"])
+            self.assertLessEqual(count_traces(s["props"], s["noms"], s["grid_size"], s["max_trace_length"]), 5000)
+            for f in s["assumptions"] + s["conclusions"]:
+                HybridSpatioTemporalParser(tokenize(f)).parse()
+
+    def test_movements_are_recognized_by_the_motion_checker(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            a = random_movement(rng, "z1", ["z0", "z1"])
+            fml = HybridSpatioTemporalParser(tokenize(a)).parse()
+            recognized = parse_static_car(a) or parse_fixed_offset(a)[0] or parse_fixed_movement(fml)[0]
+            self.assertTrue(recognized or a.startswith("@z1 !("), a)
+
+    def test_differential_check(self):
+        # atomic assumptions and fixed offsets in the motion checker, found by random scenarios
+        scenarios = [{"props": [], "noms": ["z0", "z1"], "assumptions": [f"G @z1 {d} z0"], "conclusions": ["Front z0"],
+                      "grid_size": (3, 2), "max_trace_length": 1} for d in ("Front", "Back", "Right Left")]
+        scenarios.append({"props": ["p0"], "noms": ["z0"], "assumptions": ["z0", "0"], "conclusions": ["F p0"],
+                          "grid_size": (2, 1), "max_trace_length": 2})
+        scenarios.extend(random_scenarios(5, 0))
+        for s in scenarios:
+            record = differential_check(s, EVALUATORS)
+            self.assertTrue(all(r["state"] == FINISHED for r in record["results"].values()), record)
+            self.assertTrue(record["agree"], record)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "scenarios.jsonl")
+            write_record(path, {"index": 0, **record})
+            write_record(path, scenarios[0])
+            self.assertEqual([s, scenarios[0]], read_scenarios(path))
+
+    def test_size_is_shrunk_to_the_trace_limit(self):
+        scenario = random_scenario(random.Random(1), max_props=3, max_noms=3, max_grid=(4, 4), max_trace_length=4,
+                                   max_traces=100)
+        self.assertLessEqual(count_traces(scenario["props"], scenario["noms"], scenario["grid_size"],
+                                          scenario["max_trace_length"]), 100)
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+
+from checkers.SearchTelemetry import SearchTelemetry
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import evaluate as evaluate_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    evaluate as evaluate_optimized1
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2
+from tests.FollowScenario import ALWAYS_APART_ASSUMPTIONS
+
+ARGS = ([], ["z0", "z1"], ALWAYS_APART_ASSUMPTIONS, ["G(@z0 ! Front z1)"], (4, 1), 3, False)
+
+
+class TestSearchTelemetry(unittest.TestCase):
+    def run_with_stats(self, evaluate) -> tuple:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "stats.json")
+            result = evaluate(*ARGS, stats=path)
+            with open(path, "r", encoding="utf-8") as f:
+                return result, json.load(f)
+
+    def test_stats_match_counts(self):
+        for evaluate in (evaluate_baseline, evaluate_optimized1, evaluate_optimized2):
+            (counter_sat, counter_gen), stats = self.run_with_stats(evaluate)
+            self.assertEqual((counter_sat, counter_gen), (stats["sat"], stats["traces"]))
+            self.assertEqual(counter_gen, sum(d["traces"] for d in stats["depths"]))
+            self.assertEqual([1, 2, 3], [d["depth"] for d in stats["depths"]])
+            for d in stats["depths"]:
+                self.assertEqual(d["candidates"], d["rejected"] + d["grids"])
+                self.assertEqual(d["grids"], d["traces"])
+            for phase in ("parse", "evaluation", "generation", "total"):
+                self.assertGreaterEqual(stats["phases"][phase], 0)
+
+    def test_pruning_is_visible(self):
+        _, optimized = self.run_with_stats(evaluate_optimized1)
+        _, motion = self.run_with_stats(evaluate_optimized2)
+        self.assertEqual({"candidates": 16, "rejected": 4, "grids": 12, "groups": 1},
+                         {k: v for k, v in optimized["pool"].items() if k != "seconds"})
+        self.assertEqual(12, optimized["depths"][1]["branching_factor"])
+        self.assertIsNone(motion["depths"][0]["branching_factor"])
+        self.assertEqual(optimized["depths"][0]["grids"], motion["depths"][0]["grids"])
+        self.assertLess(motion["depths"][1]["branching_factor"], optimized["depths"][1]["branching_factor"])
+        self.assertGreater(motion["depths"][1]["rejected"], 0)
+
+    def test_timed(self):
+        telemetry = SearchTelemetry()
+        stats = telemetry.level(2)
+        self.assertEqual([{"a": 1}, {}], list(telemetry.timed([{"a": 1}, {}], stats)))
+        self.assertGreaterEqual(stats["seconds"], 0)
+        self.assertIs(stats, telemetry.level(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
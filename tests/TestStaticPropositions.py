@@ -0,0 +1,32 @@
+import unittest
+
+from checkers.SpatioTemporalEvaluatorUtils import satisfying_points
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import generate_traces
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import \
+    evaluate as evaluate_optimized1, find_counterexample as find_counterexample_optimized1
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2, find_counterexample as find_counterexample_optimized2
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+ASSUMPTIONS = ["@z0 !(Back 1)"]
+
+
+class TestStaticPropositions(unittest.TestCase):
+    def test_evaluate_agrees_with_filtered_baseline(self):
+        fml = HybridSpatioTemporalParser(tokenize("(F(h & X z0)) & (@z0 !(Back 1))")).parse()
+        static_traces = [t for t in generate_traces(["h"], ["z0"], 3, (2, 1)) if all(g["h"] == t[0]["h"] for g in t)]
+        expected_sat = len([t for t in static_traces if satisfying_points(fml, t, (2, 1))])
+
+        for evaluate in [evaluate_optimized1, evaluate_optimized2]:
+            self.assertEqual((expected_sat, len(static_traces)),
+                             evaluate(["h"], ["z0"], ASSUMPTIONS, ["F(h & X z0)"], (2, 1), 3, False,
+                                      static_props=["h"]))
+
+    def test_counterexample_respects_static_props(self):
+        # h can only disappear if it may change over time
+        for find_counterexample in [find_counterexample_optimized1, find_counterexample_optimized2]:
+            trace, _, _ = find_counterexample(["h"], ["z0"], ASSUMPTIONS, ["G(h -> ((! X 1) | X h))"], (2, 1), 3)
+            self.assertIsNotNone(trace)
+            trace, _, _ = find_counterexample(["h"], ["z0"], ASSUMPTIONS, ["G(h -> ((! X 1) | X h))"], (2, 1), 3,
+                                              static_props=["h"])
+            self.assertIsNone(trace)
@@ -0,0 +1,44 @@
+import unittest
+
+from formula_types.HybridFormula import Bind
+from formula_types.Trace import Trace, BoundTrace
+from parsers.HybridSpatioTemporalFormulaParser import tokenize, HybridSpatioTemporalParser
+
+
+class TestTrace(unittest.TestCase):
+    def test_extend_is_persistent(self):
+        root = Trace().extend({"z": (0, 0)})
+        first = root.extend({"z": (1, 0)})
+        second = root.extend({"z": (2, 0)})
+        longer = second.extend({"z": (3, 0)})
+        other = first.extend({"z": (4, 0)})
+
+        self.assertEqual([{"z": (0, 0)}], root)
+        self.assertEqual([{"z": (0, 0)}, {"z": (1, 0)}], first)
+        self.assertEqual([{"z": (0, 0)}, {"z": (2, 0)}], second)
+        self.assertEqual([{"z": (0, 0)}, {"z": (2, 0)}, {"z": (3, 0)}], longer)
+        self.assertEqual([{"z": (0, 0)}, {"z": (1, 0)}, {"z": (4, 0)}], other)
+        self.assertEqual({"z": (3, 0)}, longer[-1])
+        self.assertEqual(3, len(longer))
+
+    def test_from_grids(self):
+        grids = ({"z": (0, 0)}, {"z": (0, 1)})
+        trace = Trace.from_grids(grids)
+        self.assertIs(grids[1], trace[1])
+        self.assertEqual(list(grids) + [{"z": (1, 1)}], trace.extend({"z": (1, 1)}))
+        self.assertEqual("[{'z': (0, 0)}, {'z': (0, 1)}]", repr(trace))
+
+    def test_bound_trace(self):
+        grids = [{"z": (0, 0), "a": [(1, 1)]}, {"z": (0, 1), "a": []}]
+        bound = BoundTrace(Trace.from_grids(grids), "z", (1, 1))
+        self.assertEqual((1, 1), bound[1]["z"])
+        self.assertEqual([(1, 1)], bound[0]["a"])
+        # the original grids are not modified
+        self.assertEqual((0, 1), grids[1]["z"])
+
+    def test_bind_on_trace(self):
+        fml = HybridSpatioTemporalParser(tokenize("↓z0 X (z0 & a)")).parse()
+        trace = Trace().extend({"z0": (0, 0), "a": []}).extend({"z0": (0, 0), "a": [(1, 0)]})
+        self.assertTrue(isinstance(fml, Bind))
+        self.assertTrue(fml.evaluate(trace, (1, 0), (2, 1)))
+        self.assertFalse(fml.evaluate(trace, (0, 0), (2, 1)))
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from checkers.ConclusionCounting import parse_formula
+from checkers.TraceCorpus import TraceCorpus, TraceCorpusWriter, count_satisfying
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate as evaluate_optimized2, write_trace_corpus as write_trace_corpus_optimized2
+from tests.FollowScenario import APART_ASSUMPTIONS
+
+
+class TestTraceCorpus(unittest.TestCase):
+    def test_round_trip(self):
+        traces = [[{"z0": (0, 1), "a": [(1, 2)]}],
+                  [{"z0": (2, 2), "a": []}, {"z0": (0, 0), "a": [(0, 0), (2, 1)]}]]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.trc")
+            with TraceCorpusWriter(path, ["a"], ["z0"], (3, 3), 2) as writer:
+                for t in traces:
+                    writer.write(t)
+
+            with TraceCorpus(path) as corpus:
+                self.assertEqual(2, len(corpus))
+                self.assertEqual((["a"], ["z0"], (3, 3), 2),
+                                 (corpus.props, corpus.noms, corpus.grid_size, corpus.max_trace_length))
+                self.assertEqual([(2, 2), (0, 0)], [grid["z0"] for grid in corpus[-1]])
+                self.assertEqual([((1, 2),)], [grid["a"] for grid in corpus[0]])
+                self.assertEqual(((0, 0), (2, 1)), list(corpus.traces(1))[0][1]["a"])
+
+    def test_writer_discards_failed_corpus(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.trc")
+            with self.assertRaises(ValueError):
+                with TraceCorpusWriter(path, [], ["z0"], (2, 1), 1) as writer:
+                    writer.write([{"z0": (0, 0)}, {"z0": (1, 0)}])
+            self.assertEqual([], os.listdir(directory))
+
+    def test_count_matches_evaluate(self):
+        conclusions = ["G(@z0 ! Front z1)"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "follow.trc")
+            count = write_trace_corpus_optimized2([], ["z0", "z1"], APART_ASSUMPTIONS, (4, 1), 3, path)
+            with TraceCorpus(path) as corpus:
+                self.assertEqual(count, len(corpus))
+                self.assertEqual(evaluate_optimized2([], ["z0", "z1"], APART_ASSUMPTIONS, conclusions, (4, 1), 3,
+                                                     False),
+                                 count_satisfying(parse_formula(conclusions + APART_ASSUMPTIONS), corpus))
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from checkers.GridCodec import GridCodec
+from checkers.TraceIndex import TraceIndex, canonical_scenario, index_path
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator2 import \
+    evaluate_each as evaluate_each_optimized2
+from tests.FollowScenario import APART_ASSUMPTIONS
+
+
+class TestTraceIndex(unittest.TestCase):
+    def test_codec(self):
+        codec = GridCodec(["a", "b"], ["z0"], (3, 4))
+        grid = {"a": [(0, 1), (2, 3)], "b": [], "z0": (1, 2)}
+        data = codec.encode(grid)
+        self.assertEqual(codec.grid_size_bytes, len(data))
+        self.assertEqual({"a": ((0, 1), (2, 3)), "b": (), "z0": (1, 2)}, codec.decode(data))
+
+    def test_scenario_key_is_canonical(self):
+        first = canonical_scenario("motion", [], ["z0", "z1"], APART_ASSUMPTIONS, (4, 1), 3)
+        second = canonical_scenario("motion", [], ["z1", "z0"], list(reversed(APART_ASSUMPTIONS)), (4, 1), 3)
+        third = canonical_scenario("motion", [], ["z0", "z1"], APART_ASSUMPTIONS, (4, 1), 4)
+        self.assertEqual(index_path("idx", first), index_path("idx", second))
+        self.assertNotEqual(index_path("idx", first), index_path("idx", third))
+
+    def test_indexed_counts(self):
+        conclusions = ["G(@z0 ! Front z1)", "F(@z0 Front z1)"]
+        expected = evaluate_each_optimized2([], ["z0", "z1"], APART_ASSUMPTIONS, conclusions, (4, 1), 3, False)
+        with tempfile.TemporaryDirectory() as index_dir:
+            # the first run writes the index, the second one reads it
+            for _ in range(2):
+                self.assertEqual(expected, evaluate_each_optimized2([], ["z0", "z1"], APART_ASSUMPTIONS, conclusions,
+                                                                    (4, 1), 3, False, index_dir=index_dir))
+            files = os.listdir(index_dir)
+            self.assertEqual(1, len(files))
+
+            index = TraceIndex(os.path.join(index_dir, files[0]))
+            self.assertEqual(expected[2], index.trace_count)
+            self.assertEqual(16, len(index))
+            self.assertEqual(16, len(list(index)))
+            index.close()
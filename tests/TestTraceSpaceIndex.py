@@ -0,0 +1,55 @@
+import random
+import unittest
+
+from checkers.TraceSpaceIndex import TraceSpaceIndex
+from checkers.baseline_version.evaluator_baseline.BaselineSpatioTemporalEvaluator import generate_traces, \
+    trace_space as trace_space_baseline
+from checkers.optimized_version.evaluator_optimized.OptimizedSpatioTemporalEvaluator1 import generate_traces as \
+    generate_traces_optimized1, generate_all_satisfying_grids, trace_space as trace_space_optimized1
+from parsers.HybridSpatioTemporalFormulaParser import HybridSpatioTemporalParser, tokenize
+
+
+class TestTraceSpaceIndex(unittest.TestCase):
+    def test_baseline_order(self):
+        index = trace_space_baseline(["a"], ["z0"], [], (1, 2), 2)
+        traces = list(generate_traces(["a"], ["z0"], 2, (1, 2)))
+        self.assertEqual(len(traces), index.size)
+        self.assertEqual(traces, list(index))
+        for rank in [0, 7, 8, 41, len(traces) - 1]:
+            self.assertEqual(traces[rank], index.unrank(rank))
+            self.assertEqual(rank, index.rank(traces[rank]))
+
+    def test_optimized_order_with_static_props(self):
+        assumptions = ["G (@z0 !z1)"]
+        state = [HybridSpatioTemporalParser(tokenize(a)).parse() for a in assumptions]
+        traces = list(generate_traces_optimized1(["h"], ["z0", "z1"], 2, (2, 1), state, ["h"]))
+        index = trace_space_optimized1(["h"], ["z0", "z1"], assumptions, (2, 1), 2, ["h"])
+        self.assertEqual(traces, list(index))
+        self.assertEqual(list(range(len(traces))), [index.rank(t) for t in traces])
+
+    def test_ranges_and_split(self):
+        grids = generate_all_satisfying_grids([], ["z0"], (3, 1), [])
+        index = TraceSpaceIndex([grids], 3)
+        traces = list(index)
+        rng = random.Random(5)
+        for _ in range(20):
+            start = rng.randrange(index.size)
+            stop = rng.randrange(start, index.size + 2)
+            self.assertEqual(traces[start:stop], list(index.traces(start, stop)))
+
+        ranges = index.split(4)
+        self.assertEqual(4, len(ranges))
+        self.assertEqual(traces, [t for start, stop in ranges for t in index.traces(start, stop)])
+
+    def test_foreign_traces(self):
+        index = trace_space_baseline([], ["z0"], [], (2, 1), 2)
+        with self.assertRaises(ValueError):
+            index.rank([{"z0": (5, 5)}])
+        with self.assertRaises(ValueError):
+            index.rank([{"z0": (0, 0)}] * 3)
+        with self.assertRaises(IndexError):
+            index.unrank(index.size)
+
+
+if __name__ == '__main__':
+    unittest.main()